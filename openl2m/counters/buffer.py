@@ -0,0 +1,88 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+In-memory aggregation of counter-style database updates.
+
+Instead of a read-modify-write on every event, increments are summed per object in this worker,
+and periodically written as "field = field + n" updates in a single transaction.
+This is used for the Counter() objects, and the access/change/command counters of a Switch().
+"""
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from switches import flusher
+
+_lock = threading.Lock()
+_buffer = {}  # key: (model, lookup), value: {'increments': {field: n}, 'values': {field: value}}
+
+
+def buffered_increment(model, lookup: dict, increments: dict, values: dict = None):
+    """
+    Buffer an increment of one or more fields of an object, and optionally set other fields.
+    If the object does not exist when written, the update is ignored.
+
+    Params:
+        model: the Django model class.
+        lookup (dict): the filter() arguments that find the object, e.g. {'pk': 1}
+        increments (dict): field names and the amount to add.
+        values (dict): field names and the value to set, the most recent value wins. E.g. a timestamp.
+    """
+    key = (model, tuple(sorted(lookup.items())))
+    with _lock:
+        entry = _buffer.setdefault(key, {'increments': {}, 'values': {}})
+        for field, amount in increments.items():
+            entry['increments'][field] = entry['increments'].get(field, 0) + amount
+        if values:
+            entry['values'].update(values)
+    flusher.start()
+
+
+def flush() -> int:
+    """
+    Write all buffered increments to the database in one transaction.
+
+    Returns:
+        (int): number of objects updated.
+    """
+    with _lock:
+        entries = dict(_buffer)
+        _buffer.clear()
+    if not entries:
+        return 0
+    # update in a consistent order, so concurrent workers do not deadlock.
+    keys = sorted(entries.keys(), key=lambda k: (k[0]._meta.label, k[1]))
+    try:
+        with transaction.atomic():
+            for key in keys:
+                model, lookup = key
+                updates = {field: F(field) + amount for field, amount in entries[key]['increments'].items()}
+                updates.update(entries[key]['values'])
+                model.objects.filter(**dict(lookup)).update(**updates)
+    except Exception:
+        # put the increments back, they will be retried on the next flush.
+        with _lock:
+            for key, entry in entries.items():
+                current = _buffer.setdefault(key, {'increments': {}, 'values': {}})
+                for field, amount in entry['increments'].items():
+                    current['increments'][field] = current['increments'].get(field, 0) + amount
+                for field, value in entry['values'].items():
+                    current['values'].setdefault(field, value)
+        raise
+    return len(keys)
+
+
+flusher.register(flush, interval=settings.COUNTER_WRITE_INTERVAL)
@@ -16,6 +16,7 @@ from django.contrib.auth.signals import user_logged_in, user_login_failed
 
 # this app creates a simple Counter class, used to track some activity counters
 import counters.constants as constants
+from counters.buffer import buffered_increment
 
 from switches.utils import dprint
 
@@ -57,17 +58,11 @@ class Counter(models.Model):
 
 
 def counter_increment(name, addition=1):
-    # function to increment the value of a named counter
+    # function to increment the value of a named counter.
+    # this is buffered in memory, and written periodically as an atomic update, see counters/buffer.py
+    # unknown counter names are ignored.
     dprint(f"counter_increment({name})")
-    try:
-        c = Counter.objects.get(name=name)
-        c.value += addition
-        c.save()
-
-    except Exception:
-        # ignore
-        dprint("Error finding counter!")
-        pass
+    buffered_increment(Counter, {'name': name}, increments={'value': addition})
 
 
 def increment_login_counter(sender, user, request, **kwargs):
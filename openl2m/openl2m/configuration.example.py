@@ -60,6 +60,14 @@ BASE_PATH = ''
 # Keep activity log entries for this many day. 0 disables (keep forever)
 LOG_MAX_AGE = 180
 
+# 'removelogs' deletes expired log entries in batches of this many ids, and pauses this many seconds between batches,
+# so the database is not locked up for a long time on very large log tables.
+# LOG_DELETE_BATCH_SIZE = 10000
+# LOG_DELETE_PAUSE = 0.1
+
+# if set, 'removelogs' first writes the expired log entries to a gzip-compressed JSON Lines file in this directory.
+# LOG_ARCHIVE_DIR = '/var/lib/openl2m/log-archive'
+
 # the maximum number of recent switch activity log entries shown when accessing a switch
 # Note that only change & error logs are shown, not 'view' log entries
 RECENT_SWITCH_LOG_COUNT = 25
@@ -102,6 +110,17 @@ SESSION_FILE_PATH = None
 CSRF_COOKIE_SECURE = False
 SESSION_COOKIE_SECURE = False
 
+# The Django cache, used for short-lived data such as statistics. By default, each worker process has
+# its own local memory cache. To share the cache between workers, you can e.g. use the database cache
+# (run "manage.py createcachetable" after setting this), or a Redis or Memcached server.
+# See https://docs.djangoproject.com/en/5.1/topics/cache/
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+#         'LOCATION': 'openl2m_cache',
+#     }
+# }
+
 # override the maximum GET/POST item count.
 # with large numbers of switches in a group, we may exceed the default (1000):
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
@@ -397,6 +416,10 @@ ETH_FORMAT = 0
 # matched interface are hidden:
 # IFACE_HIDE_SPEED_ABOVE = 9500
 
+# the regular expressions above, in command templates and in device searches, are compiled once,
+# and kept in memory. This sets the number of compiled expressions to keep. Default = 256
+# REGEX_CACHE_SIZE = 256
+
 #
 # a settings to dis-allow new interface description formats.
 # again uses Python 're' module to match.
@@ -498,6 +521,68 @@ SNMP_MAX_REPETITIONS = 25
 # If not, a textual version of log event will be sent.
 # SYSLOG_JSON = True
 
+# Activity log entries are queued in memory, and written to the database in bulk by a background thread,
+# at the end of each web request, and when the worker process exits.
+# Set LOG_WRITE_ASYNC = False to write each entry immediately (the previous behavior).
+# LOG_WRITE_ASYNC = True
+# the background thread writes queued entries at least every LOG_WRITE_INTERVAL seconds,
+# or sooner when LOG_WRITE_BATCH_SIZE entries are waiting:
+# LOG_WRITE_INTERVAL = 2
+# LOG_WRITE_BATCH_SIZE = 500
+
+# Activity counters, and the access, change and command counts of devices, are added up in memory
+# by each worker process, and written to the database every COUNTER_WRITE_INTERVAL seconds:
+# COUNTER_WRITE_INTERVAL = 10
+
+# Group inventory exports read all devices in a group in the background, this many at the same time.
+# A device that takes longer than EXPORT_DEVICE_TIMEOUT seconds is reported as an error in the export.
+# SNMP devices stop reading at that time; other drivers finish the read within their own connection timeouts.
+# EXPORT_MAX_WORKERS = 8
+# EXPORT_DEVICE_TIMEOUT = 180
+# the export files are stored in this directory, and removed after EXPORT_MAX_AGE hours:
+# EXPORT_DIR = '/tmp/openl2m-exports'
+# EXPORT_MAX_AGE = 24
+
+# A command, or command template, can be run on many devices of a group at the same time.
+# This many devices run the command at the same time, each with its own SSH session:
+# MULTI_COMMAND_MAX_WORKERS = 8
+# and a single run is limited to this many devices:
+# MULTI_COMMAND_MAX_DEVICES = 100
+
+# The 'poller' command (manage.py poller) periodically reads selected devices, so the first view of
+# such a device is shown immediately from the shared device cache. Devices are selected from the
+# POLLER_TOP_ACCESSED most accessed devices, the devices viewed in the last POLLER_ACTIVITY_DAYS days,
+# and all devices in groups with the 'Pre-read devices' option set.
+# The poller runs as a separate process, so the cache named by POLLER_CACHE needs to be shared,
+# see CACHES above. Set POLLER_ENABLED to True to use this:
+# POLLER_ENABLED = False
+# POLLER_CACHE = 'default'
+# each device is read every POLLER_INTERVAL seconds, plus a random delay of up to POLLER_JITTER seconds:
+# POLLER_INTERVAL = 300
+# POLLER_JITTER = 60
+# POLLER_MAX_WORKERS = 4
+# POLLER_TOP_ACCESSED = 25
+# POLLER_ACTIVITY_DAYS = 7
+# a pre-read device state older than POLLER_CACHE_TIMEOUT seconds is not used:
+# POLLER_CACHE_TIMEOUT = 900
+# if set, the poller also reads the ethernet and arp tables of the devices, to update the host index below:
+# POLLER_CLIENT_DATA = False
+# The poller also reads the ARP tables of the 'ARP Sources' set on each group (usually the routers),
+# every ARP_SOURCE_INTERVAL seconds. The IP addresses of ethernet addresses found on all devices
+# in the group are then taken from these tables, instead of reading the ARP table of each device.
+# ARP tables older than ARP_CACHE_TIMEOUT seconds are not used.
+# ARP_SOURCE_INTERVAL = 600
+# ARP_CACHE_TIMEOUT = 1800
+
+# Every time the ethernet and arp tables of a device are read, OpenL2M saves where each ethernet address
+# was found, and its IP addresses. This host index can be searched with the "Find a Host" menu, or the API,
+# without reading any device. Hosts not seen for HOST_INDEX_MAX_AGE days are removed by "manage.py removelogs"
+# HOST_INDEX_ENABLED = True
+# HOST_INDEX_MAX_AGE = 30
+# The index is written in the background, and a device is indexed at most once per HOST_INDEX_UPDATE_INTERVAL seconds:
+# HOST_INDEX_UPDATE_INTERVAL = 300
+# HOST_SEARCH_MAX_RESULTS = 100
+
 # Email settings, used to send results of commands and other emails.
 # the default uses the local plain old smtp server on port 25
 # see the installation docs or Django docs for other options.
@@ -521,6 +606,21 @@ EMAIL_SUBJECT_PREFIX_USER = '[OpenL2M] '
 
 # Vendor specific setings
 
+# Device drivers are imported when a device first needs them. Drivers you do not use can be disabled,
+# and are then never imported. This saves memory and start-up time in each web server process.
+# Devices using a disabled driver cannot be accessed. If an SNMP vendor driver is disabled,
+# the generic SNMP driver is used for those devices. The drivers, and their import times,
+# are shown in the 'Device Drivers' admin page. The driver names are:
+#   snmp, aoscx, pyez, commands_only, napalm, testdummy,
+#   snmp_cisco, snmp_juniper, snmp_procurve, snmp_comware, snmp_aruba_cx, snmp_arista_eos, snmp_netgear
+# DRIVERS_DISABLED = ['napalm', 'testdummy']
+
+# Site-local Python modules that register their own SNMP vendor drivers, e.g. a subclass of a builtin driver.
+# These are imported at startup. Each module calls switches.connect.registry.register_snmp_vendor(),
+# with the enterprise id(s), and optionally the sysObjectID prefixes or a model (sysDescr) regex to match.
+# A site-local driver is tried before the builtin drivers. See docs/code/switches_app/drivers/new-drivers.rst
+# DRIVERS_LOCAL = ['mysite.drivers']
+
 # the max time to wait, in seconds, for a new-style "cisco-copy-mib" "write mem" to complete:
 CISCO_WRITE_MEM_MAX_WAIT = 5
 
@@ -531,9 +631,70 @@ SSH_CONNECT_TIMEOUT = 5
 # SSH command read timeout, default = 15 (Netmiko library default = 10)
 SSH_COMMAND_TIMEOUT = 15
 
+# SSH command sessions are kept open after a command, and re-used for the next command
+# to the same device with the same Credentials Profile. This saves the login time.
+# Set to False to open a new session for every command.
+# SSH_POOL_ENABLED = True
+# the maximum number of open SSH sessions to a device, per web server process. Default = 2
+# SSH_POOL_MAX_PER_DEVICE = 2
+# idle SSH sessions are closed after this many seconds. Keep this below the idle (exec) timeout
+# configured on your devices. Default = 120
+# SSH_POOL_IDLE_TIMEOUT = 120
+# the seconds between SSH keepalive packets sent on open sessions. Default = 30
+# SSH_POOL_KEEPALIVE = 30
+
+# Aruba AOS-CX REST API sessions are kept logged in after a request, and re-used for the next request
+# to the same device. AOS-CX devices only allow a few REST sessions at the same time.
+# the maximum number of REST sessions to a device, per web server process. Default = 2
+# AOSCX_SESSION_MAX_PER_DEVICE = 2
+# idle REST sessions are logged out after this many seconds. Keep this below the session idle timeout
+# on your devices (20 minutes by default). Set to 0 to log out after every request. Default = 300
+# AOSCX_SESSION_IDLE_TIMEOUT = 300
+# the number of REST requests sent to a device at the same time, when reading the device. Default = 4
+# AOSCX_MAX_CONCURRENT_REQUESTS = 4
+
 # connect timeout for Junos devices via the Netconf interface
 JUNOS_PYEZ_CONN_TIMEOUT = 10
 
+# Junos Netconf sessions are kept open after a request, and re-used for the next request to the same device.
+# the maximum number of Netconf sessions to a device, per web server process. Default = 2
+# JUNOS_PYEZ_SESSION_MAX_PER_DEVICE = 2
+# idle Netconf sessions are closed after this many seconds. Keep this below the idle timeout
+# of the Netconf service on your devices. Set to 0 to close after every request. Default = 120
+# JUNOS_PYEZ_SESSION_IDLE_TIMEOUT = 120
+# the number of RPCs sent at the same time over a Netconf session, when reading a device.
+# Set to 1 to send them one at a time. Default = 4
+# JUNOS_PYEZ_MAX_CONCURRENT_RPCS = 4
+
+# Napalm driver sessions are kept open after a request, and re-used for the next request to the same device.
+# The getters, e.g. get_interfaces() and get_vlans(), run at the same time, each on its own session.
+# the maximum number of driver sessions to a device, per web server process. Default = 3
+# NAPALM_SESSION_MAX_PER_DEVICE = 3
+# idle driver sessions are closed after this many seconds. Set to 0 to close after every request. Default = 60
+# NAPALM_SESSION_IDLE_TIMEOUT = 60
+# the number of getters run at the same time, when reading a device. Set to 1 to run them one at a time. Default = 3
+# NAPALM_MAX_CONCURRENT_GETTERS = 3
+# the Napalm drivers (as set in the device 'Napalm Device Type') of devices that only allow
+# one management session at a time. Getters for these devices run one at a time. Default = []
+# NAPALM_SINGLE_SESSION_DRIVERS = ['procurve']
+# a getter that does not finish in this many seconds is abandoned, and an error is shown. Default = 60
+# NAPALM_GETTER_TIMEOUT = 60
+# The results of slow-changing getters are cached in the Django cache (see CACHES above) for this many seconds,
+# so a page refresh only reads the volatile data again. A device 'Reload' clears the cache.
+# Set a getter to 0 to not cache it. The default is:
+# NAPALM_GETTER_CACHE_TTL = {
+#     'get_facts': 3600,
+#     'get_vlans': 300,
+#     'get_interfaces_ip': 600,
+# }
+# Napalm devices are read-only, unless this is set to True. Changes are then made with the configuration
+# templates of the Napalm driver, in switches/connect/napalm/templates/<driver>/, and are merged and committed
+# with the Napalm configuration API. A bulk edit of many interfaces is committed once. Default = False
+# NAPALM_ALLOW_CHANGES = False
+# the compiled configuration templates are cached in this directory, and shared by all web server processes.
+# Default = '', the system temporary directory.
+# NAPALM_TEMPLATE_CACHE_DIR = ''
+
 # perform hostname lookup from IP addresses found in ARP info, Admin pages, etc.
 # Note this could have impact on page rendering, depending on how fast your
 # dns resolution is and how may retries the underlying host OS is configured for.
@@ -583,6 +744,8 @@ ALLOW_ARP_LLDP_DOWNLOAD = True
 TOP_ACTIVITY = 10
 # number of days for the "Top N" activity:
 TOP_ACTIVITY_DAYS = 7
+# the site usage statistics are cached for this many seconds:
+# STATS_CACHE_TIMEOUT = 60
 
 #
 # Neighbor device settings, used for LLDP Neighbor tab, and Mermaid graphical view
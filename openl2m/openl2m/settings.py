@@ -28,6 +28,7 @@ import os
 import socket
 import platform
 import sys
+import tempfile
 import netaddr
 
 from django.core.exceptions import ImproperlyConfigured
@@ -86,6 +87,9 @@ BASE_PATH = getattr(configuration, "BASE_PATH", "")
 if BASE_PATH:
     BASE_PATH = BASE_PATH.strip("/") + "/"  # Enforce trailing slash only
 LOG_MAX_AGE = getattr(configuration, "LOG_MAX_AGE", 180)
+LOG_DELETE_BATCH_SIZE = getattr(configuration, "LOG_DELETE_BATCH_SIZE", 10000)
+LOG_DELETE_PAUSE = getattr(configuration, "LOG_DELETE_PAUSE", 0.1)
+LOG_ARCHIVE_DIR = getattr(configuration, "LOG_ARCHIVE_DIR", "")
 RECENT_SWITCH_LOG_COUNT = getattr(configuration, "RECENT_SWITCH_LOG_COUNT", 25)
 CORS_ORIGIN_ALLOW_ALL = getattr(configuration, "CORS_ORIGIN_ALLOW_ALL", False)
 CORS_ORIGIN_REGEX_WHITELIST = getattr(configuration, "CORS_ORIGIN_REGEX_WHITELIST", [])
@@ -142,6 +146,8 @@ IFACE_HIDE_REGEX_IFDESCR = getattr(configuration, "IFACE_HIDE_REGEX_IFDESCR", ""
 IFACE_HIDE_SPEED_ABOVE = getattr(configuration, "IFACE_HIDE_SPEED_ABOVE", 0)
 IFACE_ALIAS_NOT_ALLOW_REGEX = getattr(configuration, "IFACE_ALIAS_NOT_ALLOW_REGEX", "")
 IFACE_ALIAS_KEEP_BEGINNING_REGEX = getattr(configuration, "IFACE_ALIAS_KEEP_BEGINNING_REGEX", "")
+# the number of compiled regular expressions kept in memory, see switches/utils.py get_compiled_regex()
+REGEX_CACHE_SIZE = getattr(configuration, "REGEX_CACHE_SIZE", 256)
 
 # if true, interface IPv4 will show prefixlen. Default is subnet mask.
 IFACE_IP4_SHOW_PREFIXLEN = getattr(configuration, "IFACE_IP4_SHOW_PREFIXLEN", False)
@@ -176,6 +182,42 @@ if SYSLOG_HOST:
     except Exception:
         raise ImproperlyConfigured("SYSLOG_HOST is not a valid host name")
 
+# Activity log writing:
+LOG_WRITE_ASYNC = getattr(configuration, "LOG_WRITE_ASYNC", True)  # queue log entries and write in bulk
+LOG_WRITE_INTERVAL = getattr(configuration, "LOG_WRITE_INTERVAL", 2)  # seconds between background writes
+LOG_WRITE_BATCH_SIZE = getattr(configuration, "LOG_WRITE_BATCH_SIZE", 500)  # write sooner if this many are queued
+# Counters and device access/change/command counts are aggregated in memory, and written this often (seconds):
+COUNTER_WRITE_INTERVAL = getattr(configuration, "COUNTER_WRITE_INTERVAL", 10)
+
+# Group inventory exports:
+EXPORT_MAX_WORKERS = getattr(configuration, "EXPORT_MAX_WORKERS", 8)  # devices read at the same time
+EXPORT_DEVICE_TIMEOUT = getattr(configuration, "EXPORT_DEVICE_TIMEOUT", 180)  # seconds, per device
+EXPORT_DIR = getattr(configuration, "EXPORT_DIR", os.path.join(tempfile.gettempdir(), "openl2m-exports"))
+EXPORT_MAX_AGE = getattr(configuration, "EXPORT_MAX_AGE", 24)  # hours to keep export files
+
+# Running a command on many devices of a group:
+MULTI_COMMAND_MAX_WORKERS = getattr(configuration, "MULTI_COMMAND_MAX_WORKERS", 8)  # devices run at the same time
+MULTI_COMMAND_MAX_DEVICES = getattr(configuration, "MULTI_COMMAND_MAX_DEVICES", 100)  # devices per run
+
+# the 'poller' command pre-reads devices into the shared device cache:
+POLLER_ENABLED = getattr(configuration, "POLLER_ENABLED", False)
+POLLER_CACHE = getattr(configuration, "POLLER_CACHE", "default")  # name of the cache in CACHES
+POLLER_INTERVAL = getattr(configuration, "POLLER_INTERVAL", 300)  # seconds between reads of a device
+POLLER_JITTER = getattr(configuration, "POLLER_JITTER", 60)  # random seconds added to spread out reads
+POLLER_MAX_WORKERS = getattr(configuration, "POLLER_MAX_WORKERS", 4)  # devices read at the same time
+POLLER_TOP_ACCESSED = getattr(configuration, "POLLER_TOP_ACCESSED", 25)  # most accessed devices to read
+POLLER_ACTIVITY_DAYS = getattr(configuration, "POLLER_ACTIVITY_DAYS", 7)  # devices viewed in the last days
+POLLER_CACHE_TIMEOUT = getattr(configuration, "POLLER_CACHE_TIMEOUT", 900)  # seconds a snapshot can be used
+POLLER_CLIENT_DATA = getattr(configuration, "POLLER_CLIENT_DATA", False)  # also read ethernet/arp tables
+ARP_SOURCE_INTERVAL = getattr(configuration, "ARP_SOURCE_INTERVAL", 600)  # seconds between reads of ARP sources
+ARP_CACHE_TIMEOUT = getattr(configuration, "ARP_CACHE_TIMEOUT", 1800)  # seconds an ARP table can be used
+
+# the host location index, updated when ethernet and arp tables are read:
+HOST_INDEX_ENABLED = getattr(configuration, "HOST_INDEX_ENABLED", True)
+HOST_INDEX_MAX_AGE = getattr(configuration, "HOST_INDEX_MAX_AGE", 30)  # days to keep hosts not seen
+HOST_INDEX_UPDATE_INTERVAL = getattr(configuration, "HOST_INDEX_UPDATE_INTERVAL", 300)  # seconds, per device
+HOST_SEARCH_MAX_RESULTS = getattr(configuration, "HOST_SEARCH_MAX_RESULTS", 100)
+
 # Sessions
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 if LOGIN_TIMEOUT is not None:
@@ -198,6 +240,18 @@ SESSION_COOKIE_SECURE = getattr(configuration, "SESSION_COOKIE_SECURE", False)
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# The Django cache, used for short-lived data such as statistics.
+# The default is a local memory cache in each worker process.
+CACHES = getattr(
+    configuration,
+    "CACHES",
+    {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    },
+)
+
 # override the maximum GET/POST item count.
 # with large numbers of switches in a group, we may exceed the default (1000):
 DATA_UPLOAD_MAX_NUMBER_FIELDS = getattr(configuration, "DATA_UPLOAD_MAX_NUMBER_FIELDS", 10000)
@@ -441,6 +495,11 @@ LOOKUP_HOSTNAME_LLDP = getattr(configuration, "LOOKUP_HOSTNAME_LLDP", False)
 # lookup hostnames for routed interface IP addresses.
 LOOKUP_HOSTNAME_ROUTED_IP = getattr(configuration, "LOOKUP_HOSTNAME_ROUTED_IP", False)
 
+# the device drivers that are never imported, see switches/connect/registry.py
+DRIVERS_DISABLED = getattr(configuration, 'DRIVERS_DISABLED', [])
+# site-local modules that register more device drivers, see switches/connect/registry.py
+DRIVERS_LOCAL = getattr(configuration, 'DRIVERS_LOCAL', [])
+
 # SSH connect timeout, default = 5 seconds (Netmiko library default = 10)
 # Only used on SSH command sessions.
 SSH_CONNECT_TIMEOUT = getattr(configuration, 'SSH_CONNECT_TIMEOUT', 5)
@@ -448,8 +507,58 @@ SSH_CONNECT_TIMEOUT = getattr(configuration, 'SSH_CONNECT_TIMEOUT', 5)
 # SSH command read timeout, default = 15 (Netmiko library default = 10)
 SSH_COMMAND_TIMEOUT = getattr(configuration, 'SSH_COMMAND_TIMEOUT', 15)
 
+# re-use SSH command sessions across requests, see switches/connect/sshpool.py
+SSH_POOL_ENABLED = getattr(configuration, 'SSH_POOL_ENABLED', True)
+# the maximum number of SSH sessions to a device, per web server process
+SSH_POOL_MAX_PER_DEVICE = getattr(configuration, 'SSH_POOL_MAX_PER_DEVICE', 2)
+# idle sessions are closed after this many seconds
+SSH_POOL_IDLE_TIMEOUT = getattr(configuration, 'SSH_POOL_IDLE_TIMEOUT', 120)
+# seconds between SSH keepalives on pooled sessions
+SSH_POOL_KEEPALIVE = getattr(configuration, 'SSH_POOL_KEEPALIVE', 30)
+
+# AOS-CX REST API sessions are kept logged in and re-used, see switches/connect/aruba_aoscx/connector.py
+# the maximum number of REST sessions to a device, per web server process
+AOSCX_SESSION_MAX_PER_DEVICE = getattr(configuration, 'AOSCX_SESSION_MAX_PER_DEVICE', 2)
+# idle sessions are logged out after this many seconds. 0 logs out after every request.
+AOSCX_SESSION_IDLE_TIMEOUT = getattr(configuration, 'AOSCX_SESSION_IDLE_TIMEOUT', 300)
+# the number of REST requests to a device at the same time, when reading the device
+AOSCX_MAX_CONCURRENT_REQUESTS = getattr(configuration, 'AOSCX_MAX_CONCURRENT_REQUESTS', 4)
+
 # connect timeout for Junos devices via the Netconf interface
 JUNOS_PYEZ_CONN_TIMEOUT = getattr(configuration, 'JUNOS_PYEZ_CONN_TIMEOUT', 10)
+# Junos Netconf sessions are kept open and re-used, see switches/connect/junos_pyez/connector.py
+# the maximum number of Netconf sessions to a device, per web server process
+JUNOS_PYEZ_SESSION_MAX_PER_DEVICE = getattr(configuration, 'JUNOS_PYEZ_SESSION_MAX_PER_DEVICE', 2)
+# idle sessions are closed after this many seconds. 0 closes the session after every request.
+JUNOS_PYEZ_SESSION_IDLE_TIMEOUT = getattr(configuration, 'JUNOS_PYEZ_SESSION_IDLE_TIMEOUT', 120)
+# the number of RPCs sent at the same time over a Netconf session, when reading the device
+JUNOS_PYEZ_MAX_CONCURRENT_RPCS = getattr(configuration, 'JUNOS_PYEZ_MAX_CONCURRENT_RPCS', 4)
+
+# Napalm driver sessions are kept open and re-used, see switches/connect/napalm/connector.py
+# the maximum number of driver sessions to a device, per web server process
+NAPALM_SESSION_MAX_PER_DEVICE = getattr(configuration, 'NAPALM_SESSION_MAX_PER_DEVICE', 3)
+# idle sessions are closed after this many seconds. 0 closes the sessions after every request.
+NAPALM_SESSION_IDLE_TIMEOUT = getattr(configuration, 'NAPALM_SESSION_IDLE_TIMEOUT', 60)
+# the number of getters run at the same time, each on its own session, when reading the device
+NAPALM_MAX_CONCURRENT_GETTERS = getattr(configuration, 'NAPALM_MAX_CONCURRENT_GETTERS', 3)
+# Napalm drivers of devices that allow only one management session; their getters run one at a time
+NAPALM_SINGLE_SESSION_DRIVERS = getattr(configuration, 'NAPALM_SINGLE_SESSION_DRIVERS', [])
+# seconds a getter can run, before it is abandoned
+NAPALM_GETTER_TIMEOUT = getattr(configuration, 'NAPALM_GETTER_TIMEOUT', 60)
+# the seconds the results of the slow-changing getters are cached, see switches/connect/napalm/cache.py
+NAPALM_GETTER_CACHE_TTL = getattr(
+    configuration,
+    'NAPALM_GETTER_CACHE_TTL',
+    {
+        'get_facts': 3600,
+        'get_vlans': 300,
+        'get_interfaces_ip': 600,
+    },
+)
+# if True, changes are allowed on Napalm devices with configuration templates, see switches/connect/napalm/commands.py
+NAPALM_ALLOW_CHANGES = getattr(configuration, 'NAPALM_ALLOW_CHANGES', False)
+# the directory of the compiled Napalm configuration templates. Empty is the system temporary directory.
+NAPALM_TEMPLATE_CACHE_DIR = getattr(configuration, 'NAPALM_TEMPLATE_CACHE_DIR', "")
 
 # REST API Settings
 API_ENABLED = getattr(configuration, 'API_ENABLED', True)
@@ -467,6 +576,8 @@ ALLOW_ARP_LLDP_DOWNLOAD = getattr(configuration, 'ALLOW_ARP_LLDP_DOWNLOAD', True
 TOP_ACTIVITY = getattr(configuration, 'TOP_ACTIVITY', 10)
 # number of days for the "Top N" activity:
 TOP_ACTIVITY_DAYS = getattr(configuration, 'TOP_ACTIVITY_DAYS', 7)
+# number of seconds the site usage statistics are cached:
+STATS_CACHE_TIMEOUT = getattr(configuration, 'STATS_CACHE_TIMEOUT', 60)
 
 #
 # Neighbor device settings, used for LLDP Neighbor tab, and Mermaid graphical view
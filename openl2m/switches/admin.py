@@ -58,6 +58,8 @@ class SwitchAdmin(admin.ModelAdmin):
     list_display = ['name', 'access_count', 'last_accessed', 'change_count', 'last_changed', 'get_switchgroups']
     readonly_fields = (
         'hostname',
+        'driver_name',
+        'sys_object_id',
         'created',
         #        'modified',
         'last_accessed',
@@ -114,7 +116,7 @@ class SwitchAdmin(admin.ModelAdmin):
             },
         ),
         ('Other Options', {'fields': ('nms_id',)}),
-        ('Read-Only Fields', {'fields': ('hostname',)}),
+        ('Read-Only Fields', {'fields': ('hostname', 'driver_name', 'sys_object_id')}),
         (
             'Stats',
             {
@@ -156,7 +158,7 @@ class SwitchGroupAdmin(OrderedInlineModelAdminMixin, admin.ModelAdmin):
     save_on_top = True
     save_as = True
     search_fields = ['name']
-    filter_horizontal = ('users', 'vlan_groups', 'vlans')
+    filter_horizontal = ('users', 'vlan_groups', 'vlans', 'arp_sources')
     list_display = ['name', 'switch_count', 'get_switchgroup_users']
     # inlines = (SwitchGroupSwitchesThroughModelTabularInline, )
     inlines = (SwitchGroupMembershipStackedInline,)
@@ -195,6 +197,8 @@ class SwitchGroupAdmin(OrderedInlineModelAdminMixin, admin.ModelAdmin):
                     'bulk_edit',
                     'allow_poe_toggle',
                     'edit_if_descr',
+                    'prefetch',
+                    'arp_sources',
                     'comments',
                 ),
             },
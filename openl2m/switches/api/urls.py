@@ -16,8 +16,11 @@ from django.urls import path
 from switches.api.views import (
     APISwitchMenuView,
     APISwitchSearch,
+    APIHostSearch,
+    APIGroupCommand,
     APISwitchBasicView,
     APISwitchDetailsView,
+    APISwitchActivity,
     APISwitchSaveConfig,
     APISwitchVlanAdd,
     APISwitchVlanEdit,
@@ -42,6 +45,16 @@ urlpatterns = [
         APISwitchSearch.as_view(),
         name="api_switch_search",
     ),
+    path(
+        "hosts/<str:host>/",
+        APIHostSearch.as_view(),
+        name="api_host_search",
+    ),
+    path(
+        "<int:group_id>/command/",
+        APIGroupCommand.as_view(),
+        name="api_group_command",
+    ),
     path(
         "<int:group_id>/<int:switch_id>/",
         APISwitchBasicView.as_view(),
@@ -52,6 +65,11 @@ urlpatterns = [
         APISwitchDetailsView.as_view(),
         name="api_switch_details_view",
     ),
+    path(
+        "<int:group_id>/<int:switch_id>/logs/",
+        APISwitchActivity.as_view(),
+        name="api_switch_activity",
+    ),
     path(
         "<int:group_id>/<int:switch_id>/save/",
         APISwitchSaveConfig.as_view(),
@@ -16,6 +16,9 @@
 # Here we implement all API views as classes
 #
 
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
 # Use the Django Rest Framework:
 from rest_framework import status as http_status
 from rest_framework.response import Response
@@ -31,9 +34,13 @@ from switches.actions import (
     perform_switch_vlan_edit,
     perform_switch_vlan_delete,
 )
+from switches import hostindex, multicommand
 from switches.connect.connect import get_connection_object
+from switches.constants import LOG_EXECUTE_COMMAND, LOG_TYPE_COMMAND
+from switches.models import Log, SwitchGroup
+from switches.paginator import get_keyset_page
 from switches.permissions import get_my_device_groups, get_group_and_switch
-from switches.utils import dprint
+from switches.utils import dprint, get_remote_ip
 
 on_values = ["on", "yes", "y", "enabled", "enable", "true", "1"]
 
@@ -122,6 +129,80 @@ class APISwitchSearch(
         )
 
 
+class APIHostSearch(
+    APIView,
+):
+    """
+    Find where an ethernet or IP address was last seen, from the host location index.
+    This does not read any device.
+    """
+
+    def get(
+        self,
+        request,
+        host,
+    ):
+        dprint(f"APIHostSearch(): user={request.user.username}, auth={request.auth}")
+
+        if not settings.HOST_INDEX_ENABLED:
+            return respond_error(reason="The host index is not enabled!")
+        allowed = hostindex.get_allowed_switches(get_my_device_groups(request=request))
+        results, error = hostindex.search(query=host, allowed=allowed)
+        if error:
+            return respond_error(reason=error)
+        return Response(
+            data={'hosts': results},
+            status=http_status.HTTP_200_OK,
+        )
+
+
+class APIGroupCommand(
+    APIView,
+):
+    """
+    Run a global command, or command template, on all (or selected) devices in a group.
+    The result of each device is streamed as a line of JSON as soon as it is done,
+    the last line has the totals. See switches/multicommand.py
+    """
+
+    def post(
+        self,
+        request,
+        group_id,
+    ):
+        dprint(f"APIGroupCommand(): user={request.user.username}, auth={request.auth}")
+
+        groups = get_my_device_groups(request=request)
+        if str(group_id) not in groups:
+            return respond_error(reason="Access denied!")
+        group = SwitchGroup.objects.filter(pk=group_id).first()
+        if group is None:
+            return respond_error(reason="Access denied!")
+        command, template, switches, error = multicommand.prepare_command(
+            user=request.user,
+            data=request.data,
+            switch_ids=[int(switch_id) for switch_id in groups[str(group_id)]['members'].keys()],
+        )
+        if error:
+            return respond_error(reason=error)
+
+        log = Log(
+            user=request.user,
+            ip_address=get_remote_ip(request),
+            group=group,
+            type=LOG_TYPE_COMMAND,
+            action=LOG_EXECUTE_COMMAND,
+            description=f"API: Running '{command}' on {len(switches)} devices of group '{group.name}'",
+        )
+        log.save()
+        results = multicommand.run_command_on_devices(
+            request=request, group=group, switches=switches, command_string=command, template=template
+        )
+        return StreamingHttpResponse(
+            multicommand.stream_results(results=results, total=len(switches)), content_type="application/x-ndjson"
+        )
+
+
 def switch_info(request, group_id, switch_id, details):
     connection, response_error = get_connection_to_switch(
         request=request, group_id=group_id, switch_id=switch_id, details=details
@@ -181,6 +262,61 @@ class APISwitchDetailsView(
         return switch_info(request=request, group_id=group_id, switch_id=switch_id, details=True)
 
 
+class APISwitchActivity(
+    APIView,
+):
+    """
+    Return the activity logs for a device, newest first.
+    This uses keyset pagination: pass the returned 'next' value as the 'after' parameter to get older entries.
+    """
+
+    def get(
+        self,
+        request,
+        group_id,
+        switch_id,
+    ):
+        dprint("APISwitchActivity(GET)")
+        group, switch = get_group_and_switch(request=request, group_id=group_id, switch_id=switch_id)
+        if not group or not switch:
+            return respond(status=http_status.HTTP_403_FORBIDDEN, text="Access denied!")
+
+        try:
+            count = min(int(request.GET.get("count", settings.PAGINATE_COUNT)), settings.MAX_PAGE_SIZE)
+        except ValueError:
+            return respond_error("Invalid 'count' parameter!")
+        if count < 1:
+            return respond_error("The 'count' parameter needs to be 1 or more!")
+        page = get_keyset_page(
+            queryset=Log.objects.filter(switch_id=switch.id).select_related("user"),
+            per_page=count,
+            after=request.GET.get("after", ""),
+            before=request.GET.get("before", ""),
+        )
+        logs = []
+        for log in page:
+            logs.append(
+                {
+                    "timestamp": log.timestamp,
+                    "user": log.user.username if log.user else "",
+                    "ip_address": log.ip_address,
+                    "type": log.get_type_display(),
+                    "action": log.get_action_display(),
+                    "if_name": log.if_name,
+                    "description": log.description,
+                }
+            )
+        data = {
+            "logs": logs,
+            "next": page.next_cursor,
+            "previous": page.previous_cursor,
+        }
+        return Response(
+            data=data,
+            status=http_status.HTTP_200_OK,
+        )
+
+
 class APISwitchSaveConfig(
     APIView,
 ):
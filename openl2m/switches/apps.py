@@ -16,3 +16,10 @@ from django.apps import AppConfig
 
 class SwitchesConfig(AppConfig):
     name = 'switches'
+
+    def ready(self):
+        from django.core import checks
+
+        from switches import retention
+
+        checks.register(retention.check_migrations, checks.Tags.database)
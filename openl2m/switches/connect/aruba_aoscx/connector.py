@@ -12,12 +12,18 @@
 # License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
 #
 import datetime
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote_plus, unquote_plus
+
+from django.conf import settings
 
 from switches.utils import dprint, dvar
 from switches.constants import LOG_TYPE_ERROR, LOG_AOSCX_ERROR_GENERIC
 from switches.connect.classes import Interface, PoePort, NeighborDevice
 from switches.connect.connector import Connector
+from switches.connect.sessionpool import PoolExhausted, SessionPool
 from switches.connect.aruba_aoscx.utils import aoscx_parse_duplex
 from switches.connect.constants import (
     POE_PORT_ADMIN_DISABLED,
@@ -67,6 +73,42 @@ import urllib3
 # see https://github.com/aruba/pyaoscx/tree/master/pyaoscx/rest
 API_VERSION = "10.08"  # '10.09', '10.08' or '10.04'
 
+# seconds to wait for a REST session to the device, if all are in use:
+SESSION_WAIT_TIMEOUT = 10
+
+# the interface attributes we parse in get_my_basic_info(). At depth 2, the 'poe_interface' reference
+# is expanded into the PoE configuration, status and measurements of the port.
+INTERFACE_ATTRIBUTES = (
+    "name,description,admin,admin_state,link_speed,duplex,ip_mtu,mvrp_enable,routing,type,"
+    "applied_vlan_tag,applied_vlan_mode,applied_vlan_trunks,lacp,bond_status,lacp_current,lacp_status,"
+    "ip4_address,ip4_address_secondary,vrf,poe_interface"
+)
+
+
+def _session_is_alive(aoscx_session: AosCxSession) -> bool:
+    """
+    Check if a logged-in REST session is still valid, i.e. it did not expire on the device.
+    """
+    response = aoscx_session.request("GET", "system", params={"attributes": "hostname"})
+    return response.status_code == 200
+
+
+def _session_logout(aoscx_session: AosCxSession):
+    aoscx_session.close()
+
+
+# REST sessions are kept logged in between requests, and re-used for the next request
+# to the same device. AOS-CX devices only allow a few REST sessions at the same time!
+# Keep settings.AOSCX_SESSION_IDLE_TIMEOUT below the device session idle timeout (default 20 minutes).
+_session_pool = SessionPool(
+    name="aoscx",
+    max_per_key=settings.AOSCX_SESSION_MAX_PER_DEVICE,
+    idle_timeout=settings.AOSCX_SESSION_IDLE_TIMEOUT,
+    wait_timeout=SESSION_WAIT_TIMEOUT,
+    is_alive=_session_is_alive,
+    close_handle=_session_logout,
+)
+
 
 class AosCxConnector(Connector):
     """
@@ -97,9 +139,11 @@ class AosCxConnector(Connector):
         # this is a read-write driver:
         # self.switch.read_only = False
 
-        # this will be the pyaoscx driver session object
+        # this will be the pyaoscx driver session object, borrowed from the session pool
         self.aoscx_session = False
         self.set_do_not_cache_attribute('aoscx_session')
+        self.aoscx_pooled_session = None
+        self.set_do_not_cache_attribute('aoscx_pooled_session')
 
         # capabilities of current driver:
         self.can_change_admin_status = True
@@ -121,27 +165,33 @@ class AosCxConnector(Connector):
             # self.error already set!
             return False
 
+        # the device, vlan, vrf and interface reads are independent,
+        # so we run them at the same time over the same REST session.
+        executor = ThreadPoolExecutor(
+            max_workers=settings.AOSCX_MAX_CONCURRENT_REQUESTS, thread_name_prefix="openl2m-aoscx"
+        )
+        device_future = executor.submit(self._read_device)
+        vlans_future = executor.submit(AosCxVlan.get_facts, session=self.aoscx_session)
+        vrfs_future = executor.submit(self._read_vrfs)
+        interfaces_future = executor.submit(self._read_interfaces_bulk)
+
         # get facts of device first, ie OS, model, etc.!
         # see https://github.com/aruba/pyaoscx/blob/master/pyaoscx/device.py
         try:
-            aoscx_device = AosCxDevice(session=self.aoscx_session)
-            aoscx_device.get()
+            aoscx_device = device_future.result()
         except Exception as error:
             dprint(f"  get_my_basic_info(): AosCxDevice.get() failed: {format(error)}")
-            self._close_device()
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._close_device(healthy=False)
             self.error.status = True
             self.error.description = "Error establishing connection!"
             self.error.details = f"Cannot read device information: {format(error)}"
             self.add_warning(
                 warning=f"Cannot read device information: {repr(error)} ({str(type(error))}) => {traceback.format_exc()}"
             )
-            self._close_device()
             return False
 
         # dvar(var=aoscx_device, header="\n\nAosCxDevice:\n\n")
-
-        # sub-systems has information about power supplies, etc.
-        aoscx_device.get_subsystems()
         # dvar(var=aoscx_device, header="\n\nAosCxDevice-SubSystems:\n\n")
 
         # this has info about each subsystem in the environment:
@@ -232,14 +282,14 @@ class AosCxConnector(Connector):
 
         # get the VLAN info, this get class objects pyaoscx.vlan.Vlan()
         try:
-            aoscx_vlans = AosCxVlan.get_facts(session=self.aoscx_session)
+            aoscx_vlans = vlans_future.result()
         except Exception as error:
-            self._close_device()
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._close_device(healthy=False)
             self.error.status = True
             self.error.description = "Error establishing connection!"
             self.error.details = f"Cannot read device vlans: {format(error)}"
             dprint("  get_my_basic_info(): AosCxVlan.get_facts() failed!")
-            self._close_device()
             return False
 
         for id, vlan in aoscx_vlans.items():
@@ -256,31 +306,47 @@ class AosCxConnector(Connector):
                 self.vlans[vlan_id].voice = True
 
         # get any VRF information
-        vrfs = AosCxVrf.get_all(session=self.aoscx_session)
+        try:
+            vrfs = vrfs_future.result()
+        except Exception as error:
+            dprint(f"  get_my_basic_info(): AosCxVrf.get_all() failed: {format(error)}")
+            self.add_warning(warning=f"Cannot read device VRFs: {format(error)}")
+            vrfs = {}
         for name, vrf in vrfs.items():
             # dprint(f"Found VRF '{name}'")
             # dvar(vrf)
             v = self.get_vrf_by_name(name=name)
-            vrf.get()
             # dprint("  -- GET() --")
             # dvar(vrf)
             if vrf.rd:
                 v.rd = vrf.rd
 
-        # and get the interfaces:
+        # and get the interfaces, with the PoE data of each port, in a single REST call:
         try:
-            # get_facts() returns Interface() items as dictionaries, not classes!
-            aoscx_interfaces = AosCxInterface.get_facts(session=self.aoscx_session)
-            # get_all() return a proper class pyaoscx.interface.Interface() ...
-            # aoscx_interfaces2 = AosCxInterface.get_all(session=self.aoscx_session)
+            (aoscx_interfaces, poe_interfaces, elapsed) = interfaces_future.result()
+            self.add_timing("Interfaces and PoE (bulk)", len(aoscx_interfaces), elapsed)
         except Exception as error:
-            self._close_device()
-            self.error.status = True
-            self.error.description = "Error establishing connection!"
-            self.error.details = f"Cannot read device interfaces: {format(error)}"
-            dprint("  get_my_basic_info(): AosCxInterface.get_facts() failed!")
-            self._close_device()
-            return False
+            # e.g. older firmware that does not support the attribute selection:
+            dprint(f"  get_my_basic_info(): bulk interface read failed: {format(error)}")
+            start_time = time.time()
+            try:
+                # get_facts() returns Interface() items as dictionaries, not classes!
+                aoscx_interfaces = AosCxInterface.get_facts(session=self.aoscx_session)
+                # get_all() return a proper class pyaoscx.interface.Interface() ...
+                # aoscx_interfaces2 = AosCxInterface.get_all(session=self.aoscx_session)
+            except Exception as error:
+                executor.shutdown(wait=True, cancel_futures=True)
+                self._close_device(healthy=False)
+                self.error.status = True
+                self.error.description = "Error establishing connection!"
+                self.error.details = f"Cannot read device interfaces: {format(error)}"
+                dprint("  get_my_basic_info(): AosCxInterface.get_facts() failed!")
+                return False
+            # read the PoE status of all ports, one port per request:
+            if_names = list(aoscx_interfaces.keys())
+            poe_interfaces = dict(zip(if_names, executor.map(self._read_poe_interface, if_names)))
+            self.add_timing("Interfaces and PoE (per port)", len(aoscx_interfaces), time.time() - start_time)
+        executor.shutdown(wait=True)
 
         # if you use the class object, and want to get a fully materialized (ie. flushed-out) object,
         # you need to call .get() on each Interface() object first!
@@ -376,36 +442,27 @@ class AosCxConnector(Connector):
                     if 'ip4_address_secondary' in aoscx_interface:
                         dprint(f"   IPv4(2nd) = {aoscx_interface['ip4_address_secondary']}")
 
-            # check if this has PoE Capabilities
-            try:
-                # go get PoE info:
-                aoscx_iface = AosCxInterface(session=self.aoscx_session, name=if_name)
-                aoscx_poe_iface = AosCxPoEInterface(session=self.aoscx_session, parent_interface=aoscx_iface)
-                # get both configuration data (which has poe enable/disable status)
-                aoscx_poe_iface.get(selector='status')
-                # as well as status data, which has power usage:
-                aoscx_poe_iface.get(selector='configuration')
-
+            # check if this has PoE Capabilities, read above:
+            aoscx_poe = poe_interfaces.get(if_name)
+            if aoscx_poe:
                 dprint(f"   +++ POE Exists for {if_name} ===")
                 # there is probably a more 'global' system/device way to see if PoE capabilities exist:
                 self.poe_capable = True
                 self.poe_enabled = True
                 # assign an OpenL2M PoePort() object
-                # dprint(f"POE: config.admin_disabled={aoscx_poe.config['admin_disable']}")
-                if aoscx_poe_iface.config['admin_disable']:
+                # dprint(f"POE: config.admin_disabled={aoscx_poe['config']['admin_disable']}")
+                if aoscx_poe['config'].get('admin_disable', False):
                     poe_status = POE_PORT_ADMIN_DISABLED
                 else:
                     poe_status = POE_PORT_ADMIN_ENABLED
                 poe_entry = PoePort(index=if_name, admin_status=poe_status)
                 iface.poe_entry = poe_entry
                 # get power used. Listed in watts, convert to milliwatts:
-                consumed = int(aoscx_poe_iface.measurements['power_drawn'] * 1000)
+                measurements = aoscx_poe.get('measurements') or {}
+                consumed = int((measurements.get('power_drawn') or 0) * 1000)
                 if consumed > 0:
                     super().set_interface_poe_consumed(iface, consumed)
 
-            except Exception as error:
-                dprint(f"   +++ NO PoE! - exception: {format(error)}")
-
             # check VRF membership
             if 'vrf' in aoscx_interface:
                 if aoscx_interface['vrf'] is not None:
@@ -431,6 +488,74 @@ class AosCxConnector(Connector):
         self._close_device()
         return True
 
+    def _read_device(self) -> AosCxDevice:
+        '''
+        Read the device facts, and the sub-systems, which have information about power supplies, etc.
+        This runs in a worker thread, and should not modify our Connector() data!
+
+        Returns:
+            (AosCxDevice): the device object. Raises an exception on errors.
+        '''
+        aoscx_device = AosCxDevice(session=self.aoscx_session)
+        aoscx_device.get()
+        aoscx_device.get_subsystems()
+        return aoscx_device
+
+    def _read_vrfs(self) -> dict:
+        '''
+        Read all the VRFs, with their details. This runs in a worker thread.
+
+        Returns:
+            (dict): AosCxVrf() objects, keyed by VRF name. Raises an exception on errors.
+        '''
+        vrfs = AosCxVrf.get_all(session=self.aoscx_session)
+        for vrf in vrfs.values():
+            vrf.get()
+        return vrfs
+
+    def _read_interfaces_bulk(self) -> tuple:
+        '''
+        Read all interfaces, with the attributes we need and the PoE data of each port, in a single REST call.
+        This runs in a worker thread.
+
+        Returns:
+            (tuple): (interfaces, poe_interfaces, elapsed):
+                the interface dictionaries, keyed by name, the PoE dictionaries of the ports that support PoE,
+                keyed by name, and the time it took. Raises an exception on errors.
+        '''
+        start_time = time.time()
+        aoscx_interfaces = self._rest_get(
+            path="system/interfaces",
+            params={'depth': 2, 'attributes': INTERFACE_ATTRIBUTES},
+        )
+        poe_interfaces = {}
+        for if_name, aoscx_interface in aoscx_interfaces.items():
+            # ports without PoE do not have this, or only have the reference uri:
+            aoscx_poe = aoscx_interface.pop('poe_interface', None)
+            if isinstance(aoscx_poe, dict) and 'config' in aoscx_poe:
+                poe_interfaces[if_name] = aoscx_poe
+        return (aoscx_interfaces, poe_interfaces, time.time() - start_time)
+
+    def _read_poe_interface(self, if_name: str) -> dict | None:
+        '''
+        Read the PoE configuration and status of an interface. This runs in a worker thread.
+        This is only used if the bulk interface read fails.
+
+        Returns:
+            (dict): the PoE 'config' and 'measurements', or None if the interface does not support PoE.
+        '''
+        try:
+            aoscx_iface = AosCxInterface(session=self.aoscx_session, name=if_name)
+            aoscx_poe_iface = AosCxPoEInterface(session=self.aoscx_session, parent_interface=aoscx_iface)
+            # get both configuration data (which has poe enable/disable status)
+            aoscx_poe_iface.get(selector='status')
+            # as well as status data, which has power usage:
+            aoscx_poe_iface.get(selector='configuration')
+            return {'config': aoscx_poe_iface.config, 'measurements': aoscx_poe_iface.measurements}
+        except Exception as error:
+            dprint(f"   +++ NO PoE for {if_name}! - exception: {format(error)}")
+            return None
+
     def get_my_hardware_details(self) -> bool:
         '''
         TBD: Placeholder to read more hardware details of the AOS-CX device.
@@ -440,14 +565,82 @@ class AosCxConnector(Connector):
     def get_my_client_data(self) -> bool:
         '''
         read mac addressess, and lldp neigbor info.
-        Not yet fully supported in AOS-CX API.
+        The full MAC and LLDP neighbor tables are read with a single REST call each, using the collection
+        endpoints with wildcards. If that fails, e.g. on older firmware, we fall back to a call per vlan or interface.
         return True on success, False on error and set self.error variables
         '''
 
         if not self._open_device():
             dprint("_open_device() failed!")
             return False
-        # get mac address table, this is based on vlans:
+
+        if not self._get_mac_table():
+            self._get_mac_table_per_vlan()
+        if not self._get_lldp_neighbors():
+            self._get_lldp_neighbors_per_interface()
+
+        # done...
+        self._close_device()
+        return True
+
+    def _rest_get(self, path: str, params: dict) -> dict:
+        '''
+        Do a single GET of a REST API resource, relative to the API version, e.g. "system/vlans/*/macs"
+
+        Args:
+            path (str): the resource path.
+            params (dict): the query parameters, e.g. 'depth', 'attributes' and 'selector'
+
+        Returns:
+            (dict): the decoded JSON response. Raises an exception on errors.
+        '''
+        dprint(f"AOS-CX _rest_get(): {path} {params}")
+        response = self.aoscx_session.request("GET", path, params=params)
+        if response.status_code == 401:
+            # the pooled session expired on the device, log in again, once:
+            dprint("  session expired, logging in again")
+            self.aoscx_session.open(
+                username=self.switch.netmiko_profile.username, password=self.switch.netmiko_profile.password
+            )
+            response = self.aoscx_session.request("GET", path, params=params)
+        if response.status_code != 200:
+            raise Exception(f"GET {path} returned {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    def _get_mac_table(self) -> bool:
+        '''
+        Read the ethernet addresses of all vlans, with the fields we need, in a single REST call.
+
+        Returns:
+            (bool): True on success, False if the call failed.
+        '''
+        dprint("Getting MAC table for all VLANs:")
+        try:
+            data = self._rest_get(
+                path=f"system/vlans/{quote_plus('*')}/macs",
+                params={'depth': 2, 'attributes': 'mac_addr,port'},
+            )
+        except Exception as err:
+            dprint(f"ERROR getting the MAC table: {err}")
+            return False
+        # the response is a dict of vlan id, with a dict of "<from>,<mac>" keys and the MAC attributes:
+        for vlan_id, macs in data.items():
+            if not isinstance(macs, dict):
+                continue
+            for mac in macs.values():
+                # the port is a dict with the interface name, and its uri:
+                port = mac.get('port')
+                if not port or not mac.get('mac_addr'):
+                    continue
+                if_name = unquote_plus(next(iter(port)))
+                self.add_learned_ethernet_address(if_name=if_name, eth_address=mac['mac_addr'], vlan_id=int(vlan_id))
+        return True
+
+    def _get_mac_table_per_vlan(self):
+        '''
+        Read the ethernet addresses with a REST call per vlan, and per ethernet address.
+        This is slow, and only used if _get_mac_table() fails.
+        '''
         dprint("Getting MAC table per VLAN:")
         for vlan_id in self.vlans.keys():
             dprint(f"Vlan {vlan_id}:")
@@ -475,8 +668,6 @@ class AosCxConnector(Connector):
                     try:  # this occasionally fails!
                         mac.get()  # materialize the object from the device
                         dprint(f"  MAC Address: {mac} -> {mac.port}")
-                        # for name in mac.__dict__:
-                        #    dprint(f"      attribute: {name} = {mac.__dict__[name]}")
                         # add this to the known addressess:
                         self.add_learned_ethernet_address(
                             if_name=mac.port.name, eth_address=mac.mac_address, vlan_id=int(vlan_id)
@@ -485,6 +676,41 @@ class AosCxConnector(Connector):
                         dprint(f"ERROR in mac.get(): {err}")
                     # just try the next one...
 
+    def _get_lldp_neighbors(self) -> bool:
+        '''
+        Read the LLDP neighbors of all interfaces, with the fields we need, in a single REST call.
+
+        Returns:
+            (bool): True on success, False if the call failed.
+        '''
+        dprint("Getting LLDP data for all INTERFACES:")
+        try:
+            data = self._rest_get(
+                path=f"system/interfaces/{quote_plus('*')}/lldp_neighbors",
+                params={'depth': 2, 'attributes': 'chassis_id,port_id,neighbor_info'},
+            )
+        except Exception as err:
+            dprint(f"ERROR getting the LLDP neighbors: {err}")
+            return False
+        # the response is a dict of interface names, with a dict of "<chassis>,<port>" keys and the neighbor attributes:
+        for if_name, neighbors in data.items():
+            if not isinstance(neighbors, dict):
+                continue
+            if_name = unquote_plus(if_name)
+            for nb in neighbors.values():
+                try:
+                    self._add_lldp_neighbor(
+                        if_name=if_name, chassis_id=nb['chassis_id'], port_id=nb['port_id'], info=nb['neighbor_info']
+                    )
+                except Exception as err:
+                    dprint(f"ERROR parsing neighbor on {if_name}: {err}")
+        return True
+
+    def _get_lldp_neighbors_per_interface(self):
+        '''
+        Read the LLDP neighbors with a REST call per interface, and per neighbor.
+        This is slow, and only used if _get_lldp_neighbors() fails.
+        '''
         dprint("Getting LLDP data per INTERFACE:")
         for if_name in self.interfaces.keys():
             dprint(f"  Interface {if_name}:")
@@ -495,40 +721,9 @@ class AosCxConnector(Connector):
                     dprint(f"AOS-CX LLDP FOUND: on {if_name} => {nb_name} -> {nb}")
                     try:  # this occasionally fails!
                         nb.get()
-                        # for attrib, value in nb.__dict__.items():
-                        #    dprint(f"  {attrib} -> {value}")
-                        # get an OpenL2M NeighborDevice()
-                        neighbor = NeighborDevice(nb.chassis_id)
-                        neighbor.set_sys_name(nb.neighbor_info['chassis_name'])
-                        neighbor.set_sys_description(nb.neighbor_info['chassis_description'])
-                        # remote device port info:
-                        neighbor.port_name = nb.port_id
-                        neighbor.set_port_description(nb.neighbor_info['port_description'])
-                        # remote chassis info:
-                        neighbor.set_chassis_string(nb.chassis_id)
-                        if nb.neighbor_info['chassis_id_subtype'] == 'link_local_addr':
-                            neighbor.set_chassis_type(LLDP_CHASSIC_TYPE_ETH_ADDR)
-                        # parse capabilities:
-                        capabilities = nb.neighbor_info['chassis_capability_enabled'].lower()
-                        dprint(f"  Capabilities: {capabilities}")
-                        if 'bridge' in capabilities:
-                            neighbor.set_capability(LLDP_CAPABILITIES_BRIDGE)
-                        if 'router' in capabilities:
-                            neighbor.set_capability(LLDP_CAPABILITIES_ROUTER)
-                        # Following NOT tested; we are assuming the following two are correct:
-                        if 'wlan' in capabilities:
-                            neighbor.set_capability(LLDP_CAPABILITIES_WLAN)
-                        if 'phone' in capabilities:
-                            neighbor.set_capability(LLDP_CAPABILITIES_PHONE)
-                        # remote device management address, this is a list(), take first entry
-                        if len(nb.neighbor_info['mgmt_ip_list']) > 0:
-                            # hardcoding to IPv4 for now...
-                            neighbor.set_management_address(
-                                address=nb.neighbor_info['mgmt_ip_list'], type=IANA_TYPE_IPV4
-                            )
-                        # add to device interface:
-                        self.add_neighbor_object(if_name, neighbor)
-
+                        self._add_lldp_neighbor(
+                            if_name=if_name, chassis_id=nb.chassis_id, port_id=nb.port_id, info=nb.neighbor_info
+                        )
                     except Exception as err:
                         dprint(f"ERROR in neighbor.get(): {err}")
                     # just try the next one...
@@ -540,9 +735,45 @@ class AosCxConnector(Connector):
                 self.add_log(type=LOG_TYPE_ERROR, action=LOG_AOSCX_ERROR_GENERIC, description=details)
                 continue
 
-        # done...
-        self._close_device()
-        return True
+    def _add_lldp_neighbor(self, if_name: str, chassis_id: str, port_id: str, info: dict):
+        '''
+        Add an LLDP neighbor to an interface, from the AOS-CX neighbor attributes.
+
+        Args:
+            if_name (str): the interface name.
+            chassis_id (str): the neighbor chassis id.
+            port_id (str): the neighbor port id.
+            info (dict): the AOS-CX 'neighbor_info' attribute.
+        '''
+        # get an OpenL2M NeighborDevice()
+        neighbor = NeighborDevice(chassis_id)
+        neighbor.set_sys_name(info['chassis_name'])
+        neighbor.set_sys_description(info['chassis_description'])
+        # remote device port info:
+        neighbor.port_name = port_id
+        neighbor.set_port_description(info['port_description'])
+        # remote chassis info:
+        neighbor.set_chassis_string(chassis_id)
+        if info['chassis_id_subtype'] == 'link_local_addr':
+            neighbor.set_chassis_type(LLDP_CHASSIC_TYPE_ETH_ADDR)
+        # parse capabilities:
+        capabilities = info['chassis_capability_enabled'].lower()
+        dprint(f"  Capabilities: {capabilities}")
+        if 'bridge' in capabilities:
+            neighbor.set_capability(LLDP_CAPABILITIES_BRIDGE)
+        if 'router' in capabilities:
+            neighbor.set_capability(LLDP_CAPABILITIES_ROUTER)
+        # Following NOT tested; we are assuming the following two are correct:
+        if 'wlan' in capabilities:
+            neighbor.set_capability(LLDP_CAPABILITIES_WLAN)
+        if 'phone' in capabilities:
+            neighbor.set_capability(LLDP_CAPABILITIES_PHONE)
+        # remote device management address, this is a list(), take first entry
+        if len(info['mgmt_ip_list']) > 0:
+            # hardcoding to IPv4 for now...
+            neighbor.set_management_address(address=info['mgmt_ip_list'], type=IANA_TYPE_IPV4)
+        # add to device interface:
+        self.add_neighbor_object(if_name, neighbor)
 
     def set_interface_admin_status(self, interface: Interface, new_state: bool) -> bool:
         """
@@ -573,7 +804,14 @@ class AosCxConnector(Connector):
             state = "down"
         # changed = aoscx_interface.set_state(state=state)
         aoscx_interface.admin_state = state
-        changed = aoscx_interface.apply()
+        try:
+            changed = aoscx_interface.apply()
+        except Exception as error:
+            self.error.status = True
+            self.error.description = "Error changing interface state!"
+            self.error.details = f"Cannot update device interface: {format(error)}"
+            self._close_device(healthy=False)
+            return False
         # self._close_device()
         if changed:
             dprint(f"  Interface change '{state}' OK!")
@@ -610,7 +848,14 @@ class AosCxConnector(Connector):
             return False
 
         aoscx_interface.description = description
-        changed = aoscx_interface.apply()
+        try:
+            changed = aoscx_interface.apply()
+        except Exception as error:
+            self.error.status = True
+            self.error.description = "Error changing interface description!"
+            self.error.details = f"Cannot update device interface: {format(error)}"
+            self._close_device(healthy=False)
+            return False
         # self._close_device()
         if changed:
             dprint("   Descr OK!")
@@ -655,12 +900,15 @@ class AosCxConnector(Connector):
                 return False
 
             dprint(f"  +++ POE Exists for {interface.name} ===")
-            if new_state == POE_PORT_ADMIN_ENABLED:
-                aoscx_poe.power_enabled = True
-                changed = aoscx_poe.apply()
-            else:
-                aoscx_poe.power_enabled = False
+            aoscx_poe.power_enabled = new_state == POE_PORT_ADMIN_ENABLED
+            try:
                 changed = aoscx_poe.apply()
+            except Exception as error:
+                self.error.status = True
+                self.error.description = "Error changing PoE state!"
+                self.error.details = f"Cannot update device PoE interface: {format(error)}"
+                self._close_device(healthy=False)
+                return False
             # self._close_device()
             if changed:
                 dprint("   PoE change OK!")
@@ -870,14 +1118,17 @@ class AosCxConnector(Connector):
         except Exception as err:
             self.error.status = True
             self.error.details = f"Error trapped while deleting vlan {vlan_id}: {err}"
+            self._close_device()
             return False
         # all OK, now do the book keeping
         super().vlan_delete(vlan_id=vlan_id)
+        self._close_device()
         return True
 
     def _open_device(self) -> bool:
         '''
-        get a pyaoscx "driver" and open a "connection" to the device
+        get a pyaoscx "driver" and open a "connection" to the device.
+        A logged-in session to the device is borrowed from the session pool if one is available.
         return True on success, False on failure, and will set self.error
         '''
         dprint("AOS-CX _open_device()")
@@ -902,20 +1153,19 @@ class AosCxConnector(Connector):
             # urllib3.disable_warnings()
 
         try:
-            dprint(f"  Creating AosCxSession(ip_address={self.switch.primary_ip4}, api={API_VERSION})")
-            self.aoscx_session = AosCxSession(ip_address=self.switch.primary_ip4, api=API_VERSION)
-            dprint(
-                f"Opening as '{self.switch.netmiko_profile.username}', password='{self.switch.netmiko_profile.password}'"
-            )
-            self.aoscx_session.open(
-                username=self.switch.netmiko_profile.username, password=self.switch.netmiko_profile.password
-            )
+            self.aoscx_pooled_session = _session_pool.borrow(key=self._get_session_key(), connect=self._login)
+            self.aoscx_session = self.aoscx_pooled_session.handle
             dprint("  session OK!")
             # dprint(f"  SESSION.cookies():\n{self.aoscx_session.cookies()}")
             # dprint(f"  SESSION.s:\n{self.aoscx_session.s}")
             # dprint(f"  SESSION.s(pformat):\n{pprint.pformat(self.aoscx_session.s)}")
-
             return True
+        except PoolExhausted as err:
+            self.error.status = True
+            self.error.description = "Device is busy!"
+            self.error.details = f"Cannot open REST session: {format(err)}"
+            dprint(f"  _open_device: {format(err)}")
+            return False
         except Exception as err:
             self.error.status = True
             self.error.description = "Error establishing connection!"
@@ -923,9 +1173,29 @@ class AosCxConnector(Connector):
             dprint(f"  _open_device: AosCxSession.open() failed: {format(err)}")
             return False
 
-    def _close_device(self) -> bool:
+    def _get_session_key(self) -> tuple:
+        '''
+        REST sessions are only shared for the same device address and credentials.
+        '''
+        profile = self.switch.netmiko_profile
+        return (self.switch.id, self.switch.primary_ip4, profile.id, hash((profile.username, profile.password)))
+
+    def _login(self) -> AosCxSession:
+        '''
+        Create a new AOS-CX REST session, and log in. Raises an exception on errors.
         '''
-        make sure we properly close the AOS-CX REST Session
+        dprint(f"  Creating AosCxSession(ip_address={self.switch.primary_ip4}, api={API_VERSION})")
+        aoscx_session = AosCxSession(ip_address=self.switch.primary_ip4, api=API_VERSION)
+        dprint(f"Opening as '{self.switch.netmiko_profile.username}'")
+        aoscx_session.open(username=self.switch.netmiko_profile.username, password=self.switch.netmiko_profile.password)
+        return aoscx_session
+
+    def _close_device(self, healthy: bool = True) -> bool:
+        '''
+        Return the AOS-CX REST Session to the session pool. The pool logs out when it is idle for too long.
+
+        Args:
+            healthy (bool): if False, e.g. after a read error, we log out now.
         '''
         dprint("AOS-CX _close_device()")
         if self.aoscx_session:
@@ -936,8 +1206,8 @@ class AosCxConnector(Connector):
                 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
                 # or all warnings:
                 # urllib3.disable_warnings()
-            self.aoscx_session.close()
-            del self.aoscx_session
+            _session_pool.release(self.aoscx_pooled_session, healthy=healthy)
+            self.aoscx_pooled_session = None
             self.aoscx_session = False
             dprint(("  session close OK!"))
         else:
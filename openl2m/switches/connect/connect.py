@@ -23,133 +23,31 @@ from django.utils import timezone
 from rest_framework.request import Request as RESTRequest
 
 from switches.utils import dprint
-from switches.constants import (
-    CONNECTOR_TYPE_SNMP,
-    CONNECTOR_TYPE_AOSCX,
-    CONNECTOR_TYPE_PYEZ,
-    CONNECTOR_TYPE_COMMANDS_ONLY,
-    CONNECTOR_TYPE_NAPALM,
-    CONNECTOR_TYPE_TESTDUMMY,
-)
+from switches.constants import CONNECTOR_TYPE_SNMP, LOG_TYPE_WARNING, LOG_NEW_OID_FOUND
 
 from switches.connect.connector import Connector
+from switches.devicecache import get_snapshot
 
-# here are the device specific classes.
-# this should be made dynamic at some point!
-from switches.connect.snmp.connector import SnmpConnector, SnmpProbeConnector, oid_in_branch
-from switches.connect.snmp.constants import enterprises
-from switches.connect.snmp.cisco.constants import ENTERPRISE_ID_CISCO
-from switches.connect.snmp.cisco.connector import SnmpConnectorCisco
-
-# Dell is yet to be tested!
-# from switches.connect.snmp.dell.constants import *
-# from switches.connect.snmp.dell.connector import SnmpConnectorDell
-from switches.connect.snmp.comware.constants import ENTERPRISE_ID_H3C
-from switches.connect.snmp.comware.connector import SnmpConnectorComware
-from switches.connect.snmp.juniper.constants import ENTERPRISE_ID_JUNIPER
-from switches.connect.snmp.juniper.connector import SnmpConnectorJuniper
-from switches.connect.snmp.procurve.constants import ENTERPRISE_ID_HP
-from switches.connect.snmp.procurve.connector import SnmpConnectorProcurve
-from switches.connect.snmp.arista_eos.constants import ENTERPRISE_ID_ARISTA
-from switches.connect.snmp.arista_eos.connector import SnmpConnectorAristaEOS
-from switches.connect.snmp.aruba_cx.constants import ENTERPRISE_ID_HP_ENTERPRISE
-from switches.connect.snmp.aruba_cx.connector import SnmpConnectorArubaCx
-from switches.connect.snmp.netgear.constants import ENTERPRISE_ID_NETGEAR
-from switches.connect.snmp.netgear.connector import SnmpConnectorNetgear
-from switches.connect.aruba_aoscx.connector import AosCxConnector
-from switches.connect.junos_pyez.connector import PyEZConnector
-from switches.connect.commands_only.connector import CommandsOnlyConnector
-
-# Napalm drivers are here:
-from switches.connect.napalm.connector import NapalmConnector
-
-# a dummy 'test connector'
-from switches.connect.dummy.connector import DummyConnector
+# the device specific classes are imported when first needed, see registry.py
+from switches.connect import registry
 
 from switches.models import Switch, SwitchGroup
 
 
-def get_connection_object(request: HttpRequest, group: SwitchGroup, switch: Switch) -> Connector:
+def get_connection_object(
+    request: HttpRequest, group: SwitchGroup, switch: Switch, use_snapshot: bool = False
+) -> Connector:
     """
     Function to get the proper type of Connector() object, based on device connector_type settings.
     For SNMP devices, we probe the 'system' mib, and then a vendor-specific Connector() object will be returned.
     If vendor is unknown, we return a generic snmp object.
     If probing fails, we raise an exception!
+
+    If use_snapshot is True, and there is no session cache for this device, the device state
+    pre-read by the 'poller' command is loaded from the shared device cache (see switches/devicecache.py)
     """
     dprint(f"get_connection_object() for {switch} at {timezone.now()}")
-
-    # What type of connector are we using?
-    if switch.connector_type == CONNECTOR_TYPE_SNMP:
-        # go probe to find vendor type
-        dprint("SNMP: Probing device...")
-        conn = SnmpProbeConnector(request, group, switch)
-        snmp_oid = conn.get_system_oid()
-        if snmp_oid:
-            # we have the ObjectID, what kind of vendor is it:
-            dprint(f"   Checking device type for {snmp_oid}")
-            sub_oid = oid_in_branch(enterprises, snmp_oid)
-            if sub_oid:
-                parts = sub_oid.split('.', 1)  # 1 means one split, two elements!
-                enterprise_id = int(parts[0])
-                # here we go:
-                if enterprise_id == ENTERPRISE_ID_CISCO:
-                    connection = SnmpConnectorCisco(request, group, switch)
-
-                elif enterprise_id == ENTERPRISE_ID_JUNIPER:
-                    connection = SnmpConnectorJuniper(request, group, switch)
-
-                elif enterprise_id == ENTERPRISE_ID_HP:
-                    connection = SnmpConnectorProcurve(request, group, switch)
-
-                elif enterprise_id == ENTERPRISE_ID_H3C:
-                    connection = SnmpConnectorComware(request, group, switch)
-
-                elif enterprise_id == ENTERPRISE_ID_HP_ENTERPRISE:
-                    connection = SnmpConnectorArubaCx(request, group, switch)
-
-                elif enterprise_id == ENTERPRISE_ID_ARISTA:
-                    connection = SnmpConnectorAristaEOS(request, group, switch)
-
-                elif enterprise_id == ENTERPRISE_ID_NETGEAR:
-                    connection = SnmpConnectorNetgear(request, group, switch)
-
-                # Dell is yet to be tested!
-                # elif enterprise_id == ENTERPRISE_ID_DELL:
-                #    connection = SnmpConnectorDell(request, group, switch)
-
-                else:
-                    # system oid found, but unknown vendor:
-                    connection = SnmpConnector(request, group, switch)
-
-        # no system oid found, return a "generic" SNMP object
-        else:
-            connection = SnmpConnector(request, group, switch)
-
-    # This is the "custom" Aruba AOS CX connector, using the device REST API.
-    elif switch.connector_type == CONNECTOR_TYPE_AOSCX:
-        connection = AosCxConnector(request, group, switch)
-
-    # This is the "custom" Junos PyEZ connector, using the device NetConf API.
-    elif switch.connector_type == CONNECTOR_TYPE_PYEZ:
-        connection = PyEZConnector(request, group, switch)
-
-    # This is the "custom" connector that handles SSH commands, but does not load
-    # interface data!
-    elif switch.connector_type == CONNECTOR_TYPE_COMMANDS_ONLY:
-        connection = CommandsOnlyConnector(request, group, switch)
-
-    # The Napalm connector uses the Python Napalm package. It is read-only.
-    # Mostly implemented to test and show the new Connector() API class.
-    elif switch.connector_type == CONNECTOR_TYPE_NAPALM:
-        connection = NapalmConnector(request, group, switch)
-
-    # this is a test class, to show and test the new Connector() API class:
-    elif switch.connector_type == CONNECTOR_TYPE_TESTDUMMY:
-        connection = DummyConnector(request, group, switch)
-
-    else:
-        # should not happen!
-        raise Exception("Invalid connector type configured on switch!")
+    connection = create_connection_object(request=request, group=group, switch=switch)
 
     # load caches (http session, memory cache (future), whatever else for performance)
     if not connection.load_cache():
@@ -162,6 +60,98 @@ def get_connection_object(request: HttpRequest, group: SwitchGroup, switch: Swit
             if not connection.get_basic_info():
                 dprint(f"  ERROR in get_basic_info(): {connection.error.description}")
                 raise Exception(connection.error.description)
+        elif use_snapshot:
+            snapshot = get_snapshot(switch=switch)
+            if snapshot:
+                dprint("  Loading device snapshot from shared device cache")
+                connection.load_snapshot(snapshot)
     # then return object
     dprint("  Returning connection() from get_connection_object()")
     return connection
+
+
+def create_connection_object(request: HttpRequest, group: SwitchGroup, switch: Switch) -> Connector:
+    """
+    Create the proper type of Connector() object, based on device connector_type settings,
+    without loading any cached data. See get_connection_object() above.
+    This is also used by the 'poller' command, where request is None.
+    """
+
+    # What type of connector are we using?
+    if switch.connector_type == CONNECTOR_TYPE_SNMP:
+        # the generic SNMP driver is needed to probe the device, and is the parent of the vendor drivers:
+        snmp_driver = registry.get_connector_driver(CONNECTOR_TYPE_SNMP)
+        snmp_driver.load()
+        from switches.connect.snmp.connector import SnmpProbeConnector
+        from switches.connect.snmp.utils import SysObjectID
+
+        driver = _get_session_driver(request=request, switch=switch)
+        if driver:
+            # this session already uses this device, so no need to probe it again:
+            dprint(f"SNMP: using driver '{driver.name}' found earlier")
+            sys_object_id = SysObjectID(switch.sys_object_id)
+        else:
+            # go probe to find vendor type
+            dprint("SNMP: Probing device...")
+            conn = SnmpProbeConnector(request, group, switch)
+            sys_object_id = SysObjectID(conn.get_system_oid())
+            if sys_object_id.oid:
+                # we have the ObjectID, what kind of vendor is it, None if unknown (or disabled):
+                dprint(f"   Checking device type for {sys_object_id}")
+                driver = registry.get_snmp_vendor_driver(sys_object_id, get_description=conn.get_system_description)
+            # no system oid found, or unknown vendor, use the "generic" SNMP driver
+            if not driver:
+                driver = snmp_driver
+        connection = driver.load()(request, group, switch)
+        # share the parsed ObjectID, so the connector does not parse it again:
+        connection.object_id = sys_object_id.oid
+        connection.sys_object_id = sys_object_id
+
+    else:
+        # the "custom" drivers, e.g. the Aruba AOS-CX REST API, Junos PyEZ, Commands Only or Napalm connector.
+        # This raises an exception on invalid connector types, or disabled drivers.
+        driver = registry.get_connector_driver(switch.connector_type)
+        connection = driver.load()(request, group, switch)
+        sys_object_id = None
+
+    connection.driver_name = driver.name
+    _save_driver_fingerprint(connection=connection, driver=driver, sys_object_id=sys_object_id)
+    return connection
+
+
+def _get_session_driver(request: HttpRequest, switch: Switch) -> registry.Driver:
+    """
+    Return the SNMP vendor driver that read the session cache, if the session cache is for this switch.
+    Return None if the device needs to be probed.
+    This uses the driver saved in the session by Connector().save_cache(), not Switch().driver_name,
+    as that is updated whenever any session or process probes the device.
+    """
+    session = getattr(request, 'session', None)
+    if not session or session.get('switch_id', None) != switch.id or not session.get('driver_name', None):
+        return None
+    driver = registry.get_driver(session['driver_name'])
+    if not driver or not driver.enabled or driver.connector_type != CONNECTOR_TYPE_SNMP:
+        return None
+    return driver
+
+
+def _save_driver_fingerprint(connection: Connector, driver: registry.Driver, sys_object_id):
+    """
+    Save the driver, and the SNMP sysObjectID it was found with, in the Switch() object, if changed.
+    A changed sysObjectID, e.g. after replacing the hardware, is logged.
+    This is for display only, a session uses the driver saved with its cache, see _get_session_driver()
+    """
+    switch = connection.switch
+    oid = sys_object_id.oid if sys_object_id else ""
+    if switch.driver_name == driver.name and switch.sys_object_id == oid:
+        return
+    if switch.sys_object_id and oid and switch.sys_object_id != oid:
+        connection.add_log(
+            type=LOG_TYPE_WARNING,
+            action=LOG_NEW_OID_FOUND,
+            description=f"New System ObjectID found: {oid} (was {switch.sys_object_id}), driver '{driver.name}'",
+        )
+    switch.driver_name = driver.name
+    switch.sys_object_id = oid
+    # only update these fields, the Switch() object may be out of date:
+    Switch.objects.filter(pk=switch.pk).update(driver_name=driver.name, sys_object_id=oid)
@@ -16,8 +16,6 @@ import datetime
 import jsonpickle
 import lib.manuf.manuf as manuf
 import natsort
-import netmiko
-import re
 import time
 import traceback
 from typing import Any, Dict, List
@@ -25,10 +23,12 @@ from typing import Any, Dict, List
 from django.conf import settings
 from django.http.request import HttpRequest
 
+from switches import devicecache, hostindex
+from switches.connect import sshpool
 from switches.models import Switch, SwitchGroup, Command, Log
 from switches.connect.constants import LLDP_CHASSIC_TYPE_ETH_ADDR
 from switches.constants import LOG_TYPE_WARNING, LOG_CONNECTION_ERROR, LOG_TYPE_ERROR, CMD_TYPE_INTERFACE
-from switches.utils import dprint, get_remote_ip, get_ip_dns_name
+from switches.utils import dprint, get_compiled_regex, get_remote_ip, get_ip_dns_name
 from switches.connect.classes import (
     Error,
     PoePort,
@@ -59,6 +59,16 @@ from switches.connect.constants import (
 
 from rest_framework.reverse import reverse as rest_reverse
 
+# these attributes depend on the user or request, and are not shared in device snapshots:
+SNAPSHOT_EXCLUDE = [
+    "read_only",
+    "allowed_vlans",
+    "last_accessed",
+    "cache_loaded",
+    "snapshot_loaded",
+    "timing",
+]
+
 '''
 Base Connector() class for OpenL2M.
 This implements the interface that is expected by the higher level code
@@ -92,6 +102,7 @@ class Connector:
         self.request = request  # if running on web server, Django http request object, needed for request.user() and request.session[]
         self.group = group  # Django SwitchGroup object
         self.switch = switch  # Django Switch()
+        self.driver_name = ""  # the registry driver that created this object, see create_connection_object()
         self.error = Error()
         self.error.status = False  # we don't actually have an error yet :-)
 
@@ -104,6 +115,11 @@ class Connector:
             "error",
             "eth_addr_count",
             "neighbor_count",
+            "arp_cache",
+            "netmiko_connection",
+            "netmiko_session",
+            "transaction_active",
+            "driver_name",
         ]
 
         self.hostname = ""  # system hostname, typically set in sub-class
@@ -122,14 +138,17 @@ class Connector:
         )  # the IPv4 addresses as keys, with stored value if_index; needed to map netmask to interface
         # some flags:
         self.cache_loaded = False  # if True, system data was loaded from cache
+        self.snapshot_loaded = False  # if True, system data was pre-read by the 'poller' command
         # some timestamps:
         self.basic_info_read_timestamp = 0  # when the last 'basic' read occured
+        self.deadline = 0  # if set, the time.monotonic() after which reads stop, see deadline_passed()
 
         # data we calculate or collect without caching:
         self.allowed_vlans: Dict[int, Vlan] = (
             {}
         )  # list of vlans (stored as Vlan() objects) allowed on the switch, the join of switch and group Vlans
         self.eth_addr_count = 0  # number of known mac/ethernet addresses
+        self.arp_cache: Dict[str, str] = {}  # IPv4 addresses from the group 'ARP sources', keyed by ethernet key
         self.neighbor_count = 0  # number of lldp neighbors
         self.warnings: List[str] = []  # list of warning strings that may be shown to users
         # timing related attributes:
@@ -169,6 +188,7 @@ class Connector:
         self.netmiko_ignore_prompt = False
         # variable to deal with the SSH connection:
         self.netmiko_connection = False  # return from Netmiko.ConnectHandler()
+        self.netmiko_session = None  # the sshpool.PooledSession() the connection was borrowed from, if any
         # self.netmiko_timeout = settings.SSH_TIMEOUT  # should be SSH timeout/retry values
         # self.netmiko_retries = settings.SSH_RETRIES
         self.netmiko_output = ""  # any output from a netmiko/ssh command executed.
@@ -206,6 +226,9 @@ class Connector:
         self.can_change_description = False
         self.can_save_config = False  # do we have the ability (or need) to execute a 'save config' or 'write memory' ?
         self.can_reload_all = False  # if true, we can reload all our data (and show a button on screen for this)
+        # if true, changes can be gathered and applied at once, see begin_transaction():
+        self.can_use_transaction = False
+        self.transaction_active = False
         self.can_get_client_data = hasattr(self, 'get_my_client_data')  # do we implement reading arp/lldp/etc?
 
     def as_dict(self) -> dict:
@@ -409,9 +432,16 @@ class Connector:
         # call the implementation-specific function:
         if hasattr(self, 'get_my_client_data'):
             start_time = time.time()
+            self._load_arp_cache()
             self.get_my_client_data()  # to be implemented by device/vendor class!
+            if self.arp_cache:
+                # for drivers that do not add ethernet addresses with add_learned_ethernet_address()
+                self._apply_arp_cache()
             read_duration = int((time.time() - start_time) + 0.5)
             self.add_more_info('System', 'Client Info Read', f"{read_duration} seconds")
+            if self.deadline_passed():
+                # skip the lookups below, the caller gave up on this device.
+                return True
             # are we resolving IP addresses to hostnames?
             if settings.LOOKUP_HOSTNAME_ARP:
                 dns_start = time.time()
@@ -429,6 +459,11 @@ class Connector:
             self._lookup_ethernet_vendors()
             oui_duration = int((time.time() - oui_start) + 0.5)
             self.add_more_info('System', 'Ethernet Vendor Search', f"{oui_duration} seconds")
+            # and save where we found the ethernet addresses:
+            if settings.HOST_INDEX_ENABLED:
+                index_start = time.time()
+                count = hostindex.update_index(connection=self)
+                self.add_timing("Host index update", count, time.time() - index_start)
 
             return True
         self.add_warning("WARNING: device driver does not support 'get_my_client_data()' !")
@@ -449,6 +484,63 @@ class Connector:
         return True
     '''
 
+    def get_arp_table(self) -> dict:
+        '''
+        Read the ARP table of the device, for use as an 'ARP source' of a group, see switches/devicecache.py
+        Drivers can implement 'get_my_arp_table()' to only read the ARP table,
+        else we read all client data and take the IPv4 addresses from the ethernet addresses.
+
+        Args:
+            none
+
+        Returns:
+            (dict): the IPv4 addresses, keyed by ethernet key, see hostindex.ethernet_to_key()
+        '''
+        dprint("Connector.get_arp_table()")
+        if hasattr(self, 'get_my_arp_table'):
+            return self.get_my_arp_table()
+        table = {}
+        if self.get_basic_info() and self.get_client_data():
+            for iface in self.interfaces.values():
+                for eth in iface.eth.values():
+                    if eth.address_ip4:
+                        table[hostindex.ethernet_to_key(eth)] = eth.address_ip4
+        return table
+
+    def _load_arp_cache(self):
+        '''
+        Load the ARP tables of the 'ARP sources' of our group, as read by the 'poller' command.
+        If this device is an ARP source itself, we read its own ARP table instead.
+
+        Args:
+            none
+
+        Returns:
+            none
+        '''
+        self.arp_cache = {}
+        if self.group:
+            source_ids = list(self.group.arp_sources.values_list('id', flat=True))
+            if source_ids and self.switch.id not in source_ids:
+                start_time = time.time()
+                self.arp_cache = devicecache.get_arp_tables(switch_ids=source_ids)
+                self.add_timing("ARP cache load", len(self.arp_cache), time.time() - start_time)
+
+    def _apply_arp_cache(self):
+        '''
+        Set the IPv4 address of all ethernet addresses without one, from the group 'ARP sources' tables.
+
+        Args:
+            none
+
+        Returns:
+            none
+        '''
+        for iface in self.interfaces.values():
+            for eth in iface.eth.values():
+                if not eth.address_ip4:
+                    eth.address_ip4 = self.arp_cache.get(hostindex.ethernet_to_key(eth), '')
+
     def clear_client_data(self):
         '''
         Clear out all client data, ie arp, lldp, etc.
@@ -909,6 +1001,39 @@ class Connector:
             self.save_needed = value
         return True
 
+    def begin_transaction(self) -> bool:
+        '''
+        Start gathering changes, to apply them all at once with commit_transaction(),
+        e.g. to do a single configuration commit for a bulk edit.
+        Until the commit, the set_interface_*() functions only queue the change, and do the bookkeeping.
+        Drivers that support this set self.can_use_transaction, and override both functions.
+
+        Returns:
+            True if changes are now gathered, False if changes are applied immediately.
+        '''
+        return False
+
+    def commit_transaction(self, comment: str = "") -> bool:
+        '''
+        Apply all changes gathered since begin_transaction().
+        If this fails, none of the changes are applied, and self.error is set.
+
+        Args:
+            comment(str): the commit comment, if the device supports it.
+
+        Returns:
+            True on success, False on failure.
+        '''
+        return True
+
+    def abort_transaction(self):
+        '''
+        Drop all changes gathered since begin_transaction(), e.g. on an unexpected error, and free what the
+        transaction holds, e.g. the device session. None of the changes are applied.
+        This can always be called, also after commit_transaction(), where it does nothing.
+        '''
+        self.transaction_active = False
+
     def add_vlan_to_interface(self, iface: Interface, vlan_id: int):
         '''
         Generic function to add a vlan to the list of vlans on the given interface
@@ -960,6 +1085,9 @@ class Connector:
         dprint(f"conn.add_learned_ethernet_address() for {eth_address} on {if_name}")
         iface = self.get_interface_by_key(if_name)
         if iface:
+            if not ip4_address and self.arp_cache:
+                # from the ARP tables of the group 'ARP sources':
+                ip4_address = self.arp_cache.get(hostindex.ethernet_to_key(eth_address), '')
             a = iface.add_learned_ethernet_address(eth_address=eth_address, vlan_id=vlan_id, ip4_address=ip4_address)
             self.eth_addr_count += 1
             return a
@@ -1051,6 +1179,9 @@ class Connector:
         with self.error.status and self.error.description set accordingly
         """
         dprint("netmiko_connect()")
+        # netmiko is only imported when a device needs SSH, see switches/connect/registry.py
+        import netmiko
+
         self.error.clear()
         if not self.switch.netmiko_profile:
             dprint("  ERROR: No netmiko profile")
@@ -1088,7 +1219,21 @@ class Connector:
         }
 
         try:
-            handle = netmiko.ConnectHandler(**device)
+            if settings.SSH_POOL_ENABLED:
+                # send keepalives, so the device does not close the session while idle in the pool:
+                device['keepalive'] = settings.SSH_POOL_KEEPALIVE
+                self.netmiko_session = sshpool.borrow(
+                    key=sshpool.get_session_key(switch=self.switch, device_type=device_type),
+                    connect=lambda: netmiko.ConnectHandler(**device),
+                )
+                handle = self.netmiko_session.handle
+            else:
+                handle = netmiko.ConnectHandler(**device)
+        except sshpool.PoolExhausted as err:
+            dprint(f"netmiko_connect(): ERROR PoolExhausted: {err}")
+            self.error.status = True
+            self.error.description = f"{err}"
+            return False
         except netmiko.NetMikoTimeoutException:
             dprint("netmiko_connect(): ERROR NetMikoTimeoutException")
             self.error.status = True
@@ -1137,6 +1282,9 @@ class Connector:
             dprint("  netmiko.disable_paging(): No connection yet, calling self.connect() (Huh?)")
             if not self.netmiko_connect():
                 return False
+        if self.netmiko_session and self.netmiko_session.prepared:
+            dprint("  Paging already disabled on this pooled session!")
+            return True
         if self.netmiko_connection:
             try:
                 dprint(f"  Trying with command: '{self.netmiko_disable_paging_command}'")
@@ -1145,7 +1293,10 @@ class Connector:
                 dprint(f"  ERROR disabling paging: {err}")
                 self.error.status = True
                 self.error.description = f"Error disabling SSH paging! {err}"
+                self.netmiko_disconnect(healthy=False)
                 return False
+        if self.netmiko_session:
+            self.netmiko_session.prepared = True
         dprint("netmiko_disable_paging() OK!")
         return True
 
@@ -1161,6 +1312,8 @@ class Connector:
             (boolean): True if success, False on failure.
         """
         dprint(f"netmiko_execute_command() '{command}'")
+        import netmiko
+
         self.error.clear()
         self.netmiko_output = ''
         if not self.netmiko_connection:
@@ -1189,6 +1342,8 @@ class Connector:
             self.error.status = True
             self.error.description = "Error: the command timed out!"
             self.error.details = f"Netmiko Error: {repr(err)}"
+            # the session may still send the output of the command, do not re-use it:
+            self.netmiko_disconnect(healthy=False)
             return False
         except Exception as err:
             dprint(f"  Netmiko.connection error: {str(type(err))} - {repr(err)}")
@@ -1196,10 +1351,30 @@ class Connector:
             self.error.status = True
             self.error.description = "Error sending command!"
             self.error.details = f"Netmiko Error: {repr(err)} ({str(type(err))})"
+            self.netmiko_disconnect(healthy=False)
             return False
         dprint("  netmiko_execute_command() OK!")
         return True
 
+    def netmiko_disconnect(self, healthy: bool = True):
+        """
+        Done with the SSH connection. If it was borrowed from the session pool, return it,
+        so the next command to this device does not need to log in again. Otherwise close it.
+
+        Args:
+            healthy (bool): if False, the connection had an error, and is closed instead of re-used.
+        """
+        dprint(f"netmiko_disconnect(healthy={healthy})")
+        if self.netmiko_session:
+            sshpool.release(session=self.netmiko_session, healthy=healthy)
+        elif self.netmiko_connection:
+            try:
+                self.netmiko_connection.disconnect()
+            except Exception as err:
+                dprint(f"  ERROR disconnecting: {err}")
+        self.netmiko_session = None
+        self.netmiko_connection = False
+
     def run_command(self, command_id: int, interface_name: str = '') -> dict:
         '''
         Execute a cli command. This is switch dependent,
@@ -1275,7 +1450,7 @@ class Connector:
             # error occured, pass it on
             cmd['error_descr'] = self.error.description
             cmd['error_details'] = self.error.details
-        del self.netmiko_connection
+        self.netmiko_disconnect()
         return cmd
 
     def run_command_string(self, command_string: str) -> dict:
@@ -1309,7 +1484,7 @@ class Connector:
             # error occured, pass it on
             cmd['error_descr'] = self.error.description
             cmd['error_details'] = self.error.details
-        del self.netmiko_connection
+        self.netmiko_disconnect()
         return cmd
 
     def set_do_not_cache_attribute(self, name: str):
@@ -1408,6 +1583,8 @@ class Connector:
             start_time = time.time()
             count = 0
             self.request.session['switch_id'] = self.switch.id
+            # and the driver that read the cached data, see connect._get_session_driver()
+            self.request.session['driver_name'] = self.driver_name
             # can I cache myself :-) ?
             for attr_name, value in self.__dict__.items():
                 if attr_name not in self._do_not_cache:
@@ -1446,6 +1623,48 @@ class Connector:
 
         return
 
+    def get_snapshot(self) -> dict:
+        '''
+        Get the device state as read by get_basic_info() and get_hardware_details(),
+        to be shared with all users in the device cache, see switches/devicecache.py
+        The user specific attributes are not included, these are set in load_snapshot()
+
+        Args:
+            none
+
+        Returns:
+            (dict): the jsonpickle-encoded attributes, keyed by name.
+        '''
+        dprint("Connector.get_snapshot()")
+        snapshot = {}
+        for attr_name, value in self.__dict__.items():
+            if attr_name not in self._do_not_cache and attr_name not in SNAPSHOT_EXCLUDE:
+                # same encoding as save_cache()
+                snapshot[attr_name] = jsonpickle.encode(value, keys=True)
+        return snapshot
+
+    def load_snapshot(self, snapshot: dict):
+        '''
+        Load the device state from a snapshot created by get_snapshot(),
+        and then apply the permissions of the current user to the interfaces.
+
+        Args:
+            snapshot (dict): as returned by get_snapshot()
+
+        Returns:
+            none
+        '''
+        dprint("Connector.load_snapshot()")
+        start_time = time.time()
+        for attr_name, value in snapshot.items():
+            self.__setattr__(attr_name, jsonpickle.decode(value, keys=True))
+        self.cache_loaded = True
+        self.snapshot_loaded = True
+        # the snapshot may have been read for another group this device is in:
+        self.add_more_info('System', 'Group', self.group.name)
+        self._set_interfaces_permissions()
+        self.add_timing("Snapshot load", len(snapshot), time.time() - start_time)
+
     def clear_cache(self):
         '''
         clear all cached data, likely because we changed switches
@@ -1526,7 +1745,7 @@ class Connector:
             value of cached item. None if not found.
         '''
         dprint(f"get_cache_variable(): {name}")
-        if name in self.request.session.keys():
+        if self.request and name in self.request.session.keys():
             dprint("   ... found!")
             return self.request.session[name]
         else:
@@ -1555,6 +1774,24 @@ class Connector:
             return True
         return False
 
+    def deadline_passed(self) -> bool:
+        '''
+        Check if the read deadline of this connection has passed, and if so, set self.error.
+        A thread reading a device cannot be stopped from the outside, e.g. in the group export,
+        so long reads check this between steps, and stop early.
+
+        Args:
+            none
+
+        Returns:
+            (bool): True if self.deadline is set and has passed.
+        '''
+        if not self.deadline or time.monotonic() < self.deadline:
+            return False
+        self.error.status = True
+        self.error.description = "Timeout: the time to read this device has passed!"
+        return True
+
     def add_timing(self, name: str, count: int, time):
         '''
         Function to track response time of the switch
@@ -1703,6 +1940,10 @@ class Connector:
             none
         '''
         dprint("_set_interfaces_permissions()")
+        if not self.request:
+            # running from the CLI, e.g. the 'poller' command. Permissions are set when a user loads the data.
+            dprint("  no request, skipping!")
+            return
         switch = self.switch
         group = self.group
         user = self.request.user
@@ -1710,6 +1951,13 @@ class Connector:
         # find allowed vlans for this user
         self._set_allowed_vlans()
 
+        # the admin deny settings, compiled once for all interfaces:
+        hide_ifname = hide_ifdescr = None
+        if settings.IFACE_HIDE_REGEX_IFNAME:
+            hide_ifname = get_compiled_regex(settings.IFACE_HIDE_REGEX_IFNAME)
+        if settings.IFACE_HIDE_REGEX_IFDESCR:
+            hide_ifdescr = get_compiled_regex(settings.IFACE_HIDE_REGEX_IFDESCR)
+
         # apply the permission rules to all interfaces
         for iface in self.interfaces.values():
             # dprint(f"  checking {iface.name}")
@@ -1798,16 +2046,16 @@ class Connector:
                 continue
 
             # see if this regex matches the interface name, e.g. GigabitEthernetx/x/x
-            if settings.IFACE_HIDE_REGEX_IFNAME != "":
-                match = re.match(settings.IFACE_HIDE_REGEX_IFNAME, iface.name)
+            if hide_ifname:
+                match = hide_ifname.match(iface.name)
                 if match:
                     iface.manageable = False  # match, so we cannot modify! Show anyway...
                     iface.unmanage_reason = "Interface access denied: name matches admin deny setting!"
                     continue
 
             # see if this regex matches the interface 'ifAlias' aka. the interface description
-            if settings.IFACE_HIDE_REGEX_IFDESCR != "":
-                match = re.match(settings.IFACE_HIDE_REGEX_IFDESCR, iface.description)
+            if hide_ifdescr:
+                match = hide_ifdescr.match(iface.description)
                 if match:
                     iface.manageable = False  # match, so we cannot modify! Show anyway...
                     iface.unmanage_reason = "Interface access denied: description matches admin deny setting!"
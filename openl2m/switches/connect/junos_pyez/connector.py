@@ -11,6 +11,7 @@
 # more details.  You should have received a copy of the GNU General Public
 # License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
 #
+from concurrent.futures import ThreadPoolExecutor
 from netaddr import IPNetwork
 import re
 
@@ -35,7 +36,12 @@ from switches.connect.constants import (
 )
 from switches.connect.classes import Interface, NeighborDevice
 from switches.connect.connector import Connector
+from switches.connect.sessionpool import PoolExhausted, SessionPool
+from switches.connect.junos_pyez.rpc import RawRPC
 from switches.connect.junos_pyez.utils import (
+    junos_iter_arp_entries,
+    junos_iter_mac_entries,
+    junos_rpc_element,
     junos_speed_to_mbps,
     junos_parse_power,
     junos_parse_duplex,
@@ -52,6 +58,26 @@ from jnpr.junos import Device
 from jnpr.junos.utils.config import Config
 from jnpr.junos.exception import RpcError, ConfigLoadError, CommitError, LockError, UnlockError
 
+# seconds to wait for a Netconf session to the device, if all are in use:
+SESSION_WAIT_TIMEOUT = 15
+
+
+def _close_handle(device: Device):
+    device.close()
+
+
+# Netconf sessions are kept open between requests, and re-used for the next request to the same device.
+# The device facts are read once per session. Keep settings.JUNOS_PYEZ_SESSION_IDLE_TIMEOUT
+# below the idle-timeout of the device Netconf service.
+_session_pool = SessionPool(
+    name="pyez",
+    max_per_key=settings.JUNOS_PYEZ_SESSION_MAX_PER_DEVICE,
+    idle_timeout=settings.JUNOS_PYEZ_SESSION_IDLE_TIMEOUT,
+    wait_timeout=SESSION_WAIT_TIMEOUT,
+    is_alive=lambda device: device.connected,
+    close_handle=_close_handle,
+)
+
 
 class PyEZConnector(Connector):
     '''
@@ -100,13 +126,21 @@ class PyEZConnector(Connector):
         # Junos driver-specific entries:
         self.is_els = False  # set to True is this a ELS switch
 
-        # this will be the Junos PyEZ driver session object
+        # this will be the Junos PyEZ driver session object, borrowed from the session pool
         self.device = False
+        self.pooled_session = None
         # and we dont want to cache this:
         self.set_do_not_cache_attribute('device')
+        self.set_do_not_cache_attribute('pooled_session')
+        # the set-commands gathered in transaction mode, see begin_transaction()
+        self.can_use_transaction = True
+        self.transaction_commands = []
+        self.set_do_not_cache_attribute('transaction_commands')
         if not self._open_device():
             dprint("  _open_device() failed! Raising exception")
             raise Exception("PyEZ connection failed! Please check the device configuration!")
+        # the session stays open in the pool, for the next call:
+        self._close_device()
 
     def _parse_address_family(self, iface: Interface, xml_data) -> bool:
         """Parse the <address-family> output of an interface from the XML data in "intf"
@@ -194,11 +228,35 @@ class PyEZConnector(Connector):
             # self.error already set!
             return False
 
+        # the interface, PoE, vlan and instance RPCs are independent, so we send them at the same time
+        # over the Netconf session, and parse the replies in order below.
+        executor = ThreadPoolExecutor(
+            max_workers=settings.JUNOS_PYEZ_MAX_CONCURRENT_RPCS, thread_name_prefix="openl2m-pyez"
+        )
+        '''
+        This RPC is cli equivalent of "show interfaces"
+        '''
+        intf_future = executor.submit(self.device.rpc.get_interface_information, extensive=False)
+        '''
+        This RPC is cli equivalent of "show poe controller"
+        '''
+        poe_controller_future = executor.submit(self.device.rpc.get_poe_controller_information)
+        '''
+        This RPC is cli equivalent of "show poe interface"
+        '''
+        poe_interface_future = executor.submit(self.device.rpc.get_poe_interface_information)
+        '''
+        This RPC is cli equivalent of "show vlans extensive"
+        '''
+        vlan_future = executor.submit(self.device.rpc.get_vlan_information, extensive=True)
+        vrf_future = executor.submit(self.device.rpc.get_instance_information, detail=True)
+        executor.shutdown(wait=False)
+
         self.hostname = self.device.facts['hostname']
         # if first time for this device (or changed), update hostname
         if self.switch.hostname != self.device.facts['hostname']:
             self.switch.hostname = self.device.facts['hostname']
-            self.switch.save()
+            self.switch.save(update_fields=['hostname'])
 
         self.add_more_info('System', 'Hostname', self.hostname)
         self.add_more_info('System', 'Model', self.device.facts['model'])
@@ -226,10 +284,16 @@ class PyEZConnector(Connector):
 
         # first get interface information:
         dprint("INTERFACES:")
-        '''
-        This RPC is cli equivalent of "show interfaces extensive"
-        '''
-        intf_data = self.device.rpc.get_interface_information(extensive=False)
+        try:
+            intf_data = intf_future.result()
+        except Exception as error:
+            dprint(f"dev.rpc.get_interface_information() error: {error}")
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._close_device(healthy=False)
+            self.error.status = True
+            self.error.description = "Error reading interfaces!"
+            self.error.details = f"Cannot read interfaces: {format(error)}"
+            return False
         interfaces = intf_data.findall('.//physical-interface')
         for intf in interfaces:
             name = intf.find('.//name').text
@@ -362,10 +426,7 @@ class PyEZConnector(Connector):
 
         # Now get PoE power supply info:
         try:
-            '''
-            This RPC is cli equivalent of "show poe controller"
-            '''
-            ps_data = self.device.rpc.get_poe_controller_information()
+            ps_data = poe_controller_future.result()
             # check that there is PoE info:
             controllers = ps_data.findall('.//controller-information')
             if controllers:
@@ -375,10 +436,7 @@ class PyEZConnector(Connector):
 
                 # and get PoE Interface info:
                 try:
-                    '''
-                    This RPC is cli equivalent of "show poe interface"
-                    '''
-                    poe_data = self.device.rpc.get_poe_interface_information()
+                    poe_data = poe_interface_future.result()
                 except Exception as error:
                     dprint(f"dev.rpc.get_poe_interface_information() error: {error}")
                     self.add_warning(warning=f"ERROR: Cannot get interface PoE info - {error}")
@@ -396,10 +454,7 @@ class PyEZConnector(Connector):
         # get vlan info. this includes port membership!
         dprint("\nVLANS:")
         try:
-            '''
-            This RPC is cli equivalent of "show vlans extensive"
-            '''
-            vlan_response = self.device.rpc.get_vlan_information(extensive=True)
+            vlan_response = vlan_future.result()
             vlans = vlan_response.findall('.//l2ng-l2ald-vlan-instance-group')
             for v in vlans:
                 name = v.find('.//l2ng-l2rtb-vlan-name').text
@@ -430,8 +485,13 @@ class PyEZConnector(Connector):
             self.add_warning(warning=f"ERROR: Cannot get vlans - {error}")
 
         dprint("VRFs()")
-        vrf_data = self.device.rpc.get_instance_information(detail=True)
-        vrfs = vrf_data.findall(".//instance-core")
+        try:
+            vrf_data = vrf_future.result()
+            vrfs = vrf_data.findall(".//instance-core")
+        except Exception as error:
+            dprint(f"dev.rpc.get_instance_information() error: {error}")
+            self.add_warning(warning=f"ERROR: Cannot get routing instances - {error}")
+            vrfs = []
         for vrf in vrfs:
             vrf_name = vrf.find(".//instance-name").text
             vrf_type = vrf.find(".//instance-type").text  # "forwarding" or "vrf"
@@ -509,35 +569,55 @@ class PyEZConnector(Connector):
             dprint("_open_device() failed!")
             self.add_warning(warning="Erroring connecting to device!")
             return False
-        # get mac address table
-        # TBD
-        #
-        dprint("\nMAC ADDRESSESS:")
+        # the MAC, ARP and LLDP RPCs are independent, so we send them at the same time:
+        executor = ThreadPoolExecutor(
+            max_workers=settings.JUNOS_PYEZ_MAX_CONCURRENT_RPCS, thread_name_prefix="openl2m-pyez"
+        )
+        # the MAC and ARP tables can be very large. We read the raw replies, and parse them incrementally,
+        # instead of building the full XML trees. See _get_raw_rpc_reply().
         '''
-        This RPC is cli equivalent of "show ethernet-switching table extensive"
+        This RPC is cli equivalent of "show ethernet-switching table"
         '''
-        mac_data = self.device.rpc.get_ethernet_switching_table_information(extensive=True)
-        macs = mac_data.findall('.//l2ng-l2ald-mac-entry-vlan')
-        for mac in macs:
-            mac_address = mac.find('.//l2ng-l2-mac-address').text
-            vlan_id = int(mac.find('.//l2ng-l2-vlan-id').text)
-            if_name = mac.find('.//l2ng-l2-mac-logical-interface').text
-            phys_if_name = junos_remove_unit(if_name)
-            dprint(f"  Found: {mac_address}, on vlan {vlan_id}, interface {phys_if_name}")
-            self.add_learned_ethernet_address(if_name=phys_if_name, eth_address=mac_address, vlan_id=vlan_id)
-
-        dprint("\nARP:")
+        mac_future = executor.submit(self._get_raw_rpc_reply, "get-ethernet-switching-table-information")
         '''
         This RPC is cli equivalent of "show arp no-resolve"
         '''
-        arp_data = self.device.rpc.get_arp_table_information(no_resolve=True)
-        arp_entries = arp_data.findall('.//arp-table-entry')
+        arp_future = executor.submit(self._get_raw_rpc_reply, "get-arp-table-information", no_resolve=True)
+        '''
+        This RPC is cli equivalent of "show lldp neighbors", i.e. all neighbors in a single call.
+        '''
+        lldp_future = executor.submit(self.device.rpc.get_lldp_neighbors_information)
+
+        dprint("\nMAC ADDRESSESS:")
+        try:
+            count = self._parse_mac_table(mac_future.result())
+        except Exception as error:
+            dprint(f"  raw ethernet-switching table read failed: {error}")
+            count = 0
+        try:
+            if not count:
+                # nothing found in the short format, try the "extensive" output:
+                count = self._parse_mac_table_extensive()
+        except Exception as error:
+            dprint(f"dev.rpc.get_ethernet_switching_table_information() error: {error}")
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._close_device(healthy=False)
+            self.error.status = True
+            self.error.description = "Error reading ethernet addresses!"
+            self.error.details = f"Cannot read the ethernet switching table: {format(error)}"
+            return False
+        dprint(f"  Found {count} ethernet addresses")
+
+        dprint("\nARP:")
+        try:
+            arp_entries = junos_iter_arp_entries(arp_future.result())
+        except Exception as error:
+            dprint(f"dev.rpc.get_arp_table_information() error: {error}")
+            self.add_warning(warning=f"ERROR: Cannot get ARP table - {error}")
+            arp_entries = []
         # compile the IRB matching reg-ex for performance:
         irb_regex = re.compile(r"^irb\.\d+\s+\[([\w\-\.\/]+)\]$")
-        for arp in arp_entries:
-            mac_address = arp.find('.//mac-address').text
-            ip_address = arp.find('.//ip-address').text
-            if_name = arp.find('.//interface-name').text
+        for mac_address, ip_address, if_name in arp_entries:
             dprint(f"  {mac_address} = {ip_address}, on {if_name}")
             # if found on routed interface, if_name could be formed as "irb.nnn [if_name]"
             m = re.match(irb_regex, if_name)
@@ -551,57 +631,162 @@ class PyEZConnector(Connector):
             self.add_learned_ethernet_address(if_name=if_name, eth_address=mac_address, ip4_address=ip_address)
 
         dprint("\nLLDP:")
-        '''
-        Most details come from the RPC call to
-            get_lldp_interface_neighbors(interface_device=<name>)
-        This RPC is cli equivalent of "show lldp neigbor interface <name>"
-        So we are going to loop through all interfaces:
-        '''
-        for iface in self.interfaces.values():
-            dprint(f"  Interface:{iface.name}")
-            try:
-                '''
-                This RPC is cli equivalent of "show lldp neigbor interface <interface-name>"
-                '''
-                lldp_data = self.device.rpc.get_lldp_interface_neighbors(interface_device=iface.name)
-                neighbors = lldp_data.findall('.//lldp-neighbor-information')
-                for nb in neighbors:
-                    dprint("    Found neighbor:")
-                    # we know this already, since we are running lldp neigbor on <iface.name> :
-                    # local_port = nb.find('.//lldp-local-interface').text
-                    remote_chassis_id_subtype = nb.find('.//lldp-remote-chassis-id-subtype').text
-                    remote_chassis_id = nb.find('.//lldp-remote-chassis-id').text
-                    # remote_description = nb.find('.//lldp-remote-port-description').text
-                    sys_name = nb.find('.//lldp-remote-system-name').text
-                    sys_description = nb.find('.//lldp-remote-system-description').text
-                    capabilities = nb.find('.//lldp-remote-system-capabilities-enabled').text
-                    dprint(f"    Neighbor: {sys_name}")
-                    neighbor = NeighborDevice(remote_chassis_id)
-                    neighbor.set_sys_name(sys_name)
-                    neighbor.set_sys_description(sys_description)
-                    # neighbor.set_port_name()
-                    # neighbor.set_port_description()
-                    neighbor.set_chassis_string(remote_chassis_id)
-                    if remote_chassis_id_subtype == 'Mac address':
-                        neighbor.set_chassis_type(LLDP_CHASSIC_TYPE_ETH_ADDR)
-                    # parse capabilities:
-                    if 'Bridge' in capabilities:
-                        neighbor.set_capability(LLDP_CAPABILITIES_BRIDGE)
-                    if 'Router' in capabilities:
-                        neighbor.set_capability(LLDP_CAPABILITIES_ROUTER)
-                    # Following NOT tested; we are assuming the following two are correct:
-                    if 'Wlan' in capabilities:
-                        neighbor.set_capability(LLDP_CAPABILITIES_WLAN)
-                    if 'Phone' in capabilities:
-                        neighbor.set_capability(LLDP_CAPABILITIES_PHONE)
-                    self.add_neighbor_object(iface.name, neighbor)
-            except Exception as err:
-                # not all interfaces can show lldp neighbor!
-                dprint(f"RPC call failed for '{iface.name}': {err}")
+        try:
+            self._get_lldp_neighbors(lldp_data=lldp_future.result(), executor=executor)
+        except Exception as err:
+            dprint(f"dev.rpc.get_lldp_neighbors_information() error: {err}")
+            self.add_warning(warning=f"ERROR: Cannot get LLDP neighbors - {err}")
+        executor.shutdown(wait=True)
 
         self._close_device()
         return True
 
+    def _get_raw_rpc_reply(self, rpc_name: str, **kwargs) -> str:
+        '''
+        Run an RPC, and return the raw XML reply. This runs in a worker thread.
+        PyEZ and ncclient parse the reply into several XML trees and copies. On large tables these use
+        a lot of memory, so we take the reply as received, without parsing it. See rpc.RawRPC()
+
+        Args:
+            rpc_name (str): the RPC name, e.g. "get-arp-table-information"
+            kwargs: the RPC options, e.g. no_resolve=True
+
+        Returns:
+            (str): the raw XML reply. Raises an exception on errors.
+        '''
+        return self.device._conn.execute(RawRPC, junos_rpc_element(rpc_name, **kwargs)).xml
+
+    def _parse_mac_table(self, xml: str) -> int:
+        '''
+        Parse the raw "show ethernet-switching table" reply incrementally,
+        and add the ethernet addresses to the interfaces.
+
+        Returns:
+            (int): the number of ethernet addresses found.
+        '''
+        # the short format has the vlan name, not the vlan id:
+        vlan_ids = {vlan.name: vlan.id for vlan in self.vlans.values()}
+        count = 0
+        for mac_address, vlan_id, vlan_name, if_name in junos_iter_mac_entries(xml):
+            if not vlan_id:
+                vlan_id = vlan_ids.get(vlan_name, 0)
+            phys_if_name = junos_remove_unit(if_name)
+            dprint(f"  Found: {mac_address}, on vlan {vlan_id}, interface {phys_if_name}")
+            self.add_learned_ethernet_address(if_name=phys_if_name, eth_address=mac_address, vlan_id=vlan_id)
+            count += 1
+        return count
+
+    def _parse_mac_table_extensive(self) -> int:
+        '''
+        Read and parse "show ethernet-switching table extensive", as a full XML tree.
+        This is only used if the short format did not return any entries.
+
+        Returns:
+            (int): the number of ethernet addresses found.
+        '''
+        '''
+        This RPC is cli equivalent of "show ethernet-switching table extensive"
+        '''
+        mac_data = self.device.rpc.get_ethernet_switching_table_information(extensive=True)
+        macs = mac_data.findall('.//l2ng-l2ald-mac-entry-vlan')
+        for mac in macs:
+            mac_address = mac.find('.//l2ng-l2-mac-address').text
+            vlan_id = int(mac.find('.//l2ng-l2-vlan-id').text)
+            if_name = mac.find('.//l2ng-l2-mac-logical-interface').text
+            phys_if_name = junos_remove_unit(if_name)
+            dprint(f"  Found: {mac_address}, on vlan {vlan_id}, interface {phys_if_name}")
+            self.add_learned_ethernet_address(if_name=phys_if_name, eth_address=mac_address, vlan_id=vlan_id)
+        return len(macs)
+
+    def _get_lldp_neighbors(self, lldp_data, executor: ThreadPoolExecutor):
+        '''
+        Parse the reply of the "show lldp neighbors" RPC, with the neighbors of all interfaces.
+        This reply does not have the system description and capabilities of the neighbors.
+        These come from "show lldp neighbors interface <name>", so we only call that for the interfaces
+        that have neighbors, at the same time, instead of for every interface.
+
+        Args:
+            lldp_data: the XML reply of get_lldp_neighbors_information()
+            executor: the thread pool to run the interface RPCs in.
+
+        Returns:
+            none
+        '''
+        neighbors = {}  # lists of <lldp-neighbor-information> elements, keyed by local interface name.
+        for nb in lldp_data.findall('.//lldp-neighbor-information'):
+            # newer versions call this <lldp-local-port-id>, older <lldp-local-interface>:
+            local_port = nb.findtext('.//lldp-local-port-id') or nb.findtext('.//lldp-local-interface')
+            if local_port:
+                neighbors.setdefault(junos_remove_unit(local_port), []).append(nb)
+        dprint(f"  Found neighbors on {len(neighbors)} interfaces")
+
+        '''
+        This RPC is cli equivalent of "show lldp neighbor interface <interface-name>"
+        '''
+        if_names = list(neighbors.keys())
+        details = executor.map(self._get_lldp_interface_neighbors, if_names)
+        for if_name, detail in zip(if_names, details):
+            if detail:
+                neighbors[if_name] = detail
+            for nb in neighbors[if_name]:
+                self._parse_lldp_neighbor(if_name=if_name, nb=nb)
+
+    def _get_lldp_interface_neighbors(self, if_name: str) -> list | None:
+        '''
+        Read the neighbor details of an interface. This runs in a worker thread.
+
+        Returns:
+            (list): the <lldp-neighbor-information> elements, or None on errors.
+        '''
+        try:
+            lldp_data = self.device.rpc.get_lldp_interface_neighbors(interface_device=if_name)
+            return lldp_data.findall('.//lldp-neighbor-information')
+        except Exception as err:
+            # not all interfaces can show lldp neighbor!
+            dprint(f"RPC call failed for '{if_name}': {err}")
+            return None
+
+    def _parse_lldp_neighbor(self, if_name: str, nb):
+        '''
+        Parse a <lldp-neighbor-information> element, and add the neighbor to the interface.
+
+        Args:
+            if_name (str): the local interface name.
+            nb: the XML element for the neighbor.
+
+        Returns:
+            none
+        '''
+        dprint("    Found neighbor:")
+        remote_chassis_id_subtype = nb.findtext('.//lldp-remote-chassis-id-subtype')
+        remote_chassis_id = nb.findtext('.//lldp-remote-chassis-id')
+        if not remote_chassis_id:
+            return
+        # remote_description = nb.find('.//lldp-remote-port-description').text
+        sys_name = nb.findtext('.//lldp-remote-system-name', default='')
+        sys_description = nb.findtext('.//lldp-remote-system-description', default='')
+        capabilities = nb.findtext('.//lldp-remote-system-capabilities-enabled', default='')
+        dprint(f"    Neighbor: {sys_name}")
+        neighbor = NeighborDevice(remote_chassis_id)
+        neighbor.set_sys_name(sys_name)
+        neighbor.set_sys_description(sys_description)
+        # neighbor.set_port_name()
+        # neighbor.set_port_description()
+        neighbor.set_chassis_string(remote_chassis_id)
+        if remote_chassis_id_subtype == 'Mac address':
+            neighbor.set_chassis_type(LLDP_CHASSIC_TYPE_ETH_ADDR)
+        # parse capabilities:
+        if 'Bridge' in capabilities:
+            neighbor.set_capability(LLDP_CAPABILITIES_BRIDGE)
+        if 'Router' in capabilities:
+            neighbor.set_capability(LLDP_CAPABILITIES_ROUTER)
+        # Following NOT tested; we are assuming the following two are correct:
+        if 'Wlan' in capabilities:
+            neighbor.set_capability(LLDP_CAPABILITIES_WLAN)
+        if 'Phone' in capabilities:
+            neighbor.set_capability(LLDP_CAPABILITIES_PHONE)
+        self.add_neighbor_object(if_name, neighbor)
+
     def _parse_powersupply(self, supply):
         '''
         Parse out XML data with power suply information, and update
@@ -685,7 +870,8 @@ class PyEZConnector(Connector):
             self._close_device()
             dprint("  change OK!")
             return True
-        self._close_device()
+        # a failed change can leave the configuration locked, so close this session:
+        self._close_device(healthy=False)
         dprint("  change FAILED!")
         return False
 
@@ -715,7 +901,8 @@ class PyEZConnector(Connector):
             self._close_device()
             dprint("  change OK!")
             return True
-        self._close_device()
+        # a failed change can leave the configuration locked, so close this session:
+        self._close_device(healthy=False)
         dprint("  change FAILED!")
         return False
 
@@ -744,6 +931,7 @@ class PyEZConnector(Connector):
                 # cannot find untagged vlan (should not happen!)
                 self.error.status = True
                 self.error.description = f"Unknown vlan {new_vlan_id}"
+                self._close_device()
                 return False
             commands.append(f"delete interfaces {interface.name} unit 0 family ethernet-switching vlan")
             commands.append(
@@ -755,7 +943,8 @@ class PyEZConnector(Connector):
             self._close_device()
             dprint("  change OK!")
             return True
-        self._close_device()
+        # a failed change can leave the configuration locked, so close this session:
+        self._close_device(healthy=False)
         dprint("  change FAILED!")
         return False
 
@@ -790,7 +979,7 @@ class PyEZConnector(Connector):
             dprint("  change OK!")
             return True
 
-        self._close_device()
+        self._close_device(healthy=False)
         self.error.details = f"Error creating vlan {vlan_id}: {self.error.description}"
         return False
 
@@ -821,6 +1010,7 @@ class PyEZConnector(Connector):
         if not vlan:
             self.error.status = True
             self.error.description = f"Vlan {vlan_id} not found. Please contact your Administrator!"
+            self._close_device()
             return False
 
         commands = []
@@ -832,7 +1022,7 @@ class PyEZConnector(Connector):
             dprint("  change OK!")
             return True
 
-        self._close_device()
+        self._close_device(healthy=False)
         self.error.description = f"Error updating vlan {vlan_id} name to '{vlan_name}': {self.error.description}"
         return False
 
@@ -857,6 +1047,7 @@ class PyEZConnector(Connector):
         if not vlan:
             self.error.status = True
             self.error.description = f"Vlan {vlan_id} not found. Please contact your Administrator!"
+            self._close_device()
             return False
 
         commands = []
@@ -868,7 +1059,7 @@ class PyEZConnector(Connector):
             dprint("  delete OK!")
             return True
 
-        self._close_device()
+        self._close_device(healthy=False)
         self.error.description = f"Error deleting vlan {vlan_id}: {self.error.description}"
         return False
 
@@ -898,31 +1089,93 @@ class PyEZConnector(Connector):
             self._close_device()
             dprint("  change OK!")
             return True
-        self._close_device()
+        # a failed change can leave the configuration locked, so close this session:
+        self._close_device(healthy=False)
         dprint("  change FAILED!")
         return False
 
-    def pyez_execute_commands(self, commands: list, format: str = 'set') -> bool:
+    def begin_transaction(self) -> bool:
+        '''
+        Start gathering the set-commands of all changes, to load and commit them at once.
+        A Junos commit can take many seconds, so this is much faster for a bulk edit.
+        The Netconf session stays open until commit_transaction().
+
+        Returns:
+            True if changes are now gathered, False on connection errors.
+        '''
+        dprint("PyEZConnector.begin_transaction()")
+        if not self._open_device():
+            return False
+        self.transaction_active = True
+        self.transaction_commands = []
+        return True
+
+    def commit_transaction(self, comment: str = "") -> bool:
+        '''
+        Load all gathered set-commands, and commit them once. On failure, the candidate configuration is
+        rolled back, and none of the changes are applied.
+
+        Args:
+            comment(str): the commit comment.
+
+        Returns:
+            (boolean) True on success, False on error and set self.error variables
+        '''
+        dprint("PyEZConnector.commit_transaction()")
+        if not self.transaction_active:
+            return True
+        self.transaction_active = False
+        commands = self.transaction_commands
+        self.transaction_commands = []
+        if not commands:
+            self._close_device()
+            return True
+        retval = self.pyez_execute_commands(commands=commands, comment=comment)
+        self._close_device(healthy=retval)
+        return retval
+
+    def abort_transaction(self):
+        '''
+        Drop the gathered set-commands without loading them, and give up the Netconf session.
+        This is called after an unexpected error, so the session state is not known, and it is closed.
+        '''
+        dprint("PyEZConnector.abort_transaction()")
+        self.transaction_active = False
+        self.transaction_commands = []
+        if self.pooled_session:
+            self._close_device(healthy=False)
+
+    def pyez_execute_commands(self, commands: list, format: str = 'set', comment: str = "") -> bool:
         '''
         Execute a list of command string(s) on the device. Defaults to 'set' format.
+        In transaction mode, the commands are gathered, and executed in commit_transaction().
 
         Args:
             commands(list): the command list of strings to execute.
             format(str): the command format, default = 'set'
+            comment(str): the commit comment, default is none.
 
         Returns:
             (boolean) True on success, False on error and set self.error variables
         '''
         dprint(f"PyEZ.pyez_execute_commands(): format={format}, '{commands}'")
+        if self.transaction_active and format == 'set':
+            dprint("  transaction active, commands will be committed later.")
+            self.transaction_commands.extend(commands)
+            return True
+        conf = False
         try:
             conf = Config(self.device)  # we assume this is open!
             conf.lock()
-            for command in commands:
-                conf.load(command, format=format)
+            # load all commands at once:
+            conf.load("\n".join(commands), format=format)
             dprint(f"Config Diff: {conf.diff()}")
             if conf.commit_check():
                 dprint("commit_check() OK")
-                conf.commit()
+                if comment:
+                    conf.commit(comment=comment)
+                else:
+                    conf.commit()
                 dprint("conf.commit() succeeded")
                 ret_val = True
             else:
@@ -942,24 +1195,22 @@ class PyEZConnector(Connector):
             self.error.status = True
             self.error.description = "Network Communications Error, change was NOT applied!"
             self.error.details = f"Error: '{err}', commands '{commands}'"
-            return False
         except ConfigLoadError as err:
             dprint("Error: ConfigLoadError")
             self.error.status = True
             self.error.description = "Error loading config, change was NOT applied!"
             self.error.details = f"Error: '{err}', commands '{commands}'"
-            return False
         except CommitError as err:
             dprint("Error: CommitError")
             self.error.status = True
             self.error.description = "Commit-Check failed, change was NOT applied!"
             self.error.details = f"Error: '{err}', commands '{commands}'"
-            return False
         except LockError as err:
             dprint("Error: LockError")
             self.error.status = True
             self.error.description = "Cannot get lock, change was NOT applied!"
             self.error.details = f"Error: '{err}', commands '{commands}'"
+            # someone else has the lock, do not touch the candidate configuration!
             return False
         except UnlockError as err:
             dprint("Error: UnlockError")
@@ -971,13 +1222,26 @@ class PyEZConnector(Connector):
             self.error.status = True
             self.error.description = "Invalid Rollback ID, change was NOT applied!"
             self.error.details = f"Error: '{err}', commands '{commands}'"
-            return False
         except Exception as err:
             dprint(f"Error generic: {type(err).__name__}")
             self.error.status = True
             self.error.description = "Unknown error occured, change was NOT applied!"
             self.error.details = f"Error: '{err}', command was '{commands}'"
-            return False
+        # do not leave partial changes in the candidate configuration:
+        self._pyez_rollback(conf)
+        return False
+
+    def _pyez_rollback(self, conf: Config):
+        '''
+        Discard the loaded changes after an error, and release the configuration lock.
+        '''
+        if not conf:
+            return
+        try:
+            conf.rollback()
+            conf.unlock()
+        except Exception as err:
+            dprint(f"  rollback/unlock after error failed: {err}")
 
     def _validate_vlan_name(self, vlan_name: str) -> bool:
         '''Validate the characters in the new vlan name
@@ -992,7 +1256,8 @@ class PyEZConnector(Connector):
 
     def _open_device(self) -> bool:
         '''
-        get a pyJunosPyEZ "driver" and open a "connection" to the device
+        get a pyJunosPyEZ "driver" and open a "connection" to the device.
+        An open Netconf session to the device is borrowed from the session pool if one is available.
         return True on success, False on failure, and will set self.error
         '''
         dprint("Junos PyEZ _open_device()")
@@ -1006,29 +1271,52 @@ class PyEZConnector(Connector):
             dprint("  _open_device: No Credentials!")
             return False
 
-        self.device = Device(
-            host=self.switch.primary_ip4,
-            user=self.switch.netmiko_profile.username,
-            password=self.switch.netmiko_profile.password,
-            normalize=True,
-            conn_open_timeout=settings.JUNOS_PYEZ_CONN_TIMEOUT,
-        )  # normalize removed trailing/ending \n and spaces.
+        profile = self.switch.netmiko_profile
+        key = (self.switch.id, self.switch.primary_ip4, profile.id, hash((profile.username, profile.password)))
         try:
-            self.device.open()
+            self.pooled_session = _session_pool.borrow(key=key, connect=self._connect)
+        except PoolExhausted as error:
+            self.error.status = True
+            self.error.description = "Device is busy!"
+            self.error.details = f"Cannot open Junos PyEZ NetConf session: {format(error)}"
+            dprint(f"  _open_device: {format(error)}")
+            return False
         except Exception as error:
             self.error.status = True
             self.error.description = "Error establishing connection!"
             self.error.details = f"Cannot open Junos PyEZ NetConf session: {format(error)}"
             dprint("  _open_device: Device.open() failed!")
             return False
-
+        self.device = self.pooled_session.handle
         return True
 
-    def _close_device(self) -> bool:
+    def _connect(self) -> Device:
+        '''
+        Open a new Netconf session to the device. Raises an exception on errors.
+        '''
+        device = Device(
+            host=self.switch.primary_ip4,
+            user=self.switch.netmiko_profile.username,
+            password=self.switch.netmiko_profile.password,
+            normalize=True,
+            conn_open_timeout=settings.JUNOS_PYEZ_CONN_TIMEOUT,
+        )  # normalize removed trailing/ending \n and spaces.
+        device.open()
+        return device
+
+    def _close_device(self, healthy: bool = True) -> bool:
         '''
-        make sure we properly close the Junos PyEZ Session
+        Return the Junos PyEZ Session to the session pool. The pool closes it when it is idle for too long.
+
+        Args:
+            healthy (bool): if False, e.g. after an RPC error, the session is closed now.
         '''
         dprint("Junos PyEZ _close_device()")
-        self.device.close()
+        if self.transaction_active and healthy:
+            dprint("  transaction active, keeping session open!")
+            return True
+        if self.pooled_session:
+            _session_pool.release(self.pooled_session, healthy=healthy)
+            self.pooled_session = None
         self.device = False
         return True
@@ -0,0 +1,76 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Run an RPC on a PyEZ Device() and get the reply as the raw XML string, as received by ncclient.
+
+A regular ncclient RPC parses the full reply into a tree, and the Junos device handler then wraps it
+in an NCElement(), which removes the namespaces with XSLT: i.e. a string copy, and another re-parsed tree.
+PyEZ returns that last tree. On a large MAC or ARP table, all these copies use a lot of memory.
+RawRPC() skips both steps, so the reply can be parsed incrementally, see utils.junos_iterparse()
+
+Usage:
+    reply = device._conn.execute(RawRPC, junos_rpc_element("get-arp-table-information", no_resolve=True))
+    xml = reply.xml
+"""
+import re
+
+from ncclient.operations.rpc import RPC, RPCReply
+
+# an <rpc-error> element, in any namespace:
+_RPC_ERROR = re.compile(r"<(?:[\w-]+:)?rpc-error[\s>]")
+
+
+class RawRPCReply(RPCReply):
+    """
+    An RPC reply that is not parsed into a tree, unless it has errors.
+    Replies with errors are small, and are parsed as usual, so ncclient can raise RPCError().
+    """
+
+    def parse(self):
+        if self._parsed:
+            return
+        if _RPC_ERROR.search(self._raw):
+            super().parse()
+            return
+        self._parsed = True
+
+
+class _RawDeviceHandler:
+    """
+    Wraps the ncclient device handler, and disables the reply transformation, i.e. the NCElement() wrapper.
+    """
+
+    def __init__(self, device_handler):
+        self._device_handler = device_handler
+
+    def __getattr__(self, name):
+        return getattr(self._device_handler, name)
+
+    def transform_reply(self):
+        return False
+
+
+class RawRPC(RPC):
+    """
+    Run an RPC, and return the RawRPCReply(). Call via ncclient Manager().execute(RawRPC, rpc_element),
+    so the session timeout and raise mode of the Manager() are used.
+    """
+
+    REPLY_CLS = RawRPCReply
+
+    def __init__(self, session, device_handler, **kwargs):
+        super().__init__(session, device_handler=_RawDeviceHandler(device_handler), **kwargs)
+
+    def request(self, rpc_command):
+        return self._request(rpc_command)
@@ -11,6 +11,7 @@
 # more details.  You should have received a copy of the GNU General Public
 # License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
 #
+from lxml import etree
 
 from switches.connect.constants import (
     IF_TYPE_NONE,
@@ -149,3 +150,114 @@ def junos_parse_if_type(if_type: str) -> int:
     if if_type in iftypes:
         return iftypes[if_type]
     return IF_TYPE_NONE
+
+
+def junos_rpc_element(rpc_name: str, **kwargs) -> etree._Element:
+    '''
+    Build the XML element for an RPC, the same way PyEZ does, e.g.
+    junos_rpc_element("get-arp-table-information", no_resolve=True) is <get-arp-table-information><no-resolve/>
+
+    Args:
+        rpc_name(str): the RPC name.
+        kwargs: the RPC options. True adds an empty flag element, other values add an element with that text.
+
+    Returns:
+        (etree._Element) the RPC element
+    '''
+    rpc = etree.Element(rpc_name)
+    for option, value in kwargs.items():
+        if value is False or value is None:
+            continue
+        element = etree.SubElement(rpc, option.replace('_', '-'))
+        if value is not True:
+            element.text = str(value)
+    return rpc
+
+
+# the size of the pieces of the raw reply fed to the parser:
+ITERPARSE_CHUNK_SIZE = 65536
+
+
+def junos_iterparse(xml: str | bytes, tag: str):
+    '''
+    Parse a raw RPC reply incrementally, and yield each <tag> element, in any namespace.
+    Each element is freed after it is used, so memory use does not grow with the size of the reply.
+    The reply is fed to the parser in chunks, so a string reply is not copied as a whole.
+    The element is only valid until the next one is yielded!
+
+    Args:
+        xml(str|bytes): the raw RPC reply, see rpc.RawRPC()
+        tag(str): the element name to yield
+
+    Returns:
+        (generator) the <tag> elements
+    '''
+    parser = etree.XMLPullParser(events=("end",), tag=f"{{*}}{tag}", huge_tree=True)
+    for start in range(0, len(xml), ITERPARSE_CHUNK_SIZE):
+        chunk = xml[start : start + ITERPARSE_CHUNK_SIZE]
+        parser.feed(chunk.encode() if isinstance(chunk, str) else chunk)
+        yield from _read_events(parser)
+    parser.close()
+    yield from _read_events(parser)
+
+
+def _read_events(parser):
+    for _, element in parser.read_events():
+        yield element
+        # free this element, and the ones we handled before it:
+        element.clear(keep_tail=False)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+def _findtext(element, name: str) -> str:
+    '''
+    Get the text of a child element, in any namespace, without surrounding white space.
+    The raw reply is not normalized, like the PyEZ replies.
+    '''
+    text = element.findtext(f".//{{*}}{name}")
+    if text is None:
+        return ""
+    return text.strip()
+
+
+def junos_iter_mac_entries(xml: str | bytes):
+    '''
+    Parse a raw "show ethernet-switching table" (non-extensive) reply incrementally.
+
+    Args:
+        xml(str|bytes): the raw reply of the get-ethernet-switching-table-information RPC.
+
+    Returns:
+        (generator) of (mac_address, vlan_id, vlan_name, if_name) tuples.
+        vlan_id is 0 if not in the reply, look it up by vlan_name.
+    '''
+    for entry in junos_iterparse(xml, tag="l2ng-mac-entry"):
+        mac_address = _findtext(entry, "l2ng-l2-mac-address")
+        if not mac_address:
+            continue
+        vlan_id = _findtext(entry, "l2ng-l2-vlan-id")
+        yield (
+            mac_address,
+            int(vlan_id) if vlan_id.isdigit() else 0,
+            _findtext(entry, "l2ng-l2-mac-vlan-name"),
+            _findtext(entry, "l2ng-l2-mac-logical-interface"),
+        )
+
+
+def junos_iter_arp_entries(xml: str | bytes):
+    '''
+    Parse a raw "show arp no-resolve" reply incrementally.
+
+    Args:
+        xml(str|bytes): the raw reply of the get-arp-table-information RPC.
+
+    Returns:
+        (generator) of (mac_address, ip_address, if_name) tuples.
+    '''
+    for entry in junos_iterparse(xml, tag="arp-table-entry"):
+        yield (
+            _findtext(entry, "mac-address"),
+            _findtext(entry, "ip-address"),
+            _findtext(entry, "interface-name"),
+        )
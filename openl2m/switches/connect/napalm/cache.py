@@ -0,0 +1,66 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Cache of the Napalm getter results that change slowly, e.g. get_facts() and get_vlans().
+
+Each getter is cached for the number of seconds set in settings.NAPALM_GETTER_CACHE_TTL,
+so a page refresh only runs the getters for the volatile data again. See NapalmConnector()._run_getters()
+The time the result was cached is kept, so values that change with time, e.g. the uptime in get_facts(),
+can be corrected for the age of the result. This uses the default Django cache, see settings.CACHES. A device reload clears the cache of that device.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _get_key(switch_id: int, getter: str) -> str:
+    return f"openl2m-napalm-{switch_id}-{getter}"
+
+
+def get_ttl(getter: str) -> int:
+    """
+    Return the seconds the result of a getter is cached, 0 if not cached.
+    """
+    return settings.NAPALM_GETTER_CACHE_TTL.get(getter, 0)
+
+
+def get_result(switch_id: int, getter: str) -> tuple:
+    """
+    Return the cached result of a getter for a device, and its age in seconds.
+    The result is None if not found.
+    """
+    if not get_ttl(getter):
+        return (None, 0)
+    entry = cache.get(_get_key(switch_id, getter))
+    if entry is None:
+        return (None, 0)
+    (cached_time, result) = entry
+    return (result, max(time.time() - cached_time, 0))
+
+
+def set_result(switch_id: int, getter: str, result):
+    """
+    Cache the result of a getter for a device, if this getter is cached.
+    """
+    ttl = get_ttl(getter)
+    if ttl:
+        cache.set(_get_key(switch_id, getter), (time.time(), result), ttl)
+
+
+def clear(switch_id: int):
+    """
+    Clear all cached getter results of a device.
+    """
+    cache.delete_many([_get_key(switch_id, getter) for getter in settings.NAPALM_GETTER_CACHE_TTL])
@@ -13,4 +13,93 @@
 #
 """
 Napalm commands for the various "set" actions supported by OpenL2M
+
+The configuration for each action is a Jinja2 template in templates/<napalm driver>/<action>.j2,
+see constants.py for the action names. All templates are compiled once per process, into a shared
+Environment(). The compiled templates are also saved in a bytecode cache on disk,
+so new web server processes do not need to parse them again.
 """
+import functools
+import os
+
+from django.conf import settings
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined
+
+from switches.utils import dprint
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+TEMPLATE_EXTENSION = "j2"
+
+
+@functools.lru_cache(maxsize=1)
+def get_template_environment() -> Environment:
+    """
+    Return the process-wide Jinja2 Environment() for the Napalm configuration templates,
+    with all templates already compiled.
+    """
+    environment = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        # an empty directory is the system temporary directory:
+        bytecode_cache=FileSystemBytecodeCache(
+            directory=settings.NAPALM_TEMPLATE_CACHE_DIR or None, pattern="openl2m-napalm-%s.cache"
+        ),
+        # a missing value is an error, and not an empty string in the configuration:
+        undefined=StrictUndefined,
+        # the templates do not change while running, and are never removed from the environment cache:
+        auto_reload=False,
+        cache_size=-1,
+    )
+    for name in environment.list_templates(extensions=[TEMPLATE_EXTENSION]):
+        environment.get_template(name)
+    dprint(f"Napalm template environment: compiled {len(environment.cache)} templates")
+    return environment
+
+
+@functools.lru_cache(maxsize=32)
+def get_driver_actions(driver: str) -> frozenset:
+    """
+    Return the actions that have a template for a Napalm driver, e.g. 'ios'
+    """
+    prefix = f"{driver}/"
+    suffix = f".{TEMPLATE_EXTENSION}"
+    return frozenset(
+        name[len(prefix) : -len(suffix)]
+        for name in get_template_environment().list_templates(extensions=[TEMPLATE_EXTENSION])
+        if name.startswith(prefix)
+    )
+
+
+def render_action(driver: str, action: str, **values) -> str:
+    """
+    Render the configuration of a single action for a Napalm driver.
+
+    Params:
+        driver (str): the Napalm driver name, e.g. 'ios'
+        action (str): the action, e.g. ACTION_SET_VLAN
+        values: the template variables, e.g. interface="GigabitEthernet1/0/1", vlan_id=10
+
+    Returns:
+        (str): the configuration lines. Raises a Jinja2 exception if the template is not found,
+               or a value is missing, and ValueError on an invalid value.
+    """
+    for name, value in values.items():
+        # a value cannot add configuration lines:
+        if isinstance(value, str) and ("\n" in value or "\r" in value):
+            raise ValueError(f"Invalid value for '{name}', line breaks are not allowed!")
+    template = get_template_environment().get_template(f"{driver}/{action}.{TEMPLATE_EXTENSION}")
+    return template.render(**values).strip()
+
+
+def render_actions(driver: str, actions: list) -> str:
+    """
+    Render a batch of actions, e.g. the changes to many interfaces, into a single configuration snippet,
+    to be merged and committed at once.
+
+    Params:
+        driver (str): the Napalm driver name, e.g. 'ios'
+        actions (list): of tuples (action, values), where values is a dict of template variables.
+
+    Returns:
+        (str): the configuration.
+    """
+    return "\n".join(render_action(driver, action, **values) for action, values in actions) + "\n"
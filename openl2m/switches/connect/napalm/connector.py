@@ -11,8 +11,11 @@
 # more details.  You should have received a copy of the GNU General Public
 # License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
 #
+from concurrent.futures import ThreadPoolExecutor, wait
+import time
 import traceback
 
+from django.conf import settings
 from django.http.request import HttpRequest
 
 from napalm import get_network_driver
@@ -33,9 +36,22 @@ from switches.constants import (
 )
 from switches.connect.classes import Interface, NeighborDevice
 from switches.connect.connector import Connector
+from switches.connect.napalm import cache as getter_cache
+from switches.connect.napalm.commands import get_driver_actions, render_action, render_actions
+from switches.connect.napalm.constants import (
+    ACTION_ENABLE_PORT,
+    ACTION_DISABLE_PORT,
+    ACTION_ENABLE_POE,
+    ACTION_DISABLE_POE,
+    ACTION_SET_VLAN,
+    ACTION_SET_DESCRIPTION,
+    ACTION_SAVE_CONFIG,
+)
+from switches.connect.sessionpool import PoolExhausted, SessionPool
 from switches.connect.utils import interface_name_to_long
 from switches.connect.constants import (
     IF_TYPE_ETHERNET,
+    POE_PORT_ADMIN_ENABLED,
     LLDP_CAPABILITIES_REPEATER,
     LLDP_CAPABILITIES_BRIDGE,
     LLDP_CAPABILITIES_ROUTER,
@@ -51,6 +67,53 @@ Basic Napalm connector. This allows us to handle any device supported by
 the Napalm Library, at least in read-only mode.
 """
 
+# seconds to wait for a session to the device, if all are in use:
+SESSION_WAIT_TIMEOUT = 15
+
+
+def _session_is_alive(device) -> bool:
+    try:
+        return device.is_alive().get('is_alive', False)
+    except NotImplementedError:
+        # not all drivers can check this, assume it works:
+        return True
+
+
+def _close_handle(device):
+    device.close()
+
+
+# Driver sessions are kept open between requests, and re-used for the next request to the same device.
+# Each getter that runs at the same time uses its own session, see NapalmConnector()._run_getters()
+_session_pool = SessionPool(
+    name="napalm",
+    max_per_key=settings.NAPALM_SESSION_MAX_PER_DEVICE,
+    idle_timeout=settings.NAPALM_SESSION_IDLE_TIMEOUT,
+    wait_timeout=SESSION_WAIT_TIMEOUT,
+    is_alive=_session_is_alive,
+    close_handle=_close_handle,
+)
+
+
+class GetterCall:
+    """
+    A Napalm getter to run, and its result.
+    """
+
+    def __init__(self, getter: str, **kwargs):
+        self.getter = getter  # the driver method, e.g. 'get_facts'
+        self.kwargs = kwargs
+        self.future = None
+        self.started = 0  # time.monotonic() when the getter was sent to the device
+        self.elapsed = 0
+        self.cached = False
+        self.cache_age = 0  # seconds since the cached result was read from the device
+        self.timed_out = False
+        self.open_failed = False  # True if no session to the device could be opened
+        self.result = None
+        self.error = None  # the Exception() raised by the getter, if any
+        self.details = ""  # the traceback of the error
+
 
 class NapalmConnector(Connector):
     """
@@ -65,13 +128,29 @@ class NapalmConnector(Connector):
         super().__init__(request, group, switch)
         self.description = 'Napalm library (R/O) driver'
         self.vendor_name = "Napalm Library"
-        # force READ-ONLY for now! We have not implemented changing settings.
-        self.read_only = True
 
         self.add_more_info('Connection', 'Type', f"Napalm Connector for '{self.switch.napalm_device_type}'")
-        self.napalm_device = False  # this will be the Napalm driver connection
+        self.napalm_driver = False  # this will be the Napalm driver class, sessions come from the session pool
         # and we dont want to cache this:
-        self.set_do_not_cache_attribute('napalm_device')
+        self.set_do_not_cache_attribute('napalm_driver')
+
+        # changes are made with the configuration templates of the driver, see commands.py
+        actions = get_driver_actions(self.switch.napalm_device_type)
+        if settings.NAPALM_ALLOW_CHANGES and actions:
+            self.description = 'Napalm library driver'
+            self.can_change_admin_status = ACTION_ENABLE_PORT in actions and ACTION_DISABLE_PORT in actions
+            self.can_change_poe_status = ACTION_ENABLE_POE in actions and ACTION_DISABLE_POE in actions
+            self.can_change_vlan = ACTION_SET_VLAN in actions
+            self.can_change_description = ACTION_SET_DESCRIPTION in actions
+            self.can_save_config = ACTION_SAVE_CONFIG in actions
+            # the changes of a bulk edit are merged and committed at once:
+            self.can_use_transaction = True
+        else:
+            # no templates, or not allowed: READ-ONLY!
+            self.read_only = True
+        # the actions gathered in transaction mode, see begin_transaction()
+        self.transaction_actions = []
+        self.set_do_not_cache_attribute('transaction_actions')
 
     def get_my_basic_info(self) -> bool:
         '''
@@ -80,17 +159,19 @@ class NapalmConnector(Connector):
         '''
         if not self._open_device():
             return False
+        # the getters are independent, so they run at the same time. Facts, vlans and IPs are cached.
+        calls = self._run_getters(
+            [
+                GetterCall('get_facts'),
+                GetterCall('get_interfaces'),
+                GetterCall('get_vlans'),
+                GetterCall('get_interfaces_ip'),
+            ]
+        )
         # get facts of device first, ie OS, model, etc.!
-        try:
-            facts = self.napalm_device.get_facts()
-        except Exception as e:
-            self.error.status = True
-            self.error.description = "Cannot get device facts"
-            self.error.details = f"Napalm Error: {repr(e)} ({str(type(e))})\n{traceback.format_exc()}"
-            dprint(f"   napalm.device.get_facts() Exception: {e.__class__.__name__}\n{self.error.details}\n")
-            self.add_warning(warning="Napalm error in get_facts() - Likely not implemented!")
-            self.add_log(type=LOG_TYPE_ERROR, action=LOG_NAPALM_ERROR_FACTS, description=f"ERROR: {self.error.details}")
+        if not self._check_getter(calls['get_facts'], "Cannot get device facts", LOG_NAPALM_ERROR_FACTS):
             return False
+        facts = calls['get_facts'].result
         dprint(f"facts = \n{facts}\n")
 
         self.hostname = facts['hostname']
@@ -98,21 +179,18 @@ class NapalmConnector(Connector):
         self.add_more_info('System', 'Vendor', facts['vendor'])
         self.add_more_info('System', 'OS', facts['os_version'])
         self.add_more_info('System', 'Model', facts['model'])
-        self.add_more_info('System', 'Uptime', uptime_to_string(int(facts['uptime'])))
+        # the facts may come from the getter cache, so add the time since they were read (-1 is unknown):
+        uptime = int(facts['uptime'])
+        if uptime >= 0:
+            uptime += int(calls['get_facts'].cache_age)
+        self.add_more_info('System', 'Uptime', uptime_to_string(uptime))
 
         # now load the interfaces:
-        try:
-            interface_list = self.napalm_device.get_interfaces()
-        except Exception as e:
-            self.error.status = True
-            self.error.description = "Cannot get interface list"
-            self.error.details = f"Napalm Error: {repr(e)} ({str(type(e))})\n{traceback.format_exc()}"
-            dprint(f"   napalm.device.get_interfaces() Exception: {e.__class__.__name__}\n{self.error.details}\n")
-            self.add_warning(warning="Napalm error in get_interfaces() - Likely not implemented!")
-            self.add_log(
-                type=LOG_TYPE_ERROR, action=LOG_NAPALM_ERROR_INTERFACES, description=f"ERROR: {self.error.details}"
-            )
+        if not self._check_getter(
+            calls['get_interfaces'], "Cannot get interface list", LOG_NAPALM_ERROR_INTERFACES
+        ):
             return False
+        interface_list = calls['get_interfaces'].result
         dprint(f"\nINTERFACES = \n{interface_list}\n")
         # parse
         for if_name, if_data in interface_list.items():
@@ -130,16 +208,9 @@ class NapalmConnector(Connector):
             self.add_interface(iface)
 
         # now load the vlan data:
-        try:
-            vlan_list = self.napalm_device.get_vlans()
-        except Exception as e:
-            self.error.status = True
-            self.error.description = "Cannot get vlan list"
-            self.error.details = f"Napalm Error: {repr(e)} ({str(type(e))})\n{traceback.format_exc()}"
-            dprint(f"   napalm.device.get_vlans() Exception: {e.__class__.__name__}\n{self.error.details}\n")
-            self.add_warning(warning="Napalm error in get_vlans() - Likely not implemented!")
-            self.add_log(type=LOG_TYPE_ERROR, action=LOG_NAPALM_ERROR_VLANS, description=f"ERROR: {self.error.details}")
+        if not self._check_getter(calls['get_vlans'], "Cannot get vlan list", LOG_NAPALM_ERROR_VLANS):
             return False
+        vlan_list = calls['get_vlans'].result
         # dprint(f"\nVLANS = \n{vlan_list}\n")
         # parse
         for vlan_id, vlan_data in vlan_list.items():
@@ -176,16 +247,9 @@ class NapalmConnector(Connector):
         """
 
         # now load the interface ipv4 data:
-        try:
-            ip_list = self.napalm_device.get_interfaces_ip()
-        except Exception as e:
-            self.error.status = True
-            self.error.description = "Cannot get interfaces ip list"
-            self.error.details = f"Napalm Error: {repr(e)} ({str(type(e))})\n{traceback.format_exc()}"
-            dprint(f"   napalm.device.get_interfaces_ip() Exception: {e.__class__.__name__}\n{self.error.details}\n")
-            self.add_warning(warning="Napalm error in get_interfaces_ip() - Likely not implemented!")
-            self.add_log(type=LOG_TYPE_ERROR, action=LOG_NAPALM_ERROR_IF_IP, description=f"ERROR: {self.error.details}")
+        if not self._check_getter(calls['get_interfaces_ip'], "Cannot get interfaces ip list", LOG_NAPALM_ERROR_IF_IP):
             return False
+        ip_list = calls['get_interfaces_ip'].result
         dprint(f"IPs = \n{ip_list}\n")
         # parse
         for if_name, if_data in ip_list.items():
@@ -212,19 +276,18 @@ class NapalmConnector(Connector):
         '''
         if not self._open_device():
             return False
+        # the mac, arp and lldp getters run at the same time, and are never cached.
+        calls = self._run_getters(
+            [
+                GetterCall('get_mac_address_table'),
+                GetterCall('get_arp_table', vrf=''),
+                GetterCall('get_lldp_neighbors_detail'),
+            ]
+        )
         # get mac address table
-        try:
-            mac_table = self.napalm_device.get_mac_address_table()
-        except Exception as e:
-            self.error.status = True
-            self.error.description = "Cannot get arp table"
-            self.error.details = f"Napalm Error: {repr(e)} ({str(type(e))})\n{traceback.format_exc()}"
-            dprint(
-                f"   napalm.device.get_mac_address_table() Exception: {e.__class__.__name__}\n{self.error.details}\n"
-            )
-            self.add_warning(warning="Napalm error in get_mac_address_table() - Likely not implemented!")
-            self.add_log(type=LOG_TYPE_ERROR, action=LOG_NAPALM_ERROR_MAC, description=f"ERROR: {self.error.details}")
+        if not self._check_getter(calls['get_mac_address_table'], "Cannot get mac table", LOG_NAPALM_ERROR_MAC):
             return False
+        mac_table = calls['get_mac_address_table'].result
         dprint(f"mac_table = \n{mac_table}\n")
         for info in mac_table:
             if_name = info['interface']
@@ -237,16 +300,9 @@ class NapalmConnector(Connector):
                     a.set_vlan(info['vlan'])
 
         # get arp table
-        try:
-            arp_table = self.napalm_device.get_arp_table(vrf='')
-        except Exception as e:
-            self.error.status = True
-            self.error.description = "Cannot get arp table"
-            self.error.details = f"Napalm Error: {repr(e)} ({str(type(e))})\n{traceback.format_exc()}"
-            dprint(f"   napalm.device.get_arp_table() Exception: {e.__class__.__name__}\n{self.error.details}\n")
-            self.add_warning(warning="Napalm error in get_arp_table() - Likely not implemented!")
-            self.add_log(type=LOG_TYPE_ERROR, action=LOG_NAPALM_ERROR_ARP, description=f"ERROR: {self.error.details}")
+        if not self._check_getter(calls['get_arp_table'], "Cannot get arp table", LOG_NAPALM_ERROR_ARP):
             return False
+        arp_table = calls['get_arp_table'].result
         dprint(f"arp_table = \n{arp_table}\n")
         for info in arp_table:
             if_name = info['interface']
@@ -259,18 +315,9 @@ class NapalmConnector(Connector):
                     a.set_ip4_address(info['ip'])
 
         # get lldp details
-        try:
-            lldp_details = self.napalm_device.get_lldp_neighbors_detail()
-        except Exception as e:
-            self.error.status = True
-            self.error.description = "Cannot get lldp details"
-            self.error.details = f"Napalm Error: {repr(e)} ({str(type(e))})\n{traceback.format_exc()}"
-            dprint(
-                f"   napalm.device.get_lldp_neighbors_detail() Exception: {e.__class__.__name__}\n{self.error.details}\n"
-            )
-            self.add_warning(warning="Napalm error in get_lldp_neighbors_detail() - Likely not implemented!")
-            self.add_log(type=LOG_TYPE_ERROR, action=LOG_NAPALM_ERROR_LLDP, description=f"ERROR: {self.error.details}")
+        if not self._check_getter(calls['get_lldp_neighbors_detail'], "Cannot get lldp details", LOG_NAPALM_ERROR_LLDP):
             return False
+        lldp_details = calls['get_lldp_neighbors_detail'].result
         dprint(f"lldp_details = \n{lldp_details}\n")
         # parse
         for if_name, lldp_data in lldp_details.items():
@@ -305,15 +352,350 @@ class NapalmConnector(Connector):
 
         return True
 
+    def set_interface_admin_status(self, interface: Interface, new_state: bool) -> bool:
+        '''
+        Set the interface to the requested state (up or down)
+
+        Args:
+            interface: the Interface() object for the requested port
+            new_state (boolean): new state, True = enabled, False = disabled
+
+        Returns:
+            (boolean) True on success, False on error and set self.error variables
+        '''
+        dprint(f"NapalmConnector.set_interface_admin_status() for {interface.name} to {bool(new_state)}")
+        action = ACTION_ENABLE_PORT if new_state else ACTION_DISABLE_PORT
+        if self.napalm_apply_actions(actions=[(action, {'interface': interface.name})]):
+            # now do the bookkeeping:
+            super().set_interface_admin_status(interface=interface, new_state=new_state)
+            return True
+        return False
+
+    def set_interface_poe_status(self, interface: Interface, new_state: int) -> bool:
+        '''
+        Set the interface Power-over-Ethernet status to the requested state (up or down)
+
+        Args:
+            interface = the Interface() object for the requested port
+            new_state (int): POE_PORT_ADMIN_ENABLED or POE_PORT_ADMIN_DISABLED
+
+        Returns:
+            (boolean) True on success, False on error and set self.error variables
+        '''
+        dprint(f"NapalmConnector.set_interface_poe_status() for {interface.name} to {new_state}")
+        action = ACTION_ENABLE_POE if new_state == POE_PORT_ADMIN_ENABLED else ACTION_DISABLE_POE
+        if self.napalm_apply_actions(actions=[(action, {'interface': interface.name})]):
+            # call the super class for bookkeeping.
+            super().set_interface_poe_status(interface, new_state)
+            return True
+        return False
+
+    def set_interface_untagged_vlan(self, interface: Interface, new_vlan_id: int) -> bool:
+        '''
+        Set the interface untagged vlan to the given vlan
+
+        Args:
+            interface: the Interface() object for the requested port
+            new_vlan_id(int): the requested untagged vlan
+
+        Returns:
+            (boolean) True on success, False on error and set self.error variables
+        '''
+        dprint(f"NapalmConnector.set_interface_untagged_vlan() for {interface.name} to vlan {new_vlan_id}")
+        if interface.is_tagged:
+            # Napalm does not read the native vlan of trunk ports, see get_my_basic_info()
+            self.error.status = True
+            self.error.description = "Changing the vlan of a tagged interface is not supported!"
+            return False
+        actions = [(ACTION_SET_VLAN, {'interface': interface.name, 'vlan_id': int(new_vlan_id)})]
+        if self.napalm_apply_actions(actions=actions):
+            # call the super class for bookkeeping.
+            super().set_interface_untagged_vlan(interface=interface, new_vlan_id=new_vlan_id)
+            return True
+        return False
+
+    def set_interface_description(self, interface: Interface, description: str) -> bool:
+        '''
+        Set the interface description (aka. description) to the string
+
+        Args:
+            interface: the Interface() object for the requested port
+            new_description: a string with the requested text
+
+        Returns:
+            (boolean) True on success, False on error and set self.error variables
+        '''
+        dprint(f"NapalmConnector.set_interface_description() for {interface.name} to '{description}'")
+        actions = [(ACTION_SET_DESCRIPTION, {'interface': interface.name, 'description': description})]
+        if self.napalm_apply_actions(actions=actions):
+            # call the super class for bookkeeping.
+            super().set_interface_description(interface=interface, description=description)
+            return True
+        return False
+
+    def save_running_config(self) -> bool:
+        '''
+        Execute the 'save config' command of the driver templates.
+
+        Returns:
+            True if this succeeds, False on failure. self.error() will be set in that case
+        '''
+        dprint("NapalmConnector.save_running_config()")
+        if not self._open_device():
+            return False
+        try:
+            command = render_action(self.switch.napalm_device_type, ACTION_SAVE_CONFIG)
+            session = _session_pool.borrow(key=self._get_session_key(), connect=self._connect)
+        except Exception as error:
+            self.error.status = True
+            self.error.description = "Cannot get Napalm connection"
+            self.error.details = f"Napalm Error: {repr(error)} ({str(type(error))})"
+            return False
+        try:
+            output = session.handle.cli([command])
+            dprint(f"  save output: {output}")
+        except Exception as error:
+            _session_pool.release(session, healthy=False)
+            self.error.status = True
+            self.error.description = "Error saving configuration!"
+            self.error.details = f"Napalm Error: {repr(error)} ({str(type(error))})\n{traceback.format_exc()}"
+            return False
+        _session_pool.release(session)
+        self.set_save_needed(False)
+        return True
+
+    def begin_transaction(self) -> bool:
+        '''
+        Start gathering the actions of all changes, to merge and commit them as one configuration.
+        A configuration merge opens a new config session on the device, so this is much faster for a bulk edit.
+
+        Returns:
+            True if changes are now gathered, False if changes are applied immediately.
+        '''
+        dprint("NapalmConnector.begin_transaction()")
+        if not self.can_use_transaction:
+            return False
+        self.transaction_active = True
+        self.transaction_actions = []
+        return True
+
+    def commit_transaction(self, comment: str = "") -> bool:
+        '''
+        Render all gathered actions into one configuration, and merge and commit it once.
+        On failure, the candidate configuration is discarded, and none of the changes are applied.
+
+        Args:
+            comment(str): the commit comment. Not all Napalm drivers support this, so it is not used.
+
+        Returns:
+            (boolean) True on success, False on error and set self.error variables
+        '''
+        dprint("NapalmConnector.commit_transaction()")
+        if not self.transaction_active:
+            return True
+        self.transaction_active = False
+        actions = self.transaction_actions
+        self.transaction_actions = []
+        if not actions:
+            return True
+        return self.napalm_apply_actions(actions=actions)
+
+    def abort_transaction(self):
+        '''
+        Drop the gathered actions without applying them.
+        '''
+        dprint("NapalmConnector.abort_transaction()")
+        self.transaction_active = False
+        self.transaction_actions = []
+
+    def napalm_apply_actions(self, actions: list) -> bool:
+        '''
+        Render the configuration for a list of actions, and merge and commit it on the device.
+        In transaction mode, the actions are gathered, and applied in commit_transaction().
+
+        Args:
+            actions (list): of tuples (action, values), see commands.render_actions()
+
+        Returns:
+            (boolean) True on success, False on error and set self.error variables
+        '''
+        dprint(f"NapalmConnector.napalm_apply_actions(): {actions}")
+        if self.transaction_active:
+            dprint("  transaction active, actions will be committed later.")
+            self.transaction_actions.extend(actions)
+            return True
+        if not self._open_device():
+            return False
+        try:
+            config = render_actions(self.switch.napalm_device_type, actions)
+        except Exception as error:
+            self.error.status = True
+            self.error.description = "Error creating configuration, change was NOT applied!"
+            self.error.details = f"Template Error: {repr(error)}, actions '{actions}'"
+            return False
+        try:
+            session = _session_pool.borrow(key=self._get_session_key(), connect=self._connect)
+        except Exception as error:
+            self.error.status = True
+            self.error.description = "Cannot get Napalm connection, change was NOT applied!"
+            self.error.details = f"Napalm Error: {repr(error)} ({str(type(error))})"
+            return False
+        device = session.handle
+        try:
+            device.load_merge_candidate(config=config)
+            diff = device.compare_config()
+            dprint(f"Config Diff: {diff}")
+            if diff:
+                device.commit_config()
+            else:
+                device.discard_config()
+        except Exception as error:
+            dprint(f"Error: {type(error).__name__}")
+            self.error.status = True
+            self.error.description = "Error applying configuration, change was NOT applied!"
+            self.error.details = f"Napalm Error: {repr(error)}, configuration '{config}'"
+            # do not leave partial changes in the candidate configuration:
+            try:
+                device.discard_config()
+            except Exception as err:
+                dprint(f"  discard_config() after error failed: {err}")
+            _session_pool.release(session, healthy=False)
+            return False
+        _session_pool.release(session)
+        # the cached vlan and ip data may have changed:
+        getter_cache.clear(switch_id=self.switch.id)
+        if self.can_save_config:
+            self.set_save_needed(True)
+        return True
+
+    def _run_getters(self, calls: list) -> dict:
+        '''
+        Run Napalm getters, at the same time where the device allows it. Each running getter uses
+        its own driver session from the session pool. A getter that does not finish in
+        settings.NAPALM_GETTER_TIMEOUT seconds is abandoned, and its session is closed.
+        Results of the slow-changing getters come from the getter cache, see switches/connect/napalm/cache.py
+
+        Args:
+            calls (list): of GetterCall() objects.
+
+        Returns:
+            (dict): the GetterCall() objects, keyed by getter name, with result or error set.
+        '''
+        to_run = []
+        for call in calls:
+            (call.result, call.cache_age) = getter_cache.get_result(self.switch.id, call.getter)
+            if call.result is not None:
+                dprint(f"  {call.getter}() from cache")
+                call.cached = True
+                self.add_timing(f"{call.getter}() (cached)", len(call.result), 0)
+            else:
+                to_run.append(call)
+
+        if to_run:
+            if self.switch.napalm_device_type in settings.NAPALM_SINGLE_SESSION_DRIVERS:
+                max_workers = 1
+            else:
+                max_workers = min(settings.NAPALM_MAX_CONCURRENT_GETTERS, settings.NAPALM_SESSION_MAX_PER_DEVICE)
+            executor = ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix="openl2m-napalm")
+            for call in to_run:
+                call.future = executor.submit(self._call_getter, call)
+            timeout = settings.NAPALM_GETTER_TIMEOUT
+            # worst case, all getters run one after another:
+            deadline = time.monotonic() + timeout * len(to_run)
+            for call in to_run:
+                while not call.future.done():
+                    now = time.monotonic()
+                    limit = min(call.started + timeout, deadline) if call.started else deadline
+                    if now >= limit:
+                        dprint(f"  {call.getter}() timed out!")
+                        call.timed_out = True
+                        call.future.cancel()
+                        call.error = TimeoutError(f"{call.getter}() did not finish in {timeout} seconds")
+                        break
+                    # a queued getter has not started yet, so check again shortly:
+                    wait([call.future], timeout=min(limit - now, 1))
+            # do not wait for abandoned getters, they release their session when done:
+            executor.shutdown(wait=False, cancel_futures=True)
+            for call in to_run:
+                if call.timed_out or call.error:
+                    continue
+                getter_cache.set_result(self.switch.id, call.getter, call.result)
+                self.add_timing(f"{call.getter}()", len(call.result), call.elapsed)
+
+        return {call.getter: call for call in calls}
+
+    def _call_getter(self, call: GetterCall):
+        '''
+        Run a single getter on a session from the session pool. This runs in a worker thread,
+        so it only sets the GetterCall() attributes.
+        '''
+        try:
+            session = _session_pool.borrow(key=self._get_session_key(), connect=self._connect)
+        except Exception as error:
+            call.open_failed = True
+            call.error = error
+            call.details = traceback.format_exc()
+            return
+        healthy = True
+        call.started = time.monotonic()
+        try:
+            call.result = getattr(session.handle, call.getter)(**call.kwargs)
+        except NotImplementedError as error:
+            call.error = error
+            call.details = traceback.format_exc()
+        except Exception as error:
+            call.error = error
+            call.details = traceback.format_exc()
+            healthy = False
+        call.elapsed = time.monotonic() - call.started
+        # the session of an abandoned getter is in an unknown state:
+        _session_pool.release(session, healthy=healthy and not call.timed_out)
+
+    def _check_getter(self, call: GetterCall, description: str, log_action: int) -> bool:
+        '''
+        Check the getter ran, and if not, set self.error, and log the error.
+        Returns True if the getter result can be used.
+        '''
+        if call.result is not None and not call.error and not call.timed_out:
+            return True
+        e = call.error
+        self.error.status = True
+        if call.open_failed:
+            if isinstance(e, PoolExhausted):
+                self.error.description = "Device is busy!"
+            else:
+                self.error.description = "Cannot get Napalm connection"
+            self.error.details = f"Napalm Error: {repr(e)} ({str(type(e))})\n{call.details}"
+            dprint(f"   napalm.device.open() Exception: {e.__class__.__name__}\n{self.error.details}\n")
+            self.add_warning(warning="Napalm error in open()!")
+            self.add_log(type=LOG_TYPE_ERROR, action=LOG_NAPALM_ERROR_OPEN, description=f"ERROR: {self.error.details}")
+            return False
+        self.error.description = description
+        if call.timed_out:
+            self.error.details = f"Napalm Error: {str(e)}"
+            self.add_warning(warning=f"Napalm {call.getter}() timed out!")
+        else:
+            self.error.details = f"Napalm Error: {repr(e)} ({str(type(e))})\n{call.details}"
+            self.add_warning(warning=f"Napalm error in {call.getter}() - Likely not implemented!")
+        dprint(f"   napalm.device.{call.getter}() Exception: {e.__class__.__name__}\n{self.error.details}\n")
+        self.add_log(type=LOG_TYPE_ERROR, action=log_action, description=f"ERROR: {self.error.details}")
+        return False
+
     def _open_device(self) -> bool:
         '''
-        get a Napalm 'driver' and open connection to the device
+        get the Napalm 'driver' for the device. The connections to the device are opened
+        when the getters run, or borrowed from the session pool, see _run_getters()
         return True on success, False on failure, and will set self.error
         '''
-        # first, get the proper driver
-        driver = False
+        if self.napalm_driver:
+            return True
+        if not self.switch.netmiko_profile:
+            self.error.status = True
+            self.error.description = "Please configure a Credentials Profile to be able to connect to this device!"
+            dprint("  _open_device: No Credentials!")
+            return False
         try:
-            driver = get_network_driver(self.switch.napalm_device_type)
+            self.napalm_driver = get_network_driver(self.switch.napalm_device_type)
         except Exception as e:
             self.error.status = True
             self.error.description = "Cannot get Napalm network driver"
@@ -324,9 +706,26 @@ class NapalmConnector(Connector):
                 type=LOG_TYPE_ERROR, action=LOG_NAPALM_ERROR_DRIVER, description=f"ERROR: {self.error.details}"
             )
             return False
+        return True
+
+    def _get_session_key(self) -> tuple:
+        '''
+        The session pool key: sessions are only re-used for the same device, driver and credentials.
+        '''
+        profile = self.switch.netmiko_profile
+        return (
+            self.switch.id,
+            self.switch.primary_ip4,
+            self.switch.napalm_device_type,
+            profile.id,
+            hash((profile.username, profile.password, profile.tcp_port)),
+        )
 
-        # next open connection
-        self.napalm_device = driver(
+    def _connect(self):
+        '''
+        Open a new driver session to the device. Raises an exception on errors.
+        '''
+        device = self.napalm_driver(
             hostname=self.switch.primary_ip4,
             username=self.switch.netmiko_profile.username,
             password=self.switch.netmiko_profile.password,
@@ -334,15 +733,5 @@ class NapalmConnector(Connector):
                 "port": self.switch.netmiko_profile.tcp_port,
             },
         )
-        try:
-            self.napalm_device.open()
-        except Exception as e:
-            self.error.status = True
-            self.error.description = "Cannot get Napalm connection"
-            self.error.details = f"Napalm Error: {repr(e)} ({str(type(e))})\n{traceback.format_exc()}"
-            dprint(f"   napalm.device.open() Exception: {e.__class__.__name__}\n{self.error.details}\n")
-            self.add_warning(warning="Napalm error in open()!")
-            self.add_log(type=LOG_TYPE_ERROR, action=LOG_NAPALM_ERROR_OPEN, description=f"ERROR: {self.error.details}")
-            return False
-
-        return True
+        device.open()
+        return device
@@ -14,3 +14,15 @@
 """
 Napalm library related constants.
 """
+
+# the 'set' actions, i.e. the names of the configuration templates in templates/<napalm driver>/<action>.j2
+ACTION_ENABLE_PORT = "enable_port"
+ACTION_DISABLE_PORT = "disable_port"
+ACTION_ENABLE_POE = "enable_poe"
+ACTION_DISABLE_POE = "disable_poe"
+ACTION_SET_VLAN = "set_vlan"
+ACTION_SET_ACCESS_MODE = "set_access_mode"
+ACTION_SET_TRUNK_MODE = "set_trunk_mode"
+ACTION_SET_DESCRIPTION = "set_description"
+# this is a command, not configuration, and is not part of a configuration merge:
+ACTION_SAVE_CONFIG = "save_config"
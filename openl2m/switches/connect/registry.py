@@ -0,0 +1,422 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Registry of the device drivers, i.e. the Connector() classes.
+
+Drivers are imported the first time a device needs them, and not when a web server process starts.
+Some driver libraries (e.g. napalm, junos-eznc and pyaoscx) take seconds and a lot of memory to import,
+and every web server process would pay for this, even if no device uses them.
+Drivers listed in settings.DRIVERS_DISABLED are never imported.
+
+The time it takes to import each driver is kept, and shown in the 'Drivers' admin page.
+
+SNMP vendor drivers register the enterprise id(s) of the device sysObjectID they support,
+and optionally sysObjectID prefixes and/or a regex on the model (sysDescr), for drivers that only
+support some products of a vendor. The site-local modules in settings.DRIVERS_LOCAL are imported
+at the end of this file, and can register their own drivers, without changes to connect.py
+"""
+import importlib
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+from switches.constants import (
+    CONNECTOR_TYPE_SNMP,
+    CONNECTOR_TYPE_AOSCX,
+    CONNECTOR_TYPE_PYEZ,
+    CONNECTOR_TYPE_COMMANDS_ONLY,
+    CONNECTOR_TYPE_NAPALM,
+    CONNECTOR_TYPE_TESTDUMMY,
+)
+from switches.connect.snmp.cisco.constants import ENTERPRISE_ID_CISCO
+from switches.connect.snmp.comware.constants import ENTERPRISE_ID_H3C
+from switches.connect.snmp.juniper.constants import ENTERPRISE_ID_JUNIPER
+from switches.connect.snmp.procurve.constants import ENTERPRISE_ID_HP
+from switches.connect.snmp.arista_eos.constants import ENTERPRISE_ID_ARISTA
+from switches.connect.snmp.aruba_cx.constants import ENTERPRISE_ID_HP_ENTERPRISE
+from switches.connect.snmp.netgear.constants import ENTERPRISE_ID_NETGEAR
+from switches.connect.snmp.utils import SysObjectID
+from switches.utils import dprint, get_compiled_regex
+
+logger = logging.getLogger("openl2m.registry")
+
+# only one thread imports a driver at a time:
+_import_lock = threading.Lock()
+
+
+def _normalize_oid(oid: str) -> str:
+    """
+    Return the OID with a leading dot and without a trailing dot, as ezsnmp returns them.
+    """
+    return "." + oid.strip(".")
+
+
+class DriverDisabled(Exception):
+    """
+    The driver is listed in settings.DRIVERS_DISABLED
+    """
+
+    pass
+
+
+class Driver:
+    """
+    A device driver, and its import statistics.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        description: str,
+        connector_type: int = CONNECTOR_TYPE_SNMP,
+        enterprise_ids: list = None,
+        sysobjectid_prefixes: list = None,
+        model_regex: str = "",
+    ):
+        self.name = name  # as used in settings.DRIVERS_DISABLED, and stored in Switch().driver_name
+        self.path = path  # "module:ClassName"
+        self.description = description
+        self.connector_type = connector_type
+        # SNMP vendor drivers only, how to match the device:
+        self.enterprise_ids = list(enterprise_ids or [])
+        self.sysobjectid_prefixes = [_normalize_oid(prefix) for prefix in sysobjectid_prefixes or []]
+        self.model_regex = model_regex  # matched against the sysDescr
+        self.connector_class = None  # set when imported
+        self.import_time = 0.0  # seconds it took to import the driver module
+        self.modules_imported = 0  # the number of new modules that import loaded
+
+    @property
+    def module_name(self) -> str:
+        return self.path.split(":")[0]
+
+    @property
+    def enabled(self) -> bool:
+        return self.name not in settings.DRIVERS_DISABLED
+
+    @property
+    def loaded(self) -> bool:
+        return self.connector_class is not None
+
+    @property
+    def match_description(self) -> str:
+        """
+        Return how this SNMP vendor driver matches a device, as shown in the 'Drivers' admin page.
+        """
+        match = [f"enterprise {enterprise_id}" for enterprise_id in self.enterprise_ids]
+        match.extend(f"sysObjectID {prefix}.*" for prefix in self.sysobjectid_prefixes)
+        if self.model_regex:
+            match.append(f"model '{self.model_regex}'")
+        return ", ".join(match)
+
+    def matches_model(self, get_description) -> bool:
+        """
+        Return True if this driver has no model regex, or the device sysDescr matches it.
+        get_description() is only called if needed, as it reads the device.
+        """
+        if not self.model_regex:
+            return True
+        return bool(get_compiled_regex(self.model_regex).search(get_description()))
+
+    def load(self):
+        """
+        Return the Connector() class of this driver, and import it if needed.
+        Raises DriverDisabled if the driver is disabled in the configuration.
+        """
+        if self.connector_class:
+            return self.connector_class
+        if not self.enabled:
+            raise DriverDisabled(f"The '{self.name}' driver is disabled in the configuration!")
+        with _import_lock:
+            if not self.connector_class:
+                (module_name, class_name) = self.path.split(":")
+                modules_before = len(sys.modules)
+                start = time.perf_counter()
+                module = importlib.import_module(module_name)
+                self.import_time = time.perf_counter() - start
+                self.modules_imported = len(sys.modules) - modules_before
+                self.connector_class = getattr(module, class_name)
+                dprint(f"Driver '{self.name}' imported in {self.import_time:.3f} seconds")
+                logger.info(
+                    f"driver '{self.name}' imported in {self.import_time:.3f} seconds, "
+                    f"{self.modules_imported} modules (pid {os.getpid()})"
+                )
+        return self.connector_class
+
+
+# the drivers by Switch().connector_type
+_connectors = {}
+# the SNMP vendor drivers, by the enterprise id in the device sysObjectID.
+# Each entry is a list, the most recently registered driver first.
+_snmp_vendors = {}
+# the SNMP vendor drivers, by sysObjectID prefix, e.g. ".1.3.6.1.4.1.9.1"
+_snmp_prefixes = {}
+
+
+def register_connector(connector_type: int, name: str, path: str, description: str):
+    """
+    Register the driver for a device connector type.
+    """
+    _connectors[connector_type] = Driver(name=name, path=path, description=description, connector_type=connector_type)
+
+
+def register_snmp_vendor(
+    name: str,
+    path: str,
+    description: str,
+    enterprise_ids: list = None,
+    sysobjectid_prefixes: list = None,
+    model_regex: str = "",
+) -> Driver:
+    """
+    Register an SNMP vendor driver. The Connector() class should be a subclass of SnmpConnector().
+
+    Params:
+        name (str): the unique driver name, e.g. "snmp_cisco".
+        path (str): the "module:ClassName" of the Connector() class. It is imported when first needed.
+        description (str): shown in the 'Drivers' admin page.
+        enterprise_ids (list): the enterprise id(s) in the sysObjectID of the devices supported.
+        sysobjectid_prefixes (list): the sysObjectID prefixes of the devices supported, for drivers that
+                                     support only some products of a vendor.
+        model_regex (str): if set, the device sysDescr has to match this regex as well.
+
+    A driver registered later is tried first, so a site-local driver can replace a builtin driver.
+    A match on sysObjectID prefix is preferred over a match on enterprise id only.
+
+    Returns:
+        (Driver): the registered driver.
+    """
+    if not enterprise_ids and not sysobjectid_prefixes:
+        raise ValueError(f"SNMP vendor driver '{name}' needs enterprise_ids or sysobjectid_prefixes!")
+    # re-registering a driver name replaces it:
+    _unregister_snmp_vendor(name)
+    driver = Driver(
+        name=name,
+        path=path,
+        description=description,
+        enterprise_ids=enterprise_ids,
+        sysobjectid_prefixes=sysobjectid_prefixes,
+        model_regex=model_regex,
+    )
+    for enterprise_id in driver.enterprise_ids:
+        _snmp_vendors.setdefault(enterprise_id, []).insert(0, driver)
+    for prefix in driver.sysobjectid_prefixes:
+        _snmp_prefixes.setdefault(prefix, []).insert(0, driver)
+    return driver
+
+
+def _unregister_snmp_vendor(name: str):
+    for table in (_snmp_vendors, _snmp_prefixes):
+        for key, drivers in list(table.items()):
+            drivers[:] = [driver for driver in drivers if driver.name != name]
+            if not drivers:
+                del table[key]
+
+
+def get_connector_driver(connector_type: int) -> Driver:
+    """
+    Return the Driver() for a connector type. Raises an Exception if the type is unknown.
+    Driver().load() returns the Connector() class, and raises DriverDisabled if it is disabled.
+    """
+    if connector_type not in _connectors:
+        raise Exception("Invalid connector type configured on switch!")
+    return _connectors[connector_type]
+
+
+def get_snmp_vendor_driver(sys_object_id: SysObjectID, get_description=None) -> Driver:
+    """
+    Find the SNMP vendor driver for a device. The longest matching sysObjectID prefix is tried first,
+    then the drivers for the enterprise id. Each is a dictionary lookup.
+
+    Params:
+        sys_object_id (SysObjectID): the parsed sysObjectID of the device.
+        get_description (function): returns the device sysDescr, only called if a driver has a model regex.
+
+    Returns:
+        (Driver): the driver, or None if this vendor has no driver, or the drivers are disabled.
+    """
+    candidates = []
+    if _snmp_prefixes:
+        parts = sys_object_id.oid.strip(".").split(".")
+        for length in range(len(parts), 0, -1):
+            candidates.extend(_snmp_prefixes.get("." + ".".join(parts[:length]), []))
+    candidates.extend(_snmp_vendors.get(sys_object_id.enterprise_id, []))
+    description = None
+
+    def _get_description() -> str:
+        # read the sysDescr once, and only if needed
+        nonlocal description
+        if description is None:
+            description = get_description() if get_description else ""
+        return description
+
+    for driver in candidates:
+        if driver.enabled and driver.matches_model(_get_description):
+            dprint(f"SNMP vendor driver '{driver.name}' found for {sys_object_id}")
+            return driver
+    return None
+
+
+def get_drivers() -> list:
+    """
+    Return all registered Driver() objects.
+    """
+    drivers = list(_connectors.values())
+    for table in (_snmp_prefixes, _snmp_vendors):
+        for vendor_drivers in table.values():
+            drivers.extend(driver for driver in vendor_drivers if driver not in drivers)
+    return drivers
+
+
+def get_driver(name: str) -> Driver:
+    """
+    Return the Driver() with this name, or None.
+    """
+    return next((driver for driver in get_drivers() if driver.name == name), None)
+
+
+def get_importtime_report(driver: Driver, top: int = 20) -> dict:
+    """
+    Measure the import of a driver in a new Python process, with 'python -X importtime'.
+    The modules Django already loaded are not counted.
+
+    Params:
+        driver (Driver): the driver to measure.
+        top (int): the number of packages to return.
+
+    Returns:
+        (dict): with 'total' seconds, the number of 'modules', the 'packages' as a list of
+                (package, seconds) tuples, slowest first, and the 'error' string if this failed.
+    """
+    marker = "openl2m-importtime-start"
+    code = (
+        "import sys, django; django.setup(); "
+        f"sys.stderr.write('{marker}\\n'); sys.stderr.flush(); "
+        f"import {driver.module_name}"
+    )
+    env = os.environ.copy()
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'openl2m.settings')
+    report = {'total': 0.0, 'modules': 0, 'packages': [], 'error': ""}
+    try:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            timeout=120,
+            cwd=settings.BASE_DIR,
+            env=env,
+        )
+    except Exception as err:
+        report['error'] = f"Cannot run the import: {err}"
+        return report
+    (_, found, output) = result.stderr.partition(marker)
+    if not found or result.returncode:
+        report['error'] = f"Import failed: {result.stderr[-2000:]}"
+        return report
+    # each line is "import time: self [us] | cumulative | imported package", children are indented:
+    packages = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        self_time = int(parts[0]) / 1000000
+        package = parts[2].strip().split(".")[0]
+        packages[package] = packages.get(package, 0.0) + self_time
+        report['total'] += self_time
+        report['modules'] += 1
+    report['packages'] = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return report
+
+
+# the device drivers:
+register_connector(CONNECTOR_TYPE_SNMP, "snmp", "switches.connect.snmp.connector:SnmpConnector", "SNMP (generic)")
+register_connector(
+    CONNECTOR_TYPE_AOSCX, "aoscx", "switches.connect.aruba_aoscx.connector:AosCxConnector", "Aruba AOS-CX REST API"
+)
+register_connector(CONNECTOR_TYPE_PYEZ, "pyez", "switches.connect.junos_pyez.connector:PyEZConnector", "Junos PyEZ")
+register_connector(
+    CONNECTOR_TYPE_COMMANDS_ONLY,
+    "commands_only",
+    "switches.connect.commands_only.connector:CommandsOnlyConnector",
+    "Commands Only (SSH)",
+)
+register_connector(CONNECTOR_TYPE_NAPALM, "napalm", "switches.connect.napalm.connector:NapalmConnector", "Napalm")
+register_connector(
+    CONNECTOR_TYPE_TESTDUMMY, "testdummy", "switches.connect.dummy.connector:DummyConnector", "Test Dummy"
+)
+
+# the SNMP vendor drivers:
+register_snmp_vendor(
+    "snmp_cisco",
+    "switches.connect.snmp.cisco.connector:SnmpConnectorCisco",
+    "SNMP Cisco",
+    enterprise_ids=[ENTERPRISE_ID_CISCO],
+)
+register_snmp_vendor(
+    "snmp_juniper",
+    "switches.connect.snmp.juniper.connector:SnmpConnectorJuniper",
+    "SNMP Juniper",
+    enterprise_ids=[ENTERPRISE_ID_JUNIPER],
+)
+register_snmp_vendor(
+    "snmp_procurve",
+    "switches.connect.snmp.procurve.connector:SnmpConnectorProcurve",
+    "SNMP HP/Aruba ProCurve",
+    enterprise_ids=[ENTERPRISE_ID_HP],
+)
+register_snmp_vendor(
+    "snmp_comware",
+    "switches.connect.snmp.comware.connector:SnmpConnectorComware",
+    "SNMP HPE/H3C Comware",
+    enterprise_ids=[ENTERPRISE_ID_H3C],
+)
+register_snmp_vendor(
+    "snmp_aruba_cx",
+    "switches.connect.snmp.aruba_cx.connector:SnmpConnectorArubaCx",
+    "SNMP Aruba AOS-CX",
+    enterprise_ids=[ENTERPRISE_ID_HP_ENTERPRISE],
+)
+register_snmp_vendor(
+    "snmp_arista_eos",
+    "switches.connect.snmp.arista_eos.connector:SnmpConnectorAristaEOS",
+    "SNMP Arista EOS",
+    enterprise_ids=[ENTERPRISE_ID_ARISTA],
+)
+register_snmp_vendor(
+    "snmp_netgear",
+    "switches.connect.snmp.netgear.connector:SnmpConnectorNetgear",
+    "SNMP Netgear",
+    enterprise_ids=[ENTERPRISE_ID_NETGEAR],
+)
+# Dell is yet to be tested!
+# register_snmp_vendor(
+#     "snmp_dell",
+#     "switches.connect.snmp.dell.connector:SnmpConnectorDell",
+#     "SNMP Dell",
+#     enterprise_ids=[ENTERPRISE_ID_DELL],
+# )
+
+# the site-local drivers, registered after the builtin drivers so they are tried first:
+for _module_name in settings.DRIVERS_LOCAL:
+    try:
+        importlib.import_module(_module_name)
+    except Exception as err:
+        logger.error(f"Cannot import the local driver module '{_module_name}': {err}")
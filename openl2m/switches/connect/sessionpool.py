@@ -0,0 +1,205 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+A pool of logged-in device sessions, per web server process, e.g. SSH or REST API sessions.
+
+Logging in to a device can take several seconds, and devices limit the number of sessions.
+Instead of logging out after a request, a driver returns its session to the pool, and the next request
+to the same device, with the same credentials, re-uses it.
+
+Sessions are checked before they are re-used, and closed after being idle for too long.
+There are at most 'max_per_key' sessions per device at the same time.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from switches import flusher
+from switches.utils import dprint
+
+logger = logging.getLogger("openl2m.sessionpool")
+
+
+class PoolExhausted(Exception):
+    """
+    All sessions to a device are in use, and none was returned in time.
+    """
+
+    pass
+
+
+class PooledSession:
+    """
+    A device session, and what we know about it.
+    """
+
+    def __init__(self, pool, key: tuple, handle):
+        self.pool = pool
+        self.key = key
+        self.handle = handle  # the driver session object, e.g. as returned by netmiko.ConnectHandler()
+        # the driver can use this to remember the session was set up, e.g. paging was disabled:
+        self.prepared = False
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.in_use = True
+
+    def close(self):
+        try:
+            self.pool.close_handle(self.handle)
+        except Exception as err:
+            dprint(f"PooledSession.close(): error closing session: {err}")
+
+
+class SessionPool:
+    """
+    A pool of device sessions, keyed by a tuple that identifies the device and credentials.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_per_key: int,
+        idle_timeout: int,
+        wait_timeout: int,
+        is_alive=None,
+        close_handle=None,
+    ):
+        """
+        Params:
+            name (str): the name used in logging.
+            max_per_key (int): the maximum number of sessions per key.
+            idle_timeout (int): idle sessions are closed after this many seconds. 0 disables pooling.
+            wait_timeout (int): the seconds to wait for a session to be returned, if all are in use.
+            is_alive: function(handle) that returns True if the session still works. Default is always True.
+            close_handle: function(handle) that logs out and closes the session.
+        """
+        self.name = name
+        self.max_per_key = max_per_key
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.is_alive = is_alive
+        self.close_handle = close_handle
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._sessions = {}  # lists of PooledSession(), keyed by session key
+        self._pid = None
+        if idle_timeout:
+            flusher.register(self.close_idle, interval=max(idle_timeout // 2, 5), at_exit=False)
+            atexit.register(self.close_idle, all_sessions=True)
+
+    def _check_process(self):
+        """
+        Sessions are not shared with child processes of pre-forking web servers,
+        forget sessions opened in the parent. Call with the lock held.
+        """
+        if self._pid != os.getpid():
+            self._sessions.clear()
+            self._pid = os.getpid()
+
+    def borrow(self, key: tuple, connect) -> PooledSession:
+        """
+        Get an idle, working, session from the pool, or a new session if none is available.
+        If the device already has the maximum number of sessions, wait for one to be returned.
+
+        Params:
+            key (tuple): the session key, identifies the device and the credentials.
+            connect: function that returns a new, logged in, session. Exceptions are passed on to the caller.
+
+        Returns:
+            (PooledSession): the session, marked as in use. Call release() when done!
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        with self._lock:
+            self._check_process()
+            while True:
+                sessions = self._sessions.setdefault(key, [])
+                session = next((session for session in sessions if not session.in_use), None)
+                if session:
+                    session.in_use = True
+                    # check the session outside the lock, it may talk to the device:
+                    break
+                if len(sessions) < self.max_per_key:
+                    # reserve a place for the new session:
+                    session = PooledSession(pool=self, key=key, handle=None)
+                    sessions.append(session)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhausted(f"All {len(sessions)} sessions to this device are in use, please try again!")
+                self._available.wait(timeout=remaining)
+
+        if session.handle:
+            try:
+                if self.is_alive is None or self.is_alive(session.handle):
+                    dprint(f"{self.name}.borrow(): re-using session")
+                    return session
+            except Exception as err:
+                dprint(f"{self.name}.borrow(): session check failed: {err}")
+            logger.info(f"{self.name}: session to {key[1]} is no longer alive, reconnecting")
+            session.close()
+            session.prepared = False
+        try:
+            session.handle = connect()
+            session.created = time.monotonic()
+        except Exception:
+            self._remove(session)
+            raise
+        return session
+
+    def release(self, session: PooledSession, healthy: bool = True):
+        """
+        Return a session to the pool. If it is not healthy, e.g. after a time-out, it is closed.
+        """
+        if not healthy or not self.idle_timeout:
+            session.close()
+            self._remove(session)
+            return
+        with self._lock:
+            session.in_use = False
+            session.last_used = time.monotonic()
+            self._available.notify_all()
+        # the background thread closes idle sessions:
+        flusher.start()
+
+    def _remove(self, session: PooledSession):
+        with self._lock:
+            sessions = self._sessions.get(session.key, [])
+            if session in sessions:
+                sessions.remove(session)
+            if not sessions:
+                self._sessions.pop(session.key, None)
+            self._available.notify_all()
+
+    def close_idle(self, all_sessions: bool = False):
+        """
+        Close the sessions that are idle for more than 'idle_timeout' seconds, or all idle sessions.
+        This is called periodically from the background thread, see switches/flusher.py
+        """
+        expired = []
+        now = time.monotonic()
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            for sessions in self._sessions.values():
+                for session in sessions:
+                    if not session.in_use and (all_sessions or now - session.last_used > self.idle_timeout):
+                        # mark as in use, so it is not borrowed while we close it:
+                        session.in_use = True
+                        expired.append(session)
+        for session in expired:
+            dprint(f"{self.name}.close_idle(): closing session to {session.key[1]}")
+            session.close()
+            self._remove(session)
@@ -78,6 +78,7 @@ from switches.constants import (
     SNMP_V3_PRIV_AES256C,
     SNMP_V3_SECURITY_AUTH_PRIV,
 )
+from switches import hostindex
 from switches.models import Log, Switch, SwitchGroup
 from switches.utils import dprint, get_remote_ip
 
@@ -119,7 +120,12 @@ from switches.connect.classes import (
 
 # from switches.connect.connect import *
 from switches.connect.connector import Connector
-from switches.connect.snmp.utils import decimal_to_hex_string_ethernet, bytes_ethernet_to_string, get_ip_from_oid_index
+from switches.connect.snmp.utils import (
+    decimal_to_hex_string_ethernet,
+    bytes_ethernet_to_string,
+    get_ip_from_oid_index,
+    SysObjectID,
+)
 from switches.connect.snmp.constants import (
     snmp_mib_variables,
     ifIndex,
@@ -188,8 +194,6 @@ from switches.connect.snmp.constants import (
     lldpRemManAddrIfSubtype,
     LLDP_REM_MAN_ADDR_TYPE_IFINDEX,
     LLDP_REM_MAN_ADDR_TYPE_SYSTEMPORTNUMBER,
-    enterprises,
-    enterprise_id_info,
     IF_ADMIN_STATUS_UP,
     IF_OPER_STATUS_UP,
     IF_OPER_STATUS_DOWN,
@@ -559,6 +563,7 @@ class SnmpConnector(Connector):
 
         # SNMP specific attributes:
         self.object_id = ""  # SNMP system OID value, used to find type of switch
+        self.sys_object_id = SysObjectID()  # the parsed object_id, set by get_connection_object()
         self.sys_uptime = 0  # sysUptime is a tick count in 1/100th of seconds per tick, since boot
         self.sys_uptime_timestamp = 0  # timestamp when sysUptime was read.
         self.qbridge_port_to_if_index: Dict[int, str] = (
@@ -856,6 +861,10 @@ class SnmpConnector(Connector):
             )
             return -1
 
+        if self.deadline_passed():
+            dprint(f"+++> DEADLINE PASSED, skipping {branch_name}")
+            return -1
+
         start_oid = snmp_mib_variables[branch_name]
         # Perform an SNMP walk
         self.error.clear()
@@ -1004,8 +1013,9 @@ class SnmpConnector(Connector):
             # read LLDP as well
             self._get_lldp_data()
             # and the arp tables (after we found ethernet address, so we can update with IP)
-            self._get_arp_data()
-            self.switch.save()  # update counters
+            # unless we have the ARP tables of the group 'ARP sources', see Connector()._load_arp_cache()
+            if not self.arp_cache:
+                self._get_arp_data()
             return True
         return False
 
@@ -1348,7 +1358,6 @@ class SnmpConnector(Connector):
                 self.add_warning(warning)
                 # log this as well
                 log = Log(
-                    user=self.request.user,
                     group=self.group,
                     switch=self.switch,
                     ip_address=get_remote_ip(self.request),
@@ -2625,6 +2634,9 @@ class SnmpConnector(Connector):
             return True
         if oid == sysObjectID:
             self.object_id = value
+            # the probe already parsed this, see get_connection_object():
+            if self.sys_object_id.oid != value:
+                self.sys_object_id = SysObjectID(value)
             self.add_more_info('System', 'Object ID', value)
             return True
         if oid == sysDescr:
@@ -2663,7 +2675,7 @@ class SnmpConnector(Connector):
         else:
             snmp_profile_name = "NOT SET!"
         self.add_more_info('System', 'Snmp Profile', snmp_profile_name)
-        self.add_more_info('System', 'Vendor ID', get_switch_enterprise_info(self.object_id))
+        self.add_more_info('System', 'Vendor ID', self.sys_object_id.vendor_name)
         # first time when data was read:
         self.add_more_info(
             'System', 'Read Time', time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.sys_uptime_timestamp))
@@ -2673,7 +2685,8 @@ class SnmpConnector(Connector):
         if self.hostname:
             if self.switch.hostname != self.hostname:
                 self.switch.hostname = self.hostname
-                self.switch.save()
+                # only save the hostname, the counters are updated by Switch().update_access() etc.
+                self.switch.save(update_fields=['hostname'])
                 self.add_log(
                     type=LOG_TYPE_WARNING, action=LOG_NEW_HOSTNAME_FOUND, description="New System Hostname found"
                 )
@@ -3003,6 +3016,51 @@ class SnmpConnector(Connector):
             return False
         return True
 
+    def get_my_arp_table(self) -> dict:
+        """
+        Read only the arp tables, for use as an 'ARP source' of a group.
+        This does not need the interfaces, so get_basic_info() is not called.
+
+        Returns:
+            (dict): the IPv4 addresses, keyed by ethernet key, see hostindex.ethernet_to_key()
+        """
+        self.arp_table = {}
+        if self.get_snmp_branch(branch_name='ipNetToMediaPhysAddress', parser=self._parse_arp_table) < 0:
+            self.add_warning("Error getting 'ARP-Table' (ipNetToMediaPhysAddress)")
+        if self.get_snmp_branch(branch_name='ipNetToPhysicalPhysAddress', parser=self._parse_arp_table) < 0:
+            self.add_warning("Error getting 'new ARP-Table' (ipNetToPhysicalPhysAddress)")
+        table = self.arp_table
+        del self.arp_table
+        return table
+
+    def _parse_arp_table(self, oid: str, val: str) -> bool:
+        """
+        Parse a single OID from the ipNetToMedia or ipNetToPhysical tables into self.arp_table,
+        see get_my_arp_table()
+
+        Params:
+            oid (str): the SNMP OID to parse
+            val (str): the value of the SNMP OID we are parsing
+
+        Returns:
+            (boolean): True if we parse the OID, False if not.
+        """
+        # ipNetToMediaPhysAddress.<if-index>.<ip address in dotted format> = "mac address"
+        if_ip_string = oid_in_branch(ipNetToMediaPhysAddress, oid)
+        if if_ip_string:
+            ip = if_ip_string.split('.', 1)[1]
+            self.arp_table[hostindex.ethernet_to_key(bytes_ethernet_to_string(val))] = ip
+            return True
+        # ipNetToPhysicalPhysAddress.<if-index>.<address-type>.<length>.<ip address in dotted format> = "mac address"
+        if_ip_string = oid_in_branch(ipNetToPhysicalPhysAddress, oid)
+        if if_ip_string:
+            parts = if_ip_string.split('.', 2)
+            if int(parts[1]) == IANA_TYPE_IPV4:
+                ip = get_ip_from_oid_index(index=parts[2], addr_type=IANA_TYPE_IPV4)
+                self.arp_table[hostindex.ethernet_to_key(bytes_ethernet_to_string(val))] = ip
+            return True
+        return False
+
     def _get_lldp_data(self) -> bool:
         """
         Read parts of the LLDP mib for neighbors on interfaces
@@ -3597,6 +3655,18 @@ class SnmpProbeConnector(SnmpConnector):
         dprint(f"  System OID={retval.value}")
         return retval.value
 
+    def get_system_description(self) -> str:
+        """Read the SNMP System Description, if a vendor driver needs the model to match.
+
+        Return:
+            (str): the sysDescr value, or "" if this cannot be read.
+        """
+        dprint("get_system_description()")
+        (error_status, retval) = self.get(oid=sysDescr, parser=self._parse_mibs_system)
+        if error_status:
+            return ""
+        return str(retval.value)
+
 
 # --- End of SnmpProbeConnector() --
 
@@ -3623,15 +3693,4 @@ def get_switch_enterprise_info(system_oid: str) -> str:
     """
     Return the Enterprise name from the Object ID given
     """
-    sub_oid = oid_in_branch(enterprises, system_oid)
-    if sub_oid:
-        parts = sub_oid.split('.', 1)  # 1 means one split, two elements!
-        enterprise_id = int(parts[0])
-        # here we go:
-        if enterprise_id in enterprise_id_info.keys():
-            return enterprise_id_info[enterprise_id]
-        else:
-            return f"Unknown ({enterprise_id})"
-    else:
-        # sub oid, ie enterprise data, not found!
-        return 'Not found'
+    return SysObjectID(system_oid).vendor_name
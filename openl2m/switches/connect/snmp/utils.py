@@ -16,6 +16,7 @@ import netaddr
 from django.conf import settings
 from switches.utils import dprint
 from switches.connect.constants import IANA_TYPE_IPV4, IANA_TYPE_IPV6
+from switches.connect.snmp.constants import enterprises, enterprise_id_info
 
 """
 This file contains SNMP utility functions
@@ -83,3 +84,35 @@ def get_ip_from_oid_index(index: str, addr_type: int) -> str:
         return ""
     dprint(f"INVALID TYPE {addr_type}")
     return ""
+
+
+
+class SysObjectID:
+    """
+    The SNMP system Object ID (sysObjectID) of a device, parsed once.
+    E.g. ".1.3.6.1.4.1.9.1.2134" has enterprise_id 9 (Cisco), and product "1.2134"
+    This is used to find the vendor driver (see switches/connect/registry.py),
+    and is then kept in the SnmpConnector() object, so it is not parsed again.
+    """
+
+    def __init__(self, oid: str = ""):
+        self.oid = oid if isinstance(oid, str) else ""
+        self.enterprise_id = 0  # 0 if the OID is not in the 'enterprises' branch
+        self.product = ""  # the vendor specific part after the enterprise id
+        branch = enterprises + "."
+        if self.oid.startswith(branch):
+            (enterprise_id, _, self.product) = self.oid[len(branch) :].partition('.')
+            if enterprise_id.isdigit():
+                self.enterprise_id = int(enterprise_id)
+
+    def __str__(self) -> str:
+        return self.oid
+
+    @property
+    def vendor_name(self) -> str:
+        """
+        Return the Enterprise name, e.g. 'Cisco', or 'Unknown (<id>)', or 'Not found'
+        """
+        if not self.enterprise_id:
+            return 'Not found'
+        return enterprise_id_info.get(self.enterprise_id, f"Unknown ({self.enterprise_id})")
@@ -0,0 +1,60 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+A pool of Netmiko SSH sessions, per web server process.
+
+Setting up an SSH session, and the login banner, can take several seconds. Instead of closing the session after a command,
+Connector().netmiko_disconnect() returns it to this pool, and the next command to the same device,
+with the same credentials, re-uses it. Paging only needs to be disabled once per session,
+the PooledSession().prepared flag is set when this was done.
+
+Idle sessions are sent SSH keepalives, and are closed after settings.SSH_POOL_IDLE_TIMEOUT seconds.
+Sessions are checked before they are re-used, and there are at most settings.SSH_POOL_MAX_PER_DEVICE
+sessions per device at the same time. See switches/connect/sessionpool.py
+"""
+from django.conf import settings
+
+from switches.connect.sessionpool import PoolExhausted, PooledSession, SessionPool  # noqa: F401
+
+
+def get_session_key(switch, device_type: str) -> tuple:
+    """
+    Sessions are only shared for the same device address and credentials.
+    """
+    profile = switch.netmiko_profile
+    return (
+        switch.id,
+        switch.primary_ip4,
+        device_type,
+        profile.id,
+        hash((profile.username, profile.password, profile.tcp_port)),
+    )
+
+
+def _close_handle(handle):
+    handle.disconnect()
+
+
+_pool = SessionPool(
+    name="sshpool",
+    max_per_key=settings.SSH_POOL_MAX_PER_DEVICE,
+    idle_timeout=settings.SSH_POOL_IDLE_TIMEOUT,
+    wait_timeout=settings.SSH_CONNECT_TIMEOUT,
+    is_alive=lambda handle: handle.is_alive(),
+    close_handle=_close_handle,
+)
+
+borrow = _pool.borrow
+release = _pool.release
+close_idle = _pool.close_idle
@@ -189,6 +189,8 @@ LOG_VIEW_SWITCH_SEARCH = 10
 LOG_VIEW_DOWNLOAD_ARP_LLDP = 11
 LOG_VIEW_DOWNLOAD_INTERFACES = 12
 LOG_VIEW_TOP_ACTIVITY = 13
+LOG_VIEW_GROUP_EXPORT = 14
+LOG_VIEW_HOST_SEARCH = 15
 LOG_LOGIN = 90
 LOG_LOGOUT = 91
 LOG_LOGOUT_INACTIVE = 92
@@ -297,6 +299,8 @@ LOG_ACTION_CHOICES = [
     [LOG_VIEW_DOWNLOAD_ARP_LLDP, 'Download Eth/Arp/LLDP'],
     [LOG_VIEW_DOWNLOAD_INTERFACES, 'Download Interfaces'],
     [LOG_VIEW_TOP_ACTIVITY, 'View Top Activity'],
+    [LOG_VIEW_GROUP_EXPORT, 'Export Group Inventory'],
+    [LOG_VIEW_HOST_SEARCH, 'Searching for Host'],
     [LOG_LOGIN, 'Login'],
     [LOG_LOGOUT, 'Logout'],
     [LOG_LOGOUT_INACTIVE, 'Inactivity Logout'],
@@ -410,3 +414,20 @@ TASK_STATUS_CHOICES = [
 ETH_FORMAT_COLON = 0  # aa:bb:cc:dd:ee:ff
 ETH_FORMAT_HYPHEN = 1  # aa-bb-cc-dd-ee-ff
 ETH_FORMAT_CISCO = 2  # aabb.ccdd.eeff
+
+# group inventory export jobs, see switches/export.py
+EXPORT_STATUS_RUNNING = 0
+EXPORT_STATUS_DONE = 1
+EXPORT_STATUS_FAILED = 2
+EXPORT_STATUS_CHOICES = [
+    [EXPORT_STATUS_RUNNING, 'Running'],
+    [EXPORT_STATUS_DONE, 'Done'],
+    [EXPORT_STATUS_FAILED, 'Failed'],
+]
+
+EXPORT_FORMAT_XLSX = 'xlsx'
+EXPORT_FORMAT_JSONL = 'jsonl'
+EXPORT_FORMAT_CHOICES = [
+    [EXPORT_FORMAT_XLSX, 'Excel spreadsheet'],
+    [EXPORT_FORMAT_JSONL, 'Compressed JSON Lines'],
+]
@@ -0,0 +1,114 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Shared device state cache.
+
+The 'poller' command periodically reads selected devices, and saves a snapshot of the
+device state (see Connector().get_snapshot()) here. When a user first views such a device,
+the snapshot is loaded instead of reading the device, see get_connection_object().
+
+The poller also reads the ARP tables of the 'ARP source' devices of each SwitchGroup(), and saves them here.
+When the ethernet tables of any device in that group are read, the IP addresses are filled in
+from these ARP tables, see Connector().add_learned_ethernet_address()
+
+This uses the Django cache named in settings.POLLER_CACHE. The web server and the poller
+are separate processes, so this needs to be a shared cache, e.g. Redis, Memcached or the database cache.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _get_key(switch_id: int) -> str:
+    return f"openl2m-device-{switch_id}"
+
+
+def _get_arp_key(switch_id: int) -> str:
+    return f"openl2m-arp-{switch_id}"
+
+
+def get_device_cache():
+    return caches[settings.POLLER_CACHE]
+
+
+def get_snapshot(switch) -> dict:
+    """
+    Return the most recent snapshot of a device, or None if not found.
+
+    Params:
+        switch (Switch): the device.
+
+    Returns:
+        (dict): as created by Connector().get_snapshot(), or None
+    """
+    if not settings.POLLER_ENABLED:
+        return None
+    entry = get_device_cache().get(_get_key(switch.id))
+    if entry:
+        return entry['data']
+    return None
+
+
+def get_snapshot_time(switch_id: int) -> float:
+    """
+    Return the time the snapshot of a device was saved, or 0 if not found.
+    """
+    entry = get_device_cache().get(_get_key(switch_id))
+    if entry:
+        return entry['time']
+    return 0
+
+
+def save_snapshot(switch, data: dict):
+    """
+    Save the snapshot of a device for settings.POLLER_CACHE_TIMEOUT seconds.
+    """
+    get_device_cache().set(
+        _get_key(switch.id), {'time': time.time(), 'data': data}, timeout=settings.POLLER_CACHE_TIMEOUT
+    )
+
+
+def clear_snapshot(switch_id: int):
+    """
+    Remove the snapshot of a device, e.g. after a change was made to it.
+    """
+    if settings.POLLER_ENABLED:
+        get_device_cache().delete(_get_key(switch_id))
+
+
+def save_arp_table(switch, table: dict):
+    """
+    Save the ARP table of an 'ARP source' device for settings.ARP_CACHE_TIMEOUT seconds.
+
+    Params:
+        switch (Switch): the device.
+        table (dict): the IPv4 addresses, keyed by ethernet key, see hostindex.ethernet_to_key()
+    """
+    get_device_cache().set(_get_arp_key(switch.id), table, timeout=settings.ARP_CACHE_TIMEOUT)
+
+
+def get_arp_tables(switch_ids: list) -> dict:
+    """
+    Return the combined ARP tables of the given 'ARP source' devices.
+
+    Returns:
+        (dict): the IPv4 addresses, keyed by ethernet key. Empty if no tables were found.
+    """
+    if not settings.POLLER_ENABLED or not switch_ids:
+        return {}
+    arp = {}
+    for table in get_device_cache().get_many([_get_arp_key(switch_id) for switch_id in switch_ids]).values():
+        arp.update(table)
+    return arp
@@ -11,7 +11,9 @@
 # more details.  You should have received a copy of the GNU General Public
 # License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
 #
-import io
+import csv
+import json
+import tempfile
 import time
 import xlsxwriter
 
@@ -28,15 +30,187 @@ from switches.connect.constants import (
 )
 from switches.utils import dprint
 
+# the download formats, with their file extension and content type:
+DOWNLOAD_FORMATS = {
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('csv', 'text/csv'),
+    'ndjson': ('ndjson', 'application/x-ndjson'),
+}
+
+# the columns of the interface download, as key: (header, column width)
+INTERFACE_COLUMNS = {
+    'interface': ('Interface', 30),
+    'mode': ('Mode', 20),
+    'state': ('State', 10),
+    'vlan': ('Untagged VLAN', 20),
+    'poe': ('PoE Status', 15),
+    'power': ('Power (mW)', 15),
+    'description': ('Description', 50),
+}
+
+# the columns of the ethernet and neighbor download:
+ETH_NEIGHBOR_COLUMNS = {
+    'interface': ('Interface', 30),
+    'vlan': ('Untagged VLAN', 20),
+    'power': ('Power (mW)', 15),
+    'description': ('Description', 50),
+    'ethernet': ('Ethernet Heard', 20),
+    'ipv4': ('IPv4 Address', 20),
+    'vendor': ('Vendor', 25),
+    'neighbor_name': ('Neighbor Name', 20),
+    'neighbor_type': ('Neighbor Type', 20),
+    'neighbor_description': ('Neighbor Description', 50),
+}
+
+
+def get_columns(available: dict, requested: str = "") -> list:
+    """Get the list of columns to download.
+
+    Args:
+        available (dict): the columns that can be downloaded, e.g. INTERFACE_COLUMNS
+        requested (str): comma-separated list of column keys, e.g. from the "columns" query parameter.
+                         Unknown keys are ignored. If empty, or nothing valid, all columns are returned.
+
+    Returns:
+        (list): the column keys, in the requested order.
+    """
+    columns = [key for key in requested.replace(" ", "").split(",") if key in available]
+    if not columns:
+        return list(available.keys())
+    return columns
+
+
+def interface_rows(connection: Connector):
+    """Generator with a dict of values for each visible interface on the device.
+
+    Args:
+        connection (Connector()): a valid Connector object, that has basic (interface) information filled in.
+    """
+    for interface in connection.interfaces.values():
+        if not interface.visible:
+            continue
+        row = {'interface': interface.name, 'description': interface.description}
+
+        if interface.is_routed:
+            row['mode'] = "Routed"
+        elif interface.lacp_master_index > 0:
+            row['mode'] = "LACP-Member"
+        elif interface.type == IF_TYPE_LAGG:
+            row['mode'] = "LACP"
+        elif interface.is_tagged:
+            row['mode'] = "Trunk"
+        elif interface.type != IF_TYPE_ETHERNET:
+            row['mode'] = "Virtual"
+        else:
+            # anything else is access port:
+            row['mode'] = "Access"
+
+        if interface.untagged_vlan > 0:
+            row['vlan'] = interface.untagged_vlan
+
+        row['state'] = "Up" if interface.oper_status else "Down"
+
+        if interface.poe_entry:
+            if interface.poe_entry.detect_status > POE_PORT_DETECT_DELIVERING:
+                row['poe'] = "Error"
+            elif interface.poe_entry.detect_status == POE_PORT_DETECT_DELIVERING:
+                row['poe'] = "Delivering"
+                row['power'] = interface.poe_entry.power_consumed
+            else:
+                row['poe'] = "Available"
+        yield row
+
+
+def eth_neighbor_rows(connection: Connector):
+    """Generator with a dict of values for each ethernet address and lldp neighbor on the device.
+
+    Args:
+        connection (Connector()): a valid Connector object, that has ethernet and neighbor information filled in.
+    """
+    for interface in connection.interfaces.values():
+        interface_info = {
+            'interface': interface.name,
+            'vlan': interface.untagged_vlan,
+            'description': interface.description,
+        }
+        if interface.poe_entry and interface.poe_entry.detect_status == POE_PORT_DETECT_DELIVERING:
+            interface_info['power'] = interface.poe_entry.power_consumed
+
+        for eth in interface.eth.values():
+            row = dict(interface_info)
+            row['ethernet'] = str(eth)
+            row['vendor'] = eth.vendor
+            row['ipv4'] = eth.address_ip4
+            yield row
+
+        # and loop through lldp:
+        for neighbor in interface.lldp.values():
+            dprint(f"LLDP: on {interface.name} - {neighbor.sys_name}")
+            row = dict(interface_info)
+            # what kind of chassis address do we have (if any)
+            if neighbor.chassis_type == LLDP_CHASSIC_TYPE_ETH_ADDR:
+                row['ethernet'] = neighbor.chassis_string
+                row['vendor'] = neighbor.vendor
+            elif neighbor.chassis_type == LLDP_CHASSIC_TYPE_NET_ADDR:
+                if neighbor.chassis_string_type == IANA_TYPE_IPV4:
+                    row['ipv4'] = neighbor.chassis_string
+                elif neighbor.chassis_string_type == IANA_TYPE_IPV6:
+                    # TBD, IPv6 not supported yet.
+                    dprint("  IPV6 chassis address: NOT supported yet")
+            # if we don't have IP info yet, do we have management IP?
+            if 'ipv4' not in row and neighbor.management_address:
+                if neighbor.management_address_type == IANA_TYPE_IPV4:
+                    row['ipv4'] = neighbor.management_address
+                elif neighbor.management_address_type == IANA_TYPE_IPV6:
+                    # TBD, IPv6 not supported yet.
+                    dprint("  IPV6 management address: NOT supported yet")
+            row['neighbor_name'] = neighbor.sys_name
+            row['neighbor_type'] = neighbor.capabilities_as_string()
+            row['neighbor_description'] = neighbor.sys_descr
+            yield row
+
+
+class Echo:
+    """A file-like object that returns what is written to it, for streaming the csv writer output."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(available: dict, columns: list, rows):
+    """Generator that returns the header and rows as CSV lines, for a StreamingHttpResponse().
+
+    Args:
+        available (dict): the column definitions, e.g. INTERFACE_COLUMNS
+        columns (list): the column keys to include.
+        rows: iterable of row dicts, e.g. interface_rows(connection)
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow([available[column][0] for column in columns])
+    for row in rows:
+        yield writer.writerow([row.get(column, "") for column in columns])
+
+
+def stream_ndjson(columns: list, rows):
+    """Generator that returns each row as a line of JSON, for a StreamingHttpResponse().
+
+    Args:
+        columns (list): the column keys to include.
+        rows: iterable of row dicts, e.g. eth_neighbor_rows(connection)
+    """
+    for row in rows:
+        yield json.dumps({column: row.get(column, None) for column in columns}) + "\n"
+
 
 class Spreadsheet:
     """Class to wrap some settings for spreadsheet output together"""
 
     def __init__(self):
-        # create the Excel file handler to a temporary byte stream
+        # create the Excel file in a temporary file, which is deleted when closed.
         # Note: this file is closed by the Django FileResponse(fh) call in views.py !
-        self.fh = io.BytesIO()
-        self.workbook = xlsxwriter.Workbook(self.fh)
+        # 'constant_memory' writes each row to disk as soon as the next row starts.
+        self.fh = tempfile.TemporaryFile()
+        self.workbook = xlsxwriter.Workbook(self.fh, {'constant_memory': True})
 
         # Add some formats to use to highlight cells.
         self.format_bold = self.workbook.add_format({'bold': True, 'font_name': 'Calibri', 'font_size': 14})
@@ -61,248 +235,105 @@ def create_workbook():
         return False, f"{err}"
 
 
-def create_interfaces_worksheet(spreadsheet: Spreadsheet(), connection: Connector):
-    """Add a worksheet that contains the interface/port information for a device.
+def create_worksheet(spreadsheet: Spreadsheet, name: str, title: str, available: dict, columns: list, rows):
+    """Add a worksheet with a title row, a header row, and a row for each of the rows.
+    Rows are written in order, as required by the 'constant_memory' mode.
     Does NOT trap exceptions, so these can be caught in the calling function for better
     error reporting.
 
     Args:
         spreadsheet (Spreadsheet()): a Spreadsheet() object with Workbook() ready to write to.
-        connection (Connector()): a valid Connector object, that has ethernet and neighbor information filled in.
+        name (str): the name of the worksheet (tab).
+        title (str): the text on the first row.
+        available (dict): the column definitions, e.g. INTERFACE_COLUMNS
+        columns (list): the column keys to include.
+        rows: iterable of row dicts.
 
     Returns:
-        n/a
+        the new worksheet
     """
-    dprint("create_interfaces_worksheet()")
-    # add a tab to workbook
-    worksheet = spreadsheet.workbook.add_worksheet('Interfaces')
-
-    COL_INTERFACE_NAME = 0
-    COL_INTERFACE_MODE = 1
-    COL_INTERFACE_STATE = 2
-    COL_INTERFACE_VLAN = 3
-    COL_INTERFACE_POE = 4
-    COL_INTERFACE_POE_DRAW = 5
-    COL_INTERFACE_DESCRIPTION = 6
-
+    worksheet = spreadsheet.workbook.add_worksheet(name)
     # start with a date message:
     row = 0
-    worksheet.write(
-        row,
-        COL_INTERFACE_NAME,
-        f"Interface info from '{connection.switch.name}' generated for '{connection.request.user}' at {time.strftime('%I:%M %p, %d %B %Y', time.localtime())}",
-        spreadsheet.format_bold,
-    )
+    worksheet.write(row, 0, title, spreadsheet.format_bold)
 
     # write header row
     row += 1
-    worksheet.write(row, COL_INTERFACE_NAME, 'Interface', spreadsheet.format_bold)
-    worksheet.set_column(COL_INTERFACE_NAME, COL_INTERFACE_NAME, 30)  # Adjust the column width.
-
-    worksheet.write(row, COL_INTERFACE_MODE, 'Mode', spreadsheet.format_bold)
-    worksheet.set_column(COL_INTERFACE_MODE, COL_INTERFACE_MODE, 20)
-
-    worksheet.write(row, COL_INTERFACE_STATE, 'State', spreadsheet.format_bold)
-    worksheet.set_column(COL_INTERFACE_STATE, COL_INTERFACE_STATE, 10)
-
-    worksheet.write(row, COL_INTERFACE_VLAN, 'Untagged VLAN', spreadsheet.format_bold)
-    worksheet.set_column(COL_INTERFACE_VLAN, COL_INTERFACE_VLAN, 20)
-
-    worksheet.write(row, COL_INTERFACE_POE, 'PoE Status', spreadsheet.format_bold)
-    worksheet.set_column(COL_INTERFACE_POE, COL_INTERFACE_POE, 15)
-
-    worksheet.write(row, COL_INTERFACE_POE_DRAW, 'Power (mW)', spreadsheet.format_bold)
-    worksheet.set_column(COL_INTERFACE_POE_DRAW, COL_INTERFACE_POE_DRAW, 15)
-
-    worksheet.write(row, COL_INTERFACE_DESCRIPTION, 'Description', spreadsheet.format_bold)
-    worksheet.set_column(COL_INTERFACE_DESCRIPTION, COL_INTERFACE_DESCRIPTION, 50)
+    for index, column in enumerate(columns):
+        header, width = available[column]
+        worksheet.write(row, index, header, spreadsheet.format_bold)
+        worksheet.set_column(index, index, width)  # Adjust the column width.
 
     # freeze top 2 rows to easy scrolling
     worksheet.freeze_panes(2, 0)
 
-    # now loop through all interfaces on the connection:
-    for interface in connection.interfaces.values():
-        if interface.visible:
-            row += 1
-            worksheet.write(row, COL_INTERFACE_NAME, interface.name, spreadsheet.format_regular)
-
-            if interface.is_routed:
-                worksheet.write(row, COL_INTERFACE_MODE, "Routed", spreadsheet.format_regular)
-            elif interface.lacp_master_index > 0:
-                worksheet.write(row, COL_INTERFACE_MODE, "LACP-Member", spreadsheet.format_regular)
-            elif interface.type == IF_TYPE_LAGG:
-                worksheet.write(row, COL_INTERFACE_MODE, "LACP", spreadsheet.format_regular)
-            elif interface.is_tagged:
-                worksheet.write(row, COL_INTERFACE_MODE, "Trunk", spreadsheet.format_regular)
-            elif interface.type != IF_TYPE_ETHERNET:
-                worksheet.write(row, COL_INTERFACE_MODE, "Virtual", spreadsheet.format_regular)
-            else:
-                # anything else is access port:
-                worksheet.write(row, COL_INTERFACE_MODE, "Access", spreadsheet.format_regular)
+    for values in rows:
+        row += 1
+        for index, column in enumerate(columns):
+            if column in values:
+                worksheet.write(row, index, values[column], spreadsheet.format_regular)
+    return worksheet
 
-            if interface.untagged_vlan > 0:
-                worksheet.write(row, COL_INTERFACE_VLAN, interface.untagged_vlan, spreadsheet.format_regular)
 
-            if interface.oper_status:
-                worksheet.write(row, COL_INTERFACE_STATE, "Up", spreadsheet.format_regular)
-            else:
-                worksheet.write(row, COL_INTERFACE_STATE, "Down", spreadsheet.format_regular)
+def create_interfaces_worksheet(spreadsheet: Spreadsheet, connection: Connector, columns: list = None):
+    """Add a worksheet that contains the interface/port information for a device.
+    Does NOT trap exceptions, so these can be caught in the calling function for better
+    error reporting.
 
-            if interface.poe_entry:
-                if interface.poe_entry.detect_status > POE_PORT_DETECT_DELIVERING:
-                    worksheet.write(row, COL_INTERFACE_POE, "Error", spreadsheet.format_regular)
-                elif interface.poe_entry.detect_status == POE_PORT_DETECT_DELIVERING:
-                    worksheet.write(row, COL_INTERFACE_POE, "Delivering", spreadsheet.format_regular)
-                    worksheet.write(
-                        row, COL_INTERFACE_POE_DRAW, interface.poe_entry.power_consumed, spreadsheet.format_regular
-                    )
-                else:
-                    worksheet.write(row, COL_INTERFACE_POE, "Available", spreadsheet.format_regular)
+    Args:
+        spreadsheet (Spreadsheet()): a Spreadsheet() object with Workbook() ready to write to.
+        connection (Connector()): a valid Connector object, that has ethernet and neighbor information filled in.
+        columns (list): the column keys to include, default is all.
 
-            worksheet.write(row, COL_INTERFACE_DESCRIPTION, interface.description, spreadsheet.format_regular)
+    Returns:
+        n/a
+    """
+    dprint("create_interfaces_worksheet()")
+    create_worksheet(
+        spreadsheet=spreadsheet,
+        name='Interfaces',
+        title=f"Interface info from '{connection.switch.name}' generated for '{connection.request.user}' at {time.strftime('%I:%M %p, %d %B %Y', time.localtime())}",
+        available=INTERFACE_COLUMNS,
+        columns=columns or list(INTERFACE_COLUMNS.keys()),
+        rows=interface_rows(connection),
+    )
 
 
-def create_neighbors_worksheet(spreadsheet: Spreadsheet, connection: Connector, active=False):
+def create_neighbors_worksheet(spreadsheet: Spreadsheet, connection: Connector, columns: list = None):
     """To the existing workbook, add a worksheet that contains the ethernet and neighbors of a device.
     Does NOT trap exceptions, so these can be caught in the calling function for better
     error reporting.
 
     Args:
-        workbook (Workboo()): a XlsWriter.Workbook object ready to write to.
+        spreadsheet (Spreadsheet()): a Spreadsheet() object with Workbook() ready to write to.
         connection (Connector()): a valid Connector object, that has ethernet and neighbor information filled in.
+        columns (list): the column keys to include, default is all.
 
     Returns:
         n/a
     """
     dprint("create_neighbors_worksheet()")
-    # add a tab to workbook
-    worksheet = spreadsheet.workbook.add_worksheet('Ethernet-Arp-LLDP')
+    worksheet = create_worksheet(
+        spreadsheet=spreadsheet,
+        name='Ethernet-Arp-LLDP',
+        title=f"Ethernet and Neighbor data from '{connection.switch.name}' generated for '{connection.request.user}' at {time.strftime('%I:%M %p, %d %B %Y', time.localtime())}",
+        available=ETH_NEIGHBOR_COLUMNS,
+        columns=columns or list(ETH_NEIGHBOR_COLUMNS.keys()),
+        rows=eth_neighbor_rows(connection),
+    )
     # if we render this worksheet (ie tab), this will always be the active tab:
     worksheet.activate()
 
-    COL_INTERFACE_NAME = 0
-    COL_INTERFACE_VLAN = 1
-    COL_INTERFACE_POE_DRAW = 2
-    COL_INTERFACE_DESCRIPTION = 3
-    COL_ETHERNET = 4
-    COL_IPV4 = 5
-    COL_VENDOR = 6
-    COL_NEIGHBOR_NAME = 7
-    COL_NEIGHBOR_TYPE = 8
-    COL_NEIGHBOR_DESCRIPTION = 9
-
-    # start with a date message:
-    row = 0
-    worksheet.write(
-        row,
-        COL_INTERFACE_NAME,
-        f"Ethernet and Neighbor data from '{connection.switch.name}' generated for '{connection.request.user}' at {time.strftime('%I:%M %p, %d %B %Y', time.localtime())}",
-        spreadsheet.format_bold,
-    )
-
-    # write header row
-    row += 1
-    worksheet.write(row, COL_INTERFACE_NAME, 'Interface', spreadsheet.format_bold)
-    worksheet.set_column(COL_INTERFACE_NAME, COL_INTERFACE_NAME, 30)  # Adjust the column width.
-
-    worksheet.write(row, COL_INTERFACE_VLAN, 'Untagged VLAN', spreadsheet.format_bold)
-    worksheet.set_column(COL_INTERFACE_VLAN, COL_INTERFACE_VLAN, 20)
-
-    worksheet.write(row, COL_INTERFACE_POE_DRAW, 'Power (mW)', spreadsheet.format_bold)
-    worksheet.set_column(COL_INTERFACE_POE_DRAW, COL_INTERFACE_POE_DRAW, 15)
-
-    worksheet.write(row, COL_INTERFACE_DESCRIPTION, 'Description', spreadsheet.format_bold)
-    worksheet.set_column(COL_INTERFACE_DESCRIPTION, COL_INTERFACE_DESCRIPTION, 50)
-
-    worksheet.write(row, COL_ETHERNET, 'Ethernet Heard', spreadsheet.format_bold)
-    worksheet.set_column(COL_ETHERNET, COL_ETHERNET, 20)
-
-    worksheet.write(row, COL_IPV4, 'IPv4 Address', spreadsheet.format_bold)
-    worksheet.set_column(COL_IPV4, COL_IPV4, 20)
-
-    worksheet.write(row, COL_VENDOR, 'Vendor', spreadsheet.format_bold)
-    worksheet.set_column(COL_VENDOR, COL_VENDOR, 25)
 
-    worksheet.write(row, COL_NEIGHBOR_NAME, 'Neighbor Name', spreadsheet.format_bold)
-    worksheet.set_column(COL_NEIGHBOR_NAME, COL_NEIGHBOR_NAME, 20)
-
-    worksheet.write(row, COL_NEIGHBOR_TYPE, 'Neighbor Type', spreadsheet.format_bold)
-    worksheet.set_column(COL_NEIGHBOR_TYPE, COL_NEIGHBOR_TYPE, 20)
-
-    worksheet.write(row, COL_NEIGHBOR_DESCRIPTION, 'Neighbor Description', spreadsheet.format_bold)
-    worksheet.set_column(COL_NEIGHBOR_DESCRIPTION, COL_NEIGHBOR_DESCRIPTION, 50)
-
-    # freeze top 2 rows to easy scrolling
-    worksheet.freeze_panes(2, 0)
-
-    # now loop through all interfaces on the connection:
-    for interface in connection.interfaces.values():
-        for eth in interface.eth.values():
-            row += 1
-            # for now write name first
-            # vendor = eth.vendor
-            worksheet.write(row, COL_INTERFACE_NAME, interface.name, spreadsheet.format_regular)
-            worksheet.write(row, COL_INTERFACE_VLAN, interface.untagged_vlan, spreadsheet.format_regular)
-
-            if interface.poe_entry and interface.poe_entry.detect_status == POE_PORT_DETECT_DELIVERING:
-                worksheet.write(
-                    row, COL_INTERFACE_POE_DRAW, interface.poe_entry.power_consumed, spreadsheet.format_regular
-                )
-
-            worksheet.write(row, COL_INTERFACE_DESCRIPTION, interface.description, spreadsheet.format_regular)
-            worksheet.write(row, COL_ETHERNET, str(eth), spreadsheet.format_regular)
-            worksheet.write(row, COL_VENDOR, eth.vendor, spreadsheet.format_regular)
-            worksheet.write(row, COL_IPV4, eth.address_ip4, spreadsheet.format_regular)
-
-        # and loop through lldp:
-        for neighbor in interface.lldp.values():
-            row += 1
-            found_ip = False
-            dprint(f"LLDP: on {interface.name} - {neighbor.sys_name}")
-            worksheet.write(row, COL_INTERFACE_NAME, interface.name, spreadsheet.format_regular)
-            worksheet.write(row, COL_INTERFACE_VLAN, interface.untagged_vlan, spreadsheet.format_regular)
-
-            if interface.poe_entry and interface.poe_entry.detect_status == POE_PORT_DETECT_DELIVERING:
-                worksheet.write(
-                    row, COL_INTERFACE_POE_DRAW, interface.poe_entry.power_consumed, spreadsheet.format_regular
-                )
-
-            worksheet.write(row, COL_INTERFACE_DESCRIPTION, interface.description, spreadsheet.format_regular)
-
-            # what kind of chassis address do we have (if any)
-            if neighbor.chassis_type == LLDP_CHASSIC_TYPE_ETH_ADDR:
-                worksheet.write(row, COL_ETHERNET, neighbor.chassis_string, spreadsheet.format_regular)
-                worksheet.write(row, COL_VENDOR, neighbor.vendor, spreadsheet.format_regular)
-            elif neighbor.chassis_type == LLDP_CHASSIC_TYPE_NET_ADDR:
-                if neighbor.chassis_string_type == IANA_TYPE_IPV4:
-                    worksheet.write(row, COL_IPV4, neighbor.chassis_string, spreadsheet.format_regular)
-                    found_ip = True
-                elif neighbor.chassis_string_type == IANA_TYPE_IPV6:
-                    # TBD, IPv6 not supported yet.
-                    dprint("  IPV6 chassis address: NOT supported yet")
-                    # worksheet.write(row, COL_IPV6, neighbor.chassis_string, spreadsheet.format_regular)
-            # if we don't have IP info yet, do we have management IP?
-            if not found_ip and neighbor.management_address:
-                if neighbor.management_address_type == IANA_TYPE_IPV4:
-                    worksheet.write(row, COL_IPV4, neighbor.management_address, spreadsheet.format_regular)
-                elif neighbor.management_address_type == IANA_TYPE_IPV6:
-                    # TBD, IPv6 not supported yet.
-                    dprint("  IPV6 management address: NOT supported yet")
-                    # worksheet.write(row, COL_IPV6, neighbor.management_address, spreadsheet.format_regular)
-
-            worksheet.write(row, COL_NEIGHBOR_NAME, neighbor.sys_name, spreadsheet.format_regular)
-            worksheet.write(row, COL_NEIGHBOR_TYPE, neighbor.capabilities_as_string(), spreadsheet.format_regular)
-            worksheet.write(row, COL_NEIGHBOR_DESCRIPTION, neighbor.sys_descr, spreadsheet.format_regular)
-
-
-def create_interfaces_xls_file(connection: Connector):
+def create_interfaces_xls_file(connection: Connector, columns: list = None):
     """Create an XLS temp file that contains the interface/port information for a device.
 
     Args:
         connection (Connector()): a valid Connector object, that has basic (interface) information filled in.
+        columns (list): the interface column keys to include, default is all.
 
     Returns:
-        (BytesIO() object), Error() ): an open stream, or an Error() object if that cannot be created,.
+        (file object, Error() ): an open temporary file, or an Error() object if that cannot be created,.
     """
     dprint("create_interfaces_xls_file()")
 
@@ -315,9 +346,10 @@ def create_interfaces_xls_file(connection: Connector):
 
     # all OK:
     try:
-        create_interfaces_worksheet(spreadsheet=spreadsheet, connection=connection)
+        create_interfaces_worksheet(spreadsheet=spreadsheet, connection=connection, columns=columns)
         spreadsheet.workbook.close()
     except Exception as err:  # trap all errors from above!
+        spreadsheet.fh.close()
         error = Error()
         error.description = "Error adding content to Excel file!"
         error.details = f"ERROR: {err}"
@@ -328,14 +360,15 @@ def create_interfaces_xls_file(connection: Connector):
     return spreadsheet.fh, None
 
 
-def create_eth_neighbor_xls_file(connection: Connector):
+def create_eth_neighbor_xls_file(connection: Connector, columns: list = None):
     """Create an XLS temp file that contains the ethernet and neighbors of a device.
 
     Args:
         connection (Connector()): a valid Connector object, that has ethernet and neighbor information filled in.
+        columns (list): the ethernet and neighbor column keys to include, default is all.
 
     Returns:
-        (BytesIO() object), Error() ): an open stream, or an Error() object if that cannot be created,.
+        (file object, Error() ): an open temporary file, or an Error() object if that cannot be created,.
     """
     dprint("create_eth_neighbor_xls_file()")
 
@@ -349,9 +382,10 @@ def create_eth_neighbor_xls_file(connection: Connector):
     # all OK:
     try:
         create_interfaces_worksheet(spreadsheet=spreadsheet, connection=connection)
-        create_neighbors_worksheet(spreadsheet=spreadsheet, connection=connection)
+        create_neighbors_worksheet(spreadsheet=spreadsheet, connection=connection, columns=columns)
         spreadsheet.workbook.close()
     except Exception as err:  # trap all errors from above!
+        spreadsheet.fh.close()
         error = Error()
         error.description = "Error adding content to Excel file!"
         error.details = f"ERROR: {err}"
@@ -0,0 +1,319 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Group inventory export: read the interfaces, vlans, ethernet addresses and neighbors
+of all devices in a SwitchGroup() at the same time, and write them into a single file.
+
+The export runs in a background thread of the web server process that started it.
+Devices are read by a bounded pool of worker threads, and each device result is written
+to the file as soon as it arrives, so memory use does not grow with the size of the group.
+The progress is saved in the ExportJob() object. If the web server process is restarted,
+the job stops saving progress, and is marked as failed, see fail_stale_exports()
+"""
+import datetime
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import xlsxwriter
+
+from django.conf import settings
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.db import connection as db_connection
+from django.db.models import Q
+from django.http import HttpRequest
+from django.utils import timezone
+
+from switches.connect.connect import get_connection_object
+from switches.constants import (
+    EXPORT_FORMAT_JSONL,
+    EXPORT_STATUS_DONE,
+    EXPORT_STATUS_FAILED,
+    EXPORT_STATUS_RUNNING,
+    SWITCH_STATUS_ACTIVE,
+)
+from switches.download import ETH_NEIGHBOR_COLUMNS, INTERFACE_COLUMNS, eth_neighbor_rows, interface_rows
+from switches.models import ExportJob, Switch
+from switches.utils import dprint
+
+logger = logging.getLogger("openl2m.export")
+
+# the columns of the per-device summary, and the vlans:
+DEVICE_COLUMNS = {
+    'device': ('Device', 30),
+    'hostname': ('Hostname', 30),
+    'status': ('Status', 10),
+    'details': ('Details', 80),
+}
+VLAN_COLUMNS = {
+    'device': ('Device', 30),
+    'vlan': ('VLAN', 10),
+    'name': ('Name', 30),
+}
+DEVICE_COLUMN = {'device': ('Device', 30)}
+
+# a running job saves its progress at least this often, in seconds:
+PROGRESS_INTERVAL = 10
+# and a running job without progress for this long is not running anymore:
+STALE_AFTER = 120
+
+
+def read_device(request: HttpRequest, group, switch: Switch, start_times: dict) -> dict:
+    """
+    Read the data of a device, and return it as lists of rows.
+    This runs in a worker thread.
+
+    Params:
+        request (HttpRequest): a request for this device only, see get_device_request()
+        group (SwitchGroup): the group of the device.
+        switch (Switch): the device to read.
+        start_times (dict): the start time of this device is saved here, keyed by switch id.
+
+    Returns:
+        (dict): with 'interfaces', 'vlans' and 'ethernet' lists of row dicts.
+    """
+    start_times[switch.id] = time.monotonic()
+    try:
+        connection = get_connection_object(request=request, group=group, switch=switch)
+        # the connection stops reading when the timeout has passed:
+        connection.deadline = start_times[switch.id] + settings.EXPORT_DEVICE_TIMEOUT
+        if not connection.get_basic_info() or connection.deadline_passed():
+            raise Exception(f"{connection.error.description} {connection.error.details}")
+        if not connection.get_client_data() or connection.deadline_passed():
+            raise Exception(f"{connection.error.description} {connection.error.details}")
+        return {
+            'interfaces': list(interface_rows(connection)),
+            'vlans': [{'vlan': vlan.id, 'name': vlan.name} for vlan in connection.vlans.values()],
+            'ethernet': list(eth_neighbor_rows(connection)),
+        }
+    finally:
+        # each worker thread has its own database connection:
+        db_connection.close()
+
+
+def get_device_request(request: HttpRequest) -> HttpRequest:
+    """
+    Return a copy of the request with its own, in-memory, session.
+    Connectors cache device data in the session, so concurrent reads cannot share the user's session.
+    """
+    device_request = HttpRequest()
+    device_request.user = request.user
+    device_request.META = request.META
+    device_request.session = SessionStore()
+    return device_request
+
+
+class XlsxExport:
+    """
+    Multi-sheet Excel workbook, written in 'constant_memory' mode, one sheet per type of data.
+    """
+
+    extension = "xlsx"
+
+    def __init__(self, filename: str, title: str):
+        self.workbook = xlsxwriter.Workbook(filename, {'constant_memory': True})
+        self.format_bold = self.workbook.add_format({'bold': True, 'font_name': 'Calibri', 'font_size': 14})
+        self.format_regular = self.workbook.add_format({'font_name': 'Calibri', 'font_size': 12})
+        self.sheets = {}
+        for name, columns in (
+            ('devices', DEVICE_COLUMNS),
+            ('interfaces', DEVICE_COLUMN | INTERFACE_COLUMNS),
+            ('vlans', VLAN_COLUMNS),
+            ('ethernet', DEVICE_COLUMN | ETH_NEIGHBOR_COLUMNS),
+        ):
+            self.sheets[name] = self._add_sheet(name=name.capitalize(), title=title, columns=columns)
+
+    def _add_sheet(self, name: str, title: str, columns: dict) -> list:
+        worksheet = self.workbook.add_worksheet(name)
+        worksheet.write(0, 0, title, self.format_bold)
+        for index, (header, width) in enumerate(columns.values()):
+            worksheet.write(1, index, header, self.format_bold)
+            worksheet.set_column(index, index, width)  # Adjust the column width.
+        # freeze top 2 rows to easy scrolling
+        worksheet.freeze_panes(2, 0)
+        # the worksheet, the column keys, and the last row written:
+        return [worksheet, list(columns.keys()), 1]
+
+    def write(self, sheet: str, values: dict):
+        sheet_info = self.sheets[sheet]
+        worksheet, columns, row = sheet_info
+        row += 1
+        for index, column in enumerate(columns):
+            if column in values:
+                worksheet.write(row, index, values[column], self.format_regular)
+        sheet_info[2] = row
+
+    def close(self):
+        self.workbook.close()
+
+
+class JsonlExport:
+    """
+    gzip-compressed JSON Lines file, one row per line with a "type" of 'devices', 'interfaces', 'vlans' or 'ethernet'.
+    """
+
+    extension = "jsonl.gz"
+
+    def __init__(self, filename: str, title: str):
+        self.file = gzip.open(filename, mode="wt", encoding="utf-8")
+
+    def write(self, sheet: str, values: dict):
+        self.file.write(json.dumps({'type': sheet} | values, default=str))
+        self.file.write("\n")
+
+    def close(self):
+        self.file.close()
+
+
+def write_device(export, switch: Switch, result: dict = None, error: str = ""):
+    """
+    Write the result of one device to the export file.
+    """
+    if error:
+        export.write('devices', {'device': switch.name, 'hostname': switch.hostname, 'status': "Error", 'details': error})
+        return
+    export.write('devices', {'device': switch.name, 'hostname': switch.hostname, 'status': "OK"})
+    for sheet in ('interfaces', 'vlans', 'ethernet'):
+        for row in result[sheet]:
+            export.write(sheet, {'device': switch.name} | row)
+
+
+def run_export(job_id: int, request: HttpRequest, switch_ids: list):
+    """
+    Read all devices, and write the export file. This runs in a background thread.
+    A device that is not finished within settings.EXPORT_DEVICE_TIMEOUT seconds is written as an error.
+    Its connection stops reading at that deadline, see Connector.deadline_passed(), but a read that is
+    in progress finishes first, i.e. until the device responds or the protocol timeout.
+
+    Params:
+        job_id (int): the ExportJob() pk.
+        request (HttpRequest): the request that started the export, for the user and client ip.
+        switch_ids (list): the Switch() pk's to export.
+    """
+    job = ExportJob.objects.select_related('group', 'user').get(pk=job_id)
+    group = job.group
+    export = None
+    pool = ThreadPoolExecutor(max_workers=settings.EXPORT_MAX_WORKERS, thread_name_prefix="openl2m-export")
+    try:
+        title = f"Inventory of group '{group.name}' generated for '{job.user}' at {timezone.localtime().strftime('%I:%M %p, %d %B %Y')}"
+        export_class = JsonlExport if job.format == EXPORT_FORMAT_JSONL else XlsxExport
+        export = export_class(filename=job.filename, title=title)
+        start_times = {}
+        pending = {}
+        for switch in Switch.objects.filter(id__in=switch_ids).order_by('name'):
+            future = pool.submit(read_device, get_device_request(request), group, switch, start_times)
+            pending[future] = switch
+        done = errors = 0
+        last_update = time.monotonic()
+        while pending:
+            progress = done
+            finished, not_done = wait(pending.keys(), timeout=1, return_when=FIRST_COMPLETED)
+            for future in finished:
+                switch = pending.pop(future)
+                try:
+                    write_device(export, switch, result=future.result())
+                except Exception as err:
+                    dprint(f"Group export: error reading {switch.name}: {err}")
+                    write_device(export, switch, error=f"{err}")
+                    errors += 1
+                done += 1
+            now = time.monotonic()
+            for future in not_done:
+                switch = pending[future]
+                start = start_times.get(switch.id)
+                if start and now - start > settings.EXPORT_DEVICE_TIMEOUT:
+                    future.cancel()
+                    del pending[future]
+                    write_device(export, switch, error=f"Timeout after {settings.EXPORT_DEVICE_TIMEOUT} seconds")
+                    errors += 1
+                    done += 1
+            if done != progress or now - last_update > PROGRESS_INTERVAL:
+                ExportJob.objects.filter(pk=job_id).update(done=done, errors=errors, updated=timezone.now())
+                last_update = now
+        export.close()
+        ExportJob.objects.filter(pk=job_id).update(status=EXPORT_STATUS_DONE, finished=timezone.now())
+    except Exception as err:
+        logger.error(f"Group export {job_id} failed: {err}")
+        if export:
+            try:
+                export.close()
+            except Exception:
+                pass
+        ExportJob.objects.filter(pk=job_id).update(status=EXPORT_STATUS_FAILED, finished=timezone.now())
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        db_connection.close()
+
+
+def start_export(request: HttpRequest, group, switch_ids: list, format: str) -> ExportJob:
+    """
+    Create an ExportJob() and start it in a background thread.
+
+    Params:
+        request (HttpRequest): the current request.
+        group (SwitchGroup): the group to export.
+        switch_ids (list): the Switch() pk's in the group the user has access to.
+        format (str): EXPORT_FORMAT_XLSX or EXPORT_FORMAT_JSONL
+
+    Returns:
+        (ExportJob): the new job.
+    """
+    remove_old_exports()
+    fail_stale_exports()
+    os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+    switch_ids = list(
+        Switch.objects.filter(id__in=switch_ids, status=SWITCH_STATUS_ACTIVE).values_list('id', flat=True)
+    )
+    job = ExportJob.objects.create(
+        user=request.user, group=group, format=format, total=len(switch_ids), updated=timezone.now()
+    )
+    extension = JsonlExport.extension if format == EXPORT_FORMAT_JSONL else XlsxExport.extension
+    job.filename = os.path.join(settings.EXPORT_DIR, f"openl2m-export-{job.id}.{extension}")
+    job.save(update_fields=['filename'])
+    threading.Thread(
+        target=run_export, args=(job.id, request, switch_ids), name=f"openl2m-export-{job.id}", daemon=True
+    ).start()
+    return job
+
+
+def remove_old_exports():
+    """
+    Delete the export jobs, and their files, older than settings.EXPORT_MAX_AGE hours.
+    """
+    cutoff = timezone.now() - datetime.timedelta(hours=settings.EXPORT_MAX_AGE)
+    for job in ExportJob.objects.filter(created__lt=cutoff):
+        if job.filename and os.path.exists(job.filename):
+            try:
+                os.remove(job.filename)
+            except OSError as err:
+                logger.error(f"Cannot remove export file {job.filename}: {err}")
+        job.delete()
+
+
+def fail_stale_exports() -> int:
+    """
+    Mark the running export jobs that have not saved progress in STALE_AFTER seconds as failed.
+    The thread of such a job is gone, e.g. the web server process was restarted.
+
+    Returns:
+        (int): the number of jobs marked as failed.
+    """
+    cutoff = timezone.now() - datetime.timedelta(seconds=STALE_AFTER)
+    return ExportJob.objects.filter(
+        Q(updated__lt=cutoff) | Q(updated__isnull=True, created__lt=cutoff), status=EXPORT_STATUS_RUNNING
+    ).update(status=EXPORT_STATUS_FAILED, finished=timezone.now())
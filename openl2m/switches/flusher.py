@@ -0,0 +1,121 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+A single background thread per process that periodically writes in-memory buffers to the database.
+
+Buffers (e.g. the activity log writer and counters) register a flush function with an interval.
+All registered functions also run at process exit, so nothing buffered is lost on a clean shutdown.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.core.signals import request_finished
+from django.db import close_old_connections
+
+logger = logging.getLogger("openl2m.flusher")
+
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_flushers = []  # list of [function, interval, on_request_finished, at_exit, last_run]
+_thread = None
+_pid = None
+
+
+def register(function, interval: int, on_request_finished: bool = False, at_exit: bool = True):
+    """
+    Register a function to be called every 'interval' seconds from the background thread.
+
+    Params:
+        function: callable without arguments that writes a buffer.
+        interval (int): seconds between calls.
+        on_request_finished (bool): if True, also call at the end of each web request.
+        at_exit (bool): if True, also call when the process exits. Use this for in-memory buffers.
+    """
+    with _lock:
+        _flushers.append([function, interval, on_request_finished, at_exit, time.monotonic()])
+
+
+def wakeup():
+    """
+    Ask the background thread to run all flush functions now, e.g. when a buffer is full.
+    """
+    start()
+    _wakeup.set()
+
+
+def flush_all(request_end: bool = False, exiting: bool = False):
+    """
+    Call all the registered flush functions.
+
+    Params:
+        request_end (bool): if True, only call the functions registered for the end of a request.
+        exiting (bool): if True, only call the functions registered for process exit.
+    """
+    for flusher in list(_flushers):
+        if (request_end and not flusher[2]) or (exiting and not flusher[3]):
+            continue
+        _call(flusher)
+
+
+def start():
+    """
+    Start the background thread if not running in this process.
+    Checking the pid makes this safe for pre-forking web servers.
+    """
+    global _thread, _pid
+    if _thread is not None and _pid == os.getpid():
+        return
+    with _lock:
+        if _thread is not None and _pid == os.getpid():
+            return
+        _pid = os.getpid()
+        _thread = threading.Thread(target=_run, name="openl2m-flusher", daemon=True)
+        _thread.start()
+
+
+def _call(flusher):
+    flusher[4] = time.monotonic()
+    try:
+        flusher[0]()
+    except Exception as err:
+        logger.error(f"Error in {flusher[0].__module__}.{flusher[0].__name__}(): {err}")
+
+
+def _run():
+    """
+    Background thread: wake up at the shortest registered interval, or when asked to,
+    and call the functions that are due.
+    """
+    while True:
+        timeout = min([flusher[1] for flusher in _flushers], default=5)
+        forced = _wakeup.wait(timeout=timeout)
+        _wakeup.clear()
+        close_old_connections()
+        now = time.monotonic()
+        for flusher in list(_flushers):
+            if forced or now - flusher[4] >= flusher[1]:
+                _call(flusher)
+
+
+def _flush_on_request_finished(sender, **kwargs):
+    flush_all(request_end=True)
+
+
+# run at the end of each request, i.e. after the response was sent,
+# and make sure nothing is lost when the worker shuts down.
+request_finished.connect(_flush_on_request_finished)
+atexit.register(flush_all, exiting=True)
@@ -0,0 +1,266 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Host location index: where ethernet addresses were learned, and their IP addresses.
+
+The index is updated when the ethernet and arp tables of a device are read,
+ie. when a user views the device details, or by the 'poller' command.
+The rows are queued, and written by the background flusher thread, so the device view does not wait for them.
+A device is indexed at most once every settings.HOST_INDEX_UPDATE_INTERVAL seconds, per process.
+Searching the index does not read any device.
+"""
+import datetime
+import ipaddress
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from switches import flusher
+from switches.connect.constants import IF_TYPE_ETHERNET, IF_TYPE_LAGG
+from switches.models import HostAddress, HostLocation
+from switches.utils import dprint
+
+logger = logging.getLogger("openl2m.hostindex")
+
+# the interface types where hosts are learned. Other interfaces, e.g. vlan interfaces, only show arp entries.
+LOCATION_INTERFACE_TYPES = (IF_TYPE_ETHERNET, IF_TYPE_LAGG)
+
+# seconds between writes of the queued index updates:
+WRITE_INTERVAL = 5
+
+_lock = threading.Lock()  # protects _pending and _last_update
+_pending = {}  # the queued (switch, locations, addresses), keyed by switch id
+_last_update = {}  # the time.monotonic() of the last queued update, keyed by switch id
+
+
+def ethernet_to_key(ethernet: str) -> str:
+    """
+    Return the hex digits of an ethernet address string, in any format, in lower case.
+    E.g. "00:1A:2B-3c.4d5e" returns "001a2b3c4d5e"
+    """
+    return re.sub(r"[^0-9a-f]", "", str(ethernet).lower())
+
+
+def key_to_ethernet(key: str) -> str:
+    """
+    Return the ethernet key as a colon-separated string, e.g. "00:1a:2b:3c:4d:5e"
+    """
+    return ":".join(key[i : i + 2] for i in range(0, len(key), 2))
+
+
+def update_index(connection) -> int:
+    """
+    Queue the ethernet addresses found on the interfaces of a device, to add or update them in the index.
+    The index needs the device tables, so call this after Connector().get_client_data()
+    Nothing is queued if the device was indexed in the last settings.HOST_INDEX_UPDATE_INTERVAL seconds.
+
+    Params:
+        connection (Connector): the device connection.
+
+    Returns:
+        (int): the number of ethernet addresses queued.
+    """
+    dprint("hostindex.update_index()")
+    switch = connection.switch
+    with _lock:
+        last_update = _last_update.get(switch.id)
+        if last_update and time.monotonic() - last_update < settings.HOST_INDEX_UPDATE_INTERVAL:
+            dprint("  => indexed recently, skipping")
+            return 0
+        _last_update[switch.id] = time.monotonic()
+    now = timezone.now()
+    locations = []
+    addresses = {}
+    for iface in connection.interfaces.values():
+        for eth in iface.eth.values():
+            key = ethernet_to_key(eth)
+            if len(key) != 12:
+                continue
+            if iface.type in LOCATION_INTERFACE_TYPES:
+                locations.append(
+                    HostLocation(
+                        ethernet=key,
+                        switch=switch,
+                        interface=iface.name[:64],
+                        vlan_id=max(eth.vlan_id, 0),
+                        first_seen=now,
+                        last_seen=now,
+                    )
+                )
+            for ip in (eth.address_ip4, eth.address_ip6):
+                if ip:
+                    addresses[(ip, key)] = HostAddress(ip_address=ip, ethernet=key, switch=switch, last_seen=now)
+    with _lock:
+        # a newer read of the same device replaces a queued one:
+        _pending[switch.id] = (switch, locations, list(addresses.values()))
+    flusher.start()
+    return len(locations)
+
+
+def flush() -> int:
+    """
+    Write the queued index updates. This is called by the background flusher thread.
+
+    Returns:
+        (int): the number of devices written.
+    """
+    with _lock:
+        batch = list(_pending.values())
+        _pending.clear()
+    for switch, locations, addresses in batch:
+        _write_index(switch=switch, locations=locations, addresses=addresses)
+    return len(batch)
+
+
+def _write_index(switch, locations: list, addresses: list):
+    """
+    Write the locations and addresses of one device to the index.
+    """
+    try:
+        # 'INSERT ... ON CONFLICT DO UPDATE', so concurrent reads of the same device are safe:
+        HostLocation.objects.bulk_create(
+            locations,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['ethernet', 'switch', 'interface'],
+            update_fields=['vlan_id', 'last_seen'],
+        )
+        HostAddress.objects.bulk_create(
+            addresses,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['ip_address', 'ethernet'],
+            update_fields=['switch', 'last_seen'],
+        )
+    except Exception as err:
+        logger.error(f"Host index update for {switch} failed: {err}")
+
+
+def update_addresses(switch, table: dict):
+    """
+    Add or update the IP addresses from the ARP table of an 'ARP source' device in the index.
+
+    Params:
+        switch (Switch): the device the ARP table was read from.
+        table (dict): the IPv4 addresses, keyed by ethernet key.
+    """
+    now = timezone.now()
+    addresses = [
+        HostAddress(ip_address=ip, ethernet=key, switch=switch, last_seen=now)
+        for key, ip in table.items()
+        if len(key) == 12 and ip
+    ]
+    try:
+        HostAddress.objects.bulk_create(
+            addresses,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['ip_address', 'ethernet'],
+            update_fields=['switch', 'last_seen'],
+        )
+    except Exception as err:
+        logger.error(f"Host index update for {switch} failed: {err}")
+
+
+def get_allowed_switches(permissions: dict) -> dict:
+    """
+    Return the devices a user can see, from the permissions dict as returned by get_my_device_groups()
+
+    Returns:
+        (dict): the group id (int) for each device, keyed by device id (int)
+    """
+    allowed = {}
+    if isinstance(permissions, dict):
+        for group_id, group in permissions.items():
+            if isinstance(group, dict):
+                for switch_id in group['members'].keys():
+                    allowed.setdefault(int(switch_id), int(group_id))
+    return allowed
+
+
+def search(query: str, allowed: dict) -> tuple[list, str]:
+    """
+    Find the locations of an ethernet or IP address.
+    An ethernet address can be given in any format, and can be partial, ie. the first digits only.
+
+    Params:
+        query (str): the ethernet or IP address to find.
+        allowed (dict): the devices to search, as returned by get_allowed_switches()
+
+    Returns:
+        (list, str): a list of dictionaries, one for each location, newest first, and an error string.
+    """
+    query = query.strip()
+    # the arp tables are often read from routers the user has no access to, so search all addresses:
+    addresses = HostAddress.objects.all()
+    try:
+        ip = ipaddress.ip_address(query)
+        ethernets = list(addresses.filter(ip_address=str(ip)).values_list('ethernet', flat=True).distinct())
+        if not ethernets:
+            return [], ""
+        locations = HostLocation.objects.filter(ethernet__in=ethernets)
+    except ValueError:
+        key = ethernet_to_key(query)
+        if len(key) < 6 or len(key) > 12:
+            return [], "Please enter an IP address, or at least the first 6 digits of an ethernet address!"
+        if len(key) == 12:
+            locations = HostLocation.objects.filter(ethernet=key)
+        else:
+            locations = HostLocation.objects.filter(ethernet__startswith=key)
+
+    results = []
+    locations = (
+        locations.filter(switch_id__in=allowed.keys())
+        .select_related('switch')
+        .order_by('-last_seen')[: settings.HOST_SEARCH_MAX_RESULTS]
+    )
+    ethernets = {location.ethernet for location in locations}
+    ip_addresses = {}
+    for ip_address, ethernet in addresses.filter(ethernet__in=ethernets).values_list('ip_address', 'ethernet'):
+        ip_addresses.setdefault(ethernet, []).append(ip_address)
+    for location in locations:
+        results.append(
+            {
+                'ethernet': key_to_ethernet(location.ethernet),
+                'ip_addresses': ip_addresses.get(location.ethernet, []),
+                'switch_id': location.switch_id,
+                'switch_name': location.switch.name,
+                'group_id': allowed[location.switch_id],
+                'interface': location.interface,
+                'vlan': location.vlan_id,
+                'first_seen': location.first_seen,
+                'last_seen': location.last_seen,
+            }
+        )
+    return results, ""
+
+
+def prune(max_age: int) -> tuple[int, int]:
+    """
+    Remove the host locations and addresses not seen in 'max_age' days.
+
+    Returns:
+        (int, int): the number of locations and addresses deleted.
+    """
+    cutoff = timezone.now() - datetime.timedelta(days=max_age)
+    locations, _ = HostLocation.objects.filter(last_seen__lt=cutoff).delete()
+    addresses, _ = HostAddress.objects.filter(last_seen__lt=cutoff).delete()
+    return locations, addresses
+
+
+flusher.register(flush, interval=WRITE_INTERVAL)
@@ -0,0 +1,155 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Buffered, asynchronous writer for activity Log() entries.
+
+Log.save() hands new entries to this module. They are kept in an in-process queue,
+and written to the database with a single bulk_create() by the background flusher thread,
+at the end of each web request, and at process exit.
+Syslog forwarding is done via a logging QueueListener(), so the request never waits on the network.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import models
+
+from switches import flusher, rollups
+
+logger = logging.getLogger("openl2m.logwriter")
+
+# the states a Log() object can be in while handled by this writer:
+STATE_PENDING = 1  # in queue, waiting to be written
+STATE_WRITING = 2  # being written by flush()
+STATE_DIRTY = 3  # saved again while being written, needs an update after insert.
+
+_lock = threading.Lock()  # protects _pending and object states
+_flush_lock = threading.Lock()  # only one flush() at a time
+_pending = []
+
+_syslogger = None
+_syslog_pid = None
+
+
+def enqueue(log) -> bool:
+    """
+    Add a new Log() object to the write queue.
+
+    Params:
+        log (Log): the unsaved Log() object.
+
+    Returns:
+        (bool): True if queued, False if the caller should save it directly.
+    """
+    if not settings.LOG_WRITE_ASYNC:
+        return False
+    with _lock:
+        state = getattr(log, "_logwriter_state", None)
+        if state == STATE_WRITING:
+            # changed while being inserted, update after the insert completes
+            log._logwriter_state = STATE_DIRTY
+            return True
+        if state in (STATE_PENDING, STATE_DIRTY):
+            # already queued, the latest values will be written.
+            return True
+        log._logwriter_state = STATE_PENDING
+        _pending.append(log)
+        queue_size = len(_pending)
+    if queue_size >= settings.LOG_WRITE_BATCH_SIZE:
+        flusher.wakeup()
+    else:
+        flusher.start()
+    return True
+
+
+def flush() -> int:
+    """
+    Write all queued Log() entries to the database.
+
+    Returns:
+        (int): the number of entries written.
+    """
+    with _flush_lock:
+        with _lock:
+            batch = _pending[:]
+            _pending.clear()
+            for log in batch:
+                log._logwriter_state = STATE_WRITING
+        if not batch:
+            return 0
+        try:
+            type(batch[0]).objects.bulk_create(batch, batch_size=settings.LOG_WRITE_BATCH_SIZE)
+        except Exception as err:
+            # retry one at a time, so a single bad entry does not lose the whole batch.
+            logger.error(f"Bulk write of {len(batch)} log entries failed, retrying individually: {err}")
+            for log in batch:
+                log.pk = None
+                log._state.adding = True
+                try:
+                    models.Model.save(log)
+                except Exception as err:
+                    logger.error(f"Failed to write log entry '{log.description}': {err}")
+        # and add to the daily activity rollups:
+        rollups.record([log for log in batch if log.pk is not None])
+        with _lock:
+            dirty = [log for log in batch if log._logwriter_state == STATE_DIRTY]
+            for log in batch:
+                log._logwriter_state = None
+        for log in dirty:
+            # the entry now has a pk, so this is an update:
+            try:
+                models.Model.save(log)
+            except Exception as err:
+                logger.error(f"Failed to update log entry '{log.description}': {err}")
+        return len(batch)
+
+
+def forward_to_syslog(log):
+    """
+    Send a Log() entry to the configured syslog host, without blocking the caller.
+    """
+    if not settings.SYSLOG_HOST:
+        return
+    if settings.SYSLOG_JSON:
+        _get_syslogger().info(log.as_json())
+    else:
+        _get_syslogger().info(log.as_string())
+
+
+def _get_syslogger() -> logging.Logger:
+    """
+    Return the 'log_to_syslog' logger, feeding a QueueListener() that owns the SysLogHandler().
+    This is set up once per process.
+    """
+    global _syslogger, _syslog_pid
+    with _lock:
+        if _syslogger is None or _syslog_pid != os.getpid():
+            syslog_queue = queue.SimpleQueue()
+            handler = logging.handlers.SysLogHandler(address=(settings.SYSLOG_HOST, settings.SYSLOG_PORT))
+            listener = logging.handlers.QueueListener(syslog_queue, handler)
+            listener.start()
+            # stop() will send everything still in the queue:
+            atexit.register(listener.stop)
+            _syslogger = logging.getLogger("log_to_syslog")
+            _syslogger.handlers = [logging.handlers.QueueHandler(syslog_queue)]
+            _syslogger.setLevel(logging.DEBUG)
+            _syslog_pid = os.getpid()
+        return _syslogger
+
+
+flusher.register(flush, interval=settings.LOG_WRITE_INTERVAL, on_request_finished=True)
@@ -293,7 +293,11 @@ class Command(BaseCommand):
                                 self.stdout.write(self.style.ERROR(f"   {format(e)}"))
                                 continue
                     try:
-                        switch.save()
+                        if switch.pk:
+                            # existing switch, do not overwrite the counters, see Switch().update_access() etc.
+                            switch.save(update_fields=switch.get_settings_fields())
+                        else:
+                            switch.save()
                     except Exception as e:
                         self.stdout.write(self.style.ERROR("   Error saving new switch object for '%s'" % row['name']))
                         self.stdout.write(self.style.ERROR(f"   Error details: {sys.exc_info()[0]}"))
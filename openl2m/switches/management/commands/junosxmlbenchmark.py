@@ -0,0 +1,158 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+
+#
+# add the command 'junosxmlbenchmark' to compare the memory use and time of handling a large
+# Junos "show ethernet-switching table" RPC reply the regular PyEZ way, and the raw way used by
+# PyEZConnector.get_my_client_data(). Both start from the reply string as received by the ncclient session,
+# and run the same ncclient reply classes as a real RPC, i.e. the RPCReply() parse, and for PyEZ the
+# NCElement() namespace removal. Only the network transfer, which is the same for both, is not measured.
+# Use a recorded reply with --file, or a generated one. This does not read any device.
+#
+# To record a reply, on the device run:
+#   show ethernet-switching table | display xml | no-more
+#
+import multiprocessing
+import random
+import resource
+import time
+
+from django.core.management.base import BaseCommand
+from ncclient.devices.junos import JunosDeviceHandler
+from ncclient.operations.rpc import RPCReply
+from ncclient.xml_ import NCElement
+
+from switches.connect.junos_pyez.rpc import RawRPCReply
+from switches.connect.junos_pyez.utils import junos_iter_mac_entries
+
+REPLY_NAMESPACE = "http://xml.juniper.net/junos/21.4R0/junos-l2ald"
+
+
+def generate_mac_table_reply(entries: int) -> str:
+    """
+    Return a raw get-ethernet-switching-table-information reply with the given number of entries.
+    """
+    output = [
+        '<rpc-reply xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" '
+        'xmlns:junos="http://xml.juniper.net/junos/21.4R0/junos" message-id="urn:uuid:openl2m-benchmark">',
+        f'<l2ng-l2ald-rtb-macdb xmlns="{REPLY_NAMESPACE}">',
+        '<l2ng-l2ald-mac-entry-vlan junos:style="brief-rtb">',
+        f'<mac-count-global>{entries}</mac-count-global>',
+    ]
+    for _ in range(entries):
+        mac = ":".join(f"{random.randint(0, 255):02x}" for _ in range(6))
+        output.append(
+            "<l2ng-mac-entry>\n"
+            f"<l2ng-l2-mac-vlan-name>vlan{random.randint(1, 200)}</l2ng-l2-mac-vlan-name>\n"
+            f"<l2ng-l2-mac-address>{mac}</l2ng-l2-mac-address>\n"
+            "<l2ng-l2-mac-flags>D</l2ng-l2-mac-flags>\n"
+            "<l2ng-l2-mac-age>-</l2ng-l2-mac-age>\n"
+            f"<l2ng-l2-mac-logical-interface>ge-{random.randint(0, 3)}/0/{random.randint(0, 47)}.0"
+            "</l2ng-l2-mac-logical-interface>\n"
+            "</l2ng-mac-entry>"
+        )
+    output.append('</l2ng-l2ald-mac-entry-vlan></l2ng-l2ald-rtb-macdb></rpc-reply>')
+    return "\n".join(output)
+
+
+def parse_pyez(xml: str) -> int:
+    """
+    Handle the reply as a regular PyEZ RPC: ncclient RPC._request() parses the RPCReply(),
+    and the Junos device handler wraps it in an NCElement(), which removes the namespaces.
+    PyEZ Device._rpc_reply() then uses that tree.
+    """
+    reply = RPCReply(xml, huge_tree=True)
+    reply.parse()
+    transform = JunosDeviceHandler({'name': 'junos'}).transform_reply()
+    tree = NCElement(reply, transform, huge_tree=True)._NCElement__doc
+    count = 0
+    for entry in tree.findall('.//l2ng-mac-entry'):
+        entry.findtext('.//l2ng-l2-mac-address')
+        entry.findtext('.//l2ng-l2-mac-vlan-name')
+        entry.findtext('.//l2ng-l2-mac-logical-interface')
+        count += 1
+    return count
+
+
+def parse_raw(xml: str) -> int:
+    """
+    Handle the reply as PyEZConnector._get_raw_rpc_reply(), i.e. RawRPC(), and parse it incrementally.
+    """
+    reply = RawRPCReply(xml, huge_tree=True)
+    reply.parse()
+    count = 0
+    for _ in junos_iter_mac_entries(reply.xml):
+        count += 1
+    return count
+
+
+def _measure(function, xml: str, queue):
+    """
+    Run in a child process, so the peak memory of each parser is measured separately.
+    """
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    count = function(xml)
+    elapsed = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((count, elapsed, after - before))
+
+
+class Command(BaseCommand):
+    help = "Compare the memory use of the PyEZ and raw handling of a large Junos ethernet-switching table reply."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            type=str,
+            default='',
+            help='a recorded "show ethernet-switching table | display xml" reply. Default is to generate one.',
+        )
+        parser.add_argument(
+            '--entries',
+            type=int,
+            default=100000,
+            help='the number of entries in the generated reply. Default is 100000.',
+        )
+        parser.add_argument(
+            '--save',
+            type=str,
+            default='',
+            help='save the generated reply to this file, to re-use with --file.',
+        )
+
+    def handle(self, *args, **options):
+        if options['file']:
+            with open(options['file'], 'r') as f:
+                xml = f.read()
+            self.stdout.write(f"Read {len(xml)} characters from {options['file']}.")
+        else:
+            xml = generate_mac_table_reply(entries=options['entries'])
+            self.stdout.write(f"Generated {options['entries']} entries, {len(xml)} characters.")
+            if options['save']:
+                with open(options['save'], 'w') as f:
+                    f.write(xml)
+                self.stdout.write(f"Saved to {options['save']}.")
+
+        # fork, so the children start with the reply already in memory:
+        context = multiprocessing.get_context("fork")
+        for name, function in (("PyEZ RPC reply", parse_pyez), ("Raw RPC reply", parse_raw)):
+            queue = context.Queue()
+            process = context.Process(target=_measure, args=(function, xml, queue))
+            process.start()
+            (count, elapsed, peak) = queue.get()
+            process.join()
+            # ru_maxrss is in kilobytes on Linux:
+            self.stdout.write(f"\t{name}: {count} entries, {elapsed * 1000:.0f} ms, peak memory +{peak / 1024:.1f} MB")
+        self.stdout.write("Finished.", self.style.SUCCESS)
@@ -0,0 +1,169 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+
+#
+# add the command 'logbenchmark' to seed a large number of Log() entries,
+# and time the queries used by the activity views.
+# DO NOT run this on a production database!
+#
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from switches.constants import LOG_TYPE_CHANGE, LOG_TYPE_VIEW, LOG_TYPE_CHOICES, LOG_VIEW_SWITCH
+from switches.models import Log, Switch
+from switches.paginator import get_keyset_page
+
+BENCHMARK_DESCRIPTION = "Log benchmark entry"
+
+
+class Command(BaseCommand):
+    help = "Seed benchmark log entries, and time the activity log queries. DO NOT USE IN PRODUCTION!"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=0,
+            help='the number of log entries to add before running the queries. Default is 0 (add none).',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=180,
+            help='spread the added entries over this many days. Default is 180.',
+        )
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=100,
+            help='the number of pages to walk for the deep pagination test. Default is 100.',
+        )
+        parser.add_argument(
+            '--cleanup',
+            action='store_true',
+            help='delete all benchmark log entries, and exit.',
+        )
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            count = Log.objects.filter(description=BENCHMARK_DESCRIPTION)._raw_delete(using=connection.alias)
+            self.stdout.write(f"Deleted {count} benchmark log entries.", self.style.SUCCESS)
+            return
+
+        switch_ids = list(Switch.objects.values_list('id', flat=True))
+        if not switch_ids:
+            self.stderr.write("You need at least one device to run this benchmark!")
+            return
+        user_ids = list(User.objects.values_list('id', flat=True))
+
+        if options['rows'] > 0:
+            self.seed(rows=options['rows'], days=options['days'], switch_ids=switch_ids, user_ids=user_ids)
+
+        self.stdout.write(f"Log table has {Log.objects.count()} entries.")
+        switch_id = switch_ids[0]
+        self.timed(
+            "Device page, recent activity",
+            lambda: list(
+                Log.objects.filter(switch_id=switch_id, type__gt=LOG_TYPE_VIEW).order_by("-timestamp")[
+                    : settings.RECENT_SWITCH_LOG_COUNT
+                ]
+            ),
+        )
+        self.timed(
+            "Device activity, first page",
+            lambda: get_keyset_page(Log.objects.filter(switch_id=switch_id), per_page=settings.PAGINATE_COUNT),
+        )
+        self.timed(
+            "Device activity, COUNT(*) (old Paginator)",
+            lambda: Log.objects.filter(switch_id=switch_id).count(),
+        )
+        self.timed(
+            "All logs, first page",
+            lambda: get_keyset_page(Log.objects.all(), per_page=settings.PAGINATE_COUNT),
+        )
+        self.timed(
+            "All logs, COUNT(*) (old Paginator)",
+            lambda: Log.objects.count(),
+        )
+        self.timed(
+            "Changes filter, first page",
+            lambda: get_keyset_page(Log.objects.filter(type=LOG_TYPE_CHANGE), per_page=settings.PAGINATE_COUNT),
+        )
+        if user_ids:
+            self.timed(
+                "User filter, first page",
+                lambda: get_keyset_page(Log.objects.filter(user_id=user_ids[0]), per_page=settings.PAGINATE_COUNT),
+            )
+        self.timed(
+            f"All logs, walk {options['pages']} pages",
+            lambda: self.walk_pages(options['pages']),
+        )
+        self.stdout.write("Finished.", self.style.SUCCESS)
+
+    def seed(self, rows: int, days: int, switch_ids: list, user_ids: list):
+        """
+        Add random log entries with a single INSERT ... SELECT, which is much faster than creating objects.
+        About 80% are 'view' entries, as in a typical install.
+        """
+        self.stdout.write(f"Adding {rows} log entries over {days} days... ", ending="")
+        self.stdout.flush()
+        types = [LOG_TYPE_VIEW] * 4 + [value for value, name in LOG_TYPE_CHOICES if value != LOG_TYPE_VIEW]
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Log._meta.db_table}
+                    (timestamp, user_id, group_id, switch_id, if_index, if_name, ip_address, type, action, description)
+                SELECT
+                    now() - random() * make_interval(days => %s),
+                    (%s::bigint[])[1 + floor(random() * %s)::int],
+                    NULL,
+                    (%s::bigint[])[1 + floor(random() * %s)::int],
+                    0, '', '0.0.0.0',
+                    (%s::int[])[1 + floor(random() * %s)::int],
+                    %s,
+                    %s
+                FROM generate_series(1, %s)
+                """,
+                [
+                    days,
+                    user_ids or [None],
+                    len(user_ids) or 1,
+                    switch_ids,
+                    len(switch_ids),
+                    types,
+                    len(types),
+                    LOG_VIEW_SWITCH,
+                    BENCHMARK_DESCRIPTION,
+                    rows,
+                ],
+            )
+            cursor.execute(f"ANALYZE {Log._meta.db_table}")
+        self.stdout.write(f"done in {time.perf_counter() - start:.1f} seconds.")
+
+    def walk_pages(self, pages: int):
+        page = get_keyset_page(Log.objects.all(), per_page=settings.PAGINATE_COUNT)
+        for _ in range(pages - 1):
+            if not page.has_next:
+                break
+            page = get_keyset_page(Log.objects.all(), per_page=settings.PAGINATE_COUNT, after=page.next_cursor)
+
+    def timed(self, name: str, function):
+        start = time.perf_counter()
+        function()
+        self.stdout.write(f"\t{name}: {(time.perf_counter() - start) * 1000:.1f} ms")
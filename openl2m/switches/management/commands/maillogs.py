@@ -15,7 +15,12 @@
 # Custom command line commands, see also:
 #    https://docs.djangoproject.com/en/4.2/howto/custom-management-commands/
 #    https://simpleisbetterthancomplex.com/tutorial/2018/08/27/how-to-create-custom-django-management-commands.html
+import csv
 from datetime import timedelta
+import gzip
+import json
+import os
+import shutil
 import tempfile
 import xlsxwriter
 
@@ -32,14 +37,94 @@ from switches.constants import (
 
 MY_TIMEFORMAT = "%x %X"
 
-# the columns in the output spreadsheet, if requested:
-COLUMN_TIME = 0
-COLUMN_TYPE = 1
-COLUMN_ACTION = 2
-COLUMN_DEVICE = 3
-COLUMN_USER = 4
-COLUMN_IP = 5
-COLUMN_DESCRIPTION = 6
+# the columns in the attachment, if requested, with the spreadsheet column widths:
+COLUMNS = [
+    ("Time", 25),
+    ("Type", 10),
+    ("Action", 15),
+    ("Device", 25),
+    ("User", 15),
+    ("IP", 20),
+    ("Description", 150),
+]
+
+# how many log entries to read from the database at a time:
+QUERY_CHUNK_SIZE = 2000
+
+
+class XlsxAttachment:
+    """
+    Excel spreadsheet attachment. This uses the xlsxwriter 'constant_memory' mode,
+    where each row is written to disk as soon as the next one starts.
+    """
+
+    extension = ".xlsx"
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.row = 0
+        self.workbook = xlsxwriter.Workbook(filename, {'constant_memory': True})
+        format_bold = self.workbook.add_format({'bold': True, 'font_name': 'Calibri', 'font_size': 14})
+        self.format_regular = self.workbook.add_format({'font_name': 'Calibri', 'font_size': 12})
+        self.worksheet = self.workbook.add_worksheet()
+        for column, (header, width) in enumerate(COLUMNS):
+            self.worksheet.set_column(column, column, width)  # Adjust the column width.
+            self.worksheet.write(self.row, column, header, format_bold)
+
+    def write(self, values: list):
+        self.row += 1
+        for column, value in enumerate(values):
+            self.worksheet.write(self.row, column, value, self.format_regular)
+
+    def close(self):
+        self.workbook.close()
+
+
+class CsvAttachment:
+    """
+    gzip-compressed CSV attachment.
+    """
+
+    extension = ".csv.gz"
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = gzip.open(filename, mode="wt", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([header for header, width in COLUMNS])
+
+    def write(self, values: list):
+        self.writer.writerow(values)
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlAttachment:
+    """
+    gzip-compressed JSON Lines attachment, one log entry per line.
+    """
+
+    extension = ".jsonl.gz"
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = gzip.open(filename, mode="wt", encoding="utf-8")
+        self.keys = [header.lower() for header, width in COLUMNS]
+
+    def write(self, values: list):
+        self.file.write(json.dumps(dict(zip(self.keys, values))))
+        self.file.write("\n")
+
+    def close(self):
+        self.file.close()
+
+
+ATTACHMENT_FORMATS = {
+    "xlsx": XlsxAttachment,
+    "csv": CsvAttachment,
+    "jsonl": JsonlAttachment,
+}
 
 
 class Command(BaseCommand):
@@ -90,6 +175,21 @@ class Command(BaseCommand):
             help="Create Excel spreadsheet as attachment.",
         )
 
+        parser.add_argument(
+            "--format",
+            type=str,
+            choices=ATTACHMENT_FORMATS.keys(),
+            default="xlsx",
+            help='the attachment format: Excel, or gzip-compressed CSV or JSON Lines. Default is "xlsx".',
+        )
+
+        parser.add_argument(
+            "--max-rows",
+            type=int,
+            default=100000,
+            help="the maximum number of log entries per attachment, more are split over multiple emails. Default is 100000.",
+        )
+
         parser.add_argument(
             "--filename",
             type=str,
@@ -128,6 +228,10 @@ class Command(BaseCommand):
             self.stdout.write("Error: 'to' argument needed!", self.style.ERROR)
             return
 
+        if options["max_rows"] < 1:
+            self.stdout.write("Error: 'max-rows' needs to be 1 or more!", self.style.ERROR)
+            return
+
         # for email, "to" needs to be a list or tuple:
         to = options["to"].split(",")
 
@@ -250,96 +354,112 @@ class Command(BaseCommand):
             f"Sending most recent {options['hours']} hours of log entries for '{type}' to '{options['to']}'"
         )
 
-        # get log since cut-off time
+        # get log since cut-off time, up to now. Entries added while sending are left out,
+        # so the count and the streamed entries are the same rows:
         filter["timestamp__gt"] = cutoff_local
-        logs = Log.objects.all().exclude(action__in=excludes).filter(**filter).order_by("timestamp")
+        filter["timestamp__lte"] = now
+        logs = (
+            Log.objects.all()
+            .exclude(action__in=excludes)
+            .filter(**filter)
+            .select_related("user", "switch")
+            .order_by("timestamp")
+        )
+        count = logs.count()
 
         # go output them!
-        if logs:
-            self.stdout.write(f"Emailing {logs.count()} log records... ", self.style.WARNING)
+        if count:
+            self.stdout.write(f"Emailing {count} log records... ", self.style.WARNING)
             self.stdout.flush()
             # need for-loop here!
             lines = []
             row = 0
+            attachment = None
+            sent = 0
+            # each attachment part is sent in its own email, so no email gets too large:
+            parts = (count + options["max_rows"] - 1) // options["max_rows"]
             if options["attach"]:
-                # open the Excel file:
-                try:
-                    tmp_file = f"{tempfile.gettempdir()}/{options['filename']}"
-                    if options["verbosity"] > 1:
-                        self.stdout.write(f"Attachment filename: {tmp_file}")
-                    workbook = xlsxwriter.Workbook(tmp_file)
-                    format_bold = workbook.add_format({'bold': True, 'font_name': 'Calibri', 'font_size': 14})
-                    format_regular = workbook.add_format({'font_name': 'Calibri', 'font_size': 12})
-
-                    worksheet = workbook.add_worksheet()
-
-                    worksheet.write(row, COLUMN_TIME, "Time", format_bold)
-                    worksheet.set_column(COLUMN_TIME, COLUMN_TIME, 25)  # Adjust the column width.
-
-                    worksheet.write(row, COLUMN_TYPE, "Type", format_bold)
-                    worksheet.set_column(COLUMN_TYPE, COLUMN_TYPE, 10)  # Adjust the column width.
-
-                    worksheet.write(row, COLUMN_ACTION, "Action", format_bold)
-                    worksheet.set_column(COLUMN_ACTION, COLUMN_ACTION, 15)  # Adjust the column width.
-
-                    worksheet.write(row, COLUMN_DEVICE, "Device", format_bold)
-                    worksheet.set_column(COLUMN_DEVICE, COLUMN_DEVICE, 25)  # Adjust the column width.
-
-                    worksheet.write(row, COLUMN_USER, "User", format_bold)
-                    worksheet.set_column(COLUMN_USER, COLUMN_USER, 15)  # Adjust the column width.
-
-                    worksheet.write(row, COLUMN_IP, "IP", format_bold)
-                    worksheet.set_column(COLUMN_IP, COLUMN_IP, 20)  # Adjust the column width.
-
-                    worksheet.write(row, COLUMN_DESCRIPTION, "Description", format_bold)
-                    worksheet.set_column(COLUMN_DESCRIPTION, COLUMN_DESCRIPTION, 150)  # Adjust the column width.
-
-                    lines.append("Log entries are in the attached file!")
-                except Exception as err:
-                    self.stdout.write(
-                        f"ERROR creating attachment at '{tmp_file}': {err}",
-                        self.style.ERROR,
-                    )
-                    return
+                lines.append("Log entries are in the attached file!")
+                tmp_dir = tempfile.mkdtemp()
+                attachment_class = ATTACHMENT_FORMATS[options["format"]]
+                base_name = options["filename"]
+                for extension in ATTACHMENT_FORMATS.values():
+                    base_name = base_name.removesuffix(extension.extension)
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"Attachment directory: {tmp_dir}")
 
-            for log in logs:
-                row += 1
-                entry = f"#{row}, {log.timestamp.strftime(MY_TIMEFORMAT)}, type '{log_types[log.type]}', action '{log_actions[log.action]}', client ip '{log.ip_address}', device '{log.switch}', description '{log.description}'"
-                timestamp = log.timestamp.astimezone(tz=None)
+            try:
+                # stream from the database, instead of loading all entries in memory:
+                for log in logs.iterator(chunk_size=QUERY_CHUNK_SIZE):
+                    row += 1
+                    entry = f"#{row}, {log.timestamp.strftime(MY_TIMEFORMAT)}, type '{log_types[log.type]}', action '{log_actions[log.action]}', client ip '{log.ip_address}', device '{log.switch}', description '{log.description}'"
+                    timestamp = log.timestamp.astimezone(tz=None)
+                    if options["attach"]:
+                        if attachment is None or (row - 1) % options["max_rows"] == 0:
+                            # send the previous attachment file, and start the next one:
+                            if attachment:
+                                self.send_attachment(attachment, sent + 1, parts, lines, to, options)
+                                sent += 1
+                            part = f"_{sent + 1}" if parts > 1 else ""
+                            attachment = attachment_class(
+                                os.path.join(tmp_dir, f"{base_name}{part}{attachment_class.extension}")
+                            )
+                        attachment.write(
+                            [
+                                timestamp.strftime(MY_TIMEFORMAT),
+                                log_types[log.type],
+                                log_actions[log.action],
+                                f"{log.switch}",
+                                f"{log.user}",
+                                log.ip_address,
+                                log.description,
+                            ]
+                        )
+                    else:
+                        lines.append(entry)
+                    if options["verbosity"] > 1:
+                        self.stdout.write(entry)
+                if attachment:
+                    self.send_attachment(attachment, sent + 1, parts, lines, to, options)
+            except Exception as err:
+                self.stdout.write(f"ERROR creating or emailing attachment: {err}", self.style.ERROR)
                 if options["attach"]:
-                    worksheet.write(row, COLUMN_TIME, timestamp.strftime(MY_TIMEFORMAT), format_regular)
-                    worksheet.write(row, COLUMN_TYPE, log_types[log.type], format_regular)
-                    worksheet.write(row, COLUMN_ACTION, log_actions[log.action], format_regular)
-                    worksheet.write(row, COLUMN_DEVICE, f"{log.switch}", format_regular)
-                    worksheet.write(row, COLUMN_USER, f"{log.user}", format_regular)
-                    worksheet.write(row, COLUMN_IP, log.ip_address, format_regular)
-                    worksheet.write(row, COLUMN_DESCRIPTION, log.description, format_regular)
-                else:
-                    lines.append(entry)
-                if options["verbosity"] > 1:
-                    self.stdout.write(entry)
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                return
 
-            if options["attach"]:
+            # email it:
+            if not options["attach"]:
                 try:
-                    workbook.close()
+                    self.send_email(subject=options["subject"], lines=lines, to=to)
                 except Exception as err:
-                    self.stdout.write(f"ERROR saving attachment file '{tmp_file}': {err}")
-                    return
-
-            # email it:
-            try:
-                message = EmailMessage(
-                    subject=options["subject"],
-                    body="\n".join(lines),
-                    from_email=f"OpenL2M Log Mailer {settings.EMAIL_FROM_ADDRESS}",
-                    to=to,
-                )
-                if options["attach"]:
-                    message.attach_file(tmp_file)
-                message.send()
-            except Exception as err:
-                self.stdout.write(f"ERROR emailing: {err}", self.style.ERROR)
+                    self.stdout.write(f"ERROR emailing: {err}", self.style.ERROR)
+            else:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
         else:
             self.stdout.write("No log records found.")
 
         self.stdout.write("Finished.", self.style.SUCCESS)
+
+    def send_attachment(self, attachment, part: int, parts: int, lines: list, to: list, options: dict):
+        """
+        Close an attachment file, email it, and remove it, so only one part is on disk at a time.
+        """
+        attachment.close()
+        subject = options["subject"]
+        if parts > 1:
+            subject = f"{subject} (part {part} of {parts})"
+        self.send_email(subject=subject, lines=lines, to=to, filename=attachment.filename)
+        os.remove(attachment.filename)
+        if options["verbosity"] > 1:
+            self.stdout.write(f"Emailed {attachment.filename}")
+
+    def send_email(self, subject: str, lines: list, to: list, filename: str = ""):
+        message = EmailMessage(
+            subject=subject,
+            body="\n".join(lines),
+            from_email=f"OpenL2M Log Mailer {settings.EMAIL_FROM_ADDRESS}",
+            to=to,
+        )
+        if filename:
+            message.attach_file(filename)
+        message.send()
@@ -0,0 +1,279 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+
+#
+# add the command 'poller', a long-running process that periodically reads selected devices,
+# and saves their state in the shared device cache, see switches/devicecache.py
+# The first view of these devices is then shown without reading the device.
+# It also reads the ARP tables of the 'ARP source' devices of all groups into the same cache.
+#
+import argparse
+import datetime
+import random
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection as db_connection
+from django.utils import timezone
+
+from switches.connect.connect import create_connection_object
+from switches.constants import LOG_VIEW_SWITCH, SWITCH_STATUS_ACTIVE
+from switches import hostindex
+from switches.devicecache import save_arp_table, save_snapshot
+from switches.models import LogDailyActivity, Switch, SwitchGroup
+
+
+def select_devices(top_accessed: int, activity_days: int) -> dict:
+    """
+    Find the devices to pre-read: the most accessed devices, the devices viewed recently,
+    and the devices in groups with the 'prefetch' option set.
+
+    Returns:
+        (dict): the SwitchGroup() to read each Switch() with, keyed by Switch()
+    """
+    switch_ids = set()
+    if top_accessed:
+        switch_ids.update(
+            Switch.objects.filter(status=SWITCH_STATUS_ACTIVE, access_count__gt=0)
+            .order_by('-access_count')
+            .values_list('id', flat=True)[:top_accessed]
+        )
+    if activity_days:
+        first_day = timezone.localdate() - datetime.timedelta(days=activity_days - 1)
+        switch_ids.update(
+            LogDailyActivity.objects.filter(day__gte=first_day, action=LOG_VIEW_SWITCH, switch_id__gt=0)
+            .values_list('switch_id', flat=True)
+            .distinct()
+        )
+    prefetch_groups = SwitchGroup.objects.filter(prefetch=True)
+    switch_ids.update(
+        Switch.objects.filter(switchgroups__in=prefetch_groups).values_list('id', flat=True).distinct()
+    )
+
+    devices = {}
+    for switch in (
+        Switch.objects.filter(id__in=switch_ids, status=SWITCH_STATUS_ACTIVE)
+        .select_related('snmp_profile', 'netmiko_profile')
+        .prefetch_related('switchgroups')
+    ):
+        # the device state does not depend on the group, but read with a 'prefetch' group if we can:
+        groups = sorted(switch.switchgroups.all(), key=lambda group: (not group.prefetch, group.name))
+        if groups:
+            devices[switch] = groups[0]
+    return devices
+
+
+def read_device(switch: Switch, group: SwitchGroup, client_data: bool) -> str:
+    """
+    Read the device, and save the state in the shared device cache. This runs in a worker thread.
+    If client_data is True, also read the ethernet and arp tables, to update the host index.
+
+    Returns:
+        (str): an error description, or "" if OK.
+    """
+    try:
+        connection = create_connection_object(request=None, group=group, switch=switch)
+        if not connection.get_basic_info() or connection.error.status:
+            return f"{connection.error.description} {connection.error.details}"
+        # errors here are already added to the warnings, we still have the basic info:
+        connection.get_hardware_details()
+        save_snapshot(switch=switch, data=connection.get_snapshot())
+        # the ethernet and arp tables are not part of the snapshot, these are always read live when viewed:
+        if client_data and connection.can_get_client_data:
+            if not connection.get_client_data():
+                return f"{connection.error.description} {connection.error.details}"
+        return ""
+    except Exception as err:
+        return f"{err}"
+    finally:
+        # each worker thread has its own database connection:
+        db_connection.close()
+
+
+def select_arp_sources() -> dict:
+    """
+    Find the 'ARP source' devices of all groups.
+
+    Returns:
+        (dict): the SwitchGroup() to read each Switch() with, keyed by Switch()
+    """
+    sources = {}
+    for group in SwitchGroup.objects.prefetch_related('arp_sources').order_by('name'):
+        for switch in group.arp_sources.all():
+            if switch.status == SWITCH_STATUS_ACTIVE and switch not in sources:
+                sources[switch] = group
+    return sources
+
+
+def read_arp_source(switch: Switch, group: SwitchGroup) -> str:
+    """
+    Read the ARP table of an 'ARP source' device, and save it in the shared device cache,
+    and the host index. This runs in a worker thread.
+
+    Returns:
+        (str): an error description, or "" if OK.
+    """
+    try:
+        connection = create_connection_object(request=None, group=group, switch=switch)
+        table = connection.get_arp_table()
+        if not table and connection.error.status:
+            return f"{connection.error.description} {connection.error.details}"
+        save_arp_table(switch=switch, table=table)
+        if settings.HOST_INDEX_ENABLED:
+            hostindex.update_addresses(switch=switch, table=table)
+        return ""
+    except Exception as err:
+        return f"{err}"
+    finally:
+        db_connection.close()
+
+
+class Command(BaseCommand):
+    help = "Periodically read the most used devices, so their first view is shown immediately."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=settings.POLLER_INTERVAL,
+            help=f'the seconds between reads of a device. Default is {settings.POLLER_INTERVAL}.',
+        )
+        parser.add_argument(
+            '--jitter',
+            type=int,
+            default=settings.POLLER_JITTER,
+            help=f'the maximum random seconds added to the interval, to spread out the reads. Default is {settings.POLLER_JITTER}.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.POLLER_MAX_WORKERS,
+            help=f'the number of devices read at the same time. Default is {settings.POLLER_MAX_WORKERS}.',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=settings.POLLER_TOP_ACCESSED,
+            help=f'read this number of most accessed devices. Default is {settings.POLLER_TOP_ACCESSED}.',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.POLLER_ACTIVITY_DAYS,
+            help=f'read the devices viewed in this number of recent days. Default is {settings.POLLER_ACTIVITY_DAYS}.',
+        )
+        parser.add_argument(
+            '--client-data',
+            action=argparse.BooleanOptionalAction,
+            default=settings.POLLER_CLIENT_DATA,
+            help='also read the ethernet and arp tables, to update the host index.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='read all selected devices once, and exit.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.POLLER_ENABLED:
+            self.stdout.write("The poller is not enabled, see POLLER_ENABLED in the configuration!", self.style.ERROR)
+            return
+        backend = settings.CACHES.get(settings.POLLER_CACHE, {}).get('BACKEND', "")
+        if backend.endswith('LocMemCache'):
+            self.stdout.write(
+                f"WARNING: cache '{settings.POLLER_CACHE}' is a local memory cache, "
+                "and is not shared with the web server!",
+                self.style.WARNING,
+            )
+        self.verbosity = options['verbosity']
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        interval = max(options['interval'], 10)
+        jitter = max(options['jitter'], 0)
+        workers = max(options['workers'], 1)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="openl2m-poller")
+        # a job is a device read, or an ARP source read, keyed by (type, Switch().id)
+        running = {}  # the futures of the jobs running, keyed by job key
+        next_read = {}  # the time.monotonic() a job runs next, keyed by job key
+        read_count = 0
+        jobs = self.update_selection(options, next_read, jitter=0 if options['once'] else jitter)
+        next_selection = time.monotonic() + interval
+        try:
+            while not self.stopping:
+                now = time.monotonic()
+                if now >= next_selection and not options['once']:
+                    # pick up changes in device access, and the group settings:
+                    jobs = self.update_selection(options, next_read, jitter)
+                    next_selection = now + interval
+
+                # collect the finished jobs, and schedule the next run:
+                for key, (switch, job_interval, future) in list(running.items()):
+                    if future.done():
+                        del running[key]
+                        self.report(switch, future.result())
+                        read_count += 1
+                        next_read[key] = time.monotonic() + job_interval + random.uniform(0, jitter)
+                if options['once'] and read_count >= len(jobs):
+                    break
+
+                # and start the jobs that are due, up to the number of workers:
+                for key, (switch, group, function, args, job_interval) in jobs.items():
+                    if len(running) >= workers:
+                        break
+                    if key not in running and key in next_read and next_read[key] <= now:
+                        running[key] = (switch, job_interval, pool.submit(function, switch, group, *args))
+                time.sleep(1)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        self.stdout.write("Finished.", self.style.SUCCESS)
+
+    def update_selection(self, options: dict, next_read: dict, jitter: int) -> dict:
+        """
+        Select the devices and ARP sources to read. New jobs run within the next 'jitter' seconds,
+        so a (re)start of the poller does not read all devices at the same time.
+        """
+        interval = max(options['interval'], 10)
+        jobs = {}
+        devices = select_devices(top_accessed=options['top'], activity_days=options['days'])
+        for switch, group in devices.items():
+            jobs[('device', switch.id)] = (switch, group, read_device, (options['client_data'],), interval)
+        sources = select_arp_sources()
+        for switch, group in sources.items():
+            jobs[('arp', switch.id)] = (switch, group, read_arp_source, (), max(settings.ARP_SOURCE_INTERVAL, 10))
+        now = time.monotonic()
+        for key in jobs:
+            if key not in next_read:
+                next_read[key] = now + random.uniform(0, jitter)
+        # forget the jobs no longer selected:
+        for key in list(next_read.keys()):
+            if key not in jobs:
+                del next_read[key]
+        if self.verbosity > 1:
+            self.stdout.write(f"{len(devices)} devices and {len(sources)} ARP sources selected")
+        return jobs
+
+    def report(self, switch: Switch, error: str):
+        if error:
+            self.stdout.write(f"{switch.name}: {error}", self.style.ERROR)
+        elif self.verbosity > 1:
+            self.stdout.write(f"{switch.name}: OK")
+
+    def stop(self, signum, frame):
+        self.stdout.write("Stopping...")
+        self.stopping = True
@@ -0,0 +1,114 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+
+#
+# add the command 'regexbenchmark' to time the command template output filtering
+# on a large generated "show mac address-table" output. This does not read any device.
+#
+import random
+import re
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from switches.multicommand import filter_template_output
+
+
+def generate_mac_table(lines: int) -> str:
+    """
+    Return a Cisco-style "show mac address-table" output with the given number of entries.
+    """
+    output = ["          Mac Address Table", "-------------------------------------------", ""]
+    output.append("Vlan    Mac Address       Type        Ports")
+    output.append("----    -----------       --------    -----")
+    for _ in range(lines):
+        mac = "".join(random.choice("0123456789abcdef") for _ in range(12))
+        output.append(
+            f"{random.randint(1, 200):4d}    {mac[0:4]}.{mac[4:8]}.{mac[8:12]}    DYNAMIC     "
+            f"Gi{random.randint(1, 8)}/0/{random.randint(1, 48)}"
+        )
+    output.append(f"Total Mac Addresses for this criterion: {lines}")
+    return "\r\n".join(output)
+
+
+def filter_output_per_line(template, output: str) -> str:
+    """
+    The output filter as it was before the compiled regex cache: a regex lookup for every line,
+    and the kept lines added to a growing string.
+    """
+    result = output
+    if template.output_match_regex:
+        if re.search(template.output_match_regex, output):
+            result = template.output_match_text if template.output_match_text else "OK!"
+        else:
+            result = template.output_fail_text if template.output_fail_text else "FAIL!"
+    if template.output_lines_keep_regex:
+        matched_lines = ""
+        for line in output.splitlines():
+            if re.search(template.output_lines_keep_regex, line):
+                matched_lines = f"{matched_lines}\n{line}"
+        if matched_lines:
+            result += "\nPartial output:\n" + matched_lines
+    return result
+
+
+class Command(BaseCommand):
+    help = "Time the command template output filtering on a large generated 'show mac address-table' output."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lines',
+            type=int,
+            default=100000,
+            help='the number of lines in the generated output. Default is 100000.',
+        )
+        parser.add_argument(
+            '--keep',
+            type=str,
+            default=r"^\s*10\s",
+            help='the "output lines keep" regex. Default matches the entries in vlan 10.',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='the number of times to run each filter. Default is 5.',
+        )
+
+    def handle(self, *args, **options):
+        output = generate_mac_table(lines=options['lines'])
+        self.stdout.write(f"Generated {options['lines']} lines, {len(output)} bytes.")
+        template = SimpleNamespace(
+            output_match_regex=r"Total Mac Addresses",
+            output_match_text="Found the MAC table",
+            output_fail_text="",
+            output_lines_keep_regex=options['keep'],
+        )
+        old = self.timed("Per-line regex, string concatenation", filter_output_per_line, template, output, options)
+        new = self.timed("Compiled regex cache, single pass", filter_template_output, template, output, options)
+        if old.splitlines() != new.splitlines():
+            self.stdout.write("WARNING: the results are different!", self.style.WARNING)
+        self.stdout.write(f"Kept {len(new.splitlines()) - 3} lines.")
+        self.stdout.write("Finished.", self.style.SUCCESS)
+
+    def timed(self, name: str, function, template, output: str, options: dict) -> str:
+        best = None
+        for _ in range(max(options['runs'], 1)):
+            start = time.perf_counter()
+            result = function(template, output)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        self.stdout.write(f"\t{name}: {best * 1000:.1f} ms (best of {options['runs']})")
+        return result
@@ -21,21 +21,59 @@
 # this is heavily inspired by the Netbox housekeeping code in
 # /netbox/extras/management/commands/housekeeping.py
 #
+# Entries are deleted in batches, see switches/retention.py. If the Log() table is partitioned by month,
+# expired months are dropped as a whole, and partitions for the coming months are created.
+# This also removes the old entries of the host location index, see switches/hostindex.py
+#
 
+import os
 from datetime import timedelta
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from django.db import DEFAULT_DB_ALIAS
 
-from switches.models import Log
+from switches import hostindex, retention
 
 
 class Command(BaseCommand):
     help = "Remove log entries older then configured number of days."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.LOG_DELETE_BATCH_SIZE,
+            help=f'delete entries in batches of this many ids. Default is {settings.LOG_DELETE_BATCH_SIZE}.',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=settings.LOG_DELETE_PAUSE,
+            help=f'seconds to pause between batches. Default is {settings.LOG_DELETE_PAUSE}.',
+        )
+        parser.add_argument(
+            '--archive',
+            default=settings.LOG_ARCHIVE_DIR,
+            help='directory to write the expired entries to as a compressed JSON Lines file before they are removed.',
+        )
+        parser.add_argument(
+            '--partition',
+            action='store_true',
+            help='convert the log table to monthly partitions. This copies all entries, stop OpenL2M first!',
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=3,
+            help='with a partitioned log table, create partitions for this many future months. Default is 3.',
+        )
+
     def handle(self, *args, **options):
+        if options['partition']:
+            self.partition(months_ahead=options['months_ahead'])
+            return
+
         # Remove log entries older then configured value...
         self.stdout.write("Checking for old log entries to remove:")
         if settings.LOG_MAX_AGE:
@@ -43,20 +81,60 @@ class Command(BaseCommand):
             if options['verbosity'] > 1:
                 self.stdout.write(f"\tRetention period: {settings.LOG_MAX_AGE} days")
                 self.stdout.write(f"\tCut-off time: {cutoff}")
-            expired_records = Log.objects.filter(timestamp__lt=cutoff).count()
-            if expired_records:
-                self.stdout.write(
-                    f"\tDeleting {expired_records} expired log records... ", self.style.WARNING, ending=""
+            archive = None
+            if options['archive']:
+                filename = os.path.join(options['archive'], f"openl2m-logs-{timezone.localdate().isoformat()}.jsonl.gz")
+                archive = retention.LogArchive(filename)
+                self.stdout.write(f"\tArchiving expired log records to {filename}")
+            try:
+                if retention.is_partitioned():
+                    retention.create_future_partitions(
+                        months_ahead=options['months_ahead'], progress=lambda message: self.stdout.write(f"\t{message}")
+                    )
+                    dropped = retention.drop_expired_partitions(
+                        cutoff=cutoff, archive=archive, progress=self.partition_progress
+                    )
+                    self.stdout.write(f"\tDropped {dropped} expired partitions.")
+                deleted = retention.delete_in_batches(
+                    cutoff=cutoff,
+                    batch_size=options['batch_size'],
+                    pause=options['pause'],
+                    archive=archive,
+                    progress=self.batch_progress if options['verbosity'] > 1 else None,
                 )
-                self.stdout.flush()
-                try:
-                    Log.objects.filter(timestamp__lt=cutoff)._raw_delete(using=DEFAULT_DB_ALIAS)
-                except Exception:
-                    self.stderr.write("Error deleting log entries!")
-                self.stdout.write("Done!", self.style.WARNING)
-            else:
-                self.stdout.write("\tNo expired log records found.")
+                if deleted:
+                    self.stdout.write(f"\tDeleted {deleted} expired log records.", self.style.WARNING)
+                else:
+                    self.stdout.write("\tNo expired log records found.")
+            except Exception as err:
+                self.stderr.write(f"Error deleting log entries: {err}")
+            finally:
+                if archive:
+                    archive.close()
+                    self.stdout.write(f"\tArchived {archive.count} log records.")
         else:
             self.stdout.write(f"\tNo-Op: No log maximum age set! (LOG_MAX_AGE = {settings.LOG_MAX_AGE})")
 
+        # and the hosts in the host location index that were not seen recently:
+        if settings.HOST_INDEX_MAX_AGE:
+            locations, addresses = hostindex.prune(max_age=settings.HOST_INDEX_MAX_AGE)
+            self.stdout.write(f"\tRemoved {locations} host locations and {addresses} host addresses.")
+
+        self.stdout.write("Finished.", self.style.SUCCESS)
+
+    def batch_progress(self, deleted: int, last_id: int, max_id: int):
+        self.stdout.write(f"\t\tDeleted {deleted} entries, at id {last_id} of {max_id}")
+
+    def partition_progress(self, name: str):
+        self.stdout.write(f"\t\tDropped partition {name}")
+
+    def partition(self, months_ahead: int):
+        self.stdout.write("Converting the log table to monthly partitions:")
+        if retention.is_partitioned():
+            self.stdout.write("\tNo-Op: the log table is already partitioned.")
+        else:
+            copied = retention.convert_to_partitioned(
+                months_ahead=months_ahead, progress=lambda message: self.stdout.write(f"\t{message}")
+            )
+            self.stdout.write(f"\tCopied {copied} log records.")
         self.stdout.write("Finished.", self.style.SUCCESS)
@@ -0,0 +1,56 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+
+#
+# add the command 'rolluplogs' to (re)build the daily log activity rollups and totals from the Log() table.
+# The rollups are maintained automatically as logs are written,
+# so this is only needed after the first upgrade to a version with rollups, or to correct the counts.
+# Today is not rebuilt, as its rollups are still being updated.
+#
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from switches.rollups import rebuild, rebuild_daily_totals
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily log activity rollups from the log entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=31,
+            help='the number of most recent days to rebuild, not including today. Default is 31.',
+        )
+
+    def handle(self, *args, **options):
+        # today is still open, see rebuild()
+        last_day = timezone.localdate() - datetime.timedelta(days=1)
+        first_day = last_day - datetime.timedelta(days=max(options['days'], 1) - 1)
+        self.stdout.write(f"Rebuilding daily log rollups from {first_day} to {last_day}:")
+        # one day at a time, to keep the transactions short.
+        day = first_day
+        while day <= last_day:
+            count = rebuild(first_day=day, last_day=day)
+            if options['verbosity'] > 1:
+                self.stdout.write(f"\t{day}: {count} rollup rows")
+            day += datetime.timedelta(days=1)
+        # and the daily totals:
+        count = rebuild_daily_totals(first_day=first_day, last_day=last_day)
+        if options['verbosity'] > 1:
+            self.stdout.write(f"\t{count} daily total rows")
+        self.stdout.write("Finished.", self.style.SUCCESS)
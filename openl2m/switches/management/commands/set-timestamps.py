@@ -68,7 +68,7 @@ class Command(BaseCommand):
                     try:
                         switch = Switch.objects.get(pk=log.object_id)
                         switch.created = log.action_time
-                        switch.save()
+                        switch.save(update_fields=['created'])
                         self.stdout.write("  Creation timestamp set!")
                         create_added += 1
                     except Exception as err:
@@ -110,7 +110,7 @@ class Command(BaseCommand):
                         log.switch.last_accessed = log.timestamp
                         self.stdout.write(f"  Access timestamp set on '{log.switch.name}': {log.timestamp}")
                     log.switch.access_count += 1
-                    log.switch.save()
+                    log.switch.save(update_fields=['last_accessed', 'access_count'])
                     access_added += 1
                 except Exception as err:
                     self.stdout.write(f"ERROR setting switch access: {err}")
@@ -129,7 +129,7 @@ class Command(BaseCommand):
                         log.switch.last_changed = log.timestamp
                         self.stdout.write(f"  Change timestamp set on '{log.switch.name}': {log.timestamp}")
                     log.switch.change_count += 1
-                    log.switch.save()
+                    log.switch.save(update_fields=['last_changed', 'change_count'])
                     change_added += 1
                 except Exception as err:
                     self.stdout.write(f"ERROR setting switch change: {err}")
@@ -144,7 +144,7 @@ class Command(BaseCommand):
                         log.switch.last_command_time = log.timestamp
                         self.stdout.write(f"  Command timestamp set on '{log.switch.name}': {log.timestamp}")
                     log.switch.command_count += 1
-                    log.switch.save()
+                    log.switch.save(update_fields=['last_command_time', 'command_count'])
                     command_added += 1
                 except Exception as err:
                     self.stdout.write(f"ERROR setting switch command: {err}")
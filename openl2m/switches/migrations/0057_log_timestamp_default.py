@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-19 09:50
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('switches', '0056_snmpprofile_read_only_alter_switch_read_only_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='log',
+            name='timestamp',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('switches', '0057_log_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogDailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('type', models.PositiveSmallIntegerField(default=0)),
+                ('action', models.PositiveSmallIntegerField(default=1)),
+                ('switch_id', models.PositiveIntegerField(default=0)),
+                ('user_id', models.PositiveIntegerField(default=0)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily Log Activity',
+                'ordering': ['day'],
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('day', 'type', 'action', 'switch_id', 'user_id'), name='unique_log_daily_activity'
+                    )
+                ],
+            },
+        ),
+    ]
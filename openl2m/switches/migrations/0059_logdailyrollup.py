@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('switches', '0058_logdailyactivity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('type', models.PositiveSmallIntegerField(default=0)),
+                ('action', models.PositiveSmallIntegerField(default=1)),
+                ('entries', models.PositiveBigIntegerField(default=0, help_text='Number of log entries.')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily Log Rollups',
+                'ordering': ['day'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'type', 'action'), name='unique_log_daily_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-19 13:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the Log table can be very large, so build the indexes without locking out writes.
+    atomic = False
+
+    dependencies = [
+        ('switches', '0059_logdailyrollup'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='log',
+            index=models.Index(fields=['-timestamp', '-id'], name='log_timestamp_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='log',
+            index=models.Index(fields=['switch', '-timestamp', '-id'], name='log_switch_timestamp_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='log',
+            index=models.Index(fields=['type', '-timestamp', '-id'], name='log_type_timestamp_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='log',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='log_user_timestamp_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='log',
+            index=models.Index(
+                condition=models.Q(('type__gt', 0)), fields=['switch', '-timestamp'], name='log_switch_activity_idx'
+            ),
+        ),
+    ]
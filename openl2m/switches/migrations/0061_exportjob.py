@@ -0,0 +1,168 @@
+# Generated by Django 5.1.3 on 2026-10-19 13:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('switches', '0060_log_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='log',
+            name='action',
+            field=models.PositiveSmallIntegerField(
+                choices=[
+                    (0, 'View Switch Groups'),
+                    (1, 'View Switch'),
+                    (2, 'View Interface'),
+                    (3, 'View PoE'),
+                    (4, 'View Vlans'),
+                    (5, 'View LLDP'),
+                    (6, 'Viewing All Logs'),
+                    (7, 'Viewing Site Statistics'),
+                    (8, 'Viewing Tasks'),
+                    (9, 'Viewing Task Details'),
+                    (10, 'Searching for Switch Name'),
+                    (11, 'Download Eth/Arp/LLDP'),
+                    (12, 'Download Interfaces'),
+                    (13, 'View Top Activity'),
+                    (14, 'Export Group Inventory'),
+                    (90, 'Login'),
+                    (91, 'Logout'),
+                    (92, 'Inactivity Logout'),
+                    (93, 'Login Failed'),
+                    (94, 'LDAP Login'),
+                    (95, 'API Login'),
+                    (100, 'Reloading Switch Data'),
+                    (101, 'New System ObjectID Found'),
+                    (102, 'New System Name Found'),
+                    (103, 'Interface Disable'),
+                    (104, 'Interface Enable'),
+                    (105, 'Interface Toggle'),
+                    (106, 'Interface PoE Disable'),
+                    (107, 'Interface PoE Enable'),
+                    (108, 'Interface PoE Toggle'),
+                    (109, 'Interface PVID Vlan Change'),
+                    (110, 'Interface Description Change'),
+                    (111, 'Saving Configuration'),
+                    (112, 'Execute Command'),
+                    (113, 'Port PoE Fault'),
+                    (114, 'LDAP New SwitchGroup'),
+                    (115, 'Bulk Edit'),
+                    (116, 'Bulk Edit Task Submit'),
+                    (117, 'Bulk Edit Task Started'),
+                    (118, 'Bulk Edit Task Ended OK'),
+                    (119, 'Bulk Edit Task Ended With Errors'),
+                    (120, 'Task Deleted'),
+                    (121, 'Task Terminated'),
+                    (122, 'Email Sent'),
+                    (123, 'VLAN Add'),
+                    (124, 'VLAN Edit'),
+                    (125, 'VLAN Delete'),
+                    (256, 'Undefined Vlan'),
+                    (257, 'Vlan Name Mismatch'),
+                    (258, 'SNMP Error'),
+                    (126, 'LDAP User->SwitchGroup'),
+                    (259, 'LDAP User->SwitchGroup Error'),
+                    (260, 'LDAP Create SwitchGroup Error'),
+                    (264, 'LDAP Backend Error'),
+                    (261, 'Bulk Edit Job Start Error'),
+                    (262, 'Email Error'),
+                    (263, 'Connection Error'),
+                    (301, 'Napalm Driver'),
+                    (302, 'Napalm Open'),
+                    (303, 'Napalm Facts'),
+                    (304, 'Napalm Interfaces'),
+                    (305, 'Napalm Vlans'),
+                    (306, 'Napalm Interface IP'),
+                    (307, 'Napalm MAC'),
+                    (308, 'Napalm ARP'),
+                    (309, 'Napalm LLDP'),
+                    (321, 'AOS-Cx Error'),
+                    (201, 'API Token Created'),
+                    (202, 'API Token Deleted'),
+                    (203, 'API Token Edited'),
+                    (509, 'Interface Not Found'),
+                    (510, 'Interface Access Denied'),
+                    (511, 'Generic Error'),
+                    (512, 'Access Denied'),
+                    (601, 'API Get Users'),
+                    (602, 'API New User'),
+                    (603, 'API Get User'),
+                    (604, 'API Edit User'),
+                    (606, 'API Get Switches'),
+                    (607, 'API New Switch'),
+                    (608, 'API Get Switch'),
+                    (609, 'API Edit Switch'),
+                    (611, 'API Get SwitchGroups'),
+                    (612, 'API New SwitchGroup'),
+                    (613, 'API Get SwitchGroup'),
+                    (614, 'API Edit SwitchGroup'),
+                    (616, 'API Get SnmpProfiles'),
+                    (617, 'API New SnmpProfile'),
+                    (618, 'API Get SnmpProfile'),
+                    (619, 'API Edit SnmpProfile'),
+                    (621, 'API Get NetmikoProfiles'),
+                    (622, 'API New NetmikoProfile'),
+                    (623, 'API Get NetmikoProfile'),
+                    (624, 'API Edit NetmikoProfile'),
+                ],
+                default=1,
+                verbose_name='Activity or Action to log',
+            ),
+        ),
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'format',
+                    models.CharField(
+                        choices=[['xlsx', 'Excel spreadsheet'], ['jsonl', 'Compressed JSON Lines']],
+                        default='xlsx',
+                        max_length=8,
+                    ),
+                ),
+                (
+                    'status',
+                    models.PositiveSmallIntegerField(choices=[[0, 'Running'], [1, 'Done'], [2, 'Failed']], default=0),
+                ),
+                ('total', models.PositiveIntegerField(default=0, help_text='Number of devices to export.')),
+                ('done', models.PositiveIntegerField(default=0, help_text='Number of devices finished, including errors.')),
+                ('errors', models.PositiveIntegerField(default=0, help_text='Number of devices that could not be read.')),
+                ('filename', models.CharField(blank=True, help_text='The export file on the server.', max_length=255)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                (
+                    'updated',
+                    models.DateTimeField(
+                        blank=True, help_text='The last time the running job saved its progress.', null=True
+                    ),
+                ),
+                (
+                    'group',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='switches.switchgroup'
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='export_jobs',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name_plural': 'Export Jobs',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
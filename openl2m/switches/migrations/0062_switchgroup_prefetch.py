@@ -0,0 +1,22 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('switches', '0061_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='switchgroup',
+            name='prefetch',
+            field=models.BooleanField(
+                default=False,
+                help_text='If set, the devices in this group are read periodically by the "poller" command, so the first view of a device is shown immediately.',
+                verbose_name='Pre-read devices',
+            ),
+        ),
+    ]
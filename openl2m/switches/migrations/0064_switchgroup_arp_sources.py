@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('switches', '0063_hostlocation_hostaddress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='switchgroup',
+            name='arp_sources',
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="The routers with the ARP tables for the devices in this group. These are read by the 'poller' command, and used to show the IP addresses of ethernet addresses on all devices in this group.",
+                related_name='arp_source_groups',
+                to='switches.switch',
+                verbose_name='ARP Sources',
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('switches', '0064_switchgroup_arp_sources'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='switch',
+            name='driver_name',
+            field=models.CharField(
+                blank=True,
+                default='',
+                help_text='The device driver found for this switch, see the Device Drivers page.',
+                max_length=64,
+                verbose_name='Driver',
+            ),
+        ),
+        migrations.AddField(
+            model_name='switch',
+            name='sys_object_id',
+            field=models.CharField(
+                blank=True,
+                default='',
+                help_text='The SNMP sysObjectID the driver was found with.',
+                max_length=128,
+                verbose_name='System Object ID',
+            ),
+        ),
+    ]
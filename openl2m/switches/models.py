@@ -12,7 +12,6 @@
 # License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
 #
 import datetime
-import logging.handlers
 import json
 
 from django.db import models
@@ -26,8 +25,11 @@ from django.utils import timezone
 # from libraries.django_ordered_model.ordered_model.models import OrderedModelManager, OrderedModel
 from ordered_model.models import OrderedModelManager, OrderedModel
 
+from counters.buffer import buffered_increment
+
 import switches.constants as constants
 from switches.connect.constants import NETMIKO_DEVICE_TYPES, NAPALM_DEVICE_TYPES
+from switches import devicecache, logwriter, rollups
 from switches.utils import is_valid_hostname_or_ip
 
 
@@ -776,6 +778,16 @@ class VlanGroup(models.Model):
 # Switches
 #
 
+# the Switch() fields updated with buffered atomic updates, see Switch().update_access() etc.
+SWITCH_COUNTER_FIELDS = (
+    'access_count',
+    'last_accessed',
+    'change_count',
+    'last_changed',
+    'command_count',
+    'last_command_time',
+)
+
 
 class Switch(models.Model):
     """
@@ -921,6 +933,20 @@ class Switch(models.Model):
         verbose_name='Hostname',
         help_text='The switch hostname as reported via snmp, ssh, etc.',
     )
+    driver_name = models.CharField(
+        max_length=64,
+        default='',
+        blank=True,
+        verbose_name='Driver',
+        help_text='The device driver found for this switch, see the Device Drivers page.',
+    )
+    sys_object_id = models.CharField(
+        max_length=128,
+        default='',
+        blank=True,
+        verbose_name='System Object ID',
+        help_text='The SNMP sysObjectID the driver was found with.',
+    )
     # dont_show_interfaces = models.BooleanField(
     #    default=False,
     #    verbose_name='Do NOT Show Interfaces',
@@ -987,30 +1013,46 @@ class Switch(models.Model):
         self.modified = timezone.now()
         return super(Switch, self).save(*args, **kwargs)
 
+    def get_settings_fields(self) -> list:
+        '''
+        Return the names of the fields to save when changing the settings of an existing switch.
+        This leaves out the access, change and command counters and timestamps, as these are
+        updated with buffered atomic updates (see update_access() below), and the values in this
+        object may be out of date.
+        '''
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key and field.name not in SWITCH_COUNTER_FIELDS
+        ]
+
     def update_access(self):
         '''
-        Update the last accessed timestamp, and increment access counter
+        Update the last accessed timestamp, and increment access counter.
+        This is buffered and written as an atomic update, see counters/buffer.py
+        Note that the values of this object are not changed, the database is updated directly.
         '''
-        self.last_accessed = timezone.now()
-        self.access_count += 1
-        # call super.save(), instead of calling our own save (which sets modified as well!)
-        super(Switch, self).save()
+        buffered_increment(
+            Switch, {'pk': self.pk}, increments={'access_count': 1}, values={'last_accessed': timezone.now()}
+        )
 
     def update_change(self):
         '''
-        Increment the change counter and update last_changed timestamp
+        Increment the change counter and update last_changed timestamp, buffered as above.
+        The pre-read device state in the shared device cache is no longer valid, so remove it.
         '''
-        self.change_count += 1
-        self.last_changed = timezone.now()
-        self.save()
+        buffered_increment(
+            Switch, {'pk': self.pk}, increments={'change_count': 1}, values={'last_changed': timezone.now()}
+        )
+        devicecache.clear_snapshot(self.pk)
 
     def update_command(self):
         '''
-        Increment the command counter and update last_command_time timestamp
+        Increment the command counter and update last_command_time timestamp, buffered as above.
         '''
-        self.command_count += 1
-        self.last_command_time = timezone.now()
-        self.save()
+        buffered_increment(
+            Switch, {'pk': self.pk}, increments={'command_count': 1}, values={'last_command_time': timezone.now()}
+        )
 
     def display_name(self):
         """
@@ -1147,6 +1189,12 @@ class SwitchGroup(models.Model):
         verbose_name='Edit Port Description',
         help_text='If set, allow interface descriptions to be edited.',
     )
+    prefetch = models.BooleanField(
+        default=False,
+        verbose_name='Pre-read devices',
+        help_text='If set, the devices in this group are read periodically by the "poller" command, '
+        'so the first view of a device is shown immediately.',
+    )
     switches = models.ManyToManyField(
         to='Switch',
         # see https://docs.djangoproject.com/en/2.2/ref/models/fields/#django.db.models.ForeignKey.related_name
@@ -1160,6 +1208,14 @@ class SwitchGroup(models.Model):
         "interface with a PVID in this list of VLANs. "
         "Other interfaces can not be managed.",
     )
+    arp_sources = models.ManyToManyField(
+        to='Switch',
+        related_name='arp_source_groups',
+        blank=True,
+        verbose_name='ARP Sources',
+        help_text="The routers with the ARP tables for the devices in this group. These are read by the 'poller' command, "
+        "and used to show the IP addresses of ethernet addresses on all devices in this group.",
+    )
     """
     Allow the above list of switches to be queried in proper sort order from templates
     """
@@ -1241,7 +1297,9 @@ class Log(models.Model):
         super().__init__(*args, **kwargs)
 
     timestamp = models.DateTimeField(
-        auto_now_add=True,  # set on save, do not allow changes in code.
+        # the time of the event, i.e. when the entry is created, and not when the log writer saves it.
+        default=timezone.now,
+        editable=False,
         blank=True,
         null=True,
     )
@@ -1309,23 +1367,19 @@ class Log(models.Model):
                 self.description = "Unknown action!"
 
         # here is the actual work of saving:
+        # new entries are queued and written in bulk by the log writer, unless asynchronous writes are disabled.
         # see https://docs.djangoproject.com/en/2.2/topics/db/models/#overriding-predefined-model-methods
-        super().save(*args, **kwargs)
-
-        # if requested, also sent to Syslog host
-        if settings.SYSLOG_HOST:
-            # we are defining a logger, and then check if it has a handler.
-            # each time you create a named logger, python will add handler to existing,
-            # even if you delete the object. this is a 'globally' defined logger in apps.py :
-            syslogger = logging.getLogger('log_to_syslog')
-            if not syslogger.hasHandlers():
-                handler = logging.handlers.SysLogHandler(address=(settings.SYSLOG_HOST, settings.SYSLOG_PORT))
-                syslogger.addHandler(handler)
-            syslogger.setLevel(logging.DEBUG)
-            if settings.SYSLOG_JSON:
-                syslogger.info(self.as_json())
-            else:
-                syslogger.info(self.as_string())
+        adding = self.pk is None
+        if adding and not self.timestamp:
+            self.timestamp = timezone.now()
+        if not (adding and not args and not kwargs and logwriter.enqueue(self)):
+            super().save(*args, **kwargs)
+            if adding:
+                # the log writer does this for queued entries.
+                rollups.record([self])
+
+        # if requested, also sent to Syslog host, this does not block.
+        logwriter.forward_to_syslog(self)
 
     def as_string(self):
         """
@@ -1375,3 +1429,235 @@ class Log(models.Model):
     class Meta:
         ordering = ['timestamp']
         verbose_name_plural = 'Activity Logs'
+        # the activity views filter on device, type or user, and show the newest first.
+        # (timestamp, id) is the key for the keyset pagination, see switches/paginator.py
+        indexes = [
+            models.Index(fields=['-timestamp', '-id'], name='log_timestamp_idx'),
+            models.Index(fields=['switch', '-timestamp', '-id'], name='log_switch_timestamp_idx'),
+            models.Index(fields=['type', '-timestamp', '-id'], name='log_type_timestamp_idx'),
+            models.Index(fields=['user', '-timestamp', '-id'], name='log_user_timestamp_idx'),
+            # recent non-view activity of a device, shown on every device page:
+            models.Index(
+                fields=['switch', '-timestamp'],
+                condition=models.Q(type__gt=constants.LOG_TYPE_VIEW),
+                name='log_switch_activity_idx',
+            ),
+        ]
+
+
+class LogDailyActivity(models.Model):
+    """
+    A daily rollup of Log() entries: the number of entries per day, type, action, device and user.
+    This is maintained incrementally as logs are written (see switches/rollups.py),
+    and can be rebuilt from the Log() table with the 'rolluplogs' command.
+    It is used for the Top-N activity and usage statistics, so we do not need to scan all log entries.
+    """
+
+    day = models.DateField()
+    # same values as Log().type and Log().action. No choices here, so new log actions need no migration.
+    type = models.PositiveSmallIntegerField(
+        default=constants.LOG_TYPE_VIEW,
+    )
+    action = models.PositiveSmallIntegerField(
+        default=constants.LOG_VIEW_SWITCH,
+    )
+    # these are not ForeignKeys, so rollups are kept when a device or user is deleted,
+    # and can be part of the unique constraint. 0 means "None".
+    switch_id = models.PositiveIntegerField(
+        default=0,
+    )
+    user_id = models.PositiveIntegerField(
+        default=0,
+    )
+    count = models.PositiveBigIntegerField(
+        default=0,
+    )
+
+    class Meta:
+        ordering = ['day']
+        verbose_name_plural = 'Daily Log Activity'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'type', 'action', 'switch_id', 'user_id'], name='unique_log_daily_activity'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day}-{self.type}-{self.action}-{self.switch_id}-{self.user_id}: {self.count}"
+
+
+class LogDailyRollup(models.Model):
+    """
+    Daily totals of Log() entries per type and action.
+    These are calculated from LogDailyActivity() once a day is over, see switches/rollups.py
+    It is used for the site usage statistics.
+    """
+
+    day = models.DateField()
+    # same values as Log().type and Log().action.
+    type = models.PositiveSmallIntegerField(
+        default=constants.LOG_TYPE_VIEW,
+    )
+    action = models.PositiveSmallIntegerField(
+        default=constants.LOG_VIEW_SWITCH,
+    )
+    entries = models.PositiveBigIntegerField(
+        default=0,
+        help_text='Number of log entries.',
+    )
+
+    class Meta:
+        ordering = ['day']
+        verbose_name_plural = 'Daily Log Rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'type', 'action'], name='unique_log_daily_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}-{self.type}-{self.action}: {self.entries}"
+
+
+class ExportJob(models.Model):
+    """
+    A group inventory export, i.e. the data of all devices in a SwitchGroup() read into a single file.
+    The job runs in the background, see switches/export.py, and the progress is tracked here
+    so any web server process can show it.
+    """
+
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='export_jobs',
+    )
+    group = models.ForeignKey(
+        to='SwitchGroup',
+        on_delete=models.CASCADE,
+        related_name='export_jobs',
+    )
+    format = models.CharField(
+        max_length=8,
+        choices=constants.EXPORT_FORMAT_CHOICES,
+        default=constants.EXPORT_FORMAT_XLSX,
+    )
+    status = models.PositiveSmallIntegerField(
+        choices=constants.EXPORT_STATUS_CHOICES,
+        default=constants.EXPORT_STATUS_RUNNING,
+    )
+    total = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of devices to export.',
+    )
+    done = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of devices finished, including errors.',
+    )
+    errors = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of devices that could not be read.',
+    )
+    filename = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text='The export file on the server.',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+    finished = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+    updated = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text='The last time the running job saved its progress.',
+    )
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name_plural = 'Export Jobs'
+
+    def __str__(self):
+        return f"{self.group}-{self.created}: {self.get_status_display()}"
+
+    @property
+    def percent(self) -> int:
+        if not self.total:
+            return 100
+        return int(100 * self.done / self.total)
+
+
+class HostLocation(models.Model):
+    """
+    Where an ethernet address was learned: the device, interface and vlan, and when.
+    This is updated every time the ethernet tables of a device are read, see switches/hostindex.py
+    so we can find a host without reading any device.
+    """
+
+    # the ethernet address as 12 lower-case hex digits, without separators:
+    ethernet = models.CharField(
+        max_length=12,
+    )
+    switch = models.ForeignKey(
+        to='Switch',
+        on_delete=models.CASCADE,
+        related_name='host_locations',
+    )
+    interface = models.CharField(
+        max_length=64,
+    )
+    vlan_id = models.PositiveIntegerField(
+        default=0,
+    )
+    first_seen = models.DateTimeField(
+        default=timezone.now,
+    )
+    last_seen = models.DateTimeField(
+        default=timezone.now,
+    )
+
+    class Meta:
+        ordering = ['-last_seen']
+        verbose_name_plural = 'Host Locations'
+        constraints = [
+            models.UniqueConstraint(fields=['ethernet', 'switch', 'interface'], name='unique_host_location'),
+        ]
+        indexes = [
+            models.Index(fields=['last_seen'], name='hostlocation_last_seen_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ethernet} on {self.switch}-{self.interface}"
+
+
+class HostAddress(models.Model):
+    """
+    The IP address of an ethernet address, as found in the ARP table of a device.
+    """
+
+    ip_address = models.GenericIPAddressField()
+    ethernet = models.CharField(
+        max_length=12,
+    )
+    switch = models.ForeignKey(
+        to='Switch',
+        on_delete=models.CASCADE,
+        related_name='host_addresses',
+    )
+    last_seen = models.DateTimeField(
+        default=timezone.now,
+    )
+
+    class Meta:
+        ordering = ['-last_seen']
+        verbose_name_plural = 'Host Addresses'
+        constraints = [
+            models.UniqueConstraint(fields=['ip_address', 'ethernet'], name='unique_host_address'),
+        ]
+        indexes = [
+            models.Index(fields=['ethernet'], name='hostaddress_ethernet_idx'),
+            models.Index(fields=['last_seen'], name='hostaddress_last_seen_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ip_address} = {self.ethernet}"
@@ -0,0 +1,306 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Run a Command() or CommandTemplate() on many devices at the same time.
+
+Devices are handled by a bounded pool of worker threads, each using a (pooled) SSH session,
+see switches/connect/sshpool.py. The result of each device is returned as soon as it arrives,
+so the web page and the REST API can show them while the other devices are still running.
+"""
+import functools
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connection as db_connection
+from django.http import HttpRequest
+from django.template import Context, Template
+
+from switches.connect.connect import create_connection_object
+from switches.constants import (
+    CMD_TYPE_GLOBAL,
+    LOG_EXECUTE_COMMAND,
+    LOG_TYPE_COMMAND,
+    LOG_TYPE_ERROR,
+    SWITCH_STATUS_ACTIVE,
+)
+from switches.export import get_device_request
+from switches.models import Command, CommandTemplate, Log, Switch
+from switches.utils import dprint, get_compiled_regex, get_remote_ip, iter_lines, string_matches_regex
+
+logger = logging.getLogger("openl2m.multicommand")
+
+# the number of fields and pick lists in a CommandTemplate()
+TEMPLATE_FIELD_COUNT = 8
+TEMPLATE_LIST_COUNT = 5
+
+
+@functools.lru_cache(maxsize=settings.REGEX_CACHE_SIZE)
+def get_compiled_template(text: str) -> Template:
+    """
+    Return the parsed Django Template() of a command template text, from a bounded LRU cache.
+    Keyed by the text, so an edited CommandTemplate() is parsed again.
+    """
+    return Template(text)
+
+
+def get_template_command(template: CommandTemplate, data) -> tuple[str, str]:
+    """
+    Validate the field and list values for a command template, and render the command.
+
+    Params:
+        template (CommandTemplate): the template.
+        data: dict-like with the 'fieldX' and 'listX' values, e.g. request.POST
+
+    Returns:
+        (str, str): the command, and an error string. If there are errors, the command is "".
+    """
+    values = {}
+    errors = []
+    for index in range(1, TEMPLATE_FIELD_COUNT + 1):
+        name = f"field{index}"
+        if "{{" + name + "}}" not in template.template:
+            continue
+        field_name = getattr(template, f"{name}_name")
+        value = data.get(name, False)
+        if not value:
+            # not found in form (or empty), but required!
+            errors.append(f"{field_name} - cannot be blank!")
+        elif string_matches_regex(str(value), getattr(template, f"{name}_regex")):
+            values[name] = str(value)
+        else:
+            errors.append(f"{field_name} - Invalid entry: {value}")
+    for index in range(1, TEMPLATE_LIST_COUNT + 1):
+        name = f"list{index}"
+        if "{{" + name + "}}" not in template.template:
+            continue
+        value = data.get(name, False)
+        if value:
+            values[name] = str(value)
+        else:
+            # not found in form (or empty), but required (unlikely to happen for list)!
+            errors.append(f"{getattr(template, f'{name}_name')} - cannot be blank!")
+    if errors:
+        return "", "<br/>".join(errors)
+
+    # now do the template expansion, i.e. Jinja2 rendering:
+    return get_compiled_template(template.template).render(Context(values)), ""
+
+
+def filter_template_output(template: CommandTemplate, output: str) -> str:
+    """
+    Apply the output matching and line filtering of a command template to the command output.
+
+    Params:
+        template (CommandTemplate): the template the command was rendered from.
+        output (str): the command output.
+
+    Returns:
+        (str): the output to show.
+    """
+    result = output
+    # do we need to match output to show match/fail result?
+    if template.output_match_regex:
+        if get_compiled_regex(template.output_match_regex).search(output):
+            result = template.output_match_text if template.output_match_text else "OK!"
+        else:
+            result = template.output_fail_text if template.output_fail_text else "FAIL!"
+    # do we need to filter (original) output to keep only matching lines?
+    if template.output_lines_keep_regex:
+        # a single pass over the lines, with the regex compiled once:
+        search = get_compiled_regex(template.output_lines_keep_regex).search
+        matched_lines = "".join(f"\n{line}" for line in iter_lines(output) if search(line))
+        if matched_lines:
+            result += "\nPartial output:\n" + matched_lines
+    return result
+
+
+def get_command_devices(
+    user, switch_ids: list, command: Command = None, template: CommandTemplate = None
+) -> list[Switch]:
+    """
+    Find the devices a command or command template can run on: active devices with a Credentials Profile,
+    that have the global command in their Command List, or the template assigned.
+
+    Params:
+        user (User): the user running the command. Staff can also run the staff commands.
+        switch_ids (list): the Switch() pk's to select from, i.e. the devices the user has access to.
+        command (Command): the global command to run, or
+        template (CommandTemplate): the template to run.
+
+    Returns:
+        (list): of Switch() objects, sorted by name.
+    """
+    switches = Switch.objects.filter(id__in=switch_ids, status=SWITCH_STATUS_ACTIVE, netmiko_profile__isnull=False)
+    if template:
+        switches = switches.filter(command_templates=template)
+    elif command:
+        allowed = switches.filter(command_list__global_commands=command)
+        if user.is_superuser or user.is_staff:
+            allowed = allowed | switches.filter(command_list__global_commands_staff=command)
+        switches = allowed
+    else:
+        return []
+    return list(switches.select_related('netmiko_profile', 'snmp_profile').distinct().order_by('name'))
+
+
+def get_group_commands(user, switch_ids: list) -> tuple[list, list]:
+    """
+    Find the global commands and command templates that can run on at least one of the given devices.
+
+    Returns:
+        (list, list): the Command() and CommandTemplate() objects, sorted by name.
+    """
+    switches = Switch.objects.filter(id__in=switch_ids, status=SWITCH_STATUS_ACTIVE, netmiko_profile__isnull=False)
+    command_list_ids = switches.exclude(command_list__isnull=True).values_list('command_list_id', flat=True)
+    commands = Command.objects.filter(global_commands__in=command_list_ids)
+    if user.is_superuser or user.is_staff:
+        commands = commands | Command.objects.filter(global_commands_staff__in=command_list_ids)
+    templates = CommandTemplate.objects.filter(command_templates__in=switches)
+    return list(commands.distinct().order_by('name')), list(templates.distinct().order_by('name'))
+
+
+def prepare_command(user, data, switch_ids: list) -> tuple[str, CommandTemplate, list, str]:
+    """
+    Parse the command, or command template and its values, and the devices to run it on.
+
+    Params:
+        user (User): the user running the command.
+        data: dict-like with 'command_id', or 'template_id' and the template values,
+              and optionally 'switch_ids', the list of selected devices. E.g. request.POST or the API data.
+        switch_ids (list): the Switch() pk's the user has access to.
+
+    Returns:
+        (str, CommandTemplate, list, str): the command, the template (or None), the Switch() objects,
+                                           and an error string if the command cannot run.
+    """
+    template = command = None
+    try:
+        if data.get('template_id'):
+            template = CommandTemplate.objects.get(pk=int(data.get('template_id')))
+        else:
+            command = Command.objects.get(pk=int(data.get('command_id', -1)), type=CMD_TYPE_GLOBAL)
+    except (ValueError, TypeError, Command.DoesNotExist, CommandTemplate.DoesNotExist):
+        return "", None, [], "Invalid command or template!"
+
+    # limit to the selected devices, if any:
+    selected = data.getlist('switch_ids') if hasattr(data, 'getlist') else data.get('switch_ids', [])
+    if selected:
+        try:
+            selected = {int(switch_id) for switch_id in selected}
+        except (ValueError, TypeError):
+            return "", None, [], "Invalid device selection!"
+        switch_ids = [switch_id for switch_id in switch_ids if int(switch_id) in selected]
+
+    switches = get_command_devices(user=user, switch_ids=switch_ids, command=command, template=template)
+    if not switches:
+        return "", None, [], "None of the devices can run this command!"
+    if len(switches) > settings.MULTI_COMMAND_MAX_DEVICES:
+        return "", None, [], f"Please select at most {settings.MULTI_COMMAND_MAX_DEVICES} devices!"
+
+    if template:
+        command_string, error = get_template_command(template=template, data=data)
+        if error:
+            return "", None, [], error
+    else:
+        command_string = command.command
+    return command_string, template, switches, ""
+
+
+def run_device_command(
+    request: HttpRequest, group, switch: Switch, command_string: str, template: CommandTemplate = None
+) -> dict:
+    """
+    Run the command on a single device, and log it. This runs in a worker thread.
+
+    Params:
+        request (HttpRequest): a request for this device only, see export.get_device_request()
+        group (SwitchGroup): the group of the device.
+        switch (Switch): the device.
+        command_string (str): the command to run.
+        template (CommandTemplate): if set, the template output filters are applied.
+
+    Returns:
+        (dict): the device result, with 'switch_id', 'switch_name', 'command', 'output' and 'error' keys.
+    """
+    result = {
+        'switch_id': switch.id,
+        'switch_name': switch.name,
+        'command': command_string,
+        'output': "",
+        'error': "",
+    }
+    log = Log(
+        user=request.user,
+        ip_address=get_remote_ip(request),
+        switch=switch,
+        group=group,
+        action=LOG_EXECUTE_COMMAND,
+    )
+    try:
+        connection = create_connection_object(request=request, group=group, switch=switch)
+        if not connection.can_run_commands():
+            raise Exception("This device cannot run commands!")
+        cmd = connection.run_command_string(command_string=command_string)
+        if connection.error.status:
+            raise Exception(f"{cmd['error_descr']}: {cmd['error_details']}")
+        result['output'] = filter_template_output(template, cmd['output']) if template else cmd['output']
+        switch.update_command()
+        log.type = LOG_TYPE_COMMAND
+        log.description = command_string
+    except Exception as err:
+        dprint(f"run_device_command(): {switch.name}: {err}")
+        result['error'] = f"{err}"
+        log.type = LOG_TYPE_ERROR
+        log.description = f"{command_string}: {err}"
+    finally:
+        log.save()
+        # each worker thread has its own database connection:
+        db_connection.close()
+    return result
+
+
+def run_command_on_devices(
+    request: HttpRequest, group, switches: list, command_string: str, template: CommandTemplate = None
+):
+    """
+    Generator that runs the command on all devices, at most settings.MULTI_COMMAND_MAX_WORKERS at the same time,
+    and yields the result of each device as soon as it is done. See run_device_command() for the result.
+    If the caller stops reading, e.g. the browser goes away, the devices not started yet are skipped.
+    """
+    pool = ThreadPoolExecutor(max_workers=settings.MULTI_COMMAND_MAX_WORKERS, thread_name_prefix="openl2m-command")
+    try:
+        futures = [
+            pool.submit(run_device_command, get_device_request(request), group, switch, command_string, template)
+            for switch in switches
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def stream_results(results, total: int):
+    """
+    Generator that returns each device result as a line of JSON, for a StreamingHttpResponse().
+    The last line has the totals, with 'done' set to True.
+    """
+    count = errors = 0
+    for result in results:
+        count += 1
+        if result['error']:
+            errors += 1
+        yield json.dumps(result) + "\n"
+    yield json.dumps({'done': True, 'total': total, 'count': count, 'errors': errors}) + "\n"
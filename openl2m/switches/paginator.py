@@ -0,0 +1,115 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Keyset (cursor) pagination of Log() entries, newest first.
+
+Unlike the Django Paginator(), this never runs a COUNT(*) over the whole result,
+and every page is an index range scan on (timestamp, id), no matter how deep we page.
+"""
+import base64
+import datetime
+
+from django.db.models import Q, QuerySet
+
+
+class KeysetPage:
+    """
+    A page of Log() entries, with the cursors to the next and previous page.
+    'next_cursor' and 'previous_cursor' are None if there is no such page.
+    """
+
+    def __init__(self, object_list: list, next_cursor: str | None, previous_cursor: str | None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+def encode_cursor(log) -> str:
+    """
+    Return the cursor string for a Log() entry.
+    """
+    return base64.urlsafe_b64encode(f"{log.timestamp.isoformat()}|{log.id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int] | None:
+    """
+    Return the (timestamp, id) from a cursor string, or None if not valid.
+    """
+    try:
+        timestamp, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(timestamp), int(id)
+    except Exception:
+        return None
+
+
+def get_keyset_page(queryset: QuerySet, per_page: int, after: str = "", before: str = "") -> KeysetPage:
+    """
+    Get a page of Log() entries, ordered newest first.
+
+    Params:
+        queryset (QuerySet): the filtered Log() entries. Any ordering is replaced.
+        per_page (int): entries per page.
+        after (str): cursor of the last entry of the previous page, to get the next (older) page.
+        before (str): cursor of the first entry of the next page, to get the previous (newer) page.
+
+    Returns:
+        (KeysetPage): the entries and cursors.
+    """
+    queryset = queryset.filter(timestamp__isnull=False)
+    position = decode_cursor(after) if after else None
+    if position:
+        timestamp, id = position
+        queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=id))
+    backwards = False
+    if not position and before:
+        position = decode_cursor(before)
+        if position:
+            timestamp, id = position
+            queryset = queryset.filter(Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=id))
+            backwards = True
+
+    # read one more, so we know if there is another page:
+    if backwards:
+        entries = list(queryset.order_by("timestamp", "id")[: per_page + 1])
+        more = len(entries) > per_page
+        entries = entries[:per_page]
+        entries.reverse()
+    else:
+        entries = list(queryset.order_by("-timestamp", "-id")[: per_page + 1])
+        more = len(entries) > per_page
+        entries = entries[:per_page]
+
+    if not entries:
+        return KeysetPage(object_list=[], next_cursor=None, previous_cursor=None)
+    if backwards:
+        next_cursor = encode_cursor(entries[-1])
+        previous_cursor = encode_cursor(entries[0]) if more else None
+    else:
+        next_cursor = encode_cursor(entries[-1]) if more else None
+        previous_cursor = encode_cursor(entries[0]) if position else None
+    return KeysetPage(object_list=entries, next_cursor=next_cursor, previous_cursor=previous_cursor)
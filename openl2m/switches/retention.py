@@ -0,0 +1,371 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Log() retention: remove expired log entries without long-running locks.
+
+Entries are deleted in small batches by primary key range, with a pause between batches.
+Optionally, the Log() table can be converted to monthly PostgreSQL partitions,
+so that expired months are removed by dropping the partition.
+Expired entries can be written to a compressed JSON Lines archive before they are removed.
+
+Note that Django's migration state does not know about the partitioning, and its primary key on (id, timestamp).
+The database system check below stops 'migrate' from changing the partitioned table, see check_migrations().
+"""
+import datetime
+import gzip
+import json
+import logging
+import re
+import time
+
+from django.core import checks
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from switches.models import Log
+
+# the fields written to the archive, one JSON object per line:
+ARCHIVE_FIELDS = [
+    'id',
+    'timestamp',
+    'user__username',
+    'group__name',
+    'switch__name',
+    'if_index',
+    'if_name',
+    'ip_address',
+    'type',
+    'action',
+    'description',
+]
+
+PARTITION_PREFIX = f"{Log._meta.db_table}_y"
+
+# migration statements that work the same on a partitioned table:
+_PARTITION_SAFE_SQL = re.compile(r"\s*(CREATE|DROP)\s+INDEX\s", re.IGNORECASE)
+
+logger = logging.getLogger("openl2m.retention")
+
+
+class LogArchive:
+    """
+    A gzip-compressed JSON Lines file with archived log entries.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.count = 0
+        self.file = gzip.open(filename, mode="at", encoding="utf-8")
+
+    def write_queryset(self, queryset, chunk_size: int = 5000):
+        """
+        Write all entries of a Log() queryset to the archive, without loading them all in memory.
+        """
+        for row in queryset.values(*ARCHIVE_FIELDS).iterator(chunk_size=chunk_size):
+            self.file.write(json.dumps(row, default=str))
+            self.file.write("\n")
+            self.count += 1
+
+    def close(self):
+        self.file.close()
+
+
+def delete_in_batches(
+    cutoff: datetime.datetime,
+    batch_size: int = 10000,
+    pause: float = 0.1,
+    archive: LogArchive = None,
+    progress=None,
+) -> int:
+    """
+    Delete the Log() entries older than cutoff, in batches of primary key ranges.
+    Each batch is a short transaction, so the application can keep writing logs.
+
+    Params:
+        cutoff (datetime): delete entries with a timestamp before this.
+        batch_size (int): the size of each primary key range.
+        pause (float): seconds to sleep between batches, to limit the load on the database.
+        archive (LogArchive): if given, write the entries here before they are deleted.
+        progress: if given, a function called as progress(deleted, last_id, max_id) after each batch.
+
+    Returns:
+        (int): the number of entries deleted.
+    """
+    expired = Log.objects.filter(timestamp__lt=cutoff)
+    bounds = expired.aggregate(first=Min('id'), last=Max('id'))
+    if bounds['first'] is None:
+        return 0
+    deleted = 0
+    start = bounds['first']
+    while start <= bounds['last']:
+        batch = expired.filter(id__gte=start, id__lt=start + batch_size)
+        with transaction.atomic():
+            if archive:
+                archive.write_queryset(batch.order_by('id'))
+            deleted += batch._raw_delete(using=connection.alias)
+        start += batch_size
+        if progress:
+            progress(deleted, min(start - 1, bounds['last']), bounds['last'])
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+#
+# Monthly partitioning, PostgreSQL only.
+#
+def month_start(day: datetime.date, add_months: int = 0) -> datetime.date:
+    """
+    Return the first day of the month of 'day', moved by 'add_months'.
+    """
+    months = day.year * 12 + day.month - 1 + add_months
+    return datetime.date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"{PARTITION_PREFIX}{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    Return True if the Log() table is a partitioned table.
+    """
+    if connections[using].vendor != "postgresql":
+        return False
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [Log._meta.db_table])
+        row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def get_partitions() -> dict:
+    """
+    Return the monthly partitions of the Log() table.
+
+    Returns:
+        (dict): partition name as key, and the first day of the month as value.
+    """
+    partitions = {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(%s)",
+            [Log._meta.db_table],
+        )
+        for (name,) in cursor.fetchall():
+            if name.startswith(PARTITION_PREFIX):
+                # the default partition does not have a month in its name.
+                partitions[name] = datetime.date(int(name[-7:-3]), int(name[-2:]), 1)
+    return partitions
+
+
+def create_partition(cursor, month: datetime.date) -> int:
+    """
+    Create the partition for one month, if it does not exist.
+    The boundaries are at midnight in the configured TIME_ZONE.
+    PostgreSQL refuses to add a partition for entries that are already in the default partition,
+    so the new table is created detached, those entries are moved into it, and then it is attached.
+    Call this inside a transaction.
+
+    Returns:
+        (int): the number of entries moved out of the default partition.
+    """
+    table = Log._meta.db_table
+    name = partition_name(month)
+    start = timezone.make_aware(datetime.datetime.combine(month, datetime.time.min))
+    end = timezone.make_aware(datetime.datetime.combine(month_start(month, 1), datetime.time.min))
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL, to_regclass(%s) IS NOT NULL", [name, f"{table}_default"])
+    exists, has_default = cursor.fetchone()
+    if exists:
+        return 0
+    if not has_default:
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} {bounds}")
+        return 0
+    cursor.execute(f"CREATE TABLE {name} (LIKE {table})")
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {table}_default WHERE timestamp >= %s AND timestamp < %s RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        [start, end],
+    )
+    moved = cursor.rowcount
+    # this adds the primary key, indexes and foreign keys of the partitioned table:
+    cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} {bounds}")
+    return moved
+
+
+def create_future_partitions(months_ahead: int = 3, progress=None) -> int:
+    """
+    Create the partitions for the current and next months. This needs to run regularly, e.g. with 'removelogs'.
+    Entries for months without partition go into the default partition, and are moved when the partition is created.
+    Each month is a separate transaction, so an error with one month does not stop the others.
+
+    Params:
+        months_ahead (int): the number of months after the current month.
+        progress: if given, a function called as progress(message) for moved entries and errors.
+
+    Returns:
+        (int): the number of partitions that exist for now and the future.
+    """
+    this_month = month_start(timezone.localdate())
+    created = 0
+    for add in range(months_ahead + 1):
+        month = month_start(this_month, add)
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                moved = create_partition(cursor, month)
+        except DatabaseError as err:
+            logger.error(f"Error creating log partition {partition_name(month)}: {err}")
+            if progress:
+                progress(f"Error creating partition {partition_name(month)}: {err}")
+            continue
+        created += 1
+        if moved and progress:
+            progress(f"Moved {moved} entries from the default partition to {partition_name(month)}")
+    return created
+
+
+def drop_expired_partitions(cutoff: datetime.datetime, archive: LogArchive = None, progress=None) -> int:
+    """
+    Drop the monthly partitions that only have entries older than cutoff.
+
+    Params:
+        cutoff (datetime): entries with a timestamp before this are expired.
+        archive (LogArchive): if given, write the entries here before the partition is dropped.
+        progress: if given, a function called as progress(name) after each partition.
+
+    Returns:
+        (int): the number of partitions dropped.
+    """
+    cutoff_day = timezone.localtime(cutoff).date()
+    dropped = 0
+    for name, month in sorted(get_partitions().items(), key=lambda item: item[1]):
+        if month_start(month, 1) > cutoff_day:
+            continue
+        if archive:
+            start = timezone.make_aware(datetime.datetime.combine(month, datetime.time.min))
+            end = timezone.make_aware(datetime.datetime.combine(month_start(month, 1), datetime.time.min))
+            archive.write_queryset(Log.objects.filter(timestamp__gte=start, timestamp__lt=end).order_by('id'))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {name}")
+        dropped += 1
+        if progress:
+            progress(name)
+    return dropped
+
+
+def convert_to_partitioned(months_ahead: int = 3, progress=None) -> int:
+    """
+    Convert the Log() table to a table partitioned by month on the timestamp.
+    This copies all entries, and locks the table until done, so run this while OpenL2M is stopped!
+    Entries without a timestamp are not copied.
+    All migrations need to be applied first, as the new table is created from the current Log() table.
+
+    Returns:
+        (int): the number of entries copied.
+    """
+    if pending_migrations():
+        raise CommandError("There are unapplied database migrations, run 'manage.py migrate' first!")
+    table = Log._meta.db_table
+    old_table = f"{table}_unpartitioned"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"SELECT min(timestamp) FROM {table}")
+        first = cursor.fetchone()[0] or timezone.now()
+        # older installs have a 'serial' id, newer ones an identity column:
+        cursor.execute(
+            "SELECT attidentity, pg_get_serial_sequence(%s, 'id') FROM pg_attribute "
+            "WHERE attrelid = to_regclass(%s) AND attname = 'id'",
+            [table, table],
+        )
+        identity, sequence = cursor.fetchone()
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {old_table}")
+        cursor.execute(
+            f"CREATE TABLE {table} (LIKE {old_table} INCLUDING DEFAULTS INCLUDING IDENTITY) "
+            "PARTITION BY RANGE (timestamp)"
+        )
+        if not identity:
+            # keep the sequence when the old table is dropped:
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+        # the partition key needs to be part of the primary key:
+        cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, timestamp)")
+        cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        month = month_start(timezone.localtime(first).date())
+        last_month = month_start(timezone.localdate(), months_ahead)
+        while month <= last_month:
+            create_partition(cursor, month)
+            month = month_start(month, 1)
+        if progress:
+            progress("Copying log entries...")
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {old_table} WHERE timestamp IS NOT NULL")
+        copied = cursor.rowcount
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), (SELECT coalesce(max(id), 1) FROM {table}))", [table]
+        )
+        cursor.execute(f"DROP TABLE {old_table}")
+        # recreate the foreign keys and indexes on the new table, they apply to all partitions:
+        for field in Log._meta.concrete_fields:
+            if field.remote_field:
+                column = field.column
+                target = field.remote_field.model._meta.db_table
+                cursor.execute(f"CREATE INDEX {table}_{column}_idx ON {table} ({column})")
+                cursor.execute(
+                    f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fk FOREIGN KEY ({column}) "
+                    f"REFERENCES {target} (id) DEFERRABLE INITIALLY DEFERRED"
+                )
+        if progress:
+            progress("Creating indexes...")
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for index in Log._meta.indexes:
+                schema_editor.add_index(Log, index)
+    return copied
+
+
+def pending_migrations(using: str = DEFAULT_DB_ALIAS) -> list:
+    """
+    Return the plan of the database migrations that are not applied yet.
+    """
+    executor = MigrationExecutor(connections[using])
+    return executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+def check_migrations(app_configs, databases=None, **kwargs) -> list:
+    """
+    The database system check, run by 'migrate'. Django's migration state does not know the Log() table
+    is partitioned, with a primary key on (id, timestamp), so a migration that changes the table can fail halfway,
+    or undo the partitioning. Report an error if the pending migrations change the partitioned table,
+    other than adding or removing indexes.
+    """
+    errors = []
+    for using in databases or []:
+        if not is_partitioned(using=using):
+            continue
+        plan = pending_migrations(using=using)
+        if not plan:
+            continue
+        table = f'"{Log._meta.db_table}"'
+        statements = MigrationExecutor(connections[using]).collect_sql(plan)
+        blocked = [sql for sql in statements if table in sql and not _PARTITION_SAFE_SQL.match(sql)]
+        if blocked:
+            errors.append(
+                checks.Error(
+                    "The log table is partitioned, and pending migrations change it.",
+                    hint="Apply these statements by hand to the partitioned table, "
+                    "then run 'manage.py migrate --fake --skip-checks':\n" + "\n".join(blocked),
+                    id="switches.E001",
+                )
+            )
+    return errors
@@ -0,0 +1,174 @@
+#
+# This file is part of Open Layer 2 Management (OpenL2M).
+#
+# OpenL2M is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+# more details.  You should have received a copy of the GNU General Public
+# License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+Maintain the daily rollups of activity Log() entries, see LogDailyActivity() and LogDailyRollup() in models.py
+"""
+import datetime
+import logging
+
+from django.apps import apps
+from django.db import connection, transaction, IntegrityError
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from switches import flusher
+
+logger = logging.getLogger("openl2m.rollups")
+
+
+def record(logs: list):
+    """
+    Add newly written Log() entries to the daily rollups.
+    The counts are added with a single 'INSERT ... ON CONFLICT DO UPDATE', so concurrent workers are safe.
+
+    Params:
+        logs (list): Log() objects that were just inserted, i.e. have a timestamp.
+    """
+    counts = {}
+    for log in logs:
+        if log.timestamp is None:
+            continue
+        key = (timezone.localdate(log.timestamp), log.type, log.action, log.switch_id or 0, log.user_id or 0)
+        counts[key] = counts.get(key, 0) + 1
+    if not counts:
+        return
+    table = apps.get_model('switches', 'LogDailyActivity')._meta.db_table
+    params = []
+    # sorted, so concurrent workers lock rows in the same order:
+    for key in sorted(counts.keys()):
+        params.extend(key)
+        params.append(counts[key])
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(counts))
+    sql = (
+        f"INSERT INTO {table} (day, type, action, switch_id, user_id, count) VALUES {values} "
+        f"ON CONFLICT (day, type, action, switch_id, user_id) DO UPDATE SET count = {table}.count + EXCLUDED.count"
+    )
+    try:
+        # in its own savepoint, so an error here does not break a surrounding transaction:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, params)
+    except Exception as err:
+        logger.error(f"Error updating daily log rollups: {err}")
+
+
+def rebuild(first_day: datetime.date, last_day: datetime.date) -> int:
+    """
+    Recalculate the daily rollups for a range of days from the Log() table.
+    Only days that are over are rebuilt: the rollups of today are still updated by record(),
+    and a rebuild at the same time would count some new entries twice, or fail on the unique key.
+
+    Params:
+        first_day (date): first day to rebuild.
+        last_day (date): last day to rebuild, inclusive. Today or later is not rebuilt.
+
+    Returns:
+        (int): the number of rollup rows created.
+    """
+    last_day = min(last_day, timezone.localdate() - datetime.timedelta(days=1))
+    if first_day > last_day:
+        return 0
+    Log = apps.get_model('switches', 'Log')
+    LogDailyActivity = apps.get_model('switches', 'LogDailyActivity')
+    start = timezone.make_aware(datetime.datetime.combine(first_day, datetime.time.min))
+    end = timezone.make_aware(datetime.datetime.combine(last_day + datetime.timedelta(days=1), datetime.time.min))
+    # let the database do the counting:
+    rows = (
+        Log.objects.filter(timestamp__gte=start, timestamp__lt=end)
+        .annotate(day=TruncDate('timestamp'))
+        .values('day', 'type', 'action', 'switch_id', 'user_id')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    rollups = [
+        LogDailyActivity(
+            day=row['day'],
+            type=row['type'],
+            action=row['action'],
+            switch_id=row['switch_id'] or 0,
+            user_id=row['user_id'] or 0,
+            count=row['count'],
+        )
+        for row in rows.iterator()
+    ]
+    with transaction.atomic():
+        LogDailyActivity.objects.filter(day__gte=first_day, day__lte=last_day).delete()
+        LogDailyActivity.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
+
+
+def rebuild_daily_totals(first_day: datetime.date, last_day: datetime.date) -> int:
+    """
+    Recalculate the LogDailyRollup() totals for a range of days from the LogDailyActivity() rollups.
+
+    Params:
+        first_day (date): first day to rebuild.
+        last_day (date): last day to rebuild, inclusive.
+
+    Returns:
+        (int): the number of rollup rows created.
+    """
+    LogDailyActivity = apps.get_model('switches', 'LogDailyActivity')
+    LogDailyRollup = apps.get_model('switches', 'LogDailyRollup')
+    rows = (
+        LogDailyActivity.objects.filter(day__gte=first_day, day__lte=last_day)
+        .values('day', 'type', 'action')
+        .annotate(total=Sum('count'))
+        .order_by()
+    )
+    rollups = [
+        LogDailyRollup(
+            day=row['day'],
+            type=row['type'],
+            action=row['action'],
+            entries=row['total'],
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        LogDailyRollup.objects.filter(day__gte=first_day, day__lte=last_day).delete()
+        LogDailyRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
+
+
+def get_last_closed_day() -> datetime.date | None:
+    """
+    Return the most recent day with LogDailyRollup() totals, or None if there are none.
+    """
+    return apps.get_model('switches', 'LogDailyRollup').objects.aggregate(last=Max('day'))['last']
+
+
+def close_days():
+    """
+    Calculate the LogDailyRollup() totals for the days that are over, and not done yet.
+    This runs periodically from the background flusher thread.
+    """
+    yesterday = timezone.localdate() - datetime.timedelta(days=1)
+    last_closed = get_last_closed_day()
+    if last_closed is None:
+        first_day = apps.get_model('switches', 'LogDailyActivity').objects.aggregate(first=Min('day'))['first']
+        if first_day is None:
+            return
+    else:
+        first_day = last_closed + datetime.timedelta(days=1)
+    if first_day > yesterday:
+        return
+    try:
+        rebuild_daily_totals(first_day=first_day, last_day=yesterday)
+    except IntegrityError:
+        # another worker process did this at the same time.
+        pass
+
+
+flusher.register(close_days, interval=3600, at_exit=False)
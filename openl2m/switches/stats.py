@@ -25,7 +25,10 @@ import time
 
 import django
 from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth.models import User
 from django.db import connection as db_connection, ProgrammingError
+from django.db.models import Sum
 from django.utils import timezone
 
 from counters.models import Counter
@@ -48,7 +51,10 @@ from switches.models import (
     Switch,
     SwitchGroup,
     Log,
+    LogDailyActivity,
+    LogDailyRollup,
 )
+from switches.rollups import get_last_closed_day
 
 from switches.utils import dprint
 
@@ -126,103 +132,96 @@ def get_database_info() -> dict:
     return db_items
 
 
+def count_log_entries(days: int, **filter) -> int:
+    """Count the log entries of today and the previous number of days, from the daily rollups.
+
+    Args:
+        days (int): the number of days before today to include, 0 is today only.
+        filter: additional filter arguments on 'type' and 'action'.
+
+    Returns:
+        (int): the number of log entries.
+    """
+    first_day = timezone.localdate() - datetime.timedelta(days=days)
+    # days that are over come from the daily totals, the current day (and any day not closed yet) from the activity.
+    last_closed = get_last_closed_day() or first_day - datetime.timedelta(days=1)
+    count = (
+        LogDailyRollup.objects.filter(day__gte=first_day, day__lte=last_closed, **filter).aggregate(
+            total=Sum('entries')
+        )['total']
+        or 0
+    )
+    count += (
+        LogDailyActivity.objects.filter(day__gte=first_day, day__gt=last_closed, **filter).aggregate(
+            total=Sum('count')
+        )['total']
+        or 0
+    )
+    return count
+
+
+def count_distinct(field: str, days: int, **filter) -> int:
+    """Count the distinct devices or users in the log entries of today and the previous number of days.
+
+    Args:
+        field (str): either 'switch_id' or 'user_id'.
+        days (int): the number of days before today to include, 0 is today only.
+        filter: additional filter arguments on 'type' and 'action'.
+
+    Returns:
+        (int): the number of distinct devices or users.
+    """
+    first_day = timezone.localdate() - datetime.timedelta(days=days)
+    return (
+        LogDailyActivity.objects.filter(day__gte=first_day, **filter)
+        .exclude(**{field: 0})
+        .values(field)
+        .distinct()
+        .count()
+    )
+
+
 def get_usage_info() -> dict:
-    '''Get OpenL2M application usage, and return as a dict().'''
+    """Get OpenL2M application usage, and return as a dict().
+    This is calculated from the daily log rollups, and cached for STATS_CACHE_TIMEOUT seconds."""
+    usage = cache.get("openl2m_usage_info")
+    if usage is None:
+        usage = calculate_usage_info()
+        cache.set("openl2m_usage_info", usage, settings.STATS_CACHE_TIMEOUT)
+    return usage
+
+
+def calculate_usage_info() -> dict:
+    """Calculate OpenL2M application usage, and return as a dict()."""
     usage = {}  # usage statistics
 
     # Devices accessed:
-    filter = {
-        "type__in": [LOG_TYPE_VIEW, LOG_TYPE_CHANGE],
-        "switch_id__isnull": False,
-        "timestamp__date": datetime.date.today(),
-    }
-    usage['Devices today'] = Log.objects.filter(**filter).values_list('switch_id', flat=True).distinct().count()
-
-    filter = {
-        "timestamp__gte": timezone.now().date() - datetime.timedelta(days=7),
-        "switch_id__isnull": False,
-    }
-    usage['Devices last 7 days'] = Log.objects.filter(**filter).values_list('switch_id', flat=True).distinct().count()
-
-    filter = {
-        "timestamp__gte": timezone.now().date() - datetime.timedelta(days=31),
-        "switch_id__isnull": False,
-    }
-    usage['Devices last 31 days'] = Log.objects.filter(**filter).values_list('switch_id', flat=True).distinct().count()
+    usage['Devices today'] = count_distinct('switch_id', days=0, type__in=[LOG_TYPE_VIEW, LOG_TYPE_CHANGE])
+    usage['Devices last 7 days'] = count_distinct('switch_id', days=7)
+    usage['Devices last 31 days'] = count_distinct('switch_id', days=31)
 
     # Changes made
-    filter = {}
-    filter['type'] = int(LOG_TYPE_CHANGE)
-    filter['timestamp__date'] = datetime.date.today()
-    usage['Changes today'] = Log.objects.filter(**filter).count()
-
-    filter = {
-        "type": int(LOG_TYPE_CHANGE),
-        "timestamp__gte": timezone.now().date() - datetime.timedelta(days=7),
-    }
-    usage["Changes last 7 days"] = Log.objects.filter(**filter).count()
-
-    filter = {
-        "type": int(LOG_TYPE_CHANGE),
-        "timestamp__gte": timezone.now().date() - datetime.timedelta(days=31),
-    }
-    usage["Changes last 31 days"] = Log.objects.filter(**filter).count()
+    usage['Changes today'] = count_log_entries(days=0, type=LOG_TYPE_CHANGE)
+    usage["Changes last 7 days"] = count_log_entries(days=7, type=LOG_TYPE_CHANGE)
+    usage["Changes last 31 days"] = count_log_entries(days=31, type=LOG_TYPE_CHANGE)
 
     # the total change count since install from Counter()'changes') object:
     usage["Total Changes"] = Counter.objects.get(name="changes").value
 
     # Unique Logins
-    filter = {}
-    filter['type'] = int(LOG_TYPE_LOGIN_OUT)
-    filter['timestamp__date'] = datetime.date.today()
-    usage['Users today'] = Log.objects.filter(**filter).values_list('user_id', flat=True).distinct().count()
-
-    filter = {}
-    filter['type'] = int(LOG_TYPE_LOGIN_OUT)
-    filter['timestamp__gte'] = timezone.now().date() - datetime.timedelta(days=7)
-    usage['Users last 7 days'] = Log.objects.filter(**filter).values_list('user_id', flat=True).distinct().count()
-
-    filter = {}
-    filter['type'] = int(LOG_TYPE_LOGIN_OUT)
-    filter['timestamp__gte'] = timezone.now().date() - datetime.timedelta(days=31)
-    usage['Users last 31 days'] = Log.objects.filter(**filter).values_list('user_id', flat=True).distinct().count()
+    usage['Users today'] = count_distinct('user_id', days=0, type=LOG_TYPE_LOGIN_OUT)
+    usage['Users last 7 days'] = count_distinct('user_id', days=7, type=LOG_TYPE_LOGIN_OUT)
+    usage['Users last 31 days'] = count_distinct('user_id', days=31, type=LOG_TYPE_LOGIN_OUT)
 
     # API requests:
-    filter = {}
-    filter['type'] = int(LOG_TYPE_LOGIN_OUT)
-    filter['action'] = int(LOG_LOGIN_REST_API)
-    filter['timestamp__date'] = datetime.date.today()
-    usage['API calls today'] = Log.objects.filter(**filter).count()
-
-    filter = {
-        "type": int(LOG_TYPE_LOGIN_OUT),
-        "action": int(LOG_LOGIN_REST_API),
-        "timestamp__gte": timezone.now().date() - datetime.timedelta(days=7),
-    }
-    usage["API calls last 7 days"] = Log.objects.filter(**filter).count()
-
-    filter = {
-        "type": int(LOG_TYPE_LOGIN_OUT),
-        "action": int(LOG_LOGIN_REST_API),
-        "timestamp__gte": timezone.now().date() - datetime.timedelta(days=31),
-    }
-    usage["API calls last 31 days"] = Log.objects.filter(**filter).count()
+    usage['API calls today'] = count_log_entries(days=0, type=LOG_TYPE_LOGIN_OUT, action=LOG_LOGIN_REST_API)
+    usage["API calls last 7 days"] = count_log_entries(days=7, type=LOG_TYPE_LOGIN_OUT, action=LOG_LOGIN_REST_API)
+    usage["API calls last 31 days"] = count_log_entries(days=31, type=LOG_TYPE_LOGIN_OUT, action=LOG_LOGIN_REST_API)
 
     # Commands run:
-    filter = {"type": int(LOG_TYPE_COMMAND), "timestamp__date": datetime.date.today()}
-    usage["Commands today"] = Log.objects.filter(**filter).count()
-
-    filter = {
-        "type": int(LOG_TYPE_COMMAND),
-        "timestamp__gte": timezone.now().date() - datetime.timedelta(days=7),
-    }
-    usage["Commands last 7 days"] = Log.objects.filter(**filter).count()
-
-    filter = {
-        "type": int(LOG_TYPE_COMMAND),
-        "timestamp__gte": timezone.now().date() - datetime.timedelta(days=31),
-    }
-    usage["Commands last 31 days"] = Log.objects.filter(**filter).count()
+    usage["Commands today"] = count_log_entries(days=0, type=LOG_TYPE_COMMAND)
+    usage["Commands last 7 days"] = count_log_entries(days=7, type=LOG_TYPE_COMMAND)
+    usage["Commands last 31 days"] = count_log_entries(days=31, type=LOG_TYPE_COMMAND)
 
     # total number of commands run:
     usage["Total Commands"] = Counter.objects.get(name="commands").value
@@ -230,92 +229,49 @@ def get_usage_info() -> dict:
     return usage
 
 
-def get_top_n_from_dict_on_count(data: dict) -> dict:
-    """Return the TOP_N from the dcitionary with value, based on the 'count' attribute.
+def get_top_activity(types: list, field: str, model) -> list:
+    """Return the TOP_ACTIVITY (id, count) tuples over the last TOP_ACTIVITY_DAYS, from the daily log rollups.
 
     Args:
-    data (dict): a dictionary of dictionaries containing at least the 'count' attrbute.
+        types (list): the log types to count.
+        field (str): the rollup field to group by, either 'switch_id' or 'user_id'.
+        model (Model): the model of the ids, Switch or User. Ids of deleted objects are skipped
+                       before the limit, so up to TOP_ACTIVITY entries are returned.
 
     Returns:
-        (dict): the TOP-N (ie sorted) entries of the data (input) argument.
-
+        (list): of (id, count) tuples, sorted by descending count.
     """
-    # sort by descending order:
-    data_sorted = dict(sorted(data.items(), key=lambda x: x[1]['count'], reverse=True))
-    # # and limit to TOP-N:
-    top_data = {}
-    num = 0
-    for key, val in data_sorted.items():
-        top_data[key] = val
-        num += 1
-        if num == settings.TOP_ACTIVITY:
-            break
-    return top_data
+    first_day = timezone.localdate() - datetime.timedelta(days=settings.TOP_ACTIVITY_DAYS)
+    rows = (
+        LogDailyActivity.objects.filter(day__gte=first_day, type__in=types)
+        .filter(**{f"{field}__in": model.objects.values('id')})
+        .values(field)
+        .annotate(total=Sum('count'))
+        .order_by('-total')[: settings.TOP_ACTIVITY]
+    )
+    return [(row[field], row['total']) for row in rows]
+
+
+def get_top_devices(types: list) -> dict:
+    """Return a dict with the most active devices for the given log types, keyed by device id."""
+    top = get_top_activity(types=types, field='switch_id', model=Switch)
+    names = dict(Switch.objects.filter(id__in=[switch_id for switch_id, count in top]).values_list('id', 'name'))
+    # a device deleted since the activity was read is skipped:
+    return {switch_id: {'name': names[switch_id], 'count': count} for switch_id, count in top if switch_id in names}
 
 
 def get_top_changed_devices() -> dict:
     """Return a dict with the most active (changed) devices over the last TOP_ACTIVITY_DAYS"""
-    devices = {}
-    filter = {
-        "type": int(LOG_TYPE_CHANGE),
-        "timestamp__gte": timezone.now().date() - datetime.timedelta(days=settings.TOP_ACTIVITY_DAYS),
-    }
-    # records = Log.objects.filter(**filter).values_list('switch_id', flat=True)
-    logs = Log.objects.filter(**filter)
-    # there is probably a better way to do this with a filter above, but this works also:
-    for log in logs:
-        if log.switch is not None:
-            if log.switch.id not in devices:
-                devices[log.switch.id] = {
-                    'name': log.switch.name,
-                    'count': 1,
-                }
-            else:
-                devices[log.switch.id]['count'] += 1
-
-    return get_top_n_from_dict_on_count(devices)
+    return get_top_devices(types=[LOG_TYPE_CHANGE])
 
 
 def get_top_viewed_devices() -> dict:
     """Return a dict with the most viewed devices over the last TOP_ACTIVITY_DAYS"""
-    devices = {}
-    filter = {
-        "type": int(LOG_TYPE_VIEW),
-        "timestamp__gte": timezone.now().date() - datetime.timedelta(days=settings.TOP_ACTIVITY_DAYS),
-    }
-    # records = Log.objects.filter(**filter).values_list('switch_id', flat=True)
-    logs = Log.objects.filter(**filter)
-    # there is probably a better way to do this with a filter above, but this works also:
-    for log in logs:
-        if log.switch is not None:
-            if log.switch.id not in devices:
-                devices[log.switch.id] = {
-                    'name': log.switch.name,
-                    'count': 1,
-                }
-            else:
-                devices[log.switch.id]['count'] += 1
-
-    return get_top_n_from_dict_on_count(devices)
+    return get_top_devices(types=[LOG_TYPE_VIEW])
 
 
 def get_top_active_users() -> dict:
     """Return a dict with the most active users, based on views or changes, over the last TOP_ACTIVITY_DAYS"""
-    users = {}
-    filter = {
-        "type__in": [LOG_TYPE_VIEW, LOG_TYPE_CHANGE],
-        "timestamp__gte": timezone.now().date() - datetime.timedelta(days=settings.TOP_ACTIVITY_DAYS),
-    }
-    logs = Log.objects.filter(**filter)
-    # there is probably a better way to do this with a filter above, but this works also:
-    for log in logs:
-        if log.user is not None:
-            if log.user.id not in users:
-                users[log.user.id] = {
-                    'name': log.user.username,
-                    'count': 1,
-                }
-            else:
-                users[log.user.id]['count'] += 1
-
-    return get_top_n_from_dict_on_count(users)
+    top = get_top_activity(types=[LOG_TYPE_VIEW, LOG_TYPE_CHANGE], field='user_id', model=User)
+    names = dict(User.objects.filter(id__in=[user_id for user_id, count in top]).values_list('id', 'username'))
+    return {user_id: {'name': names[user_id], 'count': count} for user_id, count in top if user_id in names}
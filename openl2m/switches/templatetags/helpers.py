@@ -242,6 +242,16 @@ def get_group_menu(group, group_id, open=False):
     )
     for switch_id, switch in group['members'].items():
         s = s + f"\n{get_switch_link(group_id, switch_id, switch)}"
+    # and the links to export the inventory of, and run a command on, all devices:
+    if len(group['members']) > 1:
+        s = (
+            s
+            + f'\n<a href="{reverse("switches:group_export", kwargs={"group_id": group_id})}" class="list-group-item list-group-item-action"><i class="fas fa-download" aria-hidden="true"></i> Export all devices</a>'
+        )
+        s = (
+            s
+            + f'\n<a href="{reverse("switches:group_command", kwargs={"group_id": group_id})}" class="list-group-item list-group-item-action"><i class="fas fa-terminal" aria-hidden="true"></i> Run command on devices</a>'
+        )
     # end devices div, list and group menu
     s = s + "\n</div>\n</div>\n<!-- END Group {group_id} -->\n\n"
     # done:
@@ -11,7 +11,116 @@
 # more details.  You should have received a copy of the GNU General Public
 # License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
 #
-# commented out to quiet down flake8
-# from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from switches import logwriter
+from switches.constants import LOG_TYPE_VIEW, LOG_VIEW_SWITCH
+from switches.models import Log
+
+
+# the background flusher thread uses its own database connection, so is not started here;
+# the tests call logwriter.flush() directly.
+@mock.patch("switches.flusher.wakeup")
+@mock.patch("switches.flusher.start")
+@override_settings(LOG_WRITE_ASYNC=True, SYSLOG_HOST="")
+class LogWriterTest(TestCase):
+    def setUp(self):
+        logwriter.flush()
+
+    def new_log(self, description: str = "test entry") -> Log:
+        return Log(type=LOG_TYPE_VIEW, action=LOG_VIEW_SWITCH, description=description)
+
+    def test_save_is_queued_until_flush(self, mock_start, mock_wakeup):
+        log = self.new_log()
+        log.save()
+        self.assertIsNone(log.pk)
+        self.assertEqual(Log.objects.count(), 0)
+        mock_start.assert_called()
+
+        self.assertEqual(logwriter.flush(), 1)
+        self.assertIsNotNone(log.pk)
+        self.assertEqual(Log.objects.count(), 1)
+        # nothing left to write:
+        self.assertEqual(logwriter.flush(), 0)
+
+    def test_save_twice_is_queued_once(self, mock_start, mock_wakeup):
+        log = self.new_log()
+        log.save()
+        log.description = "changed before the flush"
+        log.save()
+        self.assertEqual(logwriter.flush(), 1)
+        self.assertEqual(Log.objects.get().description, "changed before the flush")
+
+    def test_full_queue_wakes_up_flusher(self, mock_start, mock_wakeup):
+        with self.settings(LOG_WRITE_BATCH_SIZE=2):
+            self.new_log().save()
+            mock_wakeup.assert_not_called()
+            self.new_log().save()
+            mock_wakeup.assert_called_once()
+        self.assertEqual(logwriter.flush(), 2)
+
+    def test_timestamp_is_event_time(self, mock_start, mock_wakeup):
+        event_time = timezone.now() - datetime.timedelta(minutes=5)
+        log = self.new_log()
+        log.timestamp = event_time
+        log.save()
+        logwriter.flush()
+        self.assertEqual(Log.objects.get(pk=log.pk).timestamp, event_time)
+
+    def test_timestamp_set_when_queued(self, mock_start, mock_wakeup):
+        log = self.new_log()
+        log.timestamp = None
+        log.save()
+        queued_time = log.timestamp
+        self.assertIsNotNone(queued_time)
+        logwriter.flush()
+        self.assertEqual(Log.objects.get(pk=log.pk).timestamp, queued_time)
+
+    def test_save_while_writing_marks_dirty(self, mock_start, mock_wakeup):
+        log = self.new_log()
+        log.save()
+        bulk_create = Log.objects.bulk_create
+
+        def save_during_write(batch, **kwargs):
+            # another thread changes the entry while the batch is being inserted:
+            self.assertEqual(log._logwriter_state, logwriter.STATE_WRITING)
+            log.description = "changed while writing"
+            log.save()
+            self.assertEqual(log._logwriter_state, logwriter.STATE_DIRTY)
+            return bulk_create(batch, **kwargs)
+
+        with mock.patch.object(Log.objects, "bulk_create", side_effect=save_during_write):
+            self.assertEqual(logwriter.flush(), 1)
+        # not queued again, but updated after the insert:
+        self.assertEqual(logwriter.flush(), 0)
+        self.assertIsNone(log._logwriter_state)
+        self.assertEqual(Log.objects.count(), 1)
+        self.assertEqual(Log.objects.get(pk=log.pk).description, "changed while writing")
+
+    def test_failed_bulk_write_retries_each_entry(self, mock_start, mock_wakeup):
+        logs = [self.new_log(f"entry {i}") for i in range(3)]
+        for log in logs:
+            log.save()
+        with mock.patch.object(Log.objects, "bulk_create", side_effect=Exception("bulk write failed")):
+            self.assertEqual(logwriter.flush(), 3)
+        self.assertEqual(Log.objects.count(), 3)
+
+    @override_settings(LOG_WRITE_ASYNC=False)
+    def test_synchronous_fallback(self, mock_start, mock_wakeup):
+        log = self.new_log()
+        log.save()
+        self.assertIsNotNone(log.pk)
+        self.assertEqual(Log.objects.count(), 1)
+        mock_start.assert_not_called()
+        self.assertEqual(logwriter.flush(), 0)
+
+    def test_save_with_arguments_is_not_queued(self, mock_start, mock_wakeup):
+        log = self.new_log()
+        log.save(force_insert=True)
+        self.assertIsNotNone(log.pk)
+        self.assertEqual(Log.objects.count(), 1)
+        self.assertEqual(logwriter.flush(), 0)
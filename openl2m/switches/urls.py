@@ -57,6 +57,11 @@ urlpatterns = [
         views.SwitchAdminActivity.as_view(),
         name='admin_activity',
     ),
+    path(
+        'drivers',
+        views.ShowDrivers.as_view(),
+        name='show_drivers',
+    ),
     path(
         'stats',
         views.ShowStats.as_view(),
@@ -67,6 +72,31 @@ urlpatterns = [
         views.ShowTop.as_view(),
         name='show_top',
     ),
+    path(
+        'hosts',
+        views.HostSearch.as_view(),
+        name='host_search',
+    ),
+    path(
+        'export/<int:group_id>/',
+        views.GroupExport.as_view(),
+        name='group_export',
+    ),
+    path(
+        'command/<int:group_id>/',
+        views.GroupCommand.as_view(),
+        name='group_command',
+    ),
+    path(
+        'export/job/<int:job_id>/status/',
+        views.GroupExportStatus.as_view(),
+        name='group_export_status',
+    ),
+    path(
+        'export/job/<int:job_id>/download/',
+        views.GroupExportDownload.as_view(),
+        name='group_export_download',
+    ),
     path(
         '<int:group_id>/<int:switch_id>/',
         views.SwitchBasics.as_view(),
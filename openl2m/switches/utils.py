@@ -15,7 +15,9 @@
 Various utility functions
 """
 import datetime
+import functools
 import inspect
+import io
 import ipaddress
 from ipware import get_client_ip
 import logging
@@ -287,6 +289,30 @@ def is_valid_hostname_or_ip(data: str) -> bool:
     return False
 
 
+@functools.lru_cache(maxsize=settings.REGEX_CACHE_SIZE)
+def get_compiled_regex(regex: str, flags: int = 0) -> re.Pattern:
+    """
+    Return the compiled regular expression, from a bounded LRU cache shared by all threads.
+    Raises re.error if the regex is not valid.
+
+    Args:
+        regex (str): the regular expression.
+        flags (int): the re flags, e.g. re.IGNORECASE
+
+    Returns:
+        (re.Pattern): the compiled regex.
+    """
+    return re.compile(regex, flags)
+
+
+def iter_lines(string: str):
+    """
+    Return an iterator over the lines of a (large) string, without the line endings.
+    Unlike str.splitlines(), this does not build a list of all lines first.
+    """
+    return (line.rstrip("\r\n") for line in io.StringIO(string))
+
+
 def string_matches_regex(string: str, regex: str) -> bool:
     """
     Validate data with the given regular expression.
@@ -298,7 +324,7 @@ def string_matches_regex(string: str, regex: str) -> bool:
     if regex:
         # match string against regex.
         # Note re.match() starts at beginning of string!
-        match = re.match(regex, string)
+        match = get_compiled_regex(regex).match(string)
         if match:
             dprint("  ==> PASS!")
             return True
@@ -315,10 +341,10 @@ def string_contains_regex(string: str, regex: str) -> bool:
     regex: the regular expression to find anywhere in the (multi-line) string.
     returns True if found, or no regex given. False otherwize
     """
-    dprint(f"string_contains_regex(): string={string} regex={regex}")
+    dprint(f"string_contains_regex(): regex={regex}")
     if regex:
         # search string for regex, anywhere in string, hence we use re.search()!
-        found = re.search(regex, string)
+        found = get_compiled_regex(regex).search(string)
         if found:
             dprint("  ==> PASS!")
             return True
@@ -11,6 +11,7 @@
 # more details.  You should have received a copy of the GNU General Public
 # License along with OpenL2M. If not, see <http://www.gnu.org/licenses/>.
 #
+import os
 import time
 import traceback
 import re
@@ -18,12 +19,11 @@ import re
 from django.conf import settings
 from django.shortcuts import get_object_or_404, render
 from django.contrib.auth.models import User
-from django.http import FileResponse
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
 from django.urls import reverse
 from django.utils.html import mark_safe
-from django.core.paginator import Paginator
+from django.utils.http import content_disposition_header
 from django.shortcuts import redirect
-from django.template import Template, Context
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views import View
@@ -46,6 +46,7 @@ from switches.models import (
     Switch,
     SwitchGroup,
     Log,
+    ExportJob,
 )
 from switches.constants import (
     LOG_TYPE_VIEW,
@@ -69,9 +70,11 @@ from switches.constants import (
     LOG_VIEW_ALL_LOGS,
     LOG_VIEW_ADMIN_STATS,
     LOG_VIEW_SWITCH_SEARCH,
+    LOG_VIEW_HOST_SEARCH,
     LOG_VIEW_DOWNLOAD_ARP_LLDP,
     LOG_VIEW_DOWNLOAD_INTERFACES,
     LOG_VIEW_TOP_ACTIVITY,
+    LOG_VIEW_GROUP_EXPORT,
     LOG_EXECUTE_COMMAND,
     LOG_RELOAD_SWITCH,
     INTERFACE_STATUS_NONE,
@@ -89,16 +92,43 @@ from switches.constants import (
     INTERFACE_STATUS_CHANGE,
     INTERFACE_STATUS_DOWN,
     INTERFACE_STATUS_UP,
+    EXPORT_FORMAT_CHOICES,
+    EXPORT_STATUS_DONE,
+    EXPORT_STATUS_RUNNING,
 )
 from switches.connect.connector import clear_switch_cache
 from switches.connect.connect import get_connection_object
+from switches.connect import registry
+from switches.connect.napalm import cache as napalm_cache
 from switches.connect.constants import (
     POE_PORT_ADMIN_ENABLED,
     POE_PORT_ADMIN_DISABLED,
 )
-from switches.download import create_eth_neighbor_xls_file, create_interfaces_xls_file
+from switches.download import (
+    DOWNLOAD_FORMATS,
+    ETH_NEIGHBOR_COLUMNS,
+    INTERFACE_COLUMNS,
+    create_eth_neighbor_xls_file,
+    create_interfaces_xls_file,
+    eth_neighbor_rows,
+    get_columns,
+    interface_rows,
+    stream_csv,
+    stream_ndjson,
+)
+from switches.export import fail_stale_exports, start_export
+from switches.multicommand import (
+    filter_template_output,
+    get_group_commands,
+    get_template_command,
+    prepare_command,
+    run_command_on_devices,
+    stream_results,
+)
+from switches import hostindex
 from switches.permissions import get_group_and_switch, get_connection_if_permitted, get_my_device_groups
 
+from switches.paginator import get_keyset_page
 from switches.stats import (
     get_environment_info,
     get_database_info,
@@ -119,9 +149,8 @@ from switches.utils import (
     save_to_http_session,
     get_remote_ip,
     time_duration,
-    string_contains_regex,
-    string_matches_regex,
     get_choice_name,
+    get_compiled_regex,
 )
 
 from users.utils import user_can_bulkedit, user_can_edit_vlans, get_current_users
@@ -268,6 +297,12 @@ class SwitchSearch(LoginRequiredMixin, View):
         result_groups = {}
         warning = False
         permissions = get_from_http_session(request, "permissions")
+        try:
+            pattern = get_compiled_regex(search, re.IGNORECASE)
+        except re.error:
+            # invalid search, just ignore!
+            warning = f"{search} - This is an invalid search pattern!"
+            permissions = False
 
         if permissions and isinstance(permissions, dict):
             for group_id, group in permissions.items():
@@ -279,17 +314,10 @@ class SwitchSearch(LoginRequiredMixin, View):
                         description = switch['description']
                         default_view = switch['default_view']
                         # now check the name, hostname for the search pattern:
-                        try:
-                            if re.search(search, name, re.IGNORECASE) or re.search(search, hostname, re.IGNORECASE):
-                                # regular user, add all occurances of device (likely just one!)
-                                results.append(
-                                    (str(group_id), str(switch_id), name, description, default_view, group_name)
-                                )
-                                result_groups[group_name] = True
-                        except Exception:
-                            # invalid search, just ignore!
-                            warning = f"{search} - This is an invalid search pattern!"
-                            break
+                        if pattern.search(name) or pattern.search(hostname):
+                            # regular user, add all occurances of device (likely just one!)
+                            results.append((str(group_id), str(switch_id), name, description, default_view, group_name))
+                            result_groups[group_name] = True
 
         # render the template
         return render(
@@ -348,6 +376,7 @@ def switch_view(
     interface_name="",
     command_string="",
     command_template=False,
+    use_snapshot=True,
 ):
     """
     This shows the various data about a switch, either from a new SNMP read,
@@ -355,6 +384,7 @@ def switch_view(
     This is includes enough to enable/disable interfaces and power,
     and change vlans. Depending on view, there may be more data needed,
     such as ethernet, arp & lldp tables.
+    If use_snapshot is True, the device state pre-read by the 'poller' command can be shown.
     """
 
     template_name = "switch.html"
@@ -382,7 +412,7 @@ def switch_view(
         return error_page(request=request, group=False, switch=False, error=error)
 
     try:
-        conn = get_connection_object(request, group, switch)
+        conn = get_connection_object(request, group, switch, use_snapshot=use_snapshot)
     except Exception:
         log.type = LOG_TYPE_ERROR
         log.action = LOG_CONNECTION_ERROR
@@ -496,27 +526,7 @@ def switch_view(
             log.save()
             # if the result of a command template, we may need to parse the output:
             if command_template:
-                # do we need to match output to show match/fail result?
-                output = cmd["output"]
-                if command_template.output_match_regex:
-                    if string_contains_regex(cmd["output"], command_template.output_match_regex):
-                        cmd["output"] = (
-                            command_template.output_match_text if command_template.output_match_text else "OK!"
-                        )
-                    else:
-                        cmd["output"] = (
-                            command_template.output_fail_text if command_template.output_fail_text else "FAIL!"
-                        )
-                # do we need to filter (original) output to keep only matching lines?
-                if command_template.output_lines_keep_regex:
-                    matched_lines = ""
-                    lines = output.splitlines()
-                    for line in lines:
-                        # we can probably improve performance by compiling the regex first...
-                        if string_contains_regex(line, command_template.output_lines_keep_regex):
-                            matched_lines = f"{matched_lines}\n{line}"
-                    if matched_lines:
-                        cmd["output"] += "\nPartial output:\n" + matched_lines
+                cmd["output"] = filter_template_output(template=command_template, output=cmd["output"])
 
     else:
         # log the access:
@@ -527,6 +537,7 @@ def switch_view(
     logs = (
         Log.objects.all()
         .filter(switch=switch, type__gt=LOG_TYPE_VIEW)
+        .select_related("user", "switch", "group")
         .order_by("-timestamp")[: settings.RECENT_SWITCH_LOG_COUNT]
     )
 
@@ -790,274 +801,344 @@ def bulkedit_processor(
     # to get access to interfaces.
     #        conn.get_basic_info()
 
+    # if the driver supports it, gather all changes and apply them at once at the end.
+    # Not for PoE Down/Up, that needs the PoE disable applied before the enable!
+    transaction = poe_choice != BULKEDIT_POE_DOWN_UP and conn.begin_transaction()
+
+    # in a transaction, the successful changes are only logged and counted after the commit,
+    # so a rolled back bulk edit does not leave 'changed' log entries or change counts:
+    change_logs = []
+    pending_changes = 0
+
+    def save_change_log(log: Log):
+        if transaction:
+            change_logs.append(log)
+        else:
+            log.save()
+
+    def count_change():
+        nonlocal pending_changes
+        if transaction:
+            pending_changes += 1
+        else:
+            counter_increment(COUNTER_CHANGES)
+            conn.switch.update_change()
+
     # now do the work, and log each change
     iface_count = 0
     success_count = 0
     error_count = 0
+    changed_interfaces = []  # names of the interfaces with successful changes
     outputs = []  # description of any errors found
-    for if_key, name in interfaces.items():
-        iface = conn.get_interface_by_key(if_key)
-        if not iface:
-            error_count += 1
-            outputs.append(f"ERROR: (BulkEdit) interface for index '{if_key}' not found!")
-            continue
-        iface_count += 1
-
-        # now check all the things we could be changing,
-        # start with UP/DOWN state:
-        if interface_change != INTERFACE_STATUS_NONE:
-            log = Log(
-                user=request.user,
-                ip_address=remote_ip,
-                if_name=iface.name,
-                switch=switch,
-                group=group,
-            )
-            current_state = iface.admin_status
-            if interface_change == INTERFACE_STATUS_CHANGE:
-                if iface.admin_status:
+    try:
+        for if_key, name in interfaces.items():
+            iface = conn.get_interface_by_key(if_key)
+            if not iface:
+                error_count += 1
+                outputs.append(f"ERROR: (BulkEdit) interface for index '{if_key}' not found!")
+                continue
+            iface_count += 1
+            iface_success_count = success_count
+
+            # now check all the things we could be changing,
+            # start with UP/DOWN state:
+            if interface_change != INTERFACE_STATUS_NONE:
+                log = Log(
+                    user=request.user,
+                    ip_address=remote_ip,
+                    if_name=iface.name,
+                    switch=switch,
+                    group=group,
+                )
+                current_state = iface.admin_status
+                if interface_change == INTERFACE_STATUS_CHANGE:
+                    if iface.admin_status:
+                        new_state = False
+                        new_state_name = "Down"
+                        log.action = LOG_CHANGE_INTERFACE_DOWN
+                    else:
+                        new_state = True
+                        new_state_name = "Up"
+                        log.action = LOG_CHANGE_INTERFACE_UP
+
+                elif interface_change == INTERFACE_STATUS_DOWN:
                     new_state = False
                     new_state_name = "Down"
                     log.action = LOG_CHANGE_INTERFACE_DOWN
-                else:
+
+                elif interface_change == INTERFACE_STATUS_UP:
                     new_state = True
                     new_state_name = "Up"
                     log.action = LOG_CHANGE_INTERFACE_UP
 
-            elif interface_change == INTERFACE_STATUS_DOWN:
-                new_state = False
-                new_state_name = "Down"
-                log.action = LOG_CHANGE_INTERFACE_DOWN
-
-            elif interface_change == INTERFACE_STATUS_UP:
-                new_state = True
-                new_state_name = "Up"
-                log.action = LOG_CHANGE_INTERFACE_UP
-
-            # are we actually making a change?
-            if new_state != current_state:
-                # yes, apply the change:
-                retval = conn.set_interface_admin_status(iface, new_state)
-                if retval:
-                    success_count += 1
+                # are we actually making a change?
+                changed = False
+                if new_state != current_state:
+                    # yes, apply the change:
+                    retval = conn.set_interface_admin_status(iface, new_state)
+                    if retval:
+                        changed = True
+                        success_count += 1
+                        log.type = LOG_TYPE_CHANGE
+                        log.description = f"Interface {iface.name}: Admin set to {new_state_name}"
+                        count_change()
+                    else:
+                        error_count += 1
+                        log.type = LOG_TYPE_ERROR
+                        log.description = (
+                            f"Interface {iface.name}: Admin {new_state_name} ERROR: {conn.error.description}"
+                        )
+                        counter_increment(COUNTER_ERRORS)
+                else:
+                    # already in wanted admin state:
                     log.type = LOG_TYPE_CHANGE
-                    log.description = f"Interface {iface.name}: Admin set to {new_state_name}"
-                    counter_increment(COUNTER_CHANGES)
-                    conn.switch.update_change()
+                    log.description = f"Interface {iface.name}: Ignored - already {new_state_name}"
+                outputs.append(log.description)
+                if changed:
+                    save_change_log(log)
                 else:
-                    error_count += 1
-                    log.type = LOG_TYPE_ERROR
-                    log.description = f"Interface {iface.name}: Admin {new_state_name} ERROR: {conn.error.description}"
-                    counter_increment(COUNTER_ERRORS)
-            else:
-                # already in wanted admin state:
-                log.type = LOG_TYPE_CHANGE
-                log.description = f"Interface {iface.name}: Ignored - already {new_state_name}"
-            outputs.append(log.description)
-            log.save()
+                    log.save()
 
-        # next work on PoE state:
-        if poe_choice != BULKEDIT_POE_NONE:
-            if not iface.poe_entry:
-                outputs.append(f"Interface {iface.name}: Ignored - not PoE capable")
-            else:
-                log = Log(
-                    user=request.user,
-                    ip_address=remote_ip,
-                    if_name=iface.name,
-                    switch=switch,
-                    group=group,
-                )
-                current_state = iface.poe_entry.admin_status
-                if poe_choice == BULKEDIT_POE_DOWN_UP:
-                    # Down / Up on interfaces with PoE Enabled:
-                    if iface.poe_entry.admin_status == POE_PORT_ADMIN_ENABLED:
-                        log.action = LOG_CHANGE_INTERFACE_POE_TOGGLE_DOWN_UP
-                        # First disable PoE
-                        if not conn.set_interface_poe_status(iface, POE_PORT_ADMIN_DISABLED):
-                            log.description = (
-                                f"ERROR: Toggle-Disable PoE on interface {iface.name} - {conn.error.description}"
-                            )
-                            log.type = LOG_TYPE_ERROR
-                            outputs.append(log.description)
-                            log.save()
-                            counter_increment(COUNTER_ERRORS)
-                        else:
-                            # successful power down
-                            counter_increment(COUNTER_CHANGES)
-                            conn.switch.update_change()
-                            # now delay
-                            time.sleep(settings.POE_TOGGLE_DELAY)
-                            # Now enable PoE again...
-                            if not conn.set_interface_poe_status(iface, POE_PORT_ADMIN_ENABLED):
+            # next work on PoE state:
+            if poe_choice != BULKEDIT_POE_NONE:
+                if not iface.poe_entry:
+                    outputs.append(f"Interface {iface.name}: Ignored - not PoE capable")
+                else:
+                    log = Log(
+                        user=request.user,
+                        ip_address=remote_ip,
+                        if_name=iface.name,
+                        switch=switch,
+                        group=group,
+                    )
+                    current_state = iface.poe_entry.admin_status
+                    if poe_choice == BULKEDIT_POE_DOWN_UP:
+                        # Down / Up on interfaces with PoE Enabled:
+                        if iface.poe_entry.admin_status == POE_PORT_ADMIN_ENABLED:
+                            log.action = LOG_CHANGE_INTERFACE_POE_TOGGLE_DOWN_UP
+                            # First disable PoE
+                            if not conn.set_interface_poe_status(iface, POE_PORT_ADMIN_DISABLED):
                                 log.description = (
-                                    f"ERROR: Toggle-Enable PoE on interface {iface.name} - {conn.error.description}"
+                                    f"ERROR: Toggle-Disable PoE on interface {iface.name} - {conn.error.description}"
                                 )
                                 log.type = LOG_TYPE_ERROR
                                 outputs.append(log.description)
                                 log.save()
                                 counter_increment(COUNTER_ERRORS)
                             else:
-                                # all went well!
-                                success_count += 1
-                                log.type = LOG_TYPE_CHANGE
-                                log.description = f"Interface {iface.name}: PoE Toggle Down/Up OK"
-                                outputs.append(log.description)
-                                log.save()
+                                # successful power down
                                 counter_increment(COUNTER_CHANGES)
                                 conn.switch.update_change()
+                                # now delay
+                                time.sleep(settings.POE_TOGGLE_DELAY)
+                                # Now enable PoE again...
+                                if not conn.set_interface_poe_status(iface, POE_PORT_ADMIN_ENABLED):
+                                    log.description = (
+                                        f"ERROR: Toggle-Enable PoE on interface {iface.name} - {conn.error.description}"
+                                    )
+                                    log.type = LOG_TYPE_ERROR
+                                    outputs.append(log.description)
+                                    log.save()
+                                    counter_increment(COUNTER_ERRORS)
+                                else:
+                                    # all went well!
+                                    success_count += 1
+                                    log.type = LOG_TYPE_CHANGE
+                                    log.description = f"Interface {iface.name}: PoE Toggle Down/Up OK"
+                                    outputs.append(log.description)
+                                    log.save()
+                                    counter_increment(COUNTER_CHANGES)
+                                    conn.switch.update_change()
+                        else:
+                            outputs.append(f"Interface {iface.name}: PoE Down/Up IGNORED, PoE NOT enabled")
+
                     else:
-                        outputs.append(f"Interface {iface.name}: PoE Down/Up IGNORED, PoE NOT enabled")
+                        # just enable or disable:
+                        if poe_choice == BULKEDIT_POE_CHANGE:
+                            # the PoE index is kept in the iface.poe_entry
+                            if iface.poe_entry.admin_status == POE_PORT_ADMIN_ENABLED:
+                                new_state = POE_PORT_ADMIN_DISABLED
+                                new_state_name = "Disabled"
+                                log.action = LOG_CHANGE_INTERFACE_POE_DOWN
+                            else:
+                                new_state = POE_PORT_ADMIN_ENABLED
+                                new_state_name = "Enabled"
+                                log.action = LOG_CHANGE_INTERFACE_POE_UP
 
-                else:
-                    # just enable or disable:
-                    if poe_choice == BULKEDIT_POE_CHANGE:
-                        # the PoE index is kept in the iface.poe_entry
-                        if iface.poe_entry.admin_status == POE_PORT_ADMIN_ENABLED:
+                        elif poe_choice == BULKEDIT_POE_DOWN:
                             new_state = POE_PORT_ADMIN_DISABLED
                             new_state_name = "Disabled"
                             log.action = LOG_CHANGE_INTERFACE_POE_DOWN
-                        else:
+
+                        elif poe_choice == BULKEDIT_POE_UP:
                             new_state = POE_PORT_ADMIN_ENABLED
                             new_state_name = "Enabled"
                             log.action = LOG_CHANGE_INTERFACE_POE_UP
 
-                    elif poe_choice == BULKEDIT_POE_DOWN:
-                        new_state = POE_PORT_ADMIN_DISABLED
-                        new_state_name = "Disabled"
-                        log.action = LOG_CHANGE_INTERFACE_POE_DOWN
-
-                    elif poe_choice == BULKEDIT_POE_UP:
-                        new_state = POE_PORT_ADMIN_ENABLED
-                        new_state_name = "Enabled"
-                        log.action = LOG_CHANGE_INTERFACE_POE_UP
-
-                    # are we actually making a change?
-                    if new_state != current_state:
-                        # yes, go do it:
-                        if not conn.set_interface_poe_status(iface, new_state):
+                        # are we actually making a change?
+                        if new_state != current_state:
+                            # yes, go do it:
+                            if not conn.set_interface_poe_status(iface, new_state):
+                                error_count += 1
+                                log.type = LOG_TYPE_ERROR
+                                log.description = (
+                                    f"Interface {iface.name}: PoE {new_state_name} ERROR: {conn.error.description}"
+                                )
+                                outputs.append(log.description)
+                                log.save()
+                                counter_increment(COUNTER_ERRORS)
+                            else:
+                                success_count += 1
+                                log.type = LOG_TYPE_CHANGE
+                                log.description = f"Interface {iface.name}: PoE {new_state_name}"
+                                outputs.append(log.description)
+                                save_change_log(log)
+                                count_change()
+                        else:
+                            # already in wanted power state:
+                            outputs.append(f"Interface {iface.name}: Ignored, PoE already {new_state_name}")
+
+            # do we want to change the untagged vlan:
+            if new_pvid > 0:
+                if iface.lacp_master_index > 0:
+                    # LACP member interface, we cannot edit the vlan!
+                    log = Log(
+                        user=request.user,
+                        ip_address=remote_ip,
+                        if_name=iface.name,
+                        switch=switch,
+                        group=group,
+                        type=LOG_TYPE_WARNING,
+                        action=LOG_CHANGE_INTERFACE_PVID,
+                        description=f"Interface {iface.name}: LACP Member, vlan set to {new_pvid} IGNORED!",
+                    )
+                    outputs.append(log.description)
+                    log.save()
+                else:
+                    # make sure we cast the proper type here! Ie this needs an Integer()
+                    log = Log(
+                        user=request.user,
+                        ip_address=remote_ip,
+                        if_name=iface.name,
+                        switch=switch,
+                        group=group,
+                        action=LOG_CHANGE_INTERFACE_PVID,
+                    )
+                    if new_pvid != iface.untagged_vlan:
+                        # new vlan, go set it:
+                        if not conn.set_interface_untagged_vlan(iface, new_pvid):
                             error_count += 1
                             log.type = LOG_TYPE_ERROR
-                            log.description = (
-                                f"Interface {iface.name}: PoE {new_state_name} ERROR: {conn.error.description}"
-                            )
-                            outputs.append(log.description)
-                            log.save()
+                            log.description = f"Interface {iface.name}: Vlan change ERROR: {conn.error.description} - {conn.error.details}"
+                            outputs.append(f"Interface {iface.name}: Vlan change ERROR: {conn.error.description}")
                             counter_increment(COUNTER_ERRORS)
+                            log.save()
                         else:
                             success_count += 1
                             log.type = LOG_TYPE_CHANGE
-                            log.description = f"Interface {iface.name}: PoE {new_state_name}"
+                            log.description = f"Interface {iface.name}: Vlan set to {new_pvid}"
                             outputs.append(log.description)
-                            log.save()
-                            counter_increment(COUNTER_CHANGES)
-                            conn.switch.update_change()
+                            save_change_log(log)
+                        count_change()
                     else:
-                        # already in wanted power state:
-                        outputs.append(f"Interface {iface.name}: Ignored, PoE already {new_state_name}")
+                        # already on desired vlan:
+                        outputs.append(f"Interface {iface.name}: Ignored, vlan already {new_pvid}")
+
+            # tired of the old interface description?
+            if new_description:
+                iface_new_description = ""
+                # what are we supposed to do with the description/description?
+                if new_description_type == BULKEDIT_ALIAS_TYPE_APPEND:
+                    iface_new_description = f"{iface.description} {new_description}"
+                    # outputs.append(f"Interface {iface.name}: Description Append: {iface_new_description}")
+                elif new_description_type == BULKEDIT_ALIAS_TYPE_REPLACE:
+                    # check if the original description starts with a string we have to keep:
+                    if settings.IFACE_ALIAS_KEEP_BEGINNING_REGEX:
+                        keep_format = f"(^{settings.IFACE_ALIAS_KEEP_BEGINNING_REGEX})"
+                        match = re.match(keep_format, iface.description)
+                        if match:
+                            # beginning match, but check if new submitted description matches requirement:
+                            match_new = re.match(keep_format, new_description)
+                            if not match_new:
+                                # required start string NOT found on new description, so prepend it!
+                                iface_new_description = f"{match[1]} {new_description}"
+                            else:
+                                # new description matches beginning format, keep as is:
+                                iface_new_description = new_description
+                        else:
+                            # no beginning match, just set new description:
+                            iface_new_description = new_description
+                    else:
+                        # nothing special, just set new description:
+                        iface_new_description = new_description
+
+                # elif new_description_type == BULKEDIT_ALIAS_TYPE_PREPEND:
+                # To be implemented
 
-        # do we want to change the untagged vlan:
-        if new_pvid > 0:
-            if iface.lacp_master_index > 0:
-                # LACP member interface, we cannot edit the vlan!
-                log = Log(
-                    user=request.user,
-                    ip_address=remote_ip,
-                    if_name=iface.name,
-                    switch=switch,
-                    group=group,
-                    type=LOG_TYPE_WARNING,
-                    action=LOG_CHANGE_INTERFACE_PVID,
-                    description=f"Interface {iface.name}: LACP Member, vlan set to {new_pvid} IGNORED!",
-                )
-                outputs.append(log.description)
-                log.save()
-            else:
-                # make sure we cast the proper type here! Ie this needs an Integer()
                 log = Log(
                     user=request.user,
                     ip_address=remote_ip,
                     if_name=iface.name,
                     switch=switch,
                     group=group,
-                    action=LOG_CHANGE_INTERFACE_PVID,
+                    action=LOG_CHANGE_INTERFACE_ALIAS,
                 )
-                if new_pvid != iface.untagged_vlan:
-                    # new vlan, go set it:
-                    if not conn.set_interface_untagged_vlan(iface, new_pvid):
-                        error_count += 1
-                        log.type = LOG_TYPE_ERROR
-                        log.description = f"Interface {iface.name}: Vlan change ERROR: {conn.error.description} - {conn.error.details}"
-                        outputs.append(f"Interface {iface.name}: Vlan change ERROR: {conn.error.description}")
-                        counter_increment(COUNTER_ERRORS)
-                    else:
-                        success_count += 1
-                        log.type = LOG_TYPE_CHANGE
-                        log.description = f"Interface {iface.name}: Vlan set to {new_pvid}"
-                        outputs.append(log.description)
+                if not conn.set_interface_description(iface, iface_new_description):
+                    error_count += 1
+                    log.type = LOG_TYPE_ERROR
+                    log.description = (
+                        f"Interface {iface.name}: Descr ERROR: {conn.error.description} - {conn.error.details}"
+                    )
                     log.save()
-                    counter_increment(COUNTER_CHANGES)
-                    conn.switch.update_change()
-                else:
-                    # already on desired vlan:
-                    outputs.append(f"Interface {iface.name}: Ignored, vlan already {new_pvid}")
-
-        # tired of the old interface description?
-        if new_description:
-            iface_new_description = ""
-            # what are we supposed to do with the description/description?
-            if new_description_type == BULKEDIT_ALIAS_TYPE_APPEND:
-                iface_new_description = f"{iface.description} {new_description}"
-                # outputs.append(f"Interface {iface.name}: Description Append: {iface_new_description}")
-            elif new_description_type == BULKEDIT_ALIAS_TYPE_REPLACE:
-                # check if the original description starts with a string we have to keep:
-                if settings.IFACE_ALIAS_KEEP_BEGINNING_REGEX:
-                    keep_format = f"(^{settings.IFACE_ALIAS_KEEP_BEGINNING_REGEX})"
-                    match = re.match(keep_format, iface.description)
-                    if match:
-                        # beginning match, but check if new submitted description matches requirement:
-                        match_new = re.match(keep_format, new_description)
-                        if not match_new:
-                            # required start string NOT found on new description, so prepend it!
-                            iface_new_description = f"{match[1]} {new_description}"
-                        else:
-                            # new description matches beginning format, keep as is:
-                            iface_new_description = new_description
-                    else:
-                        # no beginning match, just set new description:
-                        iface_new_description = new_description
+                    counter_increment(COUNTER_ERRORS)
+                    outputs.append(f"Interface {iface.name}: Descr ERROR: {conn.error.description}")
                 else:
-                    # nothing special, just set new description:
-                    iface_new_description = new_description
-
-            # elif new_description_type == BULKEDIT_ALIAS_TYPE_PREPEND:
-            # To be implemented
-
-            log = Log(
-                user=request.user,
-                ip_address=remote_ip,
-                if_name=iface.name,
-                switch=switch,
-                group=group,
-                action=LOG_CHANGE_INTERFACE_ALIAS,
-            )
-            if not conn.set_interface_description(iface, iface_new_description):
-                error_count += 1
-                log.type = LOG_TYPE_ERROR
-                log.description = (
-                    f"Interface {iface.name}: Descr ERROR: {conn.error.description} - {conn.error.details}"
-                )
-                log.save()
-                counter_increment(COUNTER_ERRORS)
-                outputs.append(f"Interface {iface.name}: Descr ERROR: {conn.error.description}")
+                    success_count += 1
+                    log.type = LOG_TYPE_CHANGE
+                    log.description = f"Interface {iface.name}: Descr set OK"
+                    count_change()
+                    outputs.append(log.description)
+                    save_change_log(log)
+
+            if success_count > iface_success_count:
+                changed_interfaces.append(iface.name)
+
+        if transaction:
+            if conn.commit_transaction(comment=f"OpenL2M bulk edit by {request.user}"):
+                # the changes are applied, now log and count them:
+                for log in change_logs:
+                    log.save()
+                if pending_changes:
+                    counter_increment(COUNTER_CHANGES, addition=pending_changes)
+                for _ in range(pending_changes):
+                    conn.switch.update_change()
             else:
-                success_count += 1
-                log.type = LOG_TYPE_CHANGE
-                log.description = f"Interface {iface.name}: Descr set OK"
-                counter_increment(COUNTER_CHANGES)
-                conn.switch.update_change()
-                outputs.append(log.description)
-            log.save()
+                # nothing was applied, report this for every changed interface:
+                outputs.append(
+                    f"ERROR: the changes could not be committed, NONE were applied: {conn.error.description}"
+                )
+                for if_name in changed_interfaces:
+                    log = Log(
+                        user=request.user,
+                        ip_address=remote_ip,
+                        if_name=if_name,
+                        switch=switch,
+                        group=group,
+                        type=LOG_TYPE_ERROR,
+                        action=LOG_CHANGE_BULK_EDIT,
+                        description=f"Interface {if_name}: changes rolled back, commit ERROR: {conn.error.description} - "
+                        f"{conn.error.details}",
+                    )
+                    log.save()
+                    outputs.append(f"Interface {if_name}: changes rolled back!")
+                    counter_increment(COUNTER_ERRORS)
+                error_count += success_count
+                success_count = 0
+    finally:
+        if transaction:
+            # on an unexpected error, nothing is applied, and the device session is freed.
+            # After a commit, this does nothing.
+            conn.abort_transaction()
 
     # log final results
     log = Log(
@@ -1451,187 +1532,13 @@ class SwitchCmdTemplateOutput(LoginRequiredMixin, View):
         template_id = int(request.POST.get("template_id", -1))
         t = get_object_or_404(CommandTemplate, pk=template_id)
 
-        # now build the command template:
-        values = {}
-        errors = False
-        error_string = ""
-
-        """
-        do field / list validation here. This can likely be simplified - needs work!
-        """
-        # do we need to parse field1:
-        if "{{field1}}" in t.template:
-            field1 = request.POST.get("field1", False)
-            if field1:
-                if string_matches_regex(field1, t.field1_regex):
-                    values["field1"] = str(field1)
-                else:
-                    errors = True
-                    error_string = f"{t.field1_name} - Invalid entry: {field1}"
-            else:
-                # not found in form (or empty), but reqired!
-                errors = True
-                error_string = f"{t.field1_name} - cannot be blank!"
-
-        # do we need to parse field2:
-        if "{{field2}}" in t.template:
-            field2 = request.POST.get("field2", False)
-            if field2:
-                if string_matches_regex(field2, t.field2_regex):
-                    values["field2"] = str(field2)
-                else:
-                    errors = True
-                    error_string += f"<br/>{t.field2_name} - Invalid entry: {field2}"
-            else:
-                # not found in form (or empty), but reqired!
-                errors = True
-                error_string += f"<br/>{t.field2_name} - cannot be blank!"
-
-        # do we need to parse field3:
-        if "{{field3}}" in t.template:
-            field3 = request.POST.get("field3", False)
-            if field3:
-                if string_matches_regex(field3, t.field3_regex):
-                    values["field3"] = str(field3)
-                else:
-                    errors = True
-                    error_string += f"<br/>{t.field3_name} - Invalid entry: {field3}"
-            else:
-                # not found in form (or empty), but reqired!
-                errors = True
-                error_string += f"<br/>{t.field3_name} - cannot be blank!"
-
-        # do we need to parse field4:
-        if "{{field4}}" in t.template:
-            field4 = request.POST.get("field4", False)
-            if field4:
-                if string_matches_regex(field4, t.field4_regex):
-                    values["field4"] = str(field4)
-                else:
-                    errors = True
-                    error_string += f"<br/>{t.field4_name} - Invalid entry: {field4} "
-            else:
-                # not found in form (or empty), but reqired!
-                errors = True
-                error_string += f"<br/>{t.field4_name} - cannot be blank!"
-
-        # do we need to parse field5:
-        if "{{field5}}" in t.template:
-            field5 = request.POST.get("field5_regex", False)
-            if field5:
-                if string_matches_regex(field5, t.field5_regex):
-                    values["field5"] = str(field5)
-                else:
-                    errors = True
-                    error_string += f"<br/>{t.field5_name} - Invalid entry: {field5}"
-            else:
-                # not found in form (or empty), but reqired!
-                errors = True
-                error_string += f"<br/>{t.field5_name} - cannot be blank!"
-
-        # do we need to parse field6:
-        if "{{field6}}" in t.template:
-            field6 = request.POST.get("field6", False)
-            if field6:
-                if string_matches_regex(field1, t.field6_regex):
-                    values["field6"] = str(field6)
-                else:
-                    errors = True
-                    error_string += f"<br/>{t.field6_name} - Invalid entry: {field6} "
-            else:
-                # not found in form (or empty), but reqired!
-                errors = True
-                error_string += f"<br/>{t.field6_name} - cannot be blank!"
-
-        # do we need to parse field7:
-        if "{{field7}}" in t.template:
-            field7 = request.POST.get("field7", False)
-            if field7:
-                if string_matches_regex(field7, t.field7_regex):
-                    values["field7"] = str(field7)
-                else:
-                    errors = True
-                    error_string += f"<br/>{t.field7_name} - Invalid entry: {field7}"
-            else:
-                # not found in form (or empty), but reqired!
-                errors = True
-                error_string += f"<br/>{t.field7_name} - cannot be blank!"
-
-        # do we need to parse field8:
-        if "{{field8}}" in t.template:
-            field8 = request.POST.get("field8", False)
-            if field8:
-                if string_matches_regex(field8, t.field8_regex):
-                    values["field8"] = str(field8)
-                else:
-                    errors = True
-                    error_string += f"<br/>{t.field8_name} - Invalid entry: {field8}"
-            else:
-                # not found in form (or empty), but reqired!
-                errors = True
-                error_string += f"<br/>{t.field8_name} - cannot be blank!"
-
-        # and the pick lists:
-        # do we need to parse list1:
-        if "{{list1}}" in t.template:
-            list1 = request.POST.get("list1", False)
-            if list1:
-                values["list1"] = str(list1)
-            else:
-                # not found in form (or empty), but reqired (unlikely to happen for list)!
-                errors = True
-                error_string += f"<br/>{t.list1_name} - cannot be blank!"
-
-        # do we need to parse list2:
-        if "{{list2}}" in t.template:
-            list2 = request.POST.get("list2", False)
-            if list2:
-                values["list2"] = str(list2)
-            else:
-                # not found in form (or empty), but reqired (unlikely to happen for list)!
-                errors = True
-                error_string += f"<br/>{t.list2_name} - cannot be blank!"
-
-        # do we need to parse list3:
-        if "{{list3}}" in t.template:
-            list3 = request.POST.get("list3", False)
-            if list3:
-                values["list3"] = str(list3)
-            else:
-                # not found in form (or empty), but reqired (unlikely to happen for list)!
-                errors = True
-                error_string += f"<br/>{t.list3_name} - cannot be blank!"
-
-        # do we need to parse list4:
-        if "{{list4}}" in t.template:
-            list4 = request.POST.get("list4", False)
-            if list4:
-                values["list4"] = str(list4)
-            else:
-                # not found in form (or empty), but reqired (unlikely to happen for list)!
-                errors = True
-                error_string += f"<br/>{t.list4_name} - cannot be blank!"
-
-        # do we need to parse list5:
-        if "{{list5}}" in t.template:
-            list5 = request.POST.get("list5", False)
-            if list5:
-                values["list5"] = str(list5)
-            else:
-                # not found in form (or empty), but reqired (unlikely to happen for list)!
-                errors = True
-                error_string += f"<br/>{t.list5_name} - cannot be blank!"
-
-        if errors:
+        # now validate the fields, and build the command:
+        command, error_string = get_template_command(template=t, data=request.POST)
+        if error_string:
             error = Error()
             error.description = mark_safe(error_string)
             return error_page(request=request, group=group, switch=switch, error=error)
 
-        # now do the template expansion, i.e. Jinja2 rendering:
-        template = Template(t.template)
-        context = Context(values)
-        command = template.render(context)
-
         return switch_view(
             request=request,
             group_id=group_id,
@@ -1712,9 +1619,12 @@ class SwitchReload(LoginRequiredMixin, View):
         log.save()
 
         clear_switch_cache(request)
+        # and the cached Napalm getter results:
+        napalm_cache.clear(switch_id=switch.id)
         counter_increment(COUNTER_VIEWS)
 
-        return switch_view(request=request, group_id=group_id, switch_id=switch_id, view=view)
+        # a reload always reads the device, and not the pre-read device state:
+        return switch_view(request=request, group_id=group_id, switch_id=switch_id, view=view, use_snapshot=False)
 
 
 class SwitchActivity(LoginRequiredMixin, View):
@@ -1750,12 +1660,15 @@ class SwitchActivity(LoginRequiredMixin, View):
 
         # only show this switch. May add more filters later...
         filter = {"switch_id": switch_id}
-        logs = Log.objects.all().filter(**filter).order_by("-timestamp")
-
-        # setup pagination of the resulting activity logs
-        page_number = int(request.GET.get("page", default=1))
-        paginator = Paginator(logs, settings.PAGINATE_COUNT)  # Show set number of contacts per page.
-        logs_page = paginator.get_page(page_number)
+        logs = Log.objects.all().filter(**filter).select_related("user", "switch", "group")
+
+        # setup keyset pagination of the resulting activity logs, this avoids counting all entries.
+        logs_page = get_keyset_page(
+            queryset=logs,
+            per_page=settings.PAGINATE_COUNT,
+            after=request.GET.get("after", ""),
+            before=request.GET.get("before", ""),
+        )
 
         # log my activity
         log = Log(
@@ -1765,7 +1678,7 @@ class SwitchActivity(LoginRequiredMixin, View):
             group=group,
             type=LOG_TYPE_VIEW,
             action=LOG_VIEW_ALL_LOGS,
-            description=f"Viewing Switch Activity Logs (page {page_number})",
+            description="Viewing Switch Activity Logs",
         )
         log.save()
 
@@ -1781,7 +1694,6 @@ class SwitchActivity(LoginRequiredMixin, View):
             template_name,
             {
                 "logs": logs_page,
-                "paginator": paginator,
                 "group": group,
                 "switch": switch,
                 "log_title": title,
@@ -1870,6 +1782,54 @@ class ShowTop(LoginRequiredMixin, View):
         )
 
 
+class HostSearch(LoginRequiredMixin, View):
+    """
+    Find where an ethernet or IP address was last seen, from the host location index.
+    This does not read any device.
+    """
+
+    def get(
+        self,
+        request,
+    ):
+        dprint("HostSearch() - GET called")
+
+        template_name = "host_search.html"
+
+        if not settings.HOST_INDEX_ENABLED:
+            # we should not be here!
+            return redirect(reverse("switches:groups"))
+
+        search = str(request.GET.get("host", "")).strip()
+        results = []
+        warning = False
+        if search:
+            # log my activity
+            log = Log(
+                user=request.user,
+                ip_address=get_remote_ip(request),
+                action=LOG_VIEW_HOST_SEARCH,
+                description=f"Searching for host '{search}'",
+                type=LOG_TYPE_VIEW,
+            )
+            log.save()
+            permissions = get_from_http_session(request, "permissions")
+            if not permissions:
+                permissions = get_my_device_groups(request=request)
+            results, warning = hostindex.search(query=search, allowed=hostindex.get_allowed_switches(permissions))
+
+        # render the template
+        return render(
+            request,
+            template_name,
+            {
+                "search": search,
+                "results": results,
+                "warning": warning,
+            },
+        )
+
+
 #
 # "Administrative" views
 #
@@ -1912,8 +1872,6 @@ class SwitchAdminActivity(LoginRequiredMixin, View):
             action=LOG_VIEW_ALL_LOGS,
         )
 
-        page_number = int(request.GET.get("page", default=1))
-
         # look at query string, and filter as needed
         filter = {}
         if len(request.GET) > 0:
@@ -1930,18 +1888,22 @@ class SwitchAdminActivity(LoginRequiredMixin, View):
 
         # now set the filter, if found
         if len(filter) > 0:
-            logs = Log.objects.all().filter(**filter).order_by("-timestamp")
-            log.description = f"Viewing filtered logs: {filter} (page {page_number})"
+            logs = Log.objects.all().filter(**filter)
+            log.description = f"Viewing filtered logs: {filter}"
             title = "Filtered Logs"
         else:
-            logs = Log.objects.all().order_by("-timestamp")
-            log.description = f"Viewing all logs (page {page_number})"
+            logs = Log.objects.all()
+            log.description = "Viewing all logs"
             title = "All Logs"
         log.save()
 
-        # setup pagination of the resulting activity logs
-        paginator = Paginator(logs, settings.PAGINATE_COUNT)  # Show set number of contacts per page.
-        logs_page = paginator.get_page(page_number)
+        # setup keyset pagination of the resulting activity logs, this avoids counting all entries.
+        logs_page = get_keyset_page(
+            queryset=logs.select_related("user", "switch", "group"),
+            per_page=settings.PAGINATE_COUNT,
+            after=request.GET.get("after", ""),
+            before=request.GET.get("before", ""),
+        )
 
         # render the template
         return render(
@@ -1949,7 +1911,6 @@ class SwitchAdminActivity(LoginRequiredMixin, View):
             template_name,
             {
                 "logs": logs_page,
-                "paginator": paginator,
                 "filter": filter,
                 "types": LOG_TYPE_CHOICES,
                 "actions": LOG_ACTION_CHOICES,
@@ -1962,6 +1923,106 @@ class SwitchAdminActivity(LoginRequiredMixin, View):
         )
 
 
+class ShowDrivers(LoginRequiredMixin, View):
+    """
+    This shows the device drivers, if they are enabled, and how long they took to import
+    in this web server process. The import of a driver can also be measured with 'python -X importtime'.
+    """
+
+    def get(
+        self,
+        request,
+    ):
+        dprint("ShowDrivers() - GET called")
+
+        template_name = "admin_drivers.html"
+
+        if not request.user.is_superuser:
+            error = Error()
+            error.status = True
+            error.description = "You do not have access to this page!"
+            counter_increment(COUNTER_ACCESS_DENIED)
+            return error_page(request=request, group=False, switch=False, error=error)
+
+        # log my activity
+        log = Log(
+            user=request.user,
+            ip_address=get_remote_ip(request),
+            type=LOG_TYPE_VIEW,
+            action=LOG_VIEW_ADMIN_STATS,
+            description="Viewing Device Drivers",
+        )
+        log.save()
+
+        # measure the import of a driver in a new process:
+        report = False
+        driver = registry.get_driver(request.GET.get("importtime", ""))
+        if driver:
+            report = registry.get_importtime_report(driver=driver)
+            report["driver"] = driver
+
+        # render the template
+        return render(
+            request,
+            template_name,
+            {
+                "drivers": registry.get_drivers(),
+                "report": report,
+                "pid": os.getpid(),
+            },
+        )
+
+
+def download_response(request, group, switch, log, basename, available, rows, create_xls_file):
+    """
+    Return the download response for device data, in the format given by the "format" query parameter:
+    "xlsx" (the default), "csv" or "ndjson". The "columns" query parameter is an optional
+    comma-separated list of column keys to include, in that order.
+    CSV and NDJSON are streamed row by row, the Excel file is built in a temporary file with constant memory.
+
+    Params:
+        request: the HttpRequest() object.
+        group (SwitchGroup): the group of the device.
+        switch (Switch): the device.
+        log (Log): the log entry for this download, saved here.
+        basename (str): the download filename, without extension.
+        available (dict): the column definitions, e.g. INTERFACE_COLUMNS
+        rows: generator with the row dicts, for the streaming formats.
+        create_xls_file: function called with the column list, that returns (file object, Error()).
+
+    Returns:
+        FileResponse() or StreamingHttpResponse() or an error page.
+    """
+    format = request.GET.get("format", "xlsx")
+    if format not in DOWNLOAD_FORMATS:
+        format = "xlsx"
+    columns = get_columns(available=available, requested=request.GET.get("columns", ""))
+    extension, content_type = DOWNLOAD_FORMATS[format]
+    filename = f"{basename}.{extension}"
+
+    if format == "xlsx":
+        # create a temp file with the spreadsheet
+        stream, error = create_xls_file(columns)
+        if not stream:
+            log.type = LOG_TYPE_ERROR
+            log.description = f"{error.description}: {error.details}"
+            log.save()
+            return error_page(request=request, group=group, switch=switch, error=error)
+        log.description = f"Downloading '{filename}'"
+        log.save()
+        return FileResponse(stream, as_attachment=True, filename=filename)
+
+    if format == "csv":
+        content = stream_csv(available=available, columns=columns, rows=rows)
+    else:
+        content = stream_ndjson(columns=columns, rows=rows)
+    log.description = f"Downloading '{filename}'"
+    log.save()
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = content_disposition_header(as_attachment=True, filename=filename)
+    return response
+
+
 class SwitchDownloadEthernetAndNeighbors(LoginRequiredMixin, View):
     """
     Download list of known ethernet addressess on a device.
@@ -2005,19 +2066,16 @@ class SwitchDownloadEthernetAndNeighbors(LoginRequiredMixin, View):
             log.save()
             return error_page(request=request, group=group, switch=switch, error=connection.error)
 
-        # create a temp file with the spreadsheet
-        stream, error = create_eth_neighbor_xls_file(connection)
-        if not stream:
-            log.type = LOG_TYPE_ERROR
-            log.description = f"{error.description}: {error.details}"
-            log.save()
-            return error_page(request=request, group=group, switch=switch, error=error)
-
-        # create tbe download filename
-        filename = f"{connection.switch.name}-ethernet-neighbor-info.xlsx"
-        log.description = f"Downloading '{filename}'"
-        log.save()
-        return FileResponse(stream, as_attachment=True, filename=filename)
+        return download_response(
+            request=request,
+            group=group,
+            switch=switch,
+            log=log,
+            basename=f"{connection.switch.name}-ethernet-neighbor-info",
+            available=ETH_NEIGHBOR_COLUMNS,
+            rows=eth_neighbor_rows(connection),
+            create_xls_file=lambda columns: create_eth_neighbor_xls_file(connection, columns=columns),
+        )
 
 
 class SwitchDownloadInterfaces(LoginRequiredMixin, View):
@@ -2047,19 +2105,208 @@ class SwitchDownloadInterfaces(LoginRequiredMixin, View):
             type=LOG_TYPE_VIEW,
             action=LOG_VIEW_DOWNLOAD_INTERFACES,
         )
-        # create a temp file with the spreadsheet
-        stream, error = create_interfaces_xls_file(connection)
-        if not stream:
-            log.type = LOG_TYPE_ERROR
-            log.description = f"{error.description}: {error.details}"
-            log.save()
-            return error_page(request=request, group=group, switch=switch, error=error)
+        return download_response(
+            request=request,
+            group=group,
+            switch=switch,
+            log=log,
+            basename=f"{connection.switch.name}-interfaces",
+            available=INTERFACE_COLUMNS,
+            rows=interface_rows(connection),
+            create_xls_file=lambda columns: create_interfaces_xls_file(connection, columns=columns),
+        )
 
-        # create tbe download filename
-        filename = f"{connection.switch.name}-interfaces.xlsx"
-        log.description = f"Downloading '{filename}'"
+
+class GroupExport(LoginRequiredMixin, View):
+    """
+    Export the inventory of all devices in a group, see switches/export.py
+    GET shows the recent exports of this group with their progress, POST starts a new export.
+    """
+
+    def get(
+        self,
+        request,
+        group_id,
+    ):
+        dprint("GroupExport() - GET called")
+        group, members = get_group_export_permission(request=request, group_id=group_id)
+        if group is None:
+            return group_export_denied(request=request)
+
+        fail_stale_exports()
+        return render(
+            request,
+            "group_export.html",
+            {
+                "group": group,
+                "device_count": len(members),
+                "formats": EXPORT_FORMAT_CHOICES,
+                "jobs": ExportJob.objects.filter(user=request.user, group=group)[:10],
+                "status_running": EXPORT_STATUS_RUNNING,
+                "status_done": EXPORT_STATUS_DONE,
+            },
+        )
+
+    def post(
+        self,
+        request,
+        group_id,
+    ):
+        dprint("GroupExport() - POST called")
+        group, members = get_group_export_permission(request=request, group_id=group_id)
+        if group is None:
+            return group_export_denied(request=request)
+
+        format = request.POST.get("format", "")
+        if format not in [value for value, name in EXPORT_FORMAT_CHOICES]:
+            error = Error()
+            error.description = "Invalid export format!"
+            return error_page(request=request, group=group, switch=None, error=error)
+
+        job = start_export(request=request, group=group, switch_ids=[int(id) for id in members.keys()], format=format)
+        log = Log(
+            user=request.user,
+            ip_address=get_remote_ip(request),
+            group=group,
+            type=LOG_TYPE_VIEW,
+            action=LOG_VIEW_GROUP_EXPORT,
+            description=f"Exporting {job.total} devices of group '{group.name}'",
+        )
         log.save()
-        return FileResponse(stream, as_attachment=True, filename=filename)
+        return redirect(reverse("switches:group_export", kwargs={"group_id": group.id}))
+
+
+class GroupExportStatus(LoginRequiredMixin, View):
+    """
+    Return the progress of an export job as JSON, for the progress bar on the export page.
+    """
+
+    def get(
+        self,
+        request,
+        job_id,
+    ):
+        fail_stale_exports()
+        job = get_object_or_404(ExportJob, pk=job_id, user=request.user)
+        return JsonResponse(
+            {
+                "status": job.status,
+                "status_name": job.get_status_display(),
+                "total": job.total,
+                "done": job.done,
+                "errors": job.errors,
+                "percent": job.percent,
+            }
+        )
+
+
+class GroupExportDownload(LoginRequiredMixin, View):
+    """
+    Download the file of a finished export job.
+    """
+
+    def get(
+        self,
+        request,
+        job_id,
+    ):
+        dprint("GroupExportDownload() - GET called")
+        job = get_object_or_404(ExportJob.objects.select_related("group"), pk=job_id, user=request.user)
+        if job.status != EXPORT_STATUS_DONE or not os.path.exists(job.filename):
+            error = Error()
+            error.description = "This export is not available!"
+            return error_page(request=request, group=job.group, switch=None, error=error)
+        extension = job.filename.split(".", 1)[1]
+        filename = f"{job.group.name}-inventory-{job.created.strftime('%Y%m%d-%H%M')}.{extension}"
+        return FileResponse(open(job.filename, "rb"), as_attachment=True, filename=filename)
+
+
+class GroupCommand(LoginRequiredMixin, View):
+    """
+    Run a global command, or command template, on all (or selected) devices in a group, see switches/multicommand.py
+    GET shows the form, POST runs the command and streams the result of each device as a line of JSON.
+    """
+
+    def get(
+        self,
+        request,
+        group_id,
+    ):
+        dprint("GroupCommand() - GET called")
+        group, members = get_group_export_permission(request=request, group_id=group_id)
+        if group is None:
+            return group_export_denied(request=request)
+
+        commands, templates = get_group_commands(user=request.user, switch_ids=[int(id) for id in members.keys()])
+        return render(
+            request,
+            "group_command.html",
+            {
+                "group": group,
+                "members": members,
+                "commands": commands,
+                "templates": templates,
+                "max_devices": settings.MULTI_COMMAND_MAX_DEVICES,
+            },
+        )
+
+    def post(
+        self,
+        request,
+        group_id,
+    ):
+        dprint("GroupCommand() - POST called")
+        group, members = get_group_export_permission(request=request, group_id=group_id)
+        if group is None:
+            counter_increment(COUNTER_ACCESS_DENIED)
+            return JsonResponse({"error": "Access denied!"}, status=403)
+
+        command, template, switches, error = prepare_command(
+            user=request.user, data=request.POST, switch_ids=[int(id) for id in members.keys()]
+        )
+        if error:
+            return JsonResponse({"error": error}, status=400)
+
+        counter_increment(COUNTER_COMMANDS)
+        log = Log(
+            user=request.user,
+            ip_address=get_remote_ip(request),
+            group=group,
+            type=LOG_TYPE_COMMAND,
+            action=LOG_EXECUTE_COMMAND,
+            description=f"Running '{command}' on {len(switches)} devices of group '{group.name}'",
+        )
+        log.save()
+        results = run_command_on_devices(
+            request=request, group=group, switches=switches, command_string=command, template=template
+        )
+        response = StreamingHttpResponse(
+            stream_results(results=results, total=len(switches)), content_type="application/x-ndjson"
+        )
+        # ask proxies (e.g. nginx) not to buffer, so each device result is shown as soon as it arrives:
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+def get_group_export_permission(request, group_id: int):
+    """
+    Return the SwitchGroup() and the dict of its devices, if the user has access to this group.
+    Returns (None, None) if not.
+    """
+    groups = get_from_http_session(request=request, name="permissions")
+    if not groups or str(group_id) not in groups:
+        return None, None
+    group = SwitchGroup.objects.filter(pk=group_id).first()
+    if group is None:
+        return None, None
+    return group, groups[str(group_id)]["members"]
+
+
+def group_export_denied(request):
+    counter_increment(COUNTER_ACCESS_DENIED)
+    error = Error()
+    error.description = "Access denied!"
+    return error_page(request=request, group=None, switch=None, error=error)
 
 
 class TestPage(LoginRequiredMixin, View):
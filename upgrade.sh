@@ -103,6 +103,17 @@ COMMAND="python3 openl2m/manage.py migrate"
 echo "Applying database migrations ($COMMAND)..."
 eval $COMMAND || exit 1
 
+# Optionally, (re)build the daily log activity rollups used for the statistics pages from the log entries.
+# This counts all log entries of those days, so it is only done if asked for, e.g. the first time you upgrade
+# to a version with rollups:
+#   sudo ROLLUP_LOG_DAYS=31 ./upgrade.sh
+ROLLUP_LOG_DAYS="${ROLLUP_LOG_DAYS:-0}"
+if [ "${ROLLUP_LOG_DAYS}" -gt 0 ]; then
+  COMMAND="python3 openl2m/manage.py rolluplogs --days ${ROLLUP_LOG_DAYS}"
+  echo "Rebuilding daily log rollups ($COMMAND)..."
+  eval $COMMAND || exit 1
+fi
+
 cd docs
 
 # Recompile the documentation, these become django static files!